@@ -0,0 +1,265 @@
+"""Бенчмарк методов DatabaseManager на синтетической истории.
+
+Запуск:
+    python benchmarks/bench_database.py --sizes 10k,1m --output bench_db.json
+    python benchmarks/bench_database.py --compare bench_db_prev.json
+
+Базы генерируются один раз (datagen.py) и кэшируются в benchmarks/.data.
+Результаты пишутся в JSON, чтобы сравнивать их между релизами.
+"""
+
+import argparse
+import inspect
+import json
+import platform
+import shutil
+import sqlite3
+import statistics
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from datagen import config_for_rows, generate_history
+
+from database.db_manager import DatabaseManager
+from models.session import Session
+from models.activity import Activity, ActivityType
+from models.input_minute import InputMinute
+from models.focus_day import FocusDay
+
+
+DATA_DIR = Path(__file__).resolve().parent / ".data"
+
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000, "10m": 10_000_000}
+
+
+def parse_size(text: str) -> int:
+    """Разобрать размер вида 10k / 1m / 12345."""
+    text = text.strip().lower()
+    if text in SIZES:
+        return SIZES[text]
+    return int(text)
+
+
+def prepare_database(rows: int, seed: int, end_date: date) -> Path:
+    """Получить (сгенерировать или взять из кэша) базу нужного размера."""
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    db_path = DATA_DIR / f"history_{rows}_{seed}_{end_date.isoformat()}.db"
+
+    if not db_path.exists():
+        tmp_path = db_path.with_suffix(".tmp")
+        if tmp_path.exists():
+            tmp_path.unlink()
+        started = time.perf_counter()
+        result = generate_history(tmp_path, config_for_rows(rows, seed=seed, end_date=end_date))
+        tmp_path.rename(db_path)
+        print(f"  сгенерировано {result.rows} строк за {time.perf_counter() - started:.1f} с")
+
+    return db_path
+
+
+def build_cases(db: DatabaseManager, db_path: Path, end_date: date) -> Dict[str, Callable[[], Any]]:
+    """Сценарии вызова для каждого публичного метода DatabaseManager."""
+    conn = sqlite3.connect(db_path)
+    try:
+        session_id = conn.execute(
+            "SELECT session_id FROM activities ORDER BY start_time DESC LIMIT 1"
+        ).fetchone()[0]
+    finally:
+        conn.close()
+
+    week_start = end_date - timedelta(days=end_date.weekday())
+    month_start = end_date.replace(day=1)
+    day_start = datetime.combine(end_date, datetime.min.time())
+    noon = day_start + timedelta(hours=12)
+
+    def save_session():
+        db.save_session(Session(total_duration=60))
+
+    def save_activity():
+        db.save_activity(Activity(
+            session_id=session_id, application_name="bench",
+            window_title="bench", activity_type=ActivityType.NEUTRAL
+        ))
+
+    def apply_checkpoint():
+        session = Session(total_duration=60)
+        db.apply_checkpoint([session], [Activity(
+            session_id=session.id, application_name="bench",
+            window_title="bench", activity_type=ActivityType.NEUTRAL
+        )])
+
+    def save_input_minutes():
+        minute = datetime.combine(end_date, datetime.min.time()) + timedelta(hours=10)
+        db.save_input_minutes([InputMinute(minute, "bench", keys=40, clicks=5, motion=300)])
+
+    return {
+        "initialize": db.initialize,
+        "save_session": save_session,
+        "get_session": lambda: db.get_session(session_id),
+        "get_sessions_by_date": lambda: db.get_sessions_by_date(end_date),
+        "get_active_session": db.get_active_session,
+        "save_activity": save_activity,
+        "apply_checkpoint": apply_checkpoint,
+        "close_dangling_activities": db.close_dangling_activities,
+        "save_input_minutes": save_input_minutes,
+        "get_input_intensity": lambda: db.get_input_intensity(end_date),
+        "search_titles:ticket": lambda: db.search_titles("CORE-42"),
+        "search_titles:word_year": lambda: db.search_titles(
+            "Jira", end_date - timedelta(days=365), end_date
+        ),
+        "get_activities_at": lambda: db.get_activities_at(noon),
+        "get_overlapping_activities": lambda: db.get_overlapping_activities(noon, noon + timedelta(hours=2)),
+        "iter_activities:day": lambda: sum(1 for _ in db.iter_activities(day_start, day_start + timedelta(days=1))),
+        "get_overlapping_sessions": lambda: db.get_overlapping_sessions(day_start, day_start + timedelta(days=1)),
+        "get_activity_index": lambda: db.get_activity_index(day_start, day_start + timedelta(days=1)),
+        "get_activity_gaps": lambda: db.get_activity_gaps(day_start, day_start + timedelta(days=1), 60),
+        "get_activities_by_session": lambda: db.get_activities_by_session(session_id),
+        "get_app_statistics": lambda: db.get_app_statistics(end_date),
+        "get_productivity_stats": lambda: db.get_productivity_stats(end_date),
+        "get_app_with_type": lambda: db.get_app_with_type(end_date),
+        "get_day_dashboard": lambda: db.get_day_dashboard(end_date),
+        "get_daily_stats": lambda: db.get_daily_stats(end_date),
+        "get_weekly_stats:week": lambda: db.get_weekly_stats(week_start, end_date),
+        "get_weekly_stats:month": lambda: db.get_weekly_stats(month_start, end_date),
+        "get_weekly_stats:year": lambda: db.get_weekly_stats(end_date - timedelta(days=365), end_date),
+        "get_daily_totals:year": lambda: db.get_daily_totals(end_date - timedelta(days=364), end_date),
+        "get_range_stats:week": lambda: db.get_range_stats(week_start, end_date),
+        "get_range_stats:all": lambda: db.get_range_stats(date(2000, 1, 1), end_date),
+        "get_sessions_in_range:month": lambda: db.get_sessions_in_range(month_start, end_date),
+        "get_sessions_in_range:all_latest": lambda: db.get_sessions_in_range(date(2000, 1, 1), end_date, 200),
+        "get_duration_histogram:month": lambda: db.get_duration_histogram("session", month_start, end_date),
+        "get_duration_histogram:all": lambda: db.get_duration_histogram("activity", date(2000, 1, 1), end_date),
+        "set_day_durations": lambda: db.set_day_durations("focus", end_date, [300, 1500, 2700]),
+        "save_focus_days": lambda: db.save_focus_days([FocusDay(day=end_date, focus_seconds=4500, streaks=3,
+                                                                streak_durations=[300, 1500, 2700])]),
+        "get_focus_days:month": lambda: db.get_focus_days(month_start, end_date),
+        "get_days_without_focus": lambda: db.get_days_without_focus(end_date),
+        "check_external_changes": db.check_external_changes,
+    }
+
+
+def check_coverage(cases: Dict[str, Callable]) -> List[str]:
+    """Найти публичные методы DatabaseManager без сценария."""
+    covered = {name.split(":")[0] for name in cases}
+    public = [
+        name for name, _ in inspect.getmembers(DatabaseManager, inspect.isfunction)
+        if not name.startswith("_")
+    ]
+    return [name for name in public if name not in covered]
+
+
+def measure(func: Callable[[], Any], repeat: int, warmup: int = 1) -> Dict[str, float]:
+    """Замерить функцию, вернуть статистику в миллисекундах."""
+    for _ in range(warmup):
+        func()
+
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+
+    samples.sort()
+    return {
+        "min_ms": round(samples[0], 3),
+        "median_ms": round(statistics.median(samples), 3),
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        "max_ms": round(samples[-1], 3),
+        "repeat": repeat,
+    }
+
+
+def run_size(rows: int, repeat: int, seed: int, end_date: date) -> Dict[str, Any]:
+    """Прогнать все сценарии на базе одного размера."""
+    source = prepare_database(rows, seed, end_date)
+
+    # Пишущие сценарии не должны портить кэш - работаем с копией
+    work_path = source.with_name(source.stem + "_work.db")
+    shutil.copyfile(source, work_path)
+
+    try:
+        db = DatabaseManager(work_path)
+        cases = build_cases(db, work_path, end_date)
+
+        missing = check_coverage(cases)
+        if missing:
+            print(f"  ВНИМАНИЕ: нет сценариев для {', '.join(missing)}")
+
+        results = {}
+        for name, func in cases.items():
+            results[name] = measure(func, repeat)
+            print(f"  {name:<32} median {results[name]['median_ms']:>9.3f} ms"
+                  f"  p95 {results[name]['p95_ms']:>9.3f} ms")
+        return {"rows": rows, "methods": results}
+    finally:
+        work_path.unlink(missing_ok=True)
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> int:
+    """Сравнить с предыдущим прогоном, вернуть число регрессий."""
+    regressions = 0
+    for size, data in current["results"].items():
+        base_methods = baseline.get("results", {}).get(size, {}).get("methods", {})
+        for name, stats in data["methods"].items():
+            base = base_methods.get(name)
+            if not base or base["median_ms"] <= 0:
+                continue
+            ratio = stats["median_ms"] / base["median_ms"]
+            if ratio > threshold:
+                regressions += 1
+                print(f"РЕГРЕССИЯ {size} {name}: {base['median_ms']} -> "
+                      f"{stats['median_ms']} ms (x{ratio:.2f})")
+    return regressions
+
+
+def main() -> int:
+    """Точка входа бенчмарка."""
+    parser = argparse.ArgumentParser(description="Бенчмарк DatabaseManager")
+    parser.add_argument("--sizes", default="10k", help="Размеры через запятую: 10k,1m,10m")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--end-date", type=date.fromisoformat, default=date.today(),
+                        help="Последний день истории (YYYY-MM-DD)")
+    parser.add_argument("--output", type=Path, default=Path("bench_db.json"))
+    parser.add_argument("--compare", type=Path, help="JSON предыдущего прогона")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="Порог регрессии (отношение медиан)")
+    args = parser.parse_args()
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "end_date": args.end_date.isoformat(),
+            "repeat": args.repeat,
+        },
+        "results": {},
+    }
+
+    for size in args.sizes.split(","):
+        rows = parse_size(size)
+        print(f"[{size}] {rows} строк")
+        report["results"][size.strip().lower()] = run_size(rows, args.repeat, args.seed, args.end_date)
+
+    args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"Результаты сохранены в {args.output}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        if compare(report, baseline, args.threshold):
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
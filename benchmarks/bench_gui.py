@@ -0,0 +1,286 @@
+"""Бенчмарк обновления GUI без дисплея (QT_QPA_PLATFORM=offscreen).
+
+Строит MainWindow поверх сгенерированной базы и замеряет:
+- обновление вкладок «Статистика» и «Продуктивность»;
+- переключение периода и фильтра;
+- отрисовку графиков статистики с нуля;
+- прокрутку и отрисовку ленты активностей;
+- память на строку таблицы (tracemalloc и RSS).
+
+Запуск:
+    python benchmarks/bench_gui.py --rows 100k --output bench_gui.json
+    python benchmarks/bench_gui.py --budget budgets.json  # код возврата 1 при превышении
+"""
+
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_database import parse_size, prepare_database
+
+from PyQt6.QtWidgets import QApplication
+
+from database.db_manager import DatabaseManager
+from models.activity import Activity, ActivityType
+from utils.config import Config
+
+
+# Бюджеты по умолчанию: медиана в миллисекундах, память в байтах на строку
+DEFAULT_BUDGETS = {
+    "stats_refresh:today": 50.0,
+    "stats_refresh:week": 100.0,
+    "stats_refresh:month": 250.0,
+    "stats_period_switch": 250.0,
+    "activity_refresh": 100.0,
+    "activity_filter_switch": 50.0,
+    "activity_live_tick": 5.0,
+    "activity_live_switch": 16.0,
+    "chart_render:month": 10.0,
+    "chart_render:year": 10.0,
+    "chart_render:histogram": 10.0,
+    "timeline_scroll": 16.0,
+    "timeline_render:day": 50.0,
+    "timeline_render:weeks": 250.0,
+    "stats_bytes_per_row": 16384,
+    "activity_bytes_per_row": 16384,
+}
+
+
+def _rss() -> int:
+    """Текущий RSS процесса (0, если psutil недоступен)."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        return 0
+
+
+def measure(app: QApplication, func: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """Замерить операцию вместе с обработкой событий и перерисовкой."""
+    func()
+    app.processEvents()
+
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        app.processEvents()
+        samples.append((time.perf_counter() - started) * 1000)
+
+    samples.sort()
+    return {
+        "min_ms": round(samples[0], 3),
+        "median_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        "max_ms": round(samples[-1], 3),
+        "repeat": repeat,
+    }
+
+
+def measure_memory(app: QApplication, func: Callable[[], Any], rows: Callable[[], int]) -> Dict[str, float]:
+    """Память, удерживаемая после построения таблицы, в пересчёте на строку."""
+    func()
+    app.processEvents()
+
+    rss_before = _rss()
+    tracemalloc.start()
+    snapshot_before = tracemalloc.take_snapshot()
+
+    func()
+    app.processEvents()
+
+    snapshot_after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    rss_after = _rss()
+
+    py_bytes = sum(stat.size_diff for stat in snapshot_after.compare_to(snapshot_before, "filename"))
+    row_count = max(1, rows())
+    return {
+        "rows": rows(),
+        "py_bytes_per_row": round(max(0, py_bytes) / row_count, 1),
+        "rss_bytes_per_row": round(max(0, rss_after - rss_before) / row_count, 1),
+    }
+
+
+def run(db_path: Path, repeat: int) -> Dict[str, Any]:
+    """Прогнать сценарии GUI."""
+    from core.focus_analyzer import FocusHistory
+    from gui.main_window import MainWindow
+
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    config_dir = Path(tempfile.mkdtemp())
+    config = Config(config_dir / "config.json")
+    config.settings.auto_start_tracking = False
+
+    db = DatabaseManager(db_path)
+    db.initialize()
+    # Серии фокуса по истории считаются один раз, а не в фоне во время замеров
+    FocusHistory(db, threaded=False).update()
+
+    window = MainWindow(db, config)
+    window.show()
+    app.processEvents()
+
+    stats = window._stats_widget
+    activity = window._activity_widget
+    results: Dict[str, Any] = {}
+
+    try:
+        window._tab_widget.setCurrentIndex(0)
+        for index, name in enumerate(["today", "week", "month"]):
+            stats._period_combo.setCurrentIndex(index)
+            results[f"stats_refresh:{name}"] = measure(app, stats.refresh, repeat)
+
+        def switch_period():
+            for index in (1, 2, 0):
+                stats._period_combo.setCurrentIndex(index)
+
+        results["stats_period_switch"] = measure(app, switch_period, repeat)
+
+        stats._period_combo.setCurrentIndex(2)
+        results["chart_render:month"] = measure(app, stats._bar_chart.render_pixmap, repeat)
+        results["chart_render:year"] = measure(app, stats._heatmap.render_pixmap, repeat)
+        results["chart_render:histogram"] = measure(app, stats._histogram_chart.render_pixmap, repeat)
+
+        memory = measure_memory(app, stats.refresh, stats._sessions_table.rowCount)
+        results["stats_memory"] = memory
+        results["stats_bytes_per_row"] = memory["py_bytes_per_row"]
+
+        window._tab_widget.setCurrentIndex(1)
+        results["activity_refresh"] = measure(app, activity.refresh, repeat)
+
+        def switch_filter():
+            for index in (1, 2, 3, 0):
+                activity._filter_combo.setCurrentIndex(index)
+
+        results["activity_filter_switch"] = measure(app, switch_filter, repeat)
+
+        # Во время сессии: секунда идущей активности и смена приложения - без БД
+        live_apps = [row["name"] for row in db.get_app_with_type(date.today())][:5] or ["bench"]
+        switches = []
+
+        def live_switch():
+            name = live_apps[len(switches) % len(live_apps)]
+            switches.append(name)
+            activity.activity_started(Activity(application_name=name, start_time=datetime.now(),
+                                               activity_type=ActivityType.NEUTRAL))
+
+        results["activity_live_switch"] = measure(app, live_switch, repeat)
+        results["activity_live_tick"] = measure(app, activity.tick, repeat)
+
+        memory = measure_memory(app, activity.refresh, activity._apps_model.rowCount)
+        results["activity_memory"] = memory
+        results["activity_bytes_per_row"] = memory["py_bytes_per_row"]
+
+        results.update(run_timeline(app, db, repeat))
+    finally:
+        window._tray_icon.hide()
+        window.deleteLater()
+        app.processEvents()
+
+    return results
+
+
+def run_timeline(app: QApplication, db: DatabaseManager, repeat: int) -> Dict[str, Any]:
+    """Лента: прокрутка по готовым плиткам и отрисовка плиток с нуля."""
+    from gui.widgets.timeline_widget import TimelineWidget
+
+    # Дни грузятся синхронно, чтобы в замер попадала и выборка из БД
+    timeline = TimelineWidget(db, threaded=False)
+    timeline.resize(800, timeline.minimumHeight())
+    timeline.show()
+    results: Dict[str, Any] = {}
+
+    def scroll():
+        timeline.scroll_by(40)
+        timeline.repaint()
+
+    try:
+        timeline.show_day(date.today())
+        timeline.repaint()
+        results["timeline_scroll"] = measure(app, scroll, repeat)
+
+        def render():
+            timeline._days.clear()
+            timeline._tiles.invalidate()
+            timeline.repaint()
+
+        timeline.show_day(date.today())
+        results["timeline_render:day"] = measure(app, render, repeat)
+
+        timeline.zoom(TimelineWidget.MAX_LEVEL)  # несколько недель на экране
+        results["timeline_render:weeks"] = measure(app, render, repeat)
+    finally:
+        timeline.deleteLater()
+
+    return results
+
+
+def check_budgets(results: Dict[str, Any], budgets: Dict[str, float]) -> int:
+    """Проверить бюджеты, вернуть количество превышений."""
+    failures = 0
+    for name, limit in budgets.items():
+        value = results.get(name)
+        if value is None:
+            continue
+        actual = value["median_ms"] if isinstance(value, dict) else value
+        status = "OK"
+        if actual > limit:
+            status = "ПРЕВЫШЕН"
+            failures += 1
+        print(f"  {name:<28} {actual:>10.2f} / {limit:<10} {status}")
+    return failures
+
+
+def main() -> int:
+    """Точка входа бенчмарка."""
+    parser = argparse.ArgumentParser(description="Бенчмарк обновления GUI")
+    parser.add_argument("--rows", default="10k", help="Размер истории: 10k, 1m, ...")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db", type=Path, help="Готовая база вместо сгенерированной")
+    parser.add_argument("--budget", type=Path, help="JSON с бюджетами (перекрывает значения по умолчанию)")
+    parser.add_argument("--output", type=Path, default=Path("bench_gui.json"))
+    args = parser.parse_args()
+
+    budgets = dict(DEFAULT_BUDGETS)
+    if args.budget:
+        budgets.update(json.loads(args.budget.read_text(encoding="utf-8")))
+
+    db_path = args.db or prepare_database(parse_size(args.rows), args.seed, date.today())
+    results = run(db_path, args.repeat)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "db": str(db_path),
+            "platform": os.environ.get("QT_QPA_PLATFORM"),
+            "repeat": args.repeat,
+        },
+        "results": results,
+        "budgets": budgets,
+    }
+    args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    print("Бюджеты:")
+    failures = check_budgets(results, budgets)
+    print(f"Результаты сохранены в {args.output}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
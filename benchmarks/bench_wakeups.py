@@ -0,0 +1,139 @@
+"""Замер пробуждений в секунду: отдельные QTimer против ClockService.
+
+Сравнивает старую схему (TimeTracker 1 с, BreakManager 1 с,
+ActivityMonitor 2 с - три независимых таймера) с общим сервисом
+пробуждений в трёх состояниях: окно видно, окно в трее, окно в трее
+и пользователь простаивает. Кроме числа срабатываний считаются
+добровольные переключения контекста процесса - то же, что видит powertop.
+
+Запуск:
+    python benchmarks/bench_wakeups.py --seconds 10 --output bench_wakeups.json
+"""
+
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Callable, Dict
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from PyQt6.QtCore import QCoreApplication, QTimer, QEventLoop
+
+from core.clock_service import ClockService
+
+
+def _context_switches() -> int:
+    """Добровольные переключения контекста процесса (0 без psutil)."""
+    try:
+        import psutil
+        return psutil.Process().num_ctx_switches().voluntary
+    except ImportError:
+        return 0
+
+
+def run_loop(seconds: float, setup: Callable[[list], list]) -> Dict[str, float]:
+    """Крутить цикл событий seconds секунд и посчитать пробуждения."""
+    fired = []
+    owned = setup(fired)
+
+    loop = QEventLoop()
+    QTimer.singleShot(int(seconds * 1000), loop.quit)
+
+    switches_before = _context_switches()
+    loop.exec()
+    switches = _context_switches() - switches_before
+
+    result = {
+        "callbacks_per_second": round(len(fired) / seconds, 3),
+        "context_switches_per_second": round(switches / seconds, 3),
+    }
+
+    # Останавливаем таймеры сценария, чтобы они не мешали следующему
+    for obj in owned:
+        if isinstance(obj, ClockService):
+            result["wakeups_per_second"] = round(obj.wakeups / seconds, 3)
+            obj._timer.stop()
+        else:
+            obj.stop()
+        obj.deleteLater()
+    QCoreApplication.processEvents()
+
+    return result
+
+
+def legacy(fired: list) -> list:
+    """Три независимых таймера, как было до ClockService."""
+    timers = []
+    for interval in (1000, 1000, 2000):
+        timer = QTimer()
+        timer.setInterval(interval)
+        timer.timeout.connect(lambda: fired.append(1))
+        timer.start()
+        timers.append(timer)
+    return timers
+
+
+def service(visible: bool, idle: bool) -> Callable[[list], list]:
+    """Те же потребители через ClockService в заданном состоянии."""
+    def setup(fired: list) -> list:
+        clock = ClockService()
+
+        tracker = clock.subscribe(lambda: fired.append(1), 1000,
+                                  background_interval_ms=60_000, name="tracker")
+        monitor = clock.subscribe(lambda: fired.append(1), 2000,
+                                  idle_interval_ms=10_000, name="monitor")
+        breaks = clock.single_shot(lambda: fired.append(1), name="break_manager")
+
+        monitor.start()
+        if not idle:
+            # При простое сессия на автопаузе: трекер и перерывы стоят
+            tracker.start()
+            breaks.start(25 * 60 * 1000)
+
+        clock.set_ui_visible(visible)
+        clock.set_user_idle(idle)
+        clock.reset_stats()
+        return [clock]
+
+    return setup
+
+
+def main() -> int:
+    """Точка входа бенчмарка."""
+    parser = argparse.ArgumentParser(description="Пробуждения таймеров")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--output", type=Path, default=Path("bench_wakeups.json"))
+    args = parser.parse_args()
+
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+
+    scenarios = {
+        "legacy_timers": legacy,
+        "service_visible": service(visible=True, idle=False),
+        "service_hidden": service(visible=False, idle=False),
+        "service_hidden_idle": service(visible=False, idle=True),
+    }
+
+    baseline = run_loop(args.seconds, lambda fired: [])
+    print(f"{'пустой цикл':<22} {baseline['context_switches_per_second']:>8.2f} cs/s")
+
+    results = {"empty_loop": baseline}
+    for name, setup in scenarios.items():
+        results[name] = run_loop(args.seconds, setup)
+        print(f"{name:<22} {results[name]['callbacks_per_second']:>8.2f} вызовов/с "
+              f"{results[name].get('wakeups_per_second', '-'):>8} пробуждений/с "
+              f"{results[name]['context_switches_per_second']:>8.2f} cs/s")
+
+    args.output.write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"Результаты сохранены в {args.output}")
+    del app
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,351 @@
+"""Детерминированный генератор синтетической истории для бенчмарков.
+
+Генерирует сессии и активности с реалистичным распределением приложений
+(закон Ципфа по популярности, логнормальная длительность активностей,
+меньше работы по выходным) и записывает их напрямую в SQLite-схему
+DatabaseManager. Один и тот же seed всегда даёт одну и ту же базу.
+"""
+
+import math
+import random
+import sqlite3
+import sys
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from database.db_manager import DatabaseManager
+
+
+# (имя процесса, тип активности, вес популярности, средняя длительность в секундах, заголовки)
+APP_PROFILES: List[Tuple[str, str, float, int, List[str]]] = [
+    ("code", "productive", 1.0, 900, [
+        "db_manager.py - time_manager - Visual Studio Code",
+        "tracker.py - time_manager - Visual Studio Code",
+        "README.md - time_manager - Visual Studio Code",
+    ]),
+    ("firefox", "neutral", 0.9, 420, [
+        "{ticket}: Ошибка в отчёте - Jira - Mozilla Firefox",
+        "Pull Request #{num} - GitHub - Mozilla Firefox",
+        "sqlite3 — DB-API 2.0 interface - Mozilla Firefox",
+    ]),
+    ("gnome-terminal", "productive", 0.7, 300, [
+        "user@host: ~/projects/time_manager",
+        "python -m pytest -q",
+        "git log --oneline",
+    ]),
+    ("telegram", "distracting", 0.55, 120, [
+        "Telegram ({num})",
+        "Рабочий чат - Telegram",
+    ]),
+    ("slack", "neutral", 0.5, 180, [
+        "#team-backend | Slack",
+        "{ticket} обсуждение | Slack",
+    ]),
+    ("pycharm", "productive", 0.45, 1200, [
+        "time_manager – main_window.py",
+        "time_manager – activity_widget.py",
+    ]),
+    ("youtube", "distracting", 0.35, 600, [
+        "Лекция про SQLite - YouTube",
+        "Музыка для работы - YouTube",
+    ]),
+    ("outlook", "productive", 0.3, 240, [
+        "Входящие - Outlook",
+        "RE: {ticket} - Outlook",
+    ]),
+    ("figma", "productive", 0.2, 900, [
+        "Макет главного окна - Figma",
+    ]),
+    ("nautilus", "neutral", 0.15, 60, [
+        "Загрузки",
+        "Документы",
+    ]),
+    ("reddit", "distracting", 0.12, 300, [
+        "r/programming - Reddit",
+    ]),
+    ("discord", "distracting", 0.1, 240, [
+        "#general - Discord",
+    ]),
+]
+
+TICKET_PROJECTS = ["ABC", "CORE", "UI", "DB"]
+
+
+@dataclass
+class GeneratorConfig:
+    """Параметры генерации истории одного пользователя."""
+
+    days: int = 365
+    end_date: Optional[date] = None  # по умолчанию - сегодня
+    sessions_per_day: Tuple[int, int] = (2, 5)
+    session_minutes: Tuple[int, int] = (30, 180)
+    weekend_work_probability: float = 0.2
+    seed: int = 42
+
+
+@dataclass
+class GenerationResult:
+    """Итог генерации."""
+
+    db_path: Path
+    sessions: int = 0
+    activities: int = 0
+
+    @property
+    def rows(self) -> int:
+        """Общее количество строк."""
+        return self.sessions + self.activities
+
+
+def config_for_rows(target_rows: int, seed: int = 42, end_date: Optional[date] = None) -> GeneratorConfig:
+    """
+    Подобрать конфигурацию, дающую примерно target_rows строк.
+
+    Args:
+        target_rows: Желаемое число строк (сессии + активности)
+        seed: Начальное значение генератора
+        end_date: Последний день истории
+
+    Returns:
+        Конфигурация генератора
+    """
+    # Эмпирически: около 3 сессий и ~30 активностей в рабочий день,
+    # с учётом выходных - около 26 строк на календарный день
+    rows_per_day = 26
+    days = max(1, math.ceil(target_rows / rows_per_day))
+    return GeneratorConfig(days=days, seed=seed, end_date=end_date)
+
+
+def _uuid(rng: random.Random) -> str:
+    """Детерминированный UUID4 из генератора."""
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _app_weights() -> List[float]:
+    """Веса приложений по закону Ципфа, скорректированные профилем."""
+    return [weight / (rank + 1) for rank, (_, _, weight, _, _) in enumerate(APP_PROFILES)]
+
+
+def _render_title(template: str, rng: random.Random) -> str:
+    """Подставить номер задачи/число в шаблон заголовка."""
+    return template.format(
+        ticket=f"{rng.choice(TICKET_PROJECTS)}-{rng.randint(1, 400)}",
+        num=rng.randint(1, 999)
+    )
+
+
+def _generate_day(rng: random.Random, day: date, config: GeneratorConfig, weights: List[float]):
+    """Сгенерировать сессии и активности одного дня."""
+    sessions = []
+    activities = []
+
+    if day.weekday() >= 5 and rng.random() > config.weekend_work_probability:
+        return sessions, activities
+
+    count = rng.randint(*config.sessions_per_day)
+    cursor = datetime.combine(day, datetime.min.time()) + timedelta(
+        hours=8, minutes=rng.randint(0, 90)
+    )
+    day_end = datetime.combine(day, datetime.min.time()) + timedelta(hours=23, minutes=30)
+
+    for _ in range(count):
+        if cursor >= day_end:
+            break
+
+        session_id = _uuid(rng)
+        session_start = cursor
+        planned = rng.randint(*config.session_minutes) * 60
+        session_end = min(session_start + timedelta(seconds=planned), day_end)
+
+        active = 0
+        moment = session_start
+        while moment < session_end:
+            index = rng.choices(range(len(APP_PROFILES)), weights=weights)[0]
+            name, activity_type, _, mean_duration, titles = APP_PROFILES[index]
+
+            # Логнормальное распределение с медианой около mean_duration
+            duration = int(rng.lognormvariate(math.log(mean_duration), 0.9))
+            duration = max(5, min(duration, int((session_end - moment).total_seconds())))
+            end = moment + timedelta(seconds=duration)
+
+            activities.append((
+                _uuid(rng), session_id, name,
+                _render_title(rng.choice(titles), rng),
+                moment.isoformat(), end.isoformat(), duration, activity_type
+            ))
+            active += duration
+            moment = end
+
+        total = int((session_end - session_start).total_seconds())
+        sessions.append((
+            session_id, session_start.isoformat(), session_end.isoformat(),
+            "completed", total, active, max(0, total - active),
+            rng.randint(0, 3), ""
+        ))
+
+        cursor = session_end + timedelta(minutes=rng.randint(10, 90))
+
+    return sessions, activities
+
+
+def generate_history(db_path: Path, config: GeneratorConfig, batch_days: int = 30) -> GenerationResult:
+    """
+    Сгенерировать историю одного пользователя в базу db_path.
+
+    Args:
+        db_path: Путь к файлу базы (будет создан при необходимости)
+        config: Параметры генерации
+        batch_days: Сколько дней вставлять одной транзакцией
+
+    Returns:
+        Количество созданных сессий и активностей
+    """
+    db_path = Path(db_path)
+    DatabaseManager(db_path).initialize()
+
+    rng = random.Random(config.seed)
+    weights = _app_weights()
+    end_date = config.end_date or date.today()
+    start_date = end_date - timedelta(days=config.days - 1)
+    result = GenerationResult(db_path=db_path)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute("PRAGMA journal_mode = MEMORY")
+
+        day = start_date
+        while day <= end_date:
+            sessions = []
+            activities = []
+            for _ in range(batch_days):
+                if day > end_date:
+                    break
+                day_sessions, day_activities = _generate_day(rng, day, config, weights)
+                sessions.extend(day_sessions)
+                activities.extend(day_activities)
+                day += timedelta(days=1)
+
+            conn.executemany(
+                "INSERT INTO sessions (id, start_time, end_time, status, total_duration, "
+                "active_duration, idle_duration, breaks_count, notes) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                sessions
+            )
+            conn.executemany(
+                "INSERT INTO activities (id, session_id, application_name, window_title, "
+                "start_time, end_time, duration, activity_type) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                activities
+            )
+            conn.commit()
+
+            result.sessions += len(sessions)
+            result.activities += len(activities)
+    finally:
+        conn.close()
+
+    return result
+
+
+def generate_users(out_dir: Path, users: int, config: GeneratorConfig) -> List[GenerationResult]:
+    """
+    Сгенерировать истории нескольких пользователей.
+
+    Приложение однопользовательское, поэтому каждый пользователь
+    получает собственный файл базы user_<N>.db.
+
+    Args:
+        out_dir: Каталог для баз
+        users: Количество пользователей
+        config: Базовые параметры (seed смещается на номер пользователя)
+
+    Returns:
+        Результаты генерации по пользователям
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    results = []
+    for user in range(users):
+        user_config = GeneratorConfig(**{**config.__dict__, "seed": config.seed + user})
+        db_path = out_dir / f"user_{user}.db"
+        if db_path.exists():
+            db_path.unlink()
+        results.append(generate_history(db_path, user_config))
+    return results
+
+
+def generate_focus_trace(events: int, seed: int = 42, interval: float = 2.0,
+                         start: Optional[datetime] = None,
+                         idle_probability: float = 0.1) -> List[Tuple[float, int, str, str]]:
+    """
+    Сгенерировать трассу опросов монитора активности.
+
+    Опросы идут с шагом interval секунд. Приложения выбираются с теми же
+    весами, что и в истории, и держат фокус логнормальное время; изредка
+    вставляется простой на 5-15 минут (время простоя растёт, окно прежнее).
+
+    Args:
+        events: Количество опросов
+        seed: Зерно генератора
+        interval: Шаг опроса в секундах
+        start: Время первого опроса (по умолчанию 2024-01-15 09:00)
+        idle_probability: Вероятность простоя после очередного приложения
+
+    Returns:
+        Список (timestamp, секунды простоя, приложение, заголовок)
+    """
+    rng = random.Random(seed)
+    weights = _app_weights()
+    timestamp = (start or datetime(2024, 1, 15, 9, 0)).timestamp()
+
+    trace = []
+    while len(trace) < events:
+        index = rng.choices(range(len(APP_PROFILES)), weights=weights)[0]
+        name, _, _, mean_duration, titles = APP_PROFILES[index]
+        title = _render_title(rng.choice(titles), rng)
+
+        dwell = rng.lognormvariate(math.log(mean_duration), 0.9)
+        for _ in range(max(1, int(dwell / interval))):
+            if len(trace) >= events:
+                break
+            trace.append((timestamp, 0, name, title))
+            timestamp += interval
+
+        if rng.random() < idle_probability:
+            idle = 0.0
+            for _ in range(int(rng.randint(300, 900) / interval)):
+                if len(trace) >= events:
+                    break
+                idle += interval
+                trace.append((timestamp, int(idle), name, title))
+                timestamp += interval
+
+    return trace
+
+
+def main() -> int:
+    """CLI: python benchmarks/datagen.py OUT_DIR --users 3 --days 730."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Генерация синтетической истории")
+    parser.add_argument("out_dir", type=Path)
+    parser.add_argument("--users", type=int, default=1)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    results = generate_users(args.out_dir, args.users, GeneratorConfig(days=args.days, seed=args.seed))
+    for result in results:
+        print(f"{result.db_path}: {result.sessions} сессий, {result.activities} активностей")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -14,6 +14,7 @@ setup(
     install_requires=[
         "PyQt6>=6.4.0",
         "psutil>=5.9.0",
+        "python-xlib>=0.33; sys_platform == 'linux'",
     ],
     extras_require={
         "windows": ["pywin32>=305"],
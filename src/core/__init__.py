@@ -3,5 +3,6 @@
 from .tracker import TimeTracker
 from .activity_monitor import ActivityMonitor
 from .break_manager import BreakManager
+from .clock_service import ClockService
 
-__all__ = ["TimeTracker", "ActivityMonitor", "BreakManager"]
+__all__ = ["TimeTracker", "ActivityMonitor", "BreakManager", "ClockService"]
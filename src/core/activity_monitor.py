@@ -1,256 +1,249 @@
 """Монитор активности приложений и определение простоя."""
 
 import logging
-import sys
-import time
-from datetime import datetime
-from typing import Optional, Tuple
-from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from typing import Callable, Optional
+from PyQt6.QtCore import QObject, pyqtSignal
 
 from models.activity import Activity, ActivityType
 from database.db_manager import DatabaseManager
+from database.journal import SessionJournal
+from core.activity_sampler import ActivitySampler
+from core.activity_sources import ActivitySource, Sample
+from core.clock_service import ClockService
+from core.input_intensity import InputCollector, IntensityRing, create_collector
+from utils.clock import SYSTEM_CLOCK, Clock
 from utils.config import Config
+from utils.metrics import timed
 
 
 class ActivityMonitor(QObject):
-    """Мониторинг активных приложений и простоя пользователя."""
+    """
+    Мониторинг активных приложений и простоя пользователя.
+
+    Опрос платформы выполняет ActivitySampler в рабочем потоке; монитор
+    в GUI-потоке только запрашивает опрос по таймеру и обрабатывает
+    готовые результаты (простой, смена окна, запись в БД).
+    """
 
     # Сигналы
     activity_changed = pyqtSignal(str, str)  # app_name, window_title
     idle_detected = pyqtSignal(int)  # seconds of idle
     user_returned = pyqtSignal()  # пользователь вернулся после простоя
 
-    def __init__(self, db_manager: DatabaseManager, config: Config = None, parent=None):
+    POLL_INTERVAL_MS = 2000
+    IDLE_POLL_INTERVAL_MS = 10_000  # во время простоя ждём только возвращения
+    INPUT_FLUSH_INTERVAL_MS = 60_000  # выгрузка поминутных счётчиков ввода
+
+    def __init__(self, db_manager: DatabaseManager, config: Config = None,
+                 clock_service: Optional[ClockService] = None,
+                 journal: Optional[SessionJournal] = None,
+                 threaded: bool = True, source: Optional[ActivitySource] = None,
+                 clock: Optional[Clock] = None,
+                 input_collector_factory: Callable[[IntensityRing], Optional[InputCollector]] = create_collector,
+                 parent=None):
         super().__init__(parent)
         self._logger = logging.getLogger(__name__)
         self._db = db_manager
         self._config = config
+        self._journal = journal
+        clock = clock or SYSTEM_CLOCK
+        self._clock = clock.monotonic
+        self._now = clock.now
 
         self._current_activity: Optional[Activity] = None
         self._session_id: str = ""
         self._is_monitoring: bool = False
 
         # Отслеживание простоя
-        self._last_input_time: float = time.time()
+        self._last_input_time: float = self._clock()
         self._is_idle: bool = False
         self._idle_seconds: int = 0
 
-        # Таймер для проверки активного окна
-        self._timer = QTimer(self)
-        self._timer.timeout.connect(self._check_activity)
-        self._timer.setInterval(2000)  # проверка каждые 2 секунды
+        # Проверка активного окна каждые 2 секунды (через общий сервис пробуждений)
+        self._clock_service = clock_service or ClockService(self, clock)
+        self._timer = self._clock_service.subscribe(
+            self._check_activity, self.POLL_INTERVAL_MS,
+            idle_interval_ms=self.IDLE_POLL_INTERVAL_MS,
+            name="activity_monitor"
+        )
+
+        # Интенсивность ввода: сборщик пишет в кольцевой буфер, раз в минуту - в БД
+        self._intensity = IntensityRing(clock=clock)
+        self._input_collector_factory = input_collector_factory
+        self._input_collector: Optional[InputCollector] = None
+        self._input_timer = self._clock_service.subscribe(
+            self._flush_input_intensity, self.INPUT_FLUSH_INTERVAL_MS,
+            name="input_intensity"
+        )
 
         # Кэш последнего приложения
         self._last_app: str = ""
         self._last_title: str = ""
 
+        # Опрос платформы или записанной трассы (в рабочем потоке, если threaded)
+        self._threaded = threaded
+        self._sampler = ActivitySampler(source=source)
+        self._sampler.samples_ready.connect(self._on_samples_ready)
+
+    @property
+    def sampler(self) -> ActivitySampler:
+        """Сборщик состояния платформы."""
+        return self._sampler
+
+    @property
+    def current_activity(self) -> Optional[Activity]:
+        """Текущая (незавершённая) активность."""
+        return self._current_activity
+
+    @property
+    def intensity(self) -> IntensityRing:
+        """Поминутные счётчики ввода, ещё не записанные в БД."""
+        return self._intensity
+
     def start_monitoring(self, session_id: str) -> None:
         """Начать мониторинг."""
         self._session_id = session_id
         self._is_monitoring = True
-        self._last_input_time = time.time()
+        self._last_input_time = self._clock()
         self._is_idle = False
         self._idle_seconds = 0
+        if self._config:
+            self._sampler.source.set_capture_details(self._config.settings.detailed_app_names)
+        if self._threaded:
+            self._sampler.start()
         self._timer.start()
+        if self._config and self._config.settings.input_intensity_enabled:
+            self._start_input_collector()
         self._logger.info("Мониторинг активности запущен")
 
     def stop_monitoring(self) -> None:
         """Остановить мониторинг."""
         self._is_monitoring = False
         self._timer.stop()
+        if self._is_idle:
+            self._is_idle = False
+            self._clock_service.set_user_idle(False)
         self._finish_current_activity()
+        self._stop_input_collector()
+        # Следующий запуск начинает новую активность, даже если окно то же
+        self._last_app = ""
+        self._last_title = ""
         self._logger.info("Мониторинг активности остановлен")
 
+    def shutdown(self) -> None:
+        """Остановить рабочий поток опроса (при выходе из приложения)."""
+        self._stop_input_collector()
+        self._sampler.shutdown()
+
+    def _start_input_collector(self) -> None:
+        """Запустить сбор интенсивности ввода, если он возможен в этой системе."""
+        if self._input_collector is not None:
+            return
+
+        collector = self._input_collector_factory(self._intensity)
+        if collector is None:
+            self._logger.info("Сбор интенсивности ввода недоступен в этой системе")
+            return
+
+        try:
+            collector.start()
+        except Exception as e:
+            self._logger.warning(f"Не удалось запустить сбор интенсивности ввода: {e}")
+            return
+
+        self._input_collector = collector
+        self._intensity.set_app(self._last_app)
+        self._input_timer.start()
+
+    def _stop_input_collector(self) -> None:
+        """Остановить сбор и выгрузить накопленное."""
+        if self._input_collector is None:
+            return
+
+        self._input_timer.stop()
+        self._input_collector.stop()
+        self._input_collector = None
+        self._flush_input_intensity()
+
+    @timed("monitor.flush_input")
+    def _flush_input_intensity(self) -> None:
+        """Записать накопленные поминутные счётчики в БД."""
+        minutes = self._intensity.drain()
+        if not minutes:
+            return
+        try:
+            self._db.save_input_minutes(minutes)
+        except Exception as e:
+            self._logger.debug(f"Ошибка записи интенсивности ввода: {e}")
+
+    def _idle_timeout(self) -> int:
+        """Порог простоя в секундах (0 - определение простоя выключено)."""
+        if not self._config:
+            return 300  # по умолчанию 5 минут
+        if not self._config.settings.idle_detection_enabled:
+            return 0
+        return self._config.settings.idle_timeout
+
+    @timed("monitor.check_activity")
     def _check_activity(self) -> None:
-        """Проверить активность пользователя."""
-        # Проверяем простой
-        self._check_idle()
+        """Запросить опрос активности пользователя."""
+        if self._threaded:
+            self._sampler.request(self._idle_timeout())
+        else:
+            self._apply_sample(self._sampler.sample(self._idle_timeout()))
 
-        # Проверяем активное окно
-        if not self._is_idle:
-            self._check_active_window()
+    def _on_samples_ready(self) -> None:
+        """Рабочий поток прислал результаты опроса."""
+        for sample in self._sampler.take_samples():
+            self._apply_sample(sample)
 
-    def _check_idle(self) -> None:
-        """Проверить время простоя."""
-        idle_time = self._get_idle_time()
+    @timed("monitor.apply_sample")
+    def _apply_sample(self, sample: Sample) -> None:
+        """Обработать результат опроса."""
+        if not self._is_monitoring:
+            return
 
-        idle_timeout = 300  # по умолчанию 5 минут
-        idle_enabled = True
+        # Проверяем простой
+        self._check_idle(sample.idle_seconds)
 
-        if self._config:
-            idle_timeout = self._config.settings.idle_timeout
-            idle_enabled = self._config.settings.idle_detection_enabled
+        # Проверяем активное окно
+        if not self._is_idle and sample.window_probed:
+            self._check_active_window(sample.app_name, sample.window_title)
 
-        if not idle_enabled:
+    def _check_idle(self, idle_time: int) -> None:
+        """Проверить время простоя."""
+        idle_timeout = self._idle_timeout()
+        if not idle_timeout:
             return
 
         if idle_time >= idle_timeout:
             if not self._is_idle:
                 self._is_idle = True
                 self._idle_seconds = idle_time
+                self._clock_service.set_user_idle(True)
                 self._logger.info(f"Обнаружен простой: {idle_time} сек")
                 self.idle_detected.emit(idle_time)
         else:
             if self._is_idle:
                 self._is_idle = False
+                self._clock_service.set_user_idle(False)
                 self._logger.info("Пользователь вернулся")
                 self.user_returned.emit()
 
-    def _get_idle_time(self) -> int:
-        """Получить время простоя в секундах."""
-        if sys.platform == "win32":
-            try:
-                import ctypes
-
-                class LASTINPUTINFO(ctypes.Structure):
-                    _fields_ = [
-                        ('cbSize', ctypes.c_uint),
-                        ('dwTime', ctypes.c_uint),
-                    ]
-
-                lii = LASTINPUTINFO()
-                lii.cbSize = ctypes.sizeof(LASTINPUTINFO)
-
-                if ctypes.windll.user32.GetLastInputInfo(ctypes.byref(lii)):
-                    millis = ctypes.windll.kernel32.GetTickCount() - lii.dwTime
-                    return millis // 1000
-            except Exception as e:
-                self._logger.debug(f"Ошибка получения времени простоя: {e}")
-
-        elif sys.platform == "darwin":
-            try:
-                import subprocess
-                result = subprocess.run(
-                    ["ioreg", "-c", "IOHIDSystem"],
-                    capture_output=True, text=True
-                )
-                # Парсинг вывода для получения HIDIdleTime
-                for line in result.stdout.split('\n'):
-                    if 'HIDIdleTime' in line:
-                        # Значение в наносекундах
-                        idle_ns = int(line.split('=')[1].strip())
-                        return idle_ns // 1_000_000_000
-            except Exception as e:
-                self._logger.debug(f"Ошибка получения времени простоя: {e}")
-
-        else:  # Linux
-            try:
-                import subprocess
-                result = subprocess.run(
-                    ["xprintidle"],
-                    capture_output=True, text=True
-                )
-                return int(result.stdout.strip()) // 1000
-            except Exception:
-                pass
-
-        return 0
-
-    def _check_active_window(self) -> None:
-        """Проверить текущее активное окно."""
+    def _check_active_window(self, app_name: str, window_title: str) -> None:
+        """Обработать текущее активное окно."""
         try:
-            app_name, window_title = self._get_active_window_info()
-
             if app_name and app_name != self._last_app:
                 self._finish_current_activity()
                 self._start_new_activity(app_name, window_title)
 
                 self._last_app = app_name
                 self._last_title = window_title
+                self._intensity.set_app(app_name)
 
                 self.activity_changed.emit(app_name, window_title)
         except Exception as e:
-            self._logger.debug(f"Ошибка получения активного окна: {e}")
-
-    def _get_active_window_info(self) -> Tuple[str, str]:
-        """Получить информацию об активном окне."""
-        app_name = ""
-        window_title = ""
-
-        if sys.platform == "win32":
-            try:
-                import ctypes
-                from ctypes import wintypes
-
-                user32 = ctypes.windll.user32
-
-                # Получаем handle активного окна
-                hwnd = user32.GetForegroundWindow()
-                if not hwnd:
-                    return "", ""
-
-                # Получаем заголовок окна
-                length = user32.GetWindowTextLengthW(hwnd) + 1
-                buffer = ctypes.create_unicode_buffer(length)
-                user32.GetWindowTextW(hwnd, buffer, length)
-                window_title = buffer.value
-
-                # Получаем PID процесса
-                pid = wintypes.DWORD()
-                user32.GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
-
-                # Получаем имя процесса
-                import psutil
-                try:
-                    process = psutil.Process(pid.value)
-                    app_name = process.name()
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    app_name = "Unknown"
-
-            except Exception as e:
-                self._logger.debug(f"Windows API error: {e}")
-
-        elif sys.platform == "darwin":
-            try:
-                import subprocess
-                script = '''
-                tell application "System Events"
-                    set frontApp to first application process whose frontmost is true
-                    set appName to name of frontApp
-                end tell
-                return appName
-                '''
-                result = subprocess.run(
-                    ["osascript", "-e", script],
-                    capture_output=True, text=True
-                )
-                app_name = result.stdout.strip()
-            except Exception:
-                pass
-
-        else:  # Linux
-            try:
-                import subprocess
-
-                # Получаем ID активного окна
-                result = subprocess.run(
-                    ["xdotool", "getactivewindow"],
-                    capture_output=True, text=True
-                )
-                window_id = result.stdout.strip()
-
-                if window_id:
-                    # Получаем заголовок
-                    result = subprocess.run(
-                        ["xdotool", "getwindowname", window_id],
-                        capture_output=True, text=True
-                    )
-                    window_title = result.stdout.strip()
-
-                    # Получаем PID
-                    result = subprocess.run(
-                        ["xdotool", "getwindowpid", window_id],
-                        capture_output=True, text=True
-                    )
-                    pid = int(result.stdout.strip())
-
-                    import psutil
-                    process = psutil.Process(pid)
-                    app_name = process.name()
-            except Exception:
-                pass
-
-        return app_name, window_title
+            self._logger.debug(f"Ошибка записи активности: {e}")
 
     def _start_new_activity(self, app_name: str, window_title: str) -> None:
         """Начать запись новой активности."""
@@ -260,14 +253,19 @@ class ActivityMonitor(QObject):
             session_id=self._session_id,
             application_name=app_name,
             window_title=window_title,
+            start_time=self._now(),
             activity_type=activity_type
         )
+        if self._journal is not None:
+            self._journal.activity_started(self._current_activity)
         self._db.save_activity(self._current_activity)
 
     def _finish_current_activity(self) -> None:
         """Завершить текущую активность."""
         if self._current_activity:
-            self._current_activity.stop()
+            self._current_activity.stop(self._now())
+            if self._journal is not None:
+                self._journal.activity_finished(self._current_activity)
             self._db.save_activity(self._current_activity)
             self._current_activity = None
 
@@ -0,0 +1,139 @@
+"""Опрос активного окна и простоя в отдельном потоке."""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Deque, List, Optional
+from PyQt6.QtCore import QObject, QThread, pyqtSignal, pyqtSlot
+
+from core.activity_sources import ActivitySource, PlatformSource, Sample
+
+
+class ActivitySampler(QObject):
+    """
+    Сборщик состояния платформы (простой, активное окно).
+
+    Опрос источника (по умолчанию PlatformSource: xdotool, xprintidle,
+    osascript, ioreg, psutil с таймаутом на каждый вызов) выполняется
+    в рабочем потоке, поэтому зависший X-сервер не замораживает окно.
+    Результаты складываются в ограниченную очередь (при переполнении
+    теряются самые старые), о появлении новых GUI узнаёт по сигналу
+    samples_ready.
+    """
+
+    samples_ready = pyqtSignal()
+    _sample_requested = pyqtSignal(int)  # таймаут простоя (0 - не определять)
+
+    QUEUE_SIZE = 8
+
+    def __init__(self, queue_size: int = QUEUE_SIZE,
+                 source: Optional[ActivitySource] = None):
+        super().__init__()
+        self._logger = logging.getLogger(__name__)
+        self._source = source or PlatformSource()
+
+        self._lock = threading.Lock()
+        self._queue: Deque[Sample] = deque(maxlen=queue_size)
+        self._busy: bool = False
+        self._thread: Optional[QThread] = None
+
+        # Счётчики для диагностики
+        self.requested: int = 0
+        self.skipped: int = 0
+        self.dropped: int = 0
+
+        # Настоящий слот (pyqtSlot), чтобы вызов шёл в потоке объекта, а не через прокси
+        self._sample_requested.connect(self._on_sample_requested)
+
+    @property
+    def source(self) -> ActivitySource:
+        """Источник состояния платформы."""
+        return self._source
+
+    def sample(self, idle_timeout: int) -> Sample:
+        """Синхронно опросить источник (в потоке вызывающего)."""
+        return self._source.sample(idle_timeout)
+
+    # === Управление потоком ===
+
+    @property
+    def is_running(self) -> bool:
+        """Запущен ли рабочий поток."""
+        return self._thread is not None and self._thread.isRunning()
+
+    def start(self) -> None:
+        """Перенести сборщик в рабочий поток и запустить его."""
+        if self._thread is not None:
+            return
+
+        self._thread = QThread()
+        self._thread.setObjectName("activity-sampler")
+        self.moveToThread(self._thread)
+        self._thread.start()
+
+    def shutdown(self, wait_ms: int = 3000) -> None:
+        """Остановить рабочий поток (ждём не дольше wait_ms) и закрыть источник."""
+        if self._thread is not None:
+            self._thread.quit()
+            if not self._thread.wait(wait_ms):
+                self._logger.warning("Поток опроса активности не завершился вовремя")
+            self._thread = None
+        self._source.close()
+
+    # === Запросы ===
+
+    def request(self, idle_timeout: int) -> bool:
+        """
+        Запросить опрос в рабочем потоке.
+
+        Пока предыдущий опрос не закончен, новый не ставится в очередь.
+
+        Args:
+            idle_timeout: Порог простоя в секундах (0 - простой не определяется)
+
+        Returns:
+            True, если опрос поставлен
+        """
+        with self._lock:
+            if self._busy:
+                self.skipped += 1
+                return False
+            self._busy = True
+            self.requested += 1
+
+        self._sample_requested.emit(idle_timeout)
+        return True
+
+    def take_samples(self) -> List[Sample]:
+        """Забрать накопленные результаты (вызывается из GUI-потока)."""
+        with self._lock:
+            samples = list(self._queue)
+            self._queue.clear()
+        return samples
+
+    def stats(self) -> dict:
+        """Счётчики запросов, пропусков и источника."""
+        return dict(
+            self._source.stats(),
+            requested=self.requested,
+            skipped=self.skipped,
+            dropped=self.dropped,
+        )
+
+    @pyqtSlot(int)
+    def _on_sample_requested(self, idle_timeout: int) -> None:
+        """Выполнить опрос (в рабочем потоке) и положить результат в очередь."""
+        try:
+            sample = self.sample(idle_timeout)
+        except Exception as e:
+            self._logger.debug(f"Ошибка опроса активности: {e}")
+            sample = Sample(timestamp=time.time())
+
+        with self._lock:
+            if len(self._queue) == self._queue.maxlen:
+                self.dropped += 1
+            self._queue.append(sample)
+            self._busy = False
+
+        self.samples_ready.emit()
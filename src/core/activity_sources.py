@@ -0,0 +1,419 @@
+"""Источники состояния платформы для монитора активности.
+
+ActivitySource отдаёт по запросу один Sample (простой, активное окно).
+Реализации:
+
+* PlatformSource - настоящие пробы (xdotool, xprintidle, osascript, ioreg, WinAPI);
+* RecordingSource - обёртка над другим источником, пишущая каждый опрос
+  в компактный двоичный файл трассы;
+* ReplaySource - отдаёт записанную или синтетическую трассу, чтобы гонять
+  конвейер монитора без рабочего стола (тесты, бенчмарки).
+
+Формат трассы: заголовок TRACE_MAGIC, затем записи с однобайтовым тегом.
+Строки (имена приложений и заголовки окон) повторяются, поэтому каждая
+пишется один раз записью-определением, а опросы ссылаются на неё по номеру.
+"""
+
+import logging
+import struct
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from core.process_cache import ProcessCache
+from utils import metrics
+from utils.metrics import measure
+
+
+TRACE_MAGIC = b"WCTRACE1"
+
+_TAG_STRING = 1
+_TAG_SAMPLE = 2
+_STRING_HEADER = struct.Struct("<II")  # номер строки, длина в байтах
+_SAMPLE_RECORD = struct.Struct("<dIIIB")  # время, простой, приложение, заголовок, флаги
+
+_FLAG_WINDOW_PROBED = 1
+
+
+@dataclass
+class Sample:
+    """Результат одного опроса платформы."""
+
+    idle_seconds: int = 0
+    app_name: str = ""
+    window_title: str = ""
+    window_probed: bool = False  # окно не опрашивается, если пользователь простаивает
+    timestamp: float = 0.0  # время опроса (Unix time)
+
+
+class ActivitySource:
+    """Базовый источник: опрос простоя и активного окна."""
+
+    def sample(self, idle_timeout: int) -> Sample:
+        """
+        Опросить состояние.
+
+        Args:
+            idle_timeout: Порог простоя в секундах (0 - простой не определяется);
+                если он превышен, окно можно не опрашивать
+
+        Returns:
+            Результат опроса
+        """
+        raise NotImplementedError
+
+    def set_capture_details(self, enabled: bool) -> None:
+        """Читать ли подробности процессов (по умолчанию не поддерживается)."""
+
+    def stats(self) -> dict:
+        """Счётчики источника для диагностики."""
+        return {}
+
+    def close(self) -> None:
+        """Освободить ресурсы."""
+
+
+class PlatformSource(ActivitySource):
+    """Опрос настоящей платформы с таймаутом на каждую внешнюю пробу."""
+
+    PROBE_TIMEOUT = 1.0  # секунды
+    PROBE_TIMEOUTS = {"osascript": 3.0, "ioreg": 2.0}
+
+    def __init__(self, process_cache: Optional[ProcessCache] = None):
+        self._logger = logging.getLogger(__name__)
+        self._process_cache = process_cache or ProcessCache()
+        self._capture_details: Optional[bool] = None  # применяется в потоке опроса
+        self.timeouts: int = 0
+
+    @property
+    def process_cache(self) -> ProcessCache:
+        """Кэш сведений о процессах (используется только из потока опроса)."""
+        return self._process_cache
+
+    def set_capture_details(self, enabled: bool) -> None:
+        """Читать ли exe и cmdline процессов (вступает в силу со следующего опроса)."""
+        self._capture_details = enabled
+
+    def stats(self) -> dict:
+        """Таймауты проб и состояние кэша процессов."""
+        return {"timeouts": self.timeouts, "process_cache": self._process_cache.stats()}
+
+    def sample(self, idle_timeout: int) -> Sample:
+        """Опросить простой и, если пользователь активен, окно."""
+        if self._capture_details is not None:
+            self._process_cache.capture_details = self._capture_details
+            self._capture_details = None
+
+        sample = Sample(idle_seconds=self._get_idle_time(), timestamp=time.time())
+
+        if not idle_timeout or sample.idle_seconds < idle_timeout:
+            try:
+                sample.app_name, sample.window_title = self._get_active_window_info()
+            except Exception as e:
+                self._logger.debug(f"Ошибка получения активного окна: {e}")
+            sample.window_probed = True
+
+        return sample
+
+    def _run_probe(self, args: list) -> subprocess.CompletedProcess:
+        """Запустить внешнюю утилиту-пробу с таймаутом и замером времени."""
+        name = args[0]
+        timeout = self.PROBE_TIMEOUTS.get(name, self.PROBE_TIMEOUT)
+        started = time.perf_counter()
+
+        try:
+            with measure(f"probe.{name}"):
+                return subprocess.run(args, capture_output=True, text=True, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self.timeouts += 1
+            if metrics.is_enabled():
+                metrics.registry.record(f"probe.{name}.timeout", time.perf_counter() - started, error=True)
+            self._logger.debug(f"Проба {name} не ответила за {timeout} с")
+            raise
+
+    def _get_idle_time(self) -> int:
+        """Получить время простоя в секундах."""
+        if sys.platform == "win32":
+            try:
+                import ctypes
+
+                class LASTINPUTINFO(ctypes.Structure):
+                    _fields_ = [
+                        ('cbSize', ctypes.c_uint),
+                        ('dwTime', ctypes.c_uint),
+                    ]
+
+                lii = LASTINPUTINFO()
+                lii.cbSize = ctypes.sizeof(LASTINPUTINFO)
+
+                if ctypes.windll.user32.GetLastInputInfo(ctypes.byref(lii)):
+                    millis = ctypes.windll.kernel32.GetTickCount() - lii.dwTime
+                    return millis // 1000
+            except Exception as e:
+                self._logger.debug(f"Ошибка получения времени простоя: {e}")
+
+        elif sys.platform == "darwin":
+            try:
+                result = self._run_probe(["ioreg", "-c", "IOHIDSystem"])
+                # Парсинг вывода для получения HIDIdleTime
+                for line in result.stdout.split('\n'):
+                    if 'HIDIdleTime' in line:
+                        # Значение в наносекундах
+                        idle_ns = int(line.split('=')[1].strip())
+                        return idle_ns // 1_000_000_000
+            except Exception as e:
+                self._logger.debug(f"Ошибка получения времени простоя: {e}")
+
+        else:  # Linux
+            try:
+                result = self._run_probe(["xprintidle"])
+                return int(result.stdout.strip()) // 1000
+            except Exception:
+                pass
+
+        return 0
+
+    def _get_active_window_info(self) -> Tuple[str, str]:
+        """Получить информацию об активном окне."""
+        app_name = ""
+        window_title = ""
+
+        if sys.platform == "win32":
+            try:
+                import ctypes
+                from ctypes import wintypes
+
+                user32 = ctypes.windll.user32
+
+                # Получаем handle активного окна
+                hwnd = user32.GetForegroundWindow()
+                if not hwnd:
+                    return "", ""
+
+                # Получаем заголовок окна
+                length = user32.GetWindowTextLengthW(hwnd) + 1
+                buffer = ctypes.create_unicode_buffer(length)
+                user32.GetWindowTextW(hwnd, buffer, length)
+                window_title = buffer.value
+
+                # Получаем PID процесса
+                pid = wintypes.DWORD()
+                user32.GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
+
+                # Получаем имя процесса
+                with measure("probe.psutil"):
+                    app_name = self._process_cache.app_name(pid.value) or "Unknown"
+
+            except Exception as e:
+                self._logger.debug(f"Windows API error: {e}")
+
+        elif sys.platform == "darwin":
+            try:
+                script = '''
+                tell application "System Events"
+                    set frontApp to first application process whose frontmost is true
+                    set appName to name of frontApp
+                end tell
+                return appName
+                '''
+                result = self._run_probe(["osascript", "-e", script])
+                app_name = result.stdout.strip()
+            except Exception:
+                pass
+
+        else:  # Linux
+            try:
+                # Получаем ID активного окна
+                result = self._run_probe(["xdotool", "getactivewindow"])
+                window_id = result.stdout.strip()
+
+                if window_id:
+                    # Получаем заголовок
+                    result = self._run_probe(["xdotool", "getwindowname", window_id])
+                    window_title = result.stdout.strip()
+
+                    # Получаем PID
+                    result = self._run_probe(["xdotool", "getwindowpid", window_id])
+                    pid = int(result.stdout.strip())
+
+                    with measure("probe.psutil"):
+                        app_name = self._process_cache.app_name(pid)
+            except Exception:
+                pass
+
+        return app_name, window_title
+
+
+class TraceWriter:
+    """Запись опросов в двоичный файл трассы."""
+
+    def __init__(self, path: Path):
+        self._file: BinaryIO = open(path, "wb")
+        self._file.write(TRACE_MAGIC)
+        self._strings: Dict[str, int] = {"": 0}
+        self.count: int = 0
+
+    def _string_id(self, text: str) -> int:
+        """Номер строки (при первом появлении пишется определение)."""
+        string_id = self._strings.get(text)
+        if string_id is None:
+            string_id = self._strings[text] = len(self._strings)
+            data = text.encode("utf-8")
+            self._file.write(bytes((_TAG_STRING,)) + _STRING_HEADER.pack(string_id, len(data)) + data)
+        return string_id
+
+    def write(self, sample: Sample) -> None:
+        """Дописать опрос."""
+        app_id = self._string_id(sample.app_name)
+        title_id = self._string_id(sample.window_title)
+        flags = _FLAG_WINDOW_PROBED if sample.window_probed else 0
+        self._file.write(bytes((_TAG_SAMPLE,)) + _SAMPLE_RECORD.pack(
+            sample.timestamp, max(0, int(sample.idle_seconds)), app_id, title_id, flags
+        ))
+        self.count += 1
+
+    def flush(self) -> None:
+        """Сбросить буфер в файл."""
+        self._file.flush()
+
+    def close(self) -> None:
+        """Закрыть файл."""
+        if not self._file.closed:
+            self._file.close()
+
+
+def write_trace(path: Path, samples: Iterable[Sample]) -> int:
+    """Записать трассу целиком, вернуть число опросов."""
+    writer = TraceWriter(path)
+    try:
+        for sample in samples:
+            writer.write(sample)
+    finally:
+        writer.close()
+    return writer.count
+
+
+def read_trace(path: Path) -> Iterator[Sample]:
+    """
+    Прочитать трассу.
+
+    Обрезанная последняя запись (например, при аварийном выходе
+    во время записи) молча пропускается.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(TRACE_MAGIC)) != TRACE_MAGIC:
+            raise ValueError(f"{path}: не файл трассы активности")
+
+        strings: List[str] = [""]
+        while True:
+            tag = f.read(1)
+            if not tag:
+                return
+
+            if tag[0] == _TAG_STRING:
+                header = f.read(_STRING_HEADER.size)
+                if len(header) < _STRING_HEADER.size:
+                    return
+                string_id, length = _STRING_HEADER.unpack(header)
+                data = f.read(length)
+                if len(data) < length:
+                    return
+                if string_id != len(strings):
+                    raise ValueError(f"{path}: нарушен порядок строк трассы")
+                strings.append(data.decode("utf-8", errors="replace"))
+
+            elif tag[0] == _TAG_SAMPLE:
+                record = f.read(_SAMPLE_RECORD.size)
+                if len(record) < _SAMPLE_RECORD.size:
+                    return
+                timestamp, idle, app_id, title_id, flags = _SAMPLE_RECORD.unpack(record)
+                yield Sample(
+                    idle_seconds=idle,
+                    app_name=strings[app_id],
+                    window_title=strings[title_id],
+                    window_probed=bool(flags & _FLAG_WINDOW_PROBED),
+                    timestamp=timestamp,
+                )
+
+            else:
+                raise ValueError(f"{path}: неизвестная запись трассы {tag[0]}")
+
+
+class RecordingSource(ActivitySource):
+    """Обёртка, записывающая каждый опрос вложенного источника в трассу."""
+
+    FLUSH_EVERY = 32  # опросов
+
+    def __init__(self, inner: ActivitySource, path: Path):
+        self._inner = inner
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._writer = TraceWriter(self._path)
+
+    @property
+    def path(self) -> Path:
+        """Файл трассы."""
+        return self._path
+
+    def sample(self, idle_timeout: int) -> Sample:
+        """Опросить вложенный источник и записать результат."""
+        sample = self._inner.sample(idle_timeout)
+        self._writer.write(sample)
+        if self._writer.count % self.FLUSH_EVERY == 0:
+            self._writer.flush()
+        return sample
+
+    def set_capture_details(self, enabled: bool) -> None:
+        """Передать настройку вложенному источнику."""
+        self._inner.set_capture_details(enabled)
+
+    def stats(self) -> dict:
+        """Счётчики вложенного источника и число записанных опросов."""
+        return dict(self._inner.stats(), recorded=self._writer.count)
+
+    def close(self) -> None:
+        """Закрыть трассу и вложенный источник."""
+        self._writer.close()
+        self._inner.close()
+
+
+class ReplaySource(ActivitySource):
+    """Источник, отдающий заранее записанные опросы по порядку."""
+
+    def __init__(self, samples: Iterable[Sample]):
+        self._samples = iter(samples)
+        self._next: Optional[Sample] = next(self._samples, None)
+        self.last: Optional[Sample] = None
+        self.replayed: int = 0
+
+    @classmethod
+    def from_file(cls, path: Path) -> "ReplaySource":
+        """Источник из файла трассы."""
+        return cls(read_trace(path))
+
+    @property
+    def exhausted(self) -> bool:
+        """Все опросы трассы отданы."""
+        return self._next is None
+
+    @property
+    def next_timestamp(self) -> Optional[float]:
+        """Время следующего опроса трассы (None - трасса кончилась)."""
+        return self._next.timestamp if self._next is not None else None
+
+    def sample(self, idle_timeout: int) -> Sample:
+        """Следующий опрос трассы (после конца - пустой опрос)."""
+        if self._next is None:
+            return Sample(timestamp=time.time())
+
+        self.last = self._next
+        self._next = next(self._samples, None)
+        self.replayed += 1
+        return self.last
+
+    def stats(self) -> dict:
+        """Сколько опросов отдано."""
+        return {"replayed": self.replayed, "exhausted": self.exhausted}
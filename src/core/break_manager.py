@@ -1,74 +1,144 @@
 """Менеджер перерывов."""
 
 import logging
-from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+import math
+from typing import Optional
+from PyQt6.QtCore import QObject, pyqtSignal
 
+from core.clock_service import ClockService
+from utils.clock import SYSTEM_CLOCK, Clock
 from utils.config import Config
 
 
 class BreakManager(QObject):
-    """Управление перерывами."""
+    """
+    Управление перерывами.
+
+    Вместо ежесекундного тика рабочее время считается по монотонным часам,
+    а ближайшая граница напоминания вычисляется заранее и ставится одним
+    однократным таймером. Если цикл событий подвис и таймер сработал поздно,
+    пропущенные границы сводятся в одно напоминание, а не теряются.
+    """
 
     # Сигналы
     short_break_due = pyqtSignal()
     long_break_due = pyqtSignal()
     break_reminder = pyqtSignal(str, int)  # тип перерыва, длительность в минутах
 
-    def __init__(self, config: Config, parent=None):
+    def __init__(self, config: Config, clock_service: Optional[ClockService] = None,
+                 clock: Optional[Clock] = None, parent=None):
         super().__init__(parent)
         self._logger = logging.getLogger(__name__)
         self._config = config
+        clock = clock or SYSTEM_CLOCK
+        self._clock = clock.monotonic
 
-        self._work_seconds: int = 0
+        self._worked_before: float = 0.0  # отработано до текущего отрезка
+        self._run_started: Optional[float] = None  # начало текущего отрезка
+        self._handled_minute: int = 0  # последняя обработанная минута-граница
         self._is_active: bool = False
 
-        # Таймер для отсчета рабочего времени
-        self._timer = QTimer(self)
-        self._timer.timeout.connect(self._on_tick)
-        self._timer.setInterval(1000)
+        # Однократное пробуждение к ближайшей границе
+        self._clock_service = clock_service or ClockService(self, clock)
+        self._deadline = self._clock_service.single_shot(self._on_deadline, name="break_manager")
+
+    @property
+    def work_seconds(self) -> int:
+        """Отработано секунд с последнего сброса."""
+        worked = self._worked_before
+        if self._run_started is not None:
+            worked += self._clock() - self._run_started
+        return int(worked)
 
     def start(self) -> None:
         """Начать отслеживание перерывов."""
         self._is_active = True
-        self._timer.start()
+        self._begin_run()
         self._logger.info("Менеджер перерывов запущен")
 
     def stop(self) -> None:
         """Остановить отслеживание."""
         self._is_active = False
-        self._timer.stop()
+        self._end_run()
         self._logger.info("Менеджер перерывов остановлен")
 
     def pause(self) -> None:
         """Приостановить (перерыв начался)."""
-        self._timer.stop()
+        self._end_run()
 
     def resume(self) -> None:
         """Продолжить после перерыва."""
         if self._is_active:
-            self._timer.start()
+            self._begin_run()
 
     def reset(self) -> None:
         """Сбросить счетчик (после перерыва)."""
-        self._work_seconds = 0
-
-    def _on_tick(self) -> None:
-        """Обработчик тика (каждую секунду)."""
-        self._work_seconds += 1
+        self._worked_before = 0.0
+        self._handled_minute = 0
+        if self._run_started is not None:
+            self._run_started = self._clock()
+        self.reschedule()
+
+    def reschedule(self) -> None:
+        """Пересчитать ближайшую границу (например, после смены настроек)."""
+        self._deadline.stop()
+        if self._run_started is None:
+            return
+
+        target_minute = self._next_boundary(self._handled_minute)
+        delay = target_minute * 60 - (self._worked_before + self._clock() - self._run_started)
+        self._deadline.start(max(0, math.ceil(delay * 1000)))
+
+    def _begin_run(self) -> None:
+        """Начать отрезок работы."""
+        if self._run_started is None:
+            self._run_started = self._clock()
+        self.reschedule()
+
+    def _end_run(self) -> None:
+        """Закончить отрезок работы."""
+        self._deadline.stop()
+        if self._run_started is not None:
+            self._worked_before += self._clock() - self._run_started
+            self._run_started = None
+
+    def _intervals(self):
+        """Интервалы короткого и длинного перерыва в минутах (не меньше 1)."""
         settings = self._config.settings
-
-        work_minutes = self._work_seconds // 60
-
-        # Проверка на длинный перерыв
-        if work_minutes > 0 and work_minutes % settings.long_break_interval == 0:
-            if self._work_seconds % 60 == 0:  # только в начале минуты
-                self.long_break_due.emit()
-                self.break_reminder.emit("long", settings.long_break_duration)
-                self._logger.info("Пора сделать длинный перерыв!")
-
-        # Проверка на короткий перерыв
-        elif work_minutes > 0 and work_minutes % settings.short_break_interval == 0:
-            if self._work_seconds % 60 == 0:
-                self.short_break_due.emit()
-                self.break_reminder.emit("short", settings.short_break_duration)
-                self._logger.info("Пора сделать короткий перерыв!")
+        return max(1, settings.short_break_interval), max(1, settings.long_break_interval)
+
+    def _next_boundary(self, after_minute: int) -> int:
+        """Ближайшая минута-граница напоминания строго после after_minute."""
+        short_interval, long_interval = self._intervals()
+        next_short = (after_minute // short_interval + 1) * short_interval
+        next_long = (after_minute // long_interval + 1) * long_interval
+        return min(next_short, next_long)
+
+    def _on_deadline(self) -> None:
+        """Сработал таймер ближайшей границы."""
+        if self._run_started is None:
+            return
+
+        work_minutes = self.work_seconds // 60
+        boundary = self._next_boundary(self._handled_minute)
+
+        if boundary <= work_minutes:
+            # Если границ пропущено несколько - одно напоминание, длинное важнее
+            _, long_interval = self._intervals()
+            long_due = work_minutes // long_interval > self._handled_minute // long_interval
+            self._handled_minute = work_minutes
+            self._emit_reminder(long_due)
+
+        self.reschedule()
+
+    def _emit_reminder(self, long_break: bool) -> None:
+        """Отправить напоминание."""
+        settings = self._config.settings
+        if long_break:
+            self.long_break_due.emit()
+            self.break_reminder.emit("long", settings.long_break_duration)
+            self._logger.info("Пора сделать длинный перерыв!")
+        else:
+            self.short_break_due.emit()
+            self.break_reminder.emit("short", settings.short_break_duration)
+            self._logger.info("Пора сделать короткий перерыв!")
@@ -0,0 +1,68 @@
+"""Доставка уведомлений об изменении данных в GUI-поток."""
+
+import logging
+from typing import Optional
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from core.clock_service import ClockService
+from database.changes import DataChange
+from database.db_manager import DatabaseManager
+
+
+class ChangeWatcher(QObject):
+    """
+    Сигнал changed для каждого DataChange шины DatabaseManager.
+
+    Записи этого процесса приходят сразу (из рабочих потоков - через
+    очередь событий GUI-потока), записи других процессов - по
+    периодической проверке PRAGMA data_version.
+    """
+
+    changed = pyqtSignal(object)  # DataChange
+
+    POLL_INTERVAL_MS = 5000
+    BACKGROUND_POLL_INTERVAL_MS = 30_000
+
+    def __init__(self, db_manager: DatabaseManager, clock_service: Optional[ClockService] = None,
+                 parent=None):
+        super().__init__(parent)
+        self._logger = logging.getLogger(__name__)
+        self._db = db_manager
+        callback = self._on_change
+        db_manager.changes.subscribe(callback)
+        self.destroyed.connect(lambda: db_manager.changes.unsubscribe(callback))
+
+        self._timer = None
+        if clock_service is not None:
+            self._timer = clock_service.subscribe(
+                self.poll, self.POLL_INTERVAL_MS,
+                background_interval_ms=self.BACKGROUND_POLL_INTERVAL_MS,
+                idle_interval_ms=self.BACKGROUND_POLL_INTERVAL_MS,
+                name="data_version"
+            )
+
+    def start(self) -> None:
+        """Запустить проверку записей других процессов."""
+        self.poll()  # точка отсчёта data_version
+        if self._timer is not None:
+            self._timer.start()
+
+    def stop(self) -> None:
+        """Остановить проверку."""
+        if self._timer is not None:
+            self._timer.stop()
+
+    def poll(self) -> None:
+        """Проверить записи других процессов."""
+        try:
+            self._db.check_external_changes()
+        except Exception as e:
+            self._logger.debug(f"Ошибка проверки data_version: {e}")
+
+    def _on_change(self, change: DataChange) -> None:
+        """Изменение из шины (в потоке записи)."""
+        try:
+            self.changed.emit(change)
+        except RuntimeError:
+            pass  # объект уже удалён
@@ -0,0 +1,271 @@
+"""Единый сервис пробуждений для всех таймеров приложения."""
+
+import logging
+import math
+from typing import Callable, List, Optional
+from PyQt6.QtCore import QObject, QTimer, Qt
+
+from utils.clock import SYSTEM_CLOCK, Clock
+
+
+# Подписки, чьи сроки отличаются меньше чем на это окно, срабатывают вместе
+COALESCE_WINDOW = 0.025
+
+
+class Subscription:
+    """
+    Подписка на пробуждения.
+
+    Периодическая подписка срабатывает на границах, кратных её интервалу
+    на общей монотонной шкале, поэтому подписки с интервалами 1 с и 2 с
+    просыпаются вместе. Однократная подписка срабатывает через заданную
+    задержку после start().
+    """
+
+    def __init__(self, service: "ClockService", callback: Callable[[], None],
+                 interval_ms: int = 0, background_interval_ms: Optional[int] = None,
+                 idle_interval_ms: Optional[int] = None, one_shot: bool = False,
+                 name: str = ""):
+        self._service = service
+        self.callback = callback
+        self.interval_ms = interval_ms
+        self.background_interval_ms = background_interval_ms
+        self.idle_interval_ms = idle_interval_ms
+        self.one_shot = one_shot
+        self.name = name or getattr(callback, "__qualname__", "subscription")
+
+        self.active: bool = False
+        self.due: Optional[float] = None
+        self.fired: int = 0
+
+    @property
+    def is_running(self) -> bool:
+        """Запущена ли подписка."""
+        return self.active
+
+    def start(self, delay_ms: Optional[int] = None) -> None:
+        """Запустить (для однократной - через delay_ms миллисекунд)."""
+        if self.one_shot:
+            self.interval_ms = max(0, int(delay_ms if delay_ms is not None else self.interval_ms))
+        self.active = True
+        self._service._activate(self)
+
+    def stop(self) -> None:
+        """Остановить."""
+        self.active = False
+        self.due = None
+        self._service._reschedule()
+
+    def set_interval(self, interval_ms: int) -> None:
+        """Сменить интервал периодической подписки."""
+        self.interval_ms = interval_ms
+        if self.active:
+            self._service._activate(self)
+
+    def remaining_ms(self) -> Optional[int]:
+        """Сколько миллисекунд до срабатывания (None - не запланирована)."""
+        if self.due is None:
+            return None
+        return max(0, math.ceil((self.due - self._service.now()) * 1000))
+
+
+class ClockService(QObject):
+    """
+    Планировщик, сводящий все таймеры приложения к одному QTimer.
+
+    Учитывает видимость интерфейса (подписки переходят на
+    background_interval_ms или засыпают) и простой пользователя
+    (idle_interval_ms), чтобы свёрнутое в трей приложение почти не будило CPU.
+
+    С виртуальными часами (VirtualClock) QTimer не заводится: часы сами
+    вызывают wake() при перемотке времени.
+    """
+
+    def __init__(self, parent=None, clock: Optional[Clock] = None):
+        super().__init__(parent)
+        self._logger = logging.getLogger(__name__)
+        clock = clock or SYSTEM_CLOCK
+        self._clock = clock.monotonic
+        self._driven_by_clock = clock.attach(self)
+
+        self._subscriptions: List[Subscription] = []
+        self._ui_visible: bool = True
+        self._user_idle: bool = False
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._timer.timeout.connect(self._on_wakeup)
+
+        self._started_at = self._clock()
+        self.wakeups: int = 0
+
+    def now(self) -> float:
+        """Текущее монотонное время (секунды)."""
+        return self._clock()
+
+    # === Создание подписок ===
+
+    def subscribe(self, callback: Callable[[], None], interval_ms: int,
+                  background_interval_ms: Optional[int] = None,
+                  idle_interval_ms: Optional[int] = None, name: str = "") -> Subscription:
+        """
+        Создать периодическую подписку (не запущена).
+
+        Args:
+            callback: Вызывается при каждом срабатывании
+            interval_ms: Интервал при видимом окне и активном пользователе
+            background_interval_ms: Интервал, пока окно скрыто (0 - спать, None - как обычно)
+            idle_interval_ms: Интервал при простое пользователя (0 - спать, None - как обычно)
+            name: Имя для статистики
+
+        Returns:
+            Подписка
+        """
+        subscription = Subscription(
+            self, callback, interval_ms, background_interval_ms, idle_interval_ms, name=name
+        )
+        self._subscriptions.append(subscription)
+        return subscription
+
+    def single_shot(self, callback: Callable[[], None], name: str = "") -> Subscription:
+        """Создать однократную подписку; задержка передаётся в start()."""
+        subscription = Subscription(self, callback, one_shot=True, name=name)
+        self._subscriptions.append(subscription)
+        return subscription
+
+    # === Состояние приложения ===
+
+    @property
+    def ui_visible(self) -> bool:
+        """Видно ли окно."""
+        return self._ui_visible
+
+    @property
+    def user_idle(self) -> bool:
+        """Простаивает ли пользователь."""
+        return self._user_idle
+
+    def set_ui_visible(self, visible: bool) -> None:
+        """Сообщить о смене видимости окна."""
+        if visible != self._ui_visible:
+            self._ui_visible = visible
+            self._reactivate_periodic()
+
+    def set_user_idle(self, idle: bool) -> None:
+        """Сообщить о начале/конце простоя."""
+        if idle != self._user_idle:
+            self._user_idle = idle
+            self._reactivate_periodic()
+
+    # === Статистика ===
+
+    def wakeups_per_second(self) -> float:
+        """Среднее число пробуждений в секунду с момента создания."""
+        elapsed = self._clock() - self._started_at
+        return self.wakeups / elapsed if elapsed > 0 else 0.0
+
+    def stats(self) -> dict:
+        """Сводка по пробуждениям и подпискам."""
+        return {
+            "wakeups": self.wakeups,
+            "wakeups_per_second": round(self.wakeups_per_second(), 4),
+            "subscriptions": {
+                s.name: {"active": s.active, "fired": s.fired, "interval_ms": self.effective_interval_ms(s)}
+                for s in self._subscriptions
+            },
+        }
+
+    def reset_stats(self) -> None:
+        """Обнулить счётчики."""
+        self.wakeups = 0
+        self._started_at = self._clock()
+        for subscription in self._subscriptions:
+            subscription.fired = 0
+
+    # === Планирование ===
+
+    def effective_interval_ms(self, subscription: Subscription) -> Optional[int]:
+        """Интервал с учётом видимости и простоя (None - подписка спит)."""
+        if subscription.one_shot:
+            return subscription.interval_ms
+
+        interval = subscription.interval_ms
+        if not self._ui_visible and subscription.background_interval_ms is not None:
+            interval = subscription.background_interval_ms
+        # Простой растягивает интервал, но не будит подписку, спящую в фоне
+        if interval and self._user_idle and subscription.idle_interval_ms is not None:
+            interval = subscription.idle_interval_ms and max(interval, subscription.idle_interval_ms)
+
+        return interval or None
+
+    def _next_due(self, subscription: Subscription, now: float) -> Optional[float]:
+        """Следующий срок срабатывания."""
+        interval_ms = self.effective_interval_ms(subscription)
+        if interval_ms is None:
+            return None
+        if subscription.one_shot:
+            return now + interval_ms / 1000
+
+        # Выравнивание на границы, кратные интервалу
+        interval = interval_ms / 1000
+        return (math.floor((now + COALESCE_WINDOW) / interval) + 1) * interval
+
+    def _activate(self, subscription: Subscription) -> None:
+        """Запланировать подписку заново."""
+        subscription.due = self._next_due(subscription, self._clock())
+        self._reschedule()
+
+    def _reactivate_periodic(self) -> None:
+        """Пересчитать сроки периодических подписок после смены состояния."""
+        now = self._clock()
+        for subscription in self._subscriptions:
+            if subscription.active and not subscription.one_shot:
+                subscription.due = self._next_due(subscription, now)
+        self._reschedule()
+
+    def next_due(self) -> Optional[float]:
+        """Ближайший срок срабатывания (None - ничего не запланировано)."""
+        pending = [s.due for s in self._subscriptions if s.active and s.due is not None]
+        return min(pending) if pending else None
+
+    def wake(self) -> None:
+        """Пробуждение по команде часов (вместо QTimer)."""
+        self._on_wakeup()
+
+    def _reschedule(self) -> None:
+        """Поставить единственный таймер на ближайший срок."""
+        due = self.next_due()
+        if due is None or self._driven_by_clock:
+            self._timer.stop()
+            return
+
+        delay = due - self._clock()
+        self._timer.start(max(0, math.ceil(delay * 1000)))
+
+    def _on_wakeup(self) -> None:
+        """Пробуждение: вызвать все подписки, чей срок наступил."""
+        self.wakeups += 1
+        now = self._clock()
+
+        due = [
+            s for s in self._subscriptions
+            if s.active and s.due is not None and s.due <= now + COALESCE_WINDOW
+        ]
+
+        # Сначала обновляем сроки, чтобы обработчики могли остановить/перезапустить подписку
+        for subscription in due:
+            subscription.fired += 1
+            if subscription.one_shot:
+                subscription.active = False
+                subscription.due = None
+            else:
+                subscription.due = self._next_due(subscription, now)
+
+        for subscription in due:
+            try:
+                subscription.callback()
+            except Exception as e:
+                self._logger.error(f"Ошибка в обработчике таймера {subscription.name}: {e}")
+
+        self._reschedule()
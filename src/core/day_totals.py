@@ -0,0 +1,94 @@
+"""Итоги дня по приложениям, которые ведутся в памяти во время сессии.
+
+Итоги один раз загружаются из БД, дальше к ним прибавляется каждая
+завершённая активность (в момент начала следующей), а идущая активность
+учитывается на лету - по времени от её начала. Пока идёт сессия,
+вкладка продуктивности обновляется без запросов к БД.
+"""
+
+from datetime import date, datetime, time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from models.activity import Activity, ActivityType
+
+
+class DayTotals:
+    """Время по паре (приложение, тип) за день плюс идущая активность."""
+
+    def __init__(self):
+        self.day: Optional[date] = None
+        self._durations: Dict[Tuple[str, str], int] = {}
+        self._open: Optional[Activity] = None
+
+    @property
+    def open_activity(self) -> Optional[Activity]:
+        """Идущая активность."""
+        return self._open
+
+    def seed(self, day: date, apps: Iterable[Dict[str, Any]],
+             open_activity: Optional[Activity] = None) -> None:
+        """
+        Начать день с итогов из БД.
+
+        Args:
+            day: День итогов
+            apps: Строки вида get_app_with_type (name, type, duration)
+            open_activity: Незавершённая активность (её время дальше считается
+                           от начала, но не раньше начала дня; записанное в БД
+                           не учитывается)
+        """
+        self.day = day
+        self._durations = {}
+        for app in apps:
+            key = (app["name"], app["type"])
+            self._durations[key] = self._durations.get(key, 0) + (app["duration"] or 0)
+        if open_activity is not None and open_activity.duration and open_activity.start_time.date() == day:
+            # Идущая активность считается от начала - уже записанное не удваиваем
+            key = (open_activity.application_name, open_activity.activity_type.value)
+            self._durations[key] = self._durations.get(key, 0) - open_activity.duration
+        self._open = open_activity
+
+    def activity_started(self, activity: Activity) -> bool:
+        """
+        Новая активность: предыдущая закончилась в момент её начала.
+
+        Returns:
+            False, если активность относится к другому дню (итоги нужно
+            загрузить заново)
+        """
+        if activity.start_time.date() != self.day:
+            return False
+        if self._open is not None and self._open is not activity:
+            key = (self._open.application_name, self._open.activity_type.value)
+            self._durations[key] = self._durations.get(key, 0) + self._elapsed(activity.start_time)
+        self._open = activity
+        return True
+
+    def _elapsed(self, end: datetime) -> int:
+        """Время идущей активности до end за этот день (начатая вчера - с полуночи)."""
+        start = max(self._open.start_time, datetime.combine(self.day, time.min))
+        # Так же, как Activity.stop(): целые секунды от начала до конца
+        return max(0, int((end - start).total_seconds()))
+
+    def _current(self, now: datetime) -> Dict[Tuple[str, str], int]:
+        durations = dict(self._durations)
+        if self._open is not None:
+            key = (self._open.application_name, self._open.activity_type.value)
+            durations[key] = durations.get(key, 0) + self._elapsed(now)
+        return durations
+
+    def apps(self, now: datetime) -> List[Dict[str, Any]]:
+        """Приложения с типом и временем (как get_app_with_type), по убыванию времени."""
+        return [
+            {"name": name, "type": activity_type, "duration": duration}
+            for (name, activity_type), duration in sorted(
+                self._current(now).items(), key=lambda item: item[1], reverse=True
+            )
+        ]
+
+    def by_type(self, now: datetime) -> Dict[str, int]:
+        """Время по типам активности."""
+        result = {t.value: 0 for t in ActivityType}
+        for (_, activity_type), duration in self._current(now).items():
+            result[activity_type] = result.get(activity_type, 0) + duration
+        return result
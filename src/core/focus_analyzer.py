@@ -0,0 +1,204 @@
+"""Серии фокуса: непрерывная продуктивная работа по потоку активностей.
+
+Анализатор получает активности по порядку и за один проход, без
+хранения самих активностей, выделяет серии продуктивной работы,
+считает смены приложений и прерывания серий отвлекающими приложениями.
+Короткие нейтральные вставки (проверить почту, переключить музыку)
+и короткие перерывы между активностями серию не прерывают.
+
+Один и тот же анализатор работает и по живому потоку (активности
+приходят с activity_changed), и по истории: FocusHistory одним
+проходом по активностям считает незаписанные дни в пуле потоков и
+сохраняет итоги в focus_days.
+"""
+
+import copy
+import logging
+from datetime import date, datetime, time, timedelta
+from typing import Iterable, Iterator, List, Optional
+
+from PyQt6.QtCore import QObject, QThreadPool, pyqtSignal
+
+from database.db_manager import DatabaseManager
+from models.activity import Activity, ActivityType
+from models.focus_day import FocusDay
+from utils.metrics import timed
+
+
+class FocusAnalyzer:
+    """
+    Потоковый анализ серий фокуса.
+
+    Серия - продуктивные активности, между которыми не больше BLIP_SECONDS
+    нейтральных активностей или пауз. Отвлекающая активность закрывает
+    серию сразу и засчитывается как прерывание. Серии короче
+    MIN_STREAK_SECONDS не учитываются.
+    """
+
+    BLIP_SECONDS = 120
+    MIN_STREAK_SECONDS = 300
+    DEEP_WORK_SECONDS = 25 * 60
+
+    def __init__(self):
+        self._streak_start: Optional[datetime] = None
+        self._streak_end: Optional[datetime] = None
+        self._last_app: Optional[str] = None
+        self._last_end: Optional[datetime] = None
+
+        self._durations: List[int] = []
+        self.interruptions: int = 0
+        self.switches: int = 0
+        self.tracked_seconds: float = 0.0
+
+    def copy(self) -> "FocusAnalyzer":
+        """Независимая копия состояния (для предварительного итога)."""
+        clone = copy.copy(self)
+        clone._durations = list(self._durations)
+        return clone
+
+    def add(self, app_name: str, activity_type: ActivityType,
+            start: datetime, end: datetime) -> None:
+        """Учесть завершённую активность [start, end); активности идут по времени."""
+        if end <= start:
+            return
+        self.tracked_seconds += (end - start).total_seconds()
+
+        blip = timedelta(seconds=self.BLIP_SECONDS)
+        if self._last_app is not None and app_name != self._last_app and start - self._last_end <= blip:
+            self.switches += 1
+        self._last_app, self._last_end = app_name, end
+
+        if self._streak_end is not None and start - self._streak_end > blip:
+            self._close_streak()
+
+        if activity_type == ActivityType.PRODUCTIVE:
+            if self._streak_end is None:
+                self._streak_start = start
+            self._streak_end = end
+        elif activity_type == ActivityType.DISTRACTING:
+            if self._streak_end is not None:
+                self.interruptions += 1
+                self._close_streak()
+        elif self._streak_end is not None and end - self._streak_end > blip:
+            # Нейтральная вставка затянулась - серия закончилась до неё
+            self._close_streak()
+
+    def add_activity(self, activity: Activity, end: Optional[datetime] = None) -> None:
+        """Учесть активность; end - конец для незавершённой."""
+        self.add(activity.application_name, activity.activity_type,
+                 activity.start_time, activity.end_time or end or activity.start_time)
+
+    def _close_streak(self) -> None:
+        duration = int((self._streak_end - self._streak_start).total_seconds())
+        if duration >= self.MIN_STREAK_SECONDS:
+            self._durations.append(duration)
+        self._streak_start = self._streak_end = None
+
+    def summary(self, day: date) -> FocusDay:
+        """Итог на текущий момент; идущая серия засчитывается как законченная."""
+        durations = list(self._durations)
+        if self._streak_end is not None:
+            duration = int((self._streak_end - self._streak_start).total_seconds())
+            if duration >= self.MIN_STREAK_SECONDS:
+                durations.append(duration)
+
+        return FocusDay(
+            day=day,
+            focus_seconds=sum(durations),
+            deep_work_seconds=sum(d for d in durations if d >= self.DEEP_WORK_SECONDS),
+            longest_streak=max(durations, default=0),
+            streaks=len(durations),
+            interruptions=self.interruptions,
+            switches=self.switches,
+            tracked_seconds=int(self.tracked_seconds),
+            streak_durations=durations
+        )
+
+
+def analyze_days(activities: Iterable[Activity],
+                 now: Optional[datetime] = None) -> Iterator[FocusDay]:
+    """
+    Показатели фокуса по дням за один проход по активностям (по времени начала).
+
+    Активность через полночь делится между днями; незавершённая считается
+    идущей до now (без now - нулевой длины). Дни без активностей не выдаются.
+    """
+    analyzer: Optional[FocusAnalyzer] = None
+    day: Optional[date] = None
+    for activity in activities:
+        start = activity.start_time
+        end = activity.end_time or now or start
+        while start < end:
+            if start.date() != day:
+                if analyzer is not None:
+                    yield analyzer.summary(day)
+                analyzer, day = FocusAnalyzer(), start.date()
+            cut = min(end, datetime.combine(day + timedelta(days=1), time.min))
+            analyzer.add(activity.application_name, activity.activity_type, start, cut)
+            start = cut
+    if analyzer is not None:
+        yield analyzer.summary(day)
+
+
+def analyze_day(activities: Iterable[Activity], day: date,
+                now: Optional[datetime] = None) -> FocusDay:
+    """Показатели фокуса за один день (активности за его пределами отбрасываются)."""
+    for focus in analyze_days(activities, now):
+        if focus.day == day:
+            return focus
+    return FocusDay(day=day)
+
+
+class FocusHistory(QObject):
+    """
+    Пересчёт показателей фокуса по истории в пуле потоков.
+
+    update() находит дни с данными без окончательной строки в focus_days
+    (нет строки или она посчитана, пока день ещё шёл) и всегда -
+    последний день, считает их и сохраняет;
+    по окончании выдаёт days_updated со списком пересчитанных дней.
+    """
+
+    days_updated = pyqtSignal(object)  # список дат
+    _finished = pyqtSignal(object)
+
+    def __init__(self, db_manager: DatabaseManager, threaded: bool = True, parent=None):
+        super().__init__(parent)
+        self._logger = logging.getLogger(__name__)
+        self._db = db_manager
+        self._threaded = threaded
+        self._finished.connect(self.days_updated)
+
+    def update(self, through: Optional[date] = None) -> None:
+        """Досчитать дни по through включительно (по умолчанию - по сегодня)."""
+        through = through or date.today()
+        if self._threaded:
+            QThreadPool.globalInstance().start(lambda: self._run(through))
+        else:
+            self._run(through)
+
+    @timed("focus.update_history")
+    def _run(self, through: date) -> None:
+        """Посчитать и сохранить дни (в потоке пула) - одним проходом по активностям."""
+        try:
+            days = self._db.get_days_without_focus(through)
+            if through not in days:
+                days.append(through)
+            wanted = set(days)
+
+            # С начала дня перед первым нужным - чтобы захватить активности через полночь
+            start = datetime.combine(days[0] - timedelta(days=1), time.min)
+            end = datetime.combine(through + timedelta(days=1), time.min)
+            found = {focus.day: focus
+                     for focus in analyze_days(self._db.iter_activities(start, end), datetime.now())
+                     if focus.day in wanted}
+            # Посчитанное за through и позже остаётся предварительным
+            self._db.save_focus_days([found.get(day) or FocusDay(day=day) for day in days],
+                                     computed_on=through)
+        except Exception as e:
+            self._logger.warning(f"Ошибка пересчёта серий фокуса: {e}")
+            return
+        try:
+            self._finished.emit(days)
+        except RuntimeError:
+            pass  # объект уже удалён
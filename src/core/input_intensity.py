@@ -0,0 +1,271 @@
+"""Интенсивность ввода: поминутные счётчики клавиатуры и мыши.
+
+События ввода приходят сотнями в секунду (особенно движение мыши),
+поэтому сырые события нигде не хранятся: сборщик в своём потоке сразу
+прибавляет их к счётчикам текущей минуты в кольцевом буфере
+фиксированного размера, а монитор активности раз в минуту забирает
+накопленное и пишет в БД только поминутные итоги.
+"""
+
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+from models.input_minute import InputMinute
+from utils.clock import SYSTEM_CLOCK, Clock
+
+
+# Индексы счётчиков
+KEYS = 0
+CLICKS = 1
+SCROLLS = 2
+MOTION = 3
+
+_COUNTERS = 4
+
+# Коды событий протокола X11 (X.KeyPress, X.ButtonPress, X.MotionNotify)
+_X_KEY_PRESS = 2
+_X_BUTTON_PRESS = 4
+_X_MOTION_NOTIFY = 6
+
+
+class IntensityRing:
+    """
+    Кольцевой буфер поминутных счётчиков.
+
+    Ячейка i хранит минуту, для которой minute % capacity == i, и счётчики
+    по приложениям за эту минуту. Запись и выборка идут под одной
+    блокировкой: пишет поток сборщика, забирает GUI-поток. Если минуту не
+    забрали за capacity минут, её ячейка переиспользуется, а потеря
+    учитывается в overwritten.
+    """
+
+    CAPACITY = 120  # минут
+
+    def __init__(self, capacity: int = CAPACITY, clock: Optional[Clock] = None):
+        self._capacity = capacity
+        self._time = (clock or SYSTEM_CLOCK).time
+        self._lock = threading.Lock()
+
+        self._minutes: List[int] = [-1] * capacity
+        self._buckets: List[Dict[str, List[int]]] = [{} for _ in range(capacity)]
+        self._app: str = ""
+
+        self.recorded: int = 0
+        self.overwritten: int = 0
+
+    @property
+    def capacity(self) -> int:
+        """Размер буфера в минутах."""
+        return self._capacity
+
+    def set_app(self, app_name: str) -> None:
+        """Приложение, которому засчитываются следующие события."""
+        self._app = app_name
+
+    def record(self, kind: int, count: int = 1) -> None:
+        """Учесть count событий вида kind (KEYS, CLICKS, SCROLLS, MOTION)."""
+        counts = [0] * _COUNTERS
+        counts[kind] = count
+        self.record_counts(counts)
+
+    def record_counts(self, counts: Sequence[int]) -> None:
+        """Учесть пачку событий: по числу на каждый вид счётчика."""
+        if not self._app:
+            return  # приложение ещё не определено
+
+        minute = int(self._time() // 60)
+        slot = minute % self._capacity
+
+        with self._lock:
+            if self._minutes[slot] != minute:
+                bucket = self._buckets[slot]
+                if bucket:
+                    self.overwritten += 1
+                    bucket.clear()
+                self._minutes[slot] = minute
+
+            counters = self._buckets[slot].get(self._app)
+            if counters is None:
+                counters = self._buckets[slot][self._app] = [0] * _COUNTERS
+            for i in range(_COUNTERS):
+                counters[i] += counts[i]
+            self.recorded += sum(counts)
+
+    def drain(self) -> List[InputMinute]:
+        """
+        Забрать всё накопленное (в том числе неполную текущую минуту).
+
+        Returns:
+            Итоги по минутам и приложениям в порядке времени
+        """
+        with self._lock:
+            taken = [
+                (self._minutes[slot], dict(self._buckets[slot]))
+                for slot in range(self._capacity) if self._buckets[slot]
+            ]
+            for slot in range(self._capacity):
+                self._buckets[slot].clear()
+
+        taken.sort(key=lambda item: item[0])
+        return [
+            InputMinute(datetime.fromtimestamp(minute * 60), app, *counters)
+            for minute, bucket in taken
+            for app, counters in bucket.items()
+        ]
+
+    def stats(self) -> dict:
+        """Счётчики для диагностики."""
+        return {"recorded": self.recorded, "overwritten": self.overwritten}
+
+
+class InputCollector:
+    """Источник событий ввода, пишущий в IntensityRing."""
+
+    def __init__(self, ring: IntensityRing):
+        self._ring = ring
+
+    @classmethod
+    def available(cls) -> bool:
+        """Может ли сборщик работать в этой системе."""
+        return False
+
+    def start(self) -> None:
+        """Начать сбор."""
+
+    def stop(self) -> None:
+        """Остановить сбор."""
+
+
+class XRecordCollector(InputCollector):
+    """
+    Сбор событий через расширение X RECORD (нужен python-xlib).
+
+    RECORD перехватывает события устройств всех клиентов X-сервера,
+    включая синтетические (XTEST), поэтому сборщик проверяется под Xvfb
+    с xdotool. Ответы RECORD приходят пачками; каждая пачка сводится
+    в четыре числа и одним вызовом прибавляется к кольцевому буферу.
+    """
+
+    def __init__(self, ring: IntensityRing, display_name: Optional[str] = None):
+        super().__init__(ring)
+        self._logger = logging.getLogger(__name__)
+        self._display_name = display_name
+        self._record_display = None
+        self._control_display = None
+        self._context = None
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def available(cls) -> bool:
+        if not os.environ.get("DISPLAY"):
+            return False
+        try:
+            import Xlib.ext.record  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+
+        from Xlib import display
+        from Xlib.ext import record
+
+        # RECORD блокирует соединение, поэтому управление идёт через второе
+        self._record_display = display.Display(self._display_name)
+        self._control_display = display.Display(self._display_name)
+        if not self._record_display.has_extension("RECORD"):
+            self._close_displays()
+            raise RuntimeError("X-сервер не поддерживает расширение RECORD")
+
+        self._context = self._record_display.record_create_context(
+            0, [record.AllClients], [{
+                "core_requests": (0, 0),
+                "core_replies": (0, 0),
+                "ext_requests": (0, 0, 0, 0),
+                "ext_replies": (0, 0, 0, 0),
+                "delivered_events": (0, 0),
+                "device_events": (_X_KEY_PRESS, _X_MOTION_NOTIFY),
+                "errors": (0, 0),
+                "client_started": False,
+                "client_died": False,
+            }]
+        )
+
+        self._thread = threading.Thread(target=self._run, name="input-intensity", daemon=True)
+        self._thread.start()
+        self._logger.info("Сбор интенсивности ввода запущен (X RECORD)")
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+
+        self._control_display.record_disable_context(self._context)
+        self._control_display.flush()
+        self._thread.join(timeout=2.0)
+        if self._thread.is_alive():
+            self._logger.warning("Поток сбора ввода не завершился вовремя")
+        self._thread = None
+        self._close_displays()
+
+    def _close_displays(self) -> None:
+        for conn in (self._record_display, self._control_display):
+            if conn is not None:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+        self._record_display = None
+        self._control_display = None
+
+    def _run(self) -> None:
+        """Цикл RECORD (в своём потоке, блокируется до record_disable_context)."""
+        try:
+            self._record_display.record_enable_context(self._context, self._on_reply)
+            self._record_display.record_free_context(self._context)
+        except Exception as e:
+            self._logger.warning(f"Сбор ввода прерван: {e}")
+
+    def _on_reply(self, reply) -> None:
+        """Разобрать пачку событий и прибавить её к счётчикам."""
+        from Xlib.ext import record
+
+        if reply.category != record.FromServer or reply.client_swapped or not reply.data:
+            return
+
+        counts = count_device_events(reply.data)
+        if any(counts):
+            self._ring.record_counts(counts)
+
+
+def count_device_events(data: bytes) -> List[int]:
+    """
+    Свести пачку событий устройств X11 к счётчикам.
+
+    Каждое событие занимает 32 байта: тип в первом байте (старший бит -
+    признак SendEvent), код клавиши или кнопки во втором. Полный разбор
+    через python-xlib создаёт объекты на каждое событие, а нужны только
+    эти два байта.
+    """
+    counts = [0] * _COUNTERS
+    for offset in range(0, len(data) - 31, 32):
+        event_type = data[offset] & 0x7F
+        if event_type == _X_KEY_PRESS:
+            counts[KEYS] += 1
+        elif event_type == _X_BUTTON_PRESS:
+            # Кнопки 4-7 - колесо и горизонтальная прокрутка
+            counts[SCROLLS if 4 <= data[offset + 1] <= 7 else CLICKS] += 1
+        elif event_type == _X_MOTION_NOTIFY:
+            counts[MOTION] += 1
+    return counts
+
+
+def create_collector(ring: IntensityRing) -> Optional[InputCollector]:
+    """Сборщик для текущей системы (None, если сбор невозможен)."""
+    if XRecordCollector.available():
+        return XRecordCollector(ring)
+    return None
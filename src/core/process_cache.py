@@ -0,0 +1,183 @@
+"""Кэш сведений о процессах для монитора активности."""
+
+import logging
+import os
+import re
+import sys
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+
+# Интерпретаторы и оболочки, за которыми скрывается настоящее приложение
+_INTERPRETER_RE = re.compile(r"^(python[\d.]*w?|pypy[\d.]*|node|nodejs|java|javaw|ruby|perl|electron)$")
+
+
+@dataclass
+class ProcessInfo:
+    """Сведения о процессе, прочитанные один раз за его жизнь."""
+
+    pid: int
+    create_time: float
+    name: str
+    exe: str = ""
+    cmdline: List[str] = field(default_factory=list)
+
+    @property
+    def display_name(self) -> str:
+        """
+        Имя приложения для учёта.
+
+        Для интерпретаторов и Electron добавляется имя скрипта или
+        приложения из командной строки: «python (manage.py)», «electron (obsidian)».
+        Без командной строки - просто имя процесса.
+        """
+        base = self.name.lower()
+        if base.endswith(".exe"):
+            base = base[:-4]
+
+        if not _INTERPRETER_RE.match(base) or len(self.cmdline) < 2:
+            return self.name
+
+        target = self._target_argument()
+        if not target:
+            return self.name
+
+        if base == "electron":
+            # electron /opt/app/resources/app.asar -> имя каталога приложения
+            parts = [p for p in re.split(r"[\\/]", target) if p and p not in ("resources", "app.asar", "app")]
+            label = parts[-1] if parts else target
+        else:
+            label = os.path.basename(target.rstrip("/\\")) or target
+
+        return f"{self.name} ({label})"
+
+    def _target_argument(self) -> str:
+        """Первый аргумент, не являющийся опцией (скрипт, модуль, jar)."""
+        args = self.cmdline[1:]
+        i = 0
+        while i < len(args):
+            arg = args[i]
+            if arg in ("-m", "-jar") and i + 1 < len(args):
+                return args[i + 1]
+            if arg in ("-c", "-e"):
+                return ""
+            if not arg.startswith("-"):
+                return arg
+            i += 1
+        return ""
+
+
+class ProcessCache:
+    """
+    LRU-кэш ProcessInfo с ключом (pid, create_time).
+
+    На каждый запрос читается только время создания процесса - этого
+    достаточно, чтобы распознать повторно использованный PID. Имя,
+    а при capture_details - путь к исполняемому файлу и командная строка,
+    читаются один раз на процесс.
+    """
+
+    CAPACITY = 256
+
+    def __init__(self, capacity: int = CAPACITY, capture_details: bool = False):
+        self._logger = logging.getLogger(__name__)
+        self._capacity = capacity
+        self._capture_details = capture_details
+        self._entries: "OrderedDict[Tuple[int, float], ProcessInfo]" = OrderedDict()
+
+        self.hits: int = 0
+        self.misses: int = 0
+
+    @property
+    def capture_details(self) -> bool:
+        """Читать ли exe и cmdline."""
+        return self._capture_details
+
+    @capture_details.setter
+    def capture_details(self, value: bool) -> None:
+        if value != self._capture_details:
+            self._capture_details = value
+            self.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        """Очистить кэш."""
+        self._entries.clear()
+
+    def lookup(self, pid: int) -> Optional[ProcessInfo]:
+        """
+        Сведения о процессе pid.
+
+        Returns:
+            ProcessInfo или None, если процесс недоступен
+        """
+        import psutil
+
+        process = None
+        try:
+            start_time = self._start_time(pid)
+            if start_time is None:
+                process = psutil.Process(pid)
+                start_time = process.create_time()
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            return None
+
+        key = (pid, start_time)
+        info = self._entries.get(key)
+        if info is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return info
+
+        self.misses += 1
+        try:
+            process = process or psutil.Process(pid)
+            info = ProcessInfo(pid=pid, create_time=start_time, name=process.name())
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            return None
+
+        if self._capture_details:
+            try:
+                info.exe = process.exe()
+                info.cmdline = process.cmdline()
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess) as e:
+                self._logger.debug(f"Нет доступа к сведениям процесса {pid}: {e}")
+
+        self._entries[key] = info
+        if len(self._entries) > self._capacity:
+            self._entries.popitem(last=False)
+        return info
+
+    @staticmethod
+    def _start_time(pid: int) -> Optional[float]:
+        """
+        Время старта процесса без создания psutil.Process.
+
+        В Linux читается одно поле /proc/<pid>/stat (в тиках с загрузки
+        системы), в остальных системах возвращается None.
+        """
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            with open(f"/proc/{pid}/stat", "rb") as f:
+                data = f.read()
+        except OSError:
+            import psutil
+            raise psutil.NoSuchProcess(pid)
+        # Имя процесса в скобках может содержать пробелы - отсчитываем поля после ')'
+        fields = data[data.rindex(b")") + 2:].split()
+        return float(fields[19])
+
+    def app_name(self, pid: int) -> str:
+        """Имя приложения для процесса pid (пустая строка, если недоступен)."""
+        info = self.lookup(pid)
+        if info is None:
+            return ""
+        return info.display_name if self._capture_details else info.name
+
+    def stats(self) -> dict:
+        """Попадания и промахи кэша."""
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,102 @@
+"""Прогон трассы активности через конвейер монитора без рабочего стола."""
+
+import time
+from datetime import datetime
+from typing import Iterable, Optional
+
+from PyQt6.QtCore import QCoreApplication
+
+from core.activity_monitor import ActivityMonitor
+from core.activity_sources import ReplaySource, Sample
+from core.clock_service import ClockService
+from database.db_manager import DatabaseManager
+from models.session import Session
+from utils.clock import VirtualClock
+from utils.config import Config
+from utils.metrics import LatencyHistogram
+
+
+class TraceReplayer:
+    """
+    Проигрывание трассы через ActivityMonitor.
+
+    Каждый опрос трассы проходит тот же путь, что и живой:
+    _check_activity -> обработка простоя -> классификация -> запись в БД.
+    Монитор работает на виртуальных часах, выставленных на время опроса,
+    поэтому начало и длительность активностей берутся из трассы.
+    По умолчанию опросы идут без пауз; при speed > 0 выдерживаются
+    интервалы трассы, ускоренные в speed раз.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, config: Optional[Config] = None,
+                 speed: float = 0.0):
+        self._db = db_manager
+        self._config = config
+        self._speed = speed
+
+    def run(self, samples: Iterable[Sample], session: Optional[Session] = None) -> dict:
+        """
+        Прогнать трассу.
+
+        Args:
+            samples: Опросы трассы
+            session: Сессия, к которой относятся активности (по умолчанию новая)
+
+        Returns:
+            Отчёт: число событий, переключений, событий в секунду и
+            задержка от выдачи опроса до записи в БД
+        """
+        if QCoreApplication.instance() is None:
+            raise RuntimeError("Для прогона трассы нужен QCoreApplication")
+
+        source = ReplaySource(samples)
+        first = source.next_timestamp
+        clock = VirtualClock(datetime.fromtimestamp(first) if first is not None else None)
+
+        session = session or Session(start_time=clock.now())
+        self._db.save_session(session)
+
+        monitor = ActivityMonitor(
+            self._db, self._config, ClockService(clock=clock),
+            threaded=False, source=source, clock=clock
+        )
+
+        switches = []
+        idle_events = []
+        monitor.activity_changed.connect(lambda app, title: switches.append(app))
+        monitor.idle_detected.connect(idle_events.append)
+
+        latency = LatencyHistogram()
+        previous_timestamp = None
+
+        monitor.start_monitoring(session.id)
+        monitor._timer.stop()  # опросы подаются вручную, без таймера
+        started = time.perf_counter()
+
+        try:
+            while not source.exhausted:
+                clock.advance_to(datetime.fromtimestamp(source.next_timestamp))
+                call_started = time.perf_counter()
+                monitor._check_activity()
+                latency.record(time.perf_counter() - call_started)
+
+                if self._speed > 0:
+                    timestamp = source.last.timestamp
+                    if previous_timestamp is not None and timestamp > previous_timestamp:
+                        time.sleep((timestamp - previous_timestamp) / self._speed)
+                    previous_timestamp = timestamp
+        finally:
+            monitor.stop_monitoring()
+            monitor.shutdown()
+
+        elapsed = time.perf_counter() - started
+        events = source.replayed
+
+        return {
+            "events": events,
+            "activity_switches": len(switches),
+            "idle_events": len(idle_events),
+            "elapsed_s": round(elapsed, 4),
+            "events_per_second": round(events / elapsed, 1) if elapsed > 0 else 0.0,
+            "latency": latency.to_dict(),
+        }
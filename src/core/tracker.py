@@ -1,16 +1,25 @@
 """Основной трекер времени."""
 
 import logging
-from datetime import datetime
 from typing import Optional
-from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from PyQt6.QtCore import QObject, pyqtSignal
 
 from models.session import Session, SessionStatus
 from database.db_manager import DatabaseManager
+from database.journal import SessionJournal
+from core.clock_service import ClockService
+from utils.clock import SYSTEM_CLOCK, Clock
+from utils.metrics import timed
 
 
 class TimeTracker(QObject):
-    """Класс для отслеживания рабочего времени."""
+    """
+    Класс для отслеживания рабочего времени.
+
+    С журналом (SessionJournal) каждые несколько секунд пишется дешёвый
+    пульс, а полная запись в БД выполняется компакцией журнала раз
+    в COMPACT_INTERVAL. Без журнала сессия сохраняется в БД раз в SAVE_INTERVAL.
+    """
 
     # Сигналы
     time_updated = pyqtSignal(int)  # общее время в секундах
@@ -20,19 +29,40 @@ class TimeTracker(QObject):
     session_stopped = pyqtSignal(object)  # Session
     state_changed = pyqtSignal()  # Сигнал изменения состояния
 
-    def __init__(self, db_manager: DatabaseManager, parent=None):
+    # Пока окно скрыто, тик нужен только для пульса и периодического сохранения
+    # (10 с кратны опросу монитора активности, отдельных пробуждений не добавляет)
+    TICK_INTERVAL_MS = 1000
+    BACKGROUND_TICK_INTERVAL_MS = 10_000
+    SAVE_INTERVAL = 60  # секунды
+    HEARTBEAT_INTERVAL = 5  # секунды
+    COMPACT_INTERVAL = 300  # секунды
+
+    def __init__(self, db_manager: DatabaseManager,
+                 clock_service: Optional[ClockService] = None,
+                 journal: Optional[SessionJournal] = None,
+                 clock: Optional[Clock] = None, parent=None):
         super().__init__(parent)
         self._logger = logging.getLogger(__name__)
         self._db = db_manager
+        self._journal = journal
+        clock = clock or SYSTEM_CLOCK
+        self._clock = clock.monotonic
+        self._now = clock.now
 
         self._current_session: Optional[Session] = None
-        self._elapsed_seconds: int = 0
+        self._elapsed_base: int = 0  # время до начала текущего отрезка работы
+        self._run_started: Optional[float] = None  # монотонное время начала отрезка
+        self._last_saved: int = 0  # total_duration текущей сессии, записанный в БД
+        self._last_heartbeat: int = 0
         self._is_running: bool = False
 
-        # Таймер для обновления времени
-        self._timer = QTimer(self)
-        self._timer.timeout.connect(self._on_tick)
-        self._timer.setInterval(1000)  # 1 секунда
+        # Тик для обновления времени (через общий сервис пробуждений)
+        self._clock_service = clock_service or ClockService(self, clock)
+        self._timer = self._clock_service.subscribe(
+            self._on_tick, self.TICK_INTERVAL_MS,
+            background_interval_ms=self.BACKGROUND_TICK_INTERVAL_MS,
+            name="tracker"
+        )
 
         # Восстановление активной сессии
         self._restore_session()
@@ -45,7 +75,9 @@ class TimeTracker(QObject):
     @property
     def elapsed_seconds(self) -> int:
         """Прошедшее время в секундах."""
-        return self._elapsed_seconds
+        if self._run_started is None:
+            return self._elapsed_base
+        return self._elapsed_base + int(self._clock() - self._run_started)
 
     @property
     def is_running(self) -> bool:
@@ -65,15 +97,22 @@ class TimeTracker(QObject):
         return self._current_session is not None
 
     def _restore_session(self) -> None:
-        """Восстановить активную сессию из БД."""
+        """Восстановить активную сессию из БД (после проигрывания журнала)."""
+        if self._journal is not None:
+            self._journal.recover(self._db)
+
         session = self._db.get_active_session()
         if session:
             self._current_session = session
-            self._elapsed_seconds = session.total_duration
+            self._elapsed_base = session.total_duration
+            self._last_saved = session.total_duration
+            self._last_heartbeat = session.total_duration
+
+            if self._journal is not None:
+                self._journal.session_event("snapshot", session)
 
             if session.is_active:
-                self._is_running = True
-                self._timer.start()
+                self._begin_run()
 
             self._logger.info(f"Восстановлена сессия: {session.id}")
             self.state_changed.emit()
@@ -85,33 +124,49 @@ class TimeTracker(QObject):
 
         if self._current_session is None:
             # Создаем новую сессию
-            self._current_session = Session()
-            self._elapsed_seconds = 0
-            self._db.save_session(self._current_session)
+            self._current_session = Session(start_time=self._now())
+            self._elapsed_base = 0
+            self._last_heartbeat = 0
+            self._save_session("start")
             self._logger.info(f"Начата новая сессия: {self._current_session.id}")
             self.session_started.emit(self._current_session)
         elif self._current_session.is_paused:
             # Возобновляем сессию
             self._current_session.resume()
-            self._db.save_session(self._current_session)
+            self._save_session("resume")
             self._logger.info("Сессия возобновлена")
             self.session_resumed.emit()
 
+        self._begin_run()
+        self.state_changed.emit()
+
+    def _begin_run(self) -> None:
+        """Начать отрезок работы."""
         self._is_running = True
+        self._run_started = self._clock()
         self._timer.start()
-        self.state_changed.emit()
+
+    def _end_run(self) -> None:
+        """Закончить отрезок работы, зафиксировав прошедшее время."""
+        self._elapsed_base = self.elapsed_seconds
+        self._run_started = None
+        self._is_running = False
+        self._timer.stop()
+
+        if self._current_session:
+            self._current_session.total_duration = self._elapsed_base
+            self._current_session.active_duration = self._elapsed_base
 
     def pause(self) -> None:
         """Поставить на паузу."""
         if not self._is_running or self._current_session is None:
             return  # Нечего ставить на паузу
 
-        self._is_running = False
-        self._timer.stop()
+        self._end_run()
 
         self._current_session.pause()
         self._current_session.breaks_count += 1
-        self._db.save_session(self._current_session)
+        self._save_session("pause")
 
         self._logger.info("Сессия приостановлена")
         self.session_paused.emit()
@@ -122,40 +177,83 @@ class TimeTracker(QObject):
         if self._current_session is None:
             return  # Нет активной сессии
 
-        self._is_running = False
-        self._timer.stop()
+        self._end_run()
 
-        self._current_session.complete()
-        self._db.save_session(self._current_session)
+        self._current_session.complete(self._now())
+        self._save_session("stop")
 
         completed_session = self._current_session
         self._current_session = None
-        self._elapsed_seconds = 0
+        self._elapsed_base = 0
+        self._last_saved = 0
 
         self._logger.info(f"Сессия завершена: {completed_session.id}")
         self.session_stopped.emit(completed_session)
         self.state_changed.emit()
 
+    @timed("tracker.tick")
     def _on_tick(self) -> None:
-        """Обработчик тика таймера (каждую секунду)."""
+        """Обработчик тика (раз в секунду, в фоне - раз в 10 секунд)."""
         if not self._is_running:
             return
 
-        self._elapsed_seconds += 1
+        elapsed = self.elapsed_seconds
 
         if self._current_session:
-            self._current_session.total_duration = self._elapsed_seconds
-            self._current_session.active_duration = self._elapsed_seconds
-
-            # Сохраняем каждую минуту
-            if self._elapsed_seconds % 60 == 0:
-                self._db.save_session(self._current_session)
+            self._current_session.total_duration = elapsed
+            self._current_session.active_duration = elapsed
+
+            if self._journal is None:
+                # Без журнала сохраняем каждую минуту
+                if elapsed - self._last_saved >= self.SAVE_INTERVAL:
+                    self._save_session()
+            else:
+                if elapsed - self._last_heartbeat >= self.HEARTBEAT_INTERVAL:
+                    self._journal.heartbeat(self._current_session)
+                    self._last_heartbeat = elapsed
+                if elapsed - self._last_saved >= self.COMPACT_INTERVAL:
+                    self._journal.heartbeat(self._current_session)
+                    self._journal.compact(self._db)
+                    self._last_saved = elapsed
+
+        self.time_updated.emit(elapsed)
+
+    def flush(self) -> None:
+        """Записать текущее состояние в БД (перед выходом из приложения)."""
+        if self._current_session is None:
+            return
 
-        self.time_updated.emit(self._elapsed_seconds)
+        if self._is_running:
+            self._current_session.total_duration = self.elapsed_seconds
+            self._current_session.active_duration = self.elapsed_seconds
+
+        if self._journal is not None:
+            self._journal.heartbeat(self._current_session)
+            self._journal.compact(self._db)
+            self._last_saved = self._current_session.total_duration
+        else:
+            self._save_session()
+
+    def _save_session(self, event: str = "") -> None:
+        """Записать текущую сессию (и событие в журнал), запомнив сохранённую длительность."""
+        if self._journal is not None and event:
+            self._journal.session_event(event, self._current_session)
+        self._db.save_session(self._current_session)
+        self._last_saved = self._current_session.total_duration
 
     def get_today_total(self) -> int:
-        """Получить общее время за сегодня."""
-        from datetime import date
-        stats = self._db.get_daily_stats(date.today())
-        current = self._elapsed_seconds if self._current_session else 0
-        return stats["total_time"] + current
+        """
+        Получить общее время за сегодня.
+
+        Сессия относится к дню своего начала (как и в статистике), поэтому
+        после полуночи сессия, начатая вчера, в сегодняшний итог не входит.
+        """
+        today = self._now().date()
+        total = self._db.get_daily_stats(today)["total_time"]
+
+        session = self._current_session
+        if session is None or session.start_time.date() != today:
+            return total
+
+        # Сохранённая часть текущей сессии уже учтена в БД - заменяем её живым значением
+        return total - self._last_saved + self.elapsed_seconds
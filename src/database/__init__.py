@@ -1,5 +1,7 @@
 """Модуль работы с базой данных."""
 
+from .changes import ChangeBus, DataChange
 from .db_manager import DatabaseManager
+from .journal import SessionJournal
 
-__all__ = ["DatabaseManager"]
+__all__ = ["ChangeBus", "DataChange", "DatabaseManager", "SessionJournal"]
@@ -0,0 +1,97 @@
+"""Уведомления об изменении данных и версии таблиц по дням.
+
+DatabaseManager после каждой записи публикует DataChange: какая таблица,
+за какие дни и (для активностей) какие приложения изменились. Шина
+увеличивает счётчики версий - общий для таблицы и по каждому дню, -
+так что подписчик может и реагировать на события, и просто сравнить
+версию с запомненной при загрузке. Запись из другого процесса видна
+только как «изменилось что-то» (DataChange без таблицы).
+"""
+
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import date
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class DataChange:
+    """Изменение данных."""
+
+    table: Optional[str]  # None - запись из другого процесса, таблица неизвестна
+    days: FrozenSet[date] = frozenset()  # пусто - любые дни
+    apps: FrozenSet[str] = frozenset()  # приложения изменённых активностей
+
+    @property
+    def external(self) -> bool:
+        """Запись сделана другим процессом."""
+        return self.table is None
+
+    def touches(self, tables: Iterable[str], start: Optional[date] = None,
+                end: Optional[date] = None) -> bool:
+        """Могло ли изменение затронуть таблицы tables за дни [start, end]."""
+        if self.table is not None and self.table not in tables:
+            return False
+        if not self.days:
+            return True
+        return any((start is None or day >= start) and (end is None or day <= end)
+                   for day in self.days)
+
+
+class ChangeBus:
+    """
+    Подписки на изменения и счётчики версий.
+
+    Публиковать можно из любого потока; подписчики вызываются в потоке
+    записи (для GUI - через core.change_watcher.ChangeWatcher).
+    """
+
+    def __init__(self):
+        self._logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._subscribers: List[Callable[[DataChange], None]] = []
+        self._table_versions: Dict[str, int] = {}
+        self._day_versions: Dict[Tuple[str, date], int] = {}
+        self._any_day_versions: Dict[str, int] = {}  # изменения без списка дней
+        self._external: int = 0
+
+    def subscribe(self, callback: Callable[[DataChange], None]) -> None:
+        """Подписаться на изменения."""
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[DataChange], None]) -> None:
+        """Отписаться."""
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def version(self, table: str, day: Optional[date] = None) -> int:
+        """Версия таблицы (или её данных за день): растёт при каждом изменении."""
+        with self._lock:
+            if day is None:
+                return self._table_versions.get(table, 0) + self._external
+            return (self._day_versions.get((table, day), 0)
+                    + self._any_day_versions.get(table, 0) + self._external)
+
+    def publish(self, change: DataChange) -> None:
+        """Учесть изменение и оповестить подписчиков."""
+        with self._lock:
+            if change.external:
+                self._external += 1
+            else:
+                table = change.table
+                self._table_versions[table] = self._table_versions.get(table, 0) + 1
+                if change.days:
+                    for day in change.days:
+                        self._day_versions[(table, day)] = self._day_versions.get((table, day), 0) + 1
+                else:
+                    self._any_day_versions[table] = self._any_day_versions.get(table, 0) + 1
+            subscribers = list(self._subscribers)
+
+        for callback in subscribers:
+            try:
+                callback(change)
+            except Exception as e:
+                self._logger.warning(f"Ошибка подписчика на изменения данных: {e}")
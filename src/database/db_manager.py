@@ -1,14 +1,40 @@
 """Менеджер базы данных SQLite."""
 
+import math
 import sqlite3
 import logging
+import threading
 from pathlib import Path
-from datetime import date, datetime
-from typing import List, Optional, Dict, Any
+from datetime import date, datetime, timedelta
+from typing import Iterable, Iterator, List, Optional, Dict, Any, Tuple
 from contextlib import contextmanager
 
+from database.changes import ChangeBus, DataChange
 from models.session import Session, SessionStatus
 from models.activity import Activity, ActivityType
+from models.input_minute import InputMinute
+from models.focus_day import FocusDay
+from utils.interval_tree import IntervalTree
+from utils.log_histogram import BOUNDS, LogHistogram
+from utils.metrics import measure, timed
+
+
+# Индекс интервалов хранит целые секунды от этой даты (rtree_i32 - 32-битные
+# координаты: хватит до 2068 года, а вещественный rtree округлял бы до минут)
+_INTERVAL_EPOCH = datetime(2000, 1, 1)
+_INTERVAL_EPOCH_SQL = "946684800"  # strftime('%s', '2000-01-01')
+# Конец открытого интервала (активность или сессия ещё идёт)
+_INTERVAL_OPEN_END = 2**31 - 1
+
+# Таблицы с интервалами и их R*Tree-индексы
+_INTERVAL_TABLES = {"activities": "activity_intervals", "sessions": "session_intervals"}
+
+# Нарастающие итоги по дням: сессии и время по типам активности
+_CUMULATIVE_COLUMNS = ["total_time", "sessions_count", "breaks_count"] + [t.value for t in ActivityType]
+
+# Гистограммы длительностей, которые ведут триггеры: таблица -> (метрика, столбец).
+# Остальные метрики (например, серии фокуса) записываются через set_day_durations
+_DURATION_SOURCES = {"sessions": ("session", "total_duration"), "activities": ("activity", "duration")}
 
 
 class DatabaseManager:
@@ -24,21 +50,74 @@ class DatabaseManager:
 
         self._db_path.parent.mkdir(parents=True, exist_ok=True)
 
+        # Уведомления об изменениях; data_version читается через отдельное
+        # постоянное соединение (у каждого соединения своя точка отсчёта)
+        self._changes = ChangeBus()
+        self._version_lock = threading.Lock()
+        self._version_conn: Optional[sqlite3.Connection] = None
+        self._known_data_version: Optional[int] = None
+
+    @property
+    def db_path(self) -> Path:
+        """Путь к файлу базы данных."""
+        return self._db_path
+
+    @property
+    def changes(self) -> ChangeBus:
+        """Шина уведомлений об изменении данных."""
+        return self._changes
+
+    def _data_version(self) -> int:
+        """PRAGMA data_version постоянного соединения (вызывать под _version_lock)."""
+        if self._version_conn is None:
+            self._version_conn = sqlite3.connect(self._db_path, check_same_thread=False)
+        return self._version_conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _publish(self, table: str, days: Iterable[date] = (), apps: Iterable[str] = ()) -> None:
+        """
+        Оповестить о записи этого процесса (после фиксации транзакции).
+
+        Текущая data_version запоминается как известная, чтобы
+        check_external_changes() не принял эту запись за чужую.
+        """
+        with self._version_lock:
+            self._known_data_version = self._data_version()
+        self._changes.publish(DataChange(table, frozenset(days), frozenset(apps)))
+
+    @timed("db.check_external_changes")
+    def check_external_changes(self) -> bool:
+        """
+        Проверить, писал ли в базу другой процесс с прошлой проверки.
+
+        Если писал - публикует DataChange без таблицы (изменилось что угодно).
+        Запись другого процесса, зафиксированная почти одновременно с
+        записью этого, может быть принята за свою.
+        """
+        with self._version_lock:
+            version = self._data_version()
+            changed = self._known_data_version is not None and version != self._known_data_version
+            self._known_data_version = version
+        if changed:
+            self._changes.publish(DataChange(None))
+        return changed
+
     @contextmanager
     def _get_connection(self):
         """Контекстный менеджер для подключения к БД."""
-        conn = sqlite3.connect(self._db_path)
-        conn.row_factory = sqlite3.Row
-        try:
-            yield conn
-            conn.commit()
-        except Exception as e:
-            conn.rollback()
-            self._logger.error(f"Ошибка базы данных: {e}")
-            raise
-        finally:
-            conn.close()
+        with measure("db.transaction"):
+            conn = sqlite3.connect(self._db_path)
+            conn.row_factory = sqlite3.Row
+            try:
+                yield conn
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                self._logger.error(f"Ошибка базы данных: {e}")
+                raise
+            finally:
+                conn.close()
 
+    @timed("db.initialize")
     def initialize(self) -> None:
         """Инициализация базы данных."""
         with self._get_connection() as conn:
@@ -87,32 +166,368 @@ class DatabaseManager:
                 CREATE INDEX IF NOT EXISTS idx_activities_type 
                 ON activities(activity_type)
             """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_activities_open
+                ON activities(session_id) WHERE end_time IS NULL
+            """)
+
+            # Полнотекстовый индекс заголовков окон (внешнее содержимое - activities)
+            fts_exists = cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'activity_titles'"
+            ).fetchone()
+            cursor.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS activity_titles USING fts5(
+                    window_title,
+                    content = 'activities', content_rowid = 'rowid',
+                    tokenize = 'unicode61 remove_diacritics 2'
+                )
+            """)
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS activity_titles_insert
+                AFTER INSERT ON activities BEGIN
+                    INSERT INTO activity_titles (rowid, window_title)
+                    VALUES (new.rowid, new.window_title);
+                END
+            """)
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS activity_titles_delete
+                AFTER DELETE ON activities BEGIN
+                    INSERT INTO activity_titles (activity_titles, rowid, window_title)
+                    VALUES ('delete', old.rowid, old.window_title);
+                END
+            """)
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS activity_titles_update
+                AFTER UPDATE OF window_title ON activities
+                WHEN old.window_title IS NOT new.window_title BEGIN
+                    INSERT INTO activity_titles (activity_titles, rowid, window_title)
+                    VALUES ('delete', old.rowid, old.window_title);
+                    INSERT INTO activity_titles (rowid, window_title)
+                    VALUES (new.rowid, new.window_title);
+                END
+            """)
+            if not fts_exists:
+                # База создана до появления индекса - проиндексировать историю
+                cursor.execute("INSERT INTO activity_titles (activity_titles) VALUES ('rebuild')")
+
+            # Индексы интервалов [start_time, end_time) для запросов по времени
+            for table, index in _INTERVAL_TABLES.items():
+                self._create_interval_index(cursor, table, index)
+
+            # Нарастающие итоги по дням для запросов за произвольный период
+            self._create_cumulative_totals(cursor)
+
+            # Гистограммы длительностей по дням для медиан и перцентилей
+            self._create_duration_histogram(cursor)
+
+            # Показатели фокуса по дням (считает core.focus_analyzer)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS focus_days (
+                    day TEXT PRIMARY KEY,
+                    focus_seconds INTEGER DEFAULT 0,
+                    deep_work_seconds INTEGER DEFAULT 0,
+                    longest_streak INTEGER DEFAULT 0,
+                    streaks INTEGER DEFAULT 0,
+                    interruptions INTEGER DEFAULT 0,
+                    switches INTEGER DEFAULT 0,
+                    tracked_seconds INTEGER DEFAULT 0,
+                    computed_on TEXT
+                ) WITHOUT ROWID
+            """)
+            # computed_on - день расчёта; строка, посчитанная в тот же день
+            # (или раньше), предварительная и пересчитывается
+            columns = {row[1] for row in cursor.execute("PRAGMA table_info(focus_days)")}
+            if "computed_on" not in columns:
+                cursor.execute("ALTER TABLE focus_days ADD COLUMN computed_on TEXT")
+
+            # Поминутная интенсивность ввода (сырые события не хранятся)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS input_intensity (
+                    minute TEXT NOT NULL,
+                    application_name TEXT NOT NULL,
+                    keys INTEGER DEFAULT 0,
+                    clicks INTEGER DEFAULT 0,
+                    scrolls INTEGER DEFAULT 0,
+                    motion INTEGER DEFAULT 0,
+                    PRIMARY KEY (minute, application_name)
+                ) WITHOUT ROWID
+            """)
 
             self._logger.info("База данных инициализирована")
 
+    @staticmethod
+    def _create_interval_index(cursor: sqlite3.Cursor, table: str, index: str) -> None:
+        """
+        R*Tree по интервалам строк table, поддерживаемый триггерами.
+
+        Ключ - rowid строки, координаты - секунды от _INTERVAL_EPOCH: начало
+        округляется вниз, конец вверх (на секунду больше), так что индекс
+        даёт надмножество, а точное сравнение идёт по самим строкам.
+        """
+        start = f"CAST(strftime('%s', new.start_time) AS INTEGER) - {_INTERVAL_EPOCH_SQL}"
+        end = (f"COALESCE(CAST(strftime('%s', new.end_time) AS INTEGER) - {_INTERVAL_EPOCH_SQL} + 1, "
+               f"{_INTERVAL_OPEN_END})")
+
+        exists = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = ?", (index,)
+        ).fetchone()
+        cursor.execute(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {index} USING rtree_i32(id, start_ts, end_ts)
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {index}_insert
+            AFTER INSERT ON {table} BEGIN
+                INSERT INTO {index} VALUES (new.rowid, {start}, {end});
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {index}_update
+            AFTER UPDATE OF start_time, end_time ON {table} BEGIN
+                UPDATE {index} SET start_ts = {start}, end_ts = {end}
+                WHERE id = new.rowid;
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {index}_delete
+            AFTER DELETE ON {table} BEGIN
+                DELETE FROM {index} WHERE id = old.rowid;
+            END
+        """)
+        if not exists:
+            # База создана до появления индекса - проиндексировать историю
+            cursor.execute(f"""
+                INSERT INTO {index}
+                SELECT rowid, {start.replace('new.', '')}, {end.replace('new.', '')}
+                FROM {table}
+            """)
+
+    @staticmethod
+    def _create_cumulative_totals(cursor: sqlite3.Cursor) -> None:
+        """
+        Таблица cumulative_totals: итоги с начала истории по день включительно.
+
+        Итог за период - разность двух строк (конец периода минус день перед
+        ним), то есть два поиска по ключу при любой длине периода. Триггеры
+        на sessions и activities прибавляют изменение к строке дня и ко всем
+        более поздним; почти все записи относятся к сегодняшнему, последнему
+        дню, так что обновляется одна строка.
+        """
+        exists = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'cumulative_totals'"
+        ).fetchone()
+        columns = ",\n".join(f"{column} INTEGER DEFAULT 0" for column in _CUMULATIVE_COLUMNS)
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS cumulative_totals (
+                day TEXT PRIMARY KEY,
+                {columns}
+            ) WITHOUT ROWID
+        """)
+
+        def ensure_day(day: str) -> str:
+            # Строка нового дня начинается с итогов предыдущего
+            previous = ", ".join(f"COALESCE(p.{column}, 0)" for column in _CUMULATIVE_COLUMNS)
+            # (не OR IGNORE: в триггере его перекрывает политика внешней команды)
+            return f"""
+                INSERT INTO cumulative_totals
+                SELECT {day}, {previous} FROM (SELECT 1)
+                LEFT JOIN (SELECT * FROM cumulative_totals WHERE day < {day}
+                           ORDER BY day DESC LIMIT 1) p
+                WHERE NOT EXISTS (SELECT 1 FROM cumulative_totals WHERE day = {day});
+            """
+
+        def shift(day: str, deltas: Dict[str, str], sign: str) -> str:
+            assignments = ", ".join(f"{column} = {column} {sign} ({delta})"
+                                    for column, delta in deltas.items())
+            return f"UPDATE cumulative_totals SET {assignments} WHERE day >= {day};"
+
+        def session_deltas(row: str) -> Dict[str, str]:
+            return {"total_time": f"{row}.total_duration", "sessions_count": "1",
+                    "breaks_count": f"{row}.breaks_count"}
+
+        def activity_deltas(row: str) -> Dict[str, str]:
+            return {t.value: f"CASE WHEN {row}.activity_type = '{t.value}' THEN {row}.duration ELSE 0 END"
+                    for t in ActivityType}
+
+        sources = {
+            "sessions": (session_deltas, "start_time, total_duration, breaks_count"),
+            "activities": (activity_deltas, "start_time, duration, activity_type"),
+        }
+        for table, (deltas, watched) in sources.items():
+            new_day, old_day = "substr(new.start_time, 1, 10)", "substr(old.start_time, 1, 10)"
+            changed = " OR ".join(f"old.{column} IS NOT new.{column}" for column in watched.split(", "))
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS cumulative_{table}_insert
+                AFTER INSERT ON {table} BEGIN
+                    {ensure_day(new_day)}
+                    {shift(new_day, deltas("new"), "+")}
+                END
+            """)
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS cumulative_{table}_update
+                AFTER UPDATE OF {watched} ON {table}
+                WHEN {changed} BEGIN
+                    {shift(old_day, deltas("old"), "-")}
+                    {ensure_day(new_day)}
+                    {shift(new_day, deltas("new"), "+")}
+                END
+            """)
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS cumulative_{table}_delete
+                AFTER DELETE ON {table} BEGIN
+                    {shift(old_day, deltas("old"), "-")}
+                END
+            """)
+
+        if not exists:
+            # База создана до появления итогов - посчитать историю
+            per_day = ", ".join(f"SUM(SUM({column})) OVER (ORDER BY day)" for column in _CUMULATIVE_COLUMNS)
+            session_values = ", ".join(f"{session_deltas('s').get(column, '0')} AS {column}"
+                                       for column in _CUMULATIVE_COLUMNS)
+            activity_values = ", ".join(activity_deltas("a").get(column, "0") for column in _CUMULATIVE_COLUMNS)
+            cursor.execute(f"""
+                INSERT INTO cumulative_totals
+                SELECT day, {per_day} FROM (
+                    SELECT substr(s.start_time, 1, 10) AS day, {session_values} FROM sessions s
+                    UNION ALL
+                    SELECT substr(a.start_time, 1, 10), {activity_values} FROM activities a
+                )
+                GROUP BY day
+            """)
+
+    @staticmethod
+    def _create_duration_histogram(cursor: sqlite3.Cursor) -> None:
+        """
+        Таблица duration_histogram: число длительностей по корзинам за день.
+
+        Корзины общие (utils.log_histogram.BOUNDS), поэтому гистограмма
+        за период - сумма дневных, а медиана и перцентили считаются по
+        сотне-другой счётчиков вместо всех сессий. Номер корзины триггеры
+        находят по таблице границ duration_buckets, так что гистограммы
+        поддерживаются и при записи в базу в обход DatabaseManager.
+        Учитываются только завершённые строки (end_time не NULL).
+        """
+        exists = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'duration_histogram'"
+        ).fetchone()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS duration_buckets (
+                lower INTEGER PRIMARY KEY,
+                bucket INTEGER NOT NULL
+            )
+        """)
+        cursor.executemany(
+            "INSERT OR IGNORE INTO duration_buckets (lower, bucket) VALUES (?, ?)",
+            [(lower, bucket) for bucket, lower in enumerate(BOUNDS)]
+        )
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS duration_histogram (
+                metric TEXT NOT NULL,
+                day TEXT NOT NULL,
+                bucket INTEGER NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (metric, day, bucket)
+            ) WITHOUT ROWID
+        """)
+
+        def bucket(value: str) -> str:
+            return (f"(SELECT bucket FROM duration_buckets WHERE lower <= MAX({value}, 0) "
+                    f"ORDER BY lower DESC LIMIT 1)")
+
+        for table, (metric, column) in _DURATION_SOURCES.items():
+            def add(row: str) -> str:
+                return f"""
+                    INSERT INTO duration_histogram (metric, day, bucket, count)
+                    SELECT '{metric}', substr({row}.start_time, 1, 10), {bucket(f"{row}.{column}")}, 1
+                    WHERE {row}.end_time IS NOT NULL
+                    ON CONFLICT (metric, day, bucket) DO UPDATE SET count = count + 1;
+                """
+
+            def remove(row: str) -> str:
+                return f"""
+                    UPDATE duration_histogram SET count = count - 1
+                    WHERE {row}.end_time IS NOT NULL AND metric = '{metric}'
+                      AND day = substr({row}.start_time, 1, 10)
+                      AND bucket = {bucket(f"{row}.{column}")};
+                """
+
+            watched = ["start_time", "end_time", column]
+            changed = " OR ".join(f"old.{name} IS NOT new.{name}" for name in watched)
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS duration_{table}_insert
+                AFTER INSERT ON {table} BEGIN
+                    {add("new")}
+                END
+            """)
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS duration_{table}_update
+                AFTER UPDATE OF {", ".join(watched)} ON {table}
+                WHEN {changed} BEGIN
+                    {remove("old")}
+                    {add("new")}
+                END
+            """)
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS duration_{table}_delete
+                AFTER DELETE ON {table} BEGIN
+                    {remove("old")}
+                END
+            """)
+
+            if not exists:
+                # База создана до появления гистограмм - посчитать историю
+                cursor.execute(f"""
+                    INSERT INTO duration_histogram (metric, day, bucket, count)
+                    SELECT '{metric}', day, bucket, COUNT(*) FROM (
+                        SELECT substr(start_time, 1, 10) AS day, {bucket(column)} AS bucket
+                        FROM {table} WHERE end_time IS NOT NULL
+                    )
+                    GROUP BY day, bucket
+                """)
+
     # === Методы для работы с сессиями ===
 
+    # UPSERT, а не INSERT OR REPLACE: REPLACE удаляет строку без триггеров
+    # удаления, и в индексе интервалов (session_intervals) остался бы старый rowid
+    _SAVE_SESSION_SQL = """
+        INSERT INTO sessions 
+        (id, start_time, end_time, status, total_duration, 
+         active_duration, idle_duration, breaks_count, notes)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (id) DO UPDATE SET
+            start_time = excluded.start_time,
+            end_time = excluded.end_time,
+            status = excluded.status,
+            total_duration = excluded.total_duration,
+            active_duration = excluded.active_duration,
+            idle_duration = excluded.idle_duration,
+            breaks_count = excluded.breaks_count,
+            notes = excluded.notes
+    """
+
+    @staticmethod
+    def _session_params(session: Session) -> tuple:
+        """Параметры INSERT для сессии."""
+        return (
+            session.id,
+            session.start_time.isoformat(),
+            session.end_time.isoformat() if session.end_time else None,
+            session.status.value,
+            session.total_duration,
+            session.active_duration,
+            session.idle_duration,
+            session.breaks_count,
+            session.notes
+        )
+
+    @timed("db.save_session")
     def save_session(self, session: Session) -> None:
         """Сохранить сессию."""
         with self._get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                INSERT OR REPLACE INTO sessions 
-                (id, start_time, end_time, status, total_duration, 
-                 active_duration, idle_duration, breaks_count, notes)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                session.id,
-                session.start_time.isoformat(),
-                session.end_time.isoformat() if session.end_time else None,
-                session.status.value,
-                session.total_duration,
-                session.active_duration,
-                session.idle_duration,
-                session.breaks_count,
-                session.notes
-            ))
+            cursor.execute(self._SAVE_SESSION_SQL, self._session_params(session))
+        self._publish("sessions", [session.start_time.date()])
 
+    @timed("db.get_session")
     def get_session(self, session_id: str) -> Optional[Session]:
         """Получить сессию по ID."""
         with self._get_connection() as conn:
@@ -124,6 +539,7 @@ class DatabaseManager:
                 return self._row_to_session(row)
         return None
 
+    @timed("db.get_sessions_by_date")
     def get_sessions_by_date(self, target_date: date) -> List[Session]:
         """Получить все сессии за указанную дату."""
         with self._get_connection() as conn:
@@ -137,6 +553,7 @@ class DatabaseManager:
 
             return [self._row_to_session(row) for row in cursor.fetchall()]
 
+    @timed("db.get_active_session")
     def get_active_session(self) -> Optional[Session]:
         """Получить текущую активную сессию."""
         with self._get_connection() as conn:
@@ -169,26 +586,107 @@ class DatabaseManager:
 
     # === Методы для работы с активностями ===
 
+    # UPSERT, а не INSERT OR REPLACE: строка сохраняет rowid, и индекс
+    # заголовков (activity_titles) обновляется триггером только при смене заголовка
+    _SAVE_ACTIVITY_SQL = """
+        INSERT INTO activities 
+        (id, session_id, application_name, window_title, 
+         start_time, end_time, duration, activity_type)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (id) DO UPDATE SET
+            session_id = excluded.session_id,
+            application_name = excluded.application_name,
+            window_title = excluded.window_title,
+            start_time = excluded.start_time,
+            end_time = excluded.end_time,
+            duration = excluded.duration,
+            activity_type = excluded.activity_type
+    """
+
+    @staticmethod
+    def _activity_params(activity: Activity) -> tuple:
+        """Параметры INSERT для активности."""
+        return (
+            activity.id,
+            activity.session_id,
+            activity.application_name,
+            activity.window_title,
+            activity.start_time.isoformat(),
+            activity.end_time.isoformat() if activity.end_time else None,
+            activity.duration,
+            activity.activity_type.value
+        )
+
+    @timed("db.save_activity")
     def save_activity(self, activity: Activity) -> None:
         """Сохранить активность."""
         with self._get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                INSERT OR REPLACE INTO activities 
-                (id, session_id, application_name, window_title, 
-                 start_time, end_time, duration, activity_type)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                activity.id,
-                activity.session_id,
-                activity.application_name,
-                activity.window_title,
-                activity.start_time.isoformat(),
-                activity.end_time.isoformat() if activity.end_time else None,
-                activity.duration,
-                activity.activity_type.value
-            ))
+            cursor.execute(self._SAVE_ACTIVITY_SQL, self._activity_params(activity))
+        self._publish("activities", self._activity_days(activity), [activity.application_name])
+
+    @staticmethod
+    def _activity_days(activity: Activity) -> List[date]:
+        """Дни, на которые приходится активность (для уведомлений об изменении)."""
+        day = activity.start_time.date()
+        last = (activity.end_time or activity.start_time).date()
+        days = [day]
+        while day < last:
+            day += timedelta(days=1)
+            days.append(day)
+        return days
+
+    @timed("db.apply_checkpoint")
+    def apply_checkpoint(self, sessions: List[Session], activities: List[Activity]) -> None:
+        """Записать сессии и активности из журнала одной транзакцией."""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany(self._SAVE_SESSION_SQL, [self._session_params(s) for s in sessions])
+            cursor.executemany(self._SAVE_ACTIVITY_SQL, [self._activity_params(a) for a in activities])
+        if sessions:
+            self._publish("sessions", {s.start_time.date() for s in sessions})
+        if activities:
+            self._publish("activities", {day for a in activities for day in self._activity_days(a)},
+                          {a.application_name for a in activities})
 
+    @timed("db.close_dangling_activities")
+    def close_dangling_activities(self) -> int:
+        """
+        Закрыть активности, оставшиеся без end_time после аварийного выхода.
+
+        Окончанием считается начало следующей активности той же сессии,
+        иначе конец сессии, иначе само начало (длительность 0).
+
+        Returns:
+            Количество закрытых активностей
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            # Коррелированные подзапросы вместо UPDATE ... FROM (нужен SQLite 3.33+);
+            # все выражения SET видят строку до изменения
+            closing = """
+                COALESCE(
+                    (SELECT MIN(n.start_time) FROM activities n
+                     WHERE n.session_id = activities.session_id
+                       AND n.start_time > activities.start_time),
+                    (SELECT s.end_time FROM sessions s WHERE s.id = activities.session_id),
+                    activities.start_time
+                )
+            """
+            cursor.execute(f"""
+                UPDATE activities SET
+                    end_time = {closing},
+                    duration = MAX(0, CAST(ROUND(
+                        (julianday({closing}) - julianday(activities.start_time)) * 86400
+                    ) AS INTEGER))
+                WHERE end_time IS NULL
+            """)
+            closed = cursor.rowcount
+        if closed:
+            self._publish("activities")
+        return closed
+
+    @timed("db.get_activities_by_session")
     def get_activities_by_session(self, session_id: str) -> List[Activity]:
         """Получить все активности для сессии."""
         with self._get_connection() as conn:
@@ -201,6 +699,7 @@ class DatabaseManager:
 
             return [self._row_to_activity(row) for row in cursor.fetchall()]
 
+    @timed("db.get_app_statistics")
     def get_app_statistics(self, target_date: date) -> Dict[str, int]:
         """Получить статистику по приложениям за день."""
         with self._get_connection() as conn:
@@ -217,92 +716,336 @@ class DatabaseManager:
             return {row["application_name"]: row["total_duration"]
                     for row in cursor.fetchall()}
 
+    DASHBOARD_TOP = 5
+
+    def _day_activities(self, target_date: date) -> List[Activity]:
+        """Активности, пересекающие день (окном индекса интервалов), по времени начала."""
+        day_start = datetime.combine(target_date, datetime.min.time())
+        return [self._row_to_activity(row)
+                for row in self._select_intervals("activities", day_start, day_start + timedelta(days=1))]
+
+    @staticmethod
+    def _aggregate_day(activities: List[Activity], target_date: date, top: int) -> Dict[str, Any]:
+        """
+        Итоги по типам, приложения и топы за один проход по активностям.
+
+        Как и раньше в SQL (date(start_time) = день), учитываются активности,
+        начавшиеся в этот день, с записанной длительностью.
+        """
+        durations: Dict[Tuple[str, str], int] = {}
+        for activity in activities:
+            if activity.start_time.date() != target_date:
+                continue
+            key = (activity.application_name, activity.activity_type.value)
+            durations[key] = durations.get(key, 0) + (activity.duration or 0)
+
+        result: Dict[str, Any] = {t: {"duration": 0, "apps": 0}
+                                  for t in ("productive", "distracting", "neutral", "unknown")}
+        result["top_productive"] = []
+        result["top_distracting"] = []
+        result["apps"] = []
+        for (name, activity_type), duration in sorted(durations.items(), key=lambda item: item[1],
+                                                      reverse=True):
+            if activity_type in result:
+                result[activity_type]["duration"] += duration
+                result[activity_type]["apps"] += 1
+            top_list = result.get(f"top_{activity_type}")
+            if top_list is not None and len(top_list) < top:
+                top_list.append({"name": name, "duration": duration})
+            result["apps"].append({"name": name, "type": activity_type, "duration": duration})
+        return result
+
+    @timed("db.get_day_dashboard")
+    def get_day_dashboard(self, target_date: date, top: int = DASHBOARD_TOP) -> Dict[str, Any]:
+        """
+        Всё для вкладки продуктивности за день одним запросом.
+
+        Returns:
+            Словарь get_productivity_stats (итоги по типам, top_productive,
+            top_distracting) плюс "apps" - строки get_app_with_type и
+            "activities" - активности, пересекающие день (в том числе
+            начатые накануне и незавершённые)
+        """
+        activities = self._day_activities(target_date)
+        result = self._aggregate_day(activities, target_date, top)
+        result["activities"] = activities
+        return result
+
+    @timed("db.get_productivity_stats")
     def get_productivity_stats(self, target_date: date) -> Dict[str, Any]:
         """Получить статистику продуктивности за день."""
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            date_str = target_date.isoformat()
+        result = self._aggregate_day(self._day_activities(target_date), target_date, self.DASHBOARD_TOP)
+        del result["apps"]
+        return result
 
-            # Общее время по типам активности
-            cursor.execute("""
-                SELECT 
-                    activity_type,
-                    SUM(duration) as total_duration,
-                    COUNT(DISTINCT application_name) as app_count
-                FROM activities
-                WHERE date(start_time) = ?
-                GROUP BY activity_type
-            """, (date_str,))
+    @timed("db.get_app_with_type")
+    def get_app_with_type(self, target_date: date) -> List[Dict[str, Any]]:
+        """Получить список приложений с их типами за день."""
+        return self._aggregate_day(self._day_activities(target_date), target_date, self.DASHBOARD_TOP)["apps"]
 
-            result = {
-                "productive": {"duration": 0, "apps": 0},
-                "distracting": {"duration": 0, "apps": 0},
-                "neutral": {"duration": 0, "apps": 0},
-                "unknown": {"duration": 0, "apps": 0}
-            }
+    # === Поиск по заголовкам окон ===
 
-            for row in cursor.fetchall():
-                activity_type = row["activity_type"]
-                if activity_type in result:
-                    result[activity_type] = {
-                        "duration": row["total_duration"] or 0,
-                        "apps": row["app_count"] or 0
-                    }
+    @staticmethod
+    def _fts_query(text: str) -> str:
+        """
+        Запрос FTS5 из пользовательской строки.
 
-            # Топ продуктивных приложений
-            cursor.execute("""
-                SELECT application_name, SUM(duration) as total_duration
-                FROM activities
-                WHERE date(start_time) = ? AND activity_type = 'productive'
-                GROUP BY application_name
-                ORDER BY total_duration DESC
-                LIMIT 5
-            """, (date_str,))
+        Каждое слово - отдельная фраза в кавычках (дефисы, двоеточия и прочие
+        символы синтаксиса FTS5 не мешают: «ABC-123» ищется как фраза ABC 123),
+        последнее слово - префиксом, чтобы искать по мере набора.
+        """
+        terms = ['"' + term.replace('"', '""') + '"' for term in text.split()]
+        if terms:
+            terms[-1] += "*"
+        return " ".join(terms)
 
-            result["top_productive"] = [
-                {"name": row["application_name"], "duration": row["total_duration"]}
-                for row in cursor.fetchall()
-            ]
+    @timed("db.search_titles")
+    def search_titles(self, query: str, start_date: Optional[date] = None,
+                      end_date: Optional[date] = None, limit: int = 50,
+                      cancel: Optional[threading.Event] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Найти заголовки окон и суммарное время по каждому.
 
-            # Топ отвлекающих приложений
-            cursor.execute("""
-                SELECT application_name, SUM(duration) as total_duration
-                FROM activities
-                WHERE date(start_time) = ? AND activity_type = 'distracting'
-                GROUP BY application_name
-                ORDER BY total_duration DESC
-                LIMIT 5
-            """, (date_str,))
+        Args:
+            query: Слова для поиска (все должны встретиться в заголовке)
+            start_date: Первый день периода (None - с начала истории)
+            end_date: Последний день периода включительно (None - по сегодня)
+            limit: Максимум заголовков в ответе
+            cancel: Событие отмены; запрос прерывается, как только оно установлено
 
-            result["top_distracting"] = [
-                {"name": row["application_name"], "duration": row["total_duration"]}
-                for row in cursor.fetchall()
+        Returns:
+            Заголовки с приложением, временем и числом активностей по убыванию
+            времени; None, если поиск отменён
+        """
+        fts_query = self._fts_query(query)
+        if not fts_query:
+            return []
+        if cancel is not None and cancel.is_set():
+            return None
+
+        start = start_date.isoformat() if start_date else ""
+        end = (end_date + timedelta(days=1)).isoformat() if end_date else "9999"
+
+        with self._get_connection() as conn:
+            if cancel is not None:
+                conn.set_progress_handler(cancel.is_set, 1000)
+
+            try:
+                rows = conn.execute("""
+                    SELECT
+                        a.window_title,
+                        a.application_name,
+                        SUM(a.duration) as total_duration,
+                        COUNT(*) as activities_count,
+                        MAX(a.start_time) as last_seen
+                    FROM activity_titles
+                    JOIN activities a ON a.rowid = activity_titles.rowid
+                    WHERE activity_titles MATCH ?
+                      AND a.start_time >= ? AND a.start_time < ?
+                    GROUP BY a.window_title, a.application_name
+                    ORDER BY total_duration DESC
+                    LIMIT ?
+                """, (fts_query, start, end, limit)).fetchall()
+            except sqlite3.OperationalError:
+                if cancel is not None and cancel.is_set():
+                    return None
+                raise
+
+            return [
+                {
+                    "title": row["window_title"],
+                    "name": row["application_name"],
+                    "duration": row["total_duration"],
+                    "count": row["activities_count"],
+                    "last_seen": datetime.fromisoformat(row["last_seen"])
+                }
+                for row in rows
             ]
 
-            return result
+    # === Запросы по интервалам времени ===
 
-    def get_app_with_type(self, target_date: date) -> List[Dict[str, Any]]:
-        """Получить список приложений с их типами за день."""
+    @staticmethod
+    def _interval_window(start: datetime, end: datetime) -> Tuple[int, int]:
+        """Окно [start, end] в координатах индекса интервалов (с запасом до секунд)."""
+        return (
+            math.floor((start - _INTERVAL_EPOCH).total_seconds()),
+            math.ceil((end - _INTERVAL_EPOCH).total_seconds())
+        )
+
+    def _select_intervals(self, table: str, start: datetime, end: datetime,
+                          point: bool = False) -> List[sqlite3.Row]:
+        """
+        Строки table, пересекающие [start, end) (при point - содержащие момент start).
+
+        R*Tree отбирает кандидатов по целым секундам, точная проверка -
+        сравнением ISO-строк самих строк. Открытые интервалы (end_time NULL)
+        считаются продолжающимися.
+        """
+        window_start, window_end = self._interval_window(start, end)
+        start_op = "<=" if point else "<"
+        with self._get_connection() as conn:
+            return conn.execute(f"""
+                SELECT t.* FROM {_INTERVAL_TABLES[table]} i
+                JOIN {table} t ON t.rowid = i.id
+                WHERE i.start_ts <= ? AND i.end_ts >= ?
+                  AND t.start_time {start_op} ?
+                  AND (t.end_time IS NULL OR t.end_time > ?)
+                ORDER BY t.start_time
+            """, (window_end, window_start, end.isoformat(), start.isoformat())).fetchall()
+
+    @timed("db.get_activities_at")
+    def get_activities_at(self, moment: datetime) -> List[Activity]:
+        """Активности, шедшие в момент moment (start_time <= moment < end_time)."""
+        return [self._row_to_activity(row)
+                for row in self._select_intervals("activities", moment, moment, point=True)]
+
+    @timed("db.get_overlapping_activities")
+    def get_overlapping_activities(self, start: datetime, end: datetime) -> List[Activity]:
+        """Активности, пересекающие отрезок [start, end), по времени начала."""
+        if not start < end:
+            return []
+        return [self._row_to_activity(row)
+                for row in self._select_intervals("activities", start, end)]
+
+    @timed("db.iter_activities")
+    def iter_activities(self, start: datetime, end: datetime) -> Iterator[Activity]:
+        """
+        Активности, пересекающие [start, end), по времени начала - по одной.
+
+        Для проходов по длинной истории: строки читаются курсором, а не
+        списком, так что память не зависит от длины периода. Запрос
+        выполняется сразу (в замер попадает он), соединение закрывается,
+        когда итератор исчерпан.
+        """
+        if not start < end:
+            return iter(())
+        window_start, window_end = self._interval_window(start, end)
+
+        def rows():
+            with self._get_connection() as conn:
+                cursor = conn.execute("""
+                    SELECT t.* FROM activity_intervals i
+                    JOIN activities t ON t.rowid = i.id
+                    WHERE i.start_ts <= ? AND i.end_ts >= ?
+                      AND t.start_time < ?
+                      AND (t.end_time IS NULL OR t.end_time > ?)
+                    ORDER BY t.start_time
+                """, (window_end, window_start, end.isoformat(), start.isoformat()))
+                yield None  # запрос выполнен
+                for row in cursor:
+                    yield self._row_to_activity(row)
+
+        iterator = rows()
+        next(iterator)
+        return iterator
+
+    @timed("db.get_overlapping_sessions")
+    def get_overlapping_sessions(self, start: datetime, end: datetime) -> List[Session]:
+        """Сессии, пересекающие отрезок [start, end), по времени начала."""
+        if not start < end:
+            return []
+        return [self._row_to_session(row)
+                for row in self._select_intervals("sessions", start, end)]
+
+    @timed("db.get_activity_index")
+    def get_activity_index(self, start: datetime, end: datetime) -> IntervalTree:
+        """
+        Дерево интервалов активностей, пересекающих [start, end).
+
+        Загружается один раз на диапазон (день, видимая часть ленты), дальше
+        точечные запросы и запросы пересечений идут в памяти. Ключи - datetime,
+        у незавершённых активностей конец - datetime.max.
+        """
+        return IntervalTree(
+            (activity.start_time, activity.end_time or datetime.max, activity)
+            for activity in self.get_overlapping_activities(start, end)
+        )
+
+    @timed("db.get_activity_gaps")
+    def get_activity_gaps(self, start: datetime, end: datetime,
+                          min_seconds: int = 0) -> List[Tuple[datetime, datetime]]:
+        """
+        Промежутки внутри [start, end), не покрытые ни одной активностью.
+
+        Args:
+            start: Начало диапазона
+            end: Конец диапазона
+            min_seconds: Отбросить промежутки короче
+
+        Returns:
+            Пары (начало, конец) по возрастанию
+        """
+        return self.get_activity_index(start, end).gaps(
+            start, end, timedelta(seconds=min_seconds)
+        )
+
+    # === Методы для интенсивности ввода ===
+
+    @timed("db.save_input_minutes")
+    def save_input_minutes(self, minutes: List[InputMinute]) -> None:
+        """
+        Добавить поминутные счётчики ввода.
+
+        Минута могла быть уже частично записана (неполная минута при
+        прошлой выгрузке) - счётчики складываются.
+        """
+        if not minutes:
+            return
         with self._get_connection() as conn:
             cursor = conn.cursor()
-            date_str = target_date.isoformat()
+            cursor.executemany("""
+                INSERT INTO input_intensity
+                (minute, application_name, keys, clicks, scrolls, motion)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (minute, application_name) DO UPDATE SET
+                    keys = keys + excluded.keys,
+                    clicks = clicks + excluded.clicks,
+                    scrolls = scrolls + excluded.scrolls,
+                    motion = motion + excluded.motion
+            """, [
+                (m.minute.isoformat(), m.application_name, m.keys, m.clicks, m.scrolls, m.motion)
+                for m in minutes
+            ])
+        self._publish("input_intensity", {m.minute.date() for m in minutes},
+                      {m.application_name for m in minutes})
 
+    @timed("db.get_input_intensity")
+    def get_input_intensity(self, target_date: date) -> List[Dict[str, Any]]:
+        """
+        Интенсивность ввода по приложениям за день.
+
+        Returns:
+            Для каждого приложения: минуты с вводом, суммы счётчиков
+            и среднее число нажатий (клавиши + кнопки) в активную минуту
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            start = datetime.combine(target_date, datetime.min.time())
+
+            # Ключ - минута в ISO-формате, поэтому день выбирается диапазоном по индексу
             cursor.execute("""
-                SELECT 
+                SELECT
                     application_name,
-                    activity_type,
-                    SUM(duration) as total_duration
-                FROM activities
-                WHERE date(start_time) = ?
-                GROUP BY application_name, activity_type
-                ORDER BY total_duration DESC
-            """, (date_str,))
+                    COUNT(*) as active_minutes,
+                    SUM(keys) as keys,
+                    SUM(clicks) as clicks,
+                    SUM(scrolls) as scrolls,
+                    SUM(motion) as motion
+                FROM input_intensity
+                WHERE minute >= ? AND minute < ?
+                GROUP BY application_name
+                ORDER BY SUM(keys) + SUM(clicks) DESC
+            """, (start.isoformat(), (start + timedelta(days=1)).isoformat()))
 
             return [
                 {
                     "name": row["application_name"],
-                    "type": row["activity_type"],
-                    "duration": row["total_duration"]
+                    "active_minutes": row["active_minutes"],
+                    "keys": row["keys"],
+                    "clicks": row["clicks"],
+                    "scrolls": row["scrolls"],
+                    "motion": row["motion"],
+                    "per_minute": round((row["keys"] + row["clicks"]) / row["active_minutes"], 1)
                 }
                 for row in cursor.fetchall()
             ]
@@ -322,6 +1065,7 @@ class DatabaseManager:
 
     # === Методы для статистики ===
 
+    @timed("db.get_daily_stats")
     def get_daily_stats(self, target_date: date) -> Dict[str, Any]:
         """Получить статистику за день."""
         with self._get_connection() as conn:
@@ -347,6 +1091,7 @@ class DatabaseManager:
                 "breaks_count": row["breaks_count"]
             }
 
+    @timed("db.get_weekly_stats")
     def get_weekly_stats(self, start_date: date, end_date: date) -> List[Dict[str, Any]]:
         """Получить статистику за период."""
         with self._get_connection() as conn:
@@ -364,3 +1109,190 @@ class DatabaseManager:
             """, (start_date.isoformat(), end_date.isoformat()))
 
             return [dict(row) for row in cursor.fetchall()]
+
+    @timed("db.get_daily_totals")
+    def get_daily_totals(self, start_date: date, end_date: date) -> Dict[date, int]:
+        """
+        Суммарное время сессий по дням периода одним запросом.
+
+        Период выбирается диапазоном по индексу start_time (а не date(...)),
+        так что год истории читается за миллисекунды.
+
+        Returns:
+            Секунды по дням; дни без сессий отсутствуют
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT substr(start_time, 1, 10) as day, SUM(total_duration) as total_time
+                FROM sessions
+                WHERE start_time >= ? AND start_time < ?
+                GROUP BY day
+            """, (start_date.isoformat(), (end_date + timedelta(days=1)).isoformat()))
+
+            return {date.fromisoformat(row["day"]): row["total_time"] for row in cursor.fetchall()}
+
+    @timed("db.get_range_stats")
+    def get_range_stats(self, start_date: date, end_date: date) -> Dict[str, Any]:
+        """
+        Итоги за произвольный период по нарастающим суммам.
+
+        Время работы не зависит от длины периода: читаются две строки
+        cumulative_totals - последняя не позже end_date и последняя до start_date.
+
+        Returns:
+            total_time, sessions_count, breaks_count и время по типам
+            активности в "productivity"
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            query = "SELECT * FROM cumulative_totals WHERE day {} ? ORDER BY day DESC LIMIT 1"
+            end_row = cursor.execute(query.format("<="), (end_date.isoformat(),)).fetchone()
+            before_row = cursor.execute(query.format("<"), (start_date.isoformat(),)).fetchone()
+
+            totals = {
+                column: (end_row[column] if end_row else 0) - (before_row[column] if before_row else 0)
+                for column in _CUMULATIVE_COLUMNS
+            }
+            return {
+                "start_date": start_date,
+                "end_date": end_date,
+                "total_time": totals["total_time"],
+                "sessions_count": totals["sessions_count"],
+                "breaks_count": totals["breaks_count"],
+                "productivity": {t.value: totals[t.value] for t in ActivityType}
+            }
+
+    @timed("db.get_sessions_in_range")
+    def get_sessions_in_range(self, start_date: date, end_date: date,
+                              limit: Optional[int] = None) -> List[Session]:
+        """
+        Сессии, начатые в период, от последней к первой.
+
+        Args:
+            start_date: Первый день
+            end_date: Последний день включительно
+            limit: Не больше стольких последних сессий (None - все)
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT * FROM sessions
+                WHERE start_time >= ? AND start_time < ?
+                ORDER BY start_time DESC
+                LIMIT ?
+            """, (start_date.isoformat(), (end_date + timedelta(days=1)).isoformat(),
+                  -1 if limit is None else limit))
+
+            return [self._row_to_session(row) for row in cursor.fetchall()]
+
+    @timed("db.get_duration_histogram")
+    def get_duration_histogram(self, metric: str, start_date: date, end_date: date) -> LogHistogram:
+        """
+        Гистограмма длительностей за период.
+
+        Args:
+            metric: "session", "activity" или метрика из set_day_durations
+            start_date: Первый день
+            end_date: Последний день включительно
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT bucket, SUM(count) AS count FROM duration_histogram
+                WHERE metric = ? AND day >= ? AND day <= ?
+                GROUP BY bucket
+            """, (metric, start_date.isoformat(), end_date.isoformat()))
+
+            return LogHistogram({row["bucket"]: row["count"] for row in cursor.fetchall()})
+
+    @timed("db.set_day_durations")
+    def set_day_durations(self, metric: str, day: date, durations: List[int]) -> None:
+        """
+        Заменить гистограмму метрики за день.
+
+        Для метрик, которые считаются вне базы (например, серии фокуса);
+        гистограммы сессий и активностей ведут триггеры.
+        """
+        if metric in {source for source, _ in _DURATION_SOURCES.values()}:
+            raise ValueError(f"Гистограмму {metric} ведут триггеры")
+        with self._get_connection() as conn:
+            self._replace_day_histogram(conn, metric, day, durations)
+        self._publish("duration_histogram", [day])
+
+    @staticmethod
+    def _replace_day_histogram(conn: sqlite3.Connection, metric: str, day: date,
+                               durations: List[int]) -> None:
+        """Записать гистограмму метрики за день вместо прежней."""
+        histogram = LogHistogram.of(durations)
+        conn.execute("DELETE FROM duration_histogram WHERE metric = ? AND day = ?",
+                     (metric, day.isoformat()))
+        conn.executemany(
+            "INSERT INTO duration_histogram (metric, day, bucket, count) VALUES (?, ?, ?, ?)",
+            [(metric, day.isoformat(), bucket, count) for bucket, count in histogram.counts.items()]
+        )
+
+    # === Показатели фокуса ===
+
+    _FOCUS_COLUMNS = ["focus_seconds", "deep_work_seconds", "longest_streak", "streaks",
+                      "interruptions", "switches", "tracked_seconds"]
+
+    @timed("db.save_focus_days")
+    def save_focus_days(self, days: List[FocusDay], computed_on: Optional[date] = None) -> None:
+        """
+        Сохранить показатели фокуса по дням и гистограммы серий (метрика "focus") одной транзакцией.
+
+        Args:
+            days: Показатели по дням
+            computed_on: День расчёта (по умолчанию - сегодня); дни не раньше
+                         него считаются незаконченными и будут пересчитаны
+        """
+        columns = ", ".join(self._FOCUS_COLUMNS)
+        placeholders = ", ".join("?" for _ in self._FOCUS_COLUMNS)
+        computed = (computed_on or date.today()).isoformat()
+        with self._get_connection() as conn:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO focus_days (day, {columns}, computed_on) "
+                f"VALUES (?, {placeholders}, ?)",
+                [(focus.day.isoformat(), *(getattr(focus, column) for column in self._FOCUS_COLUMNS),
+                  computed)
+                 for focus in days]
+            )
+            for focus in days:
+                self._replace_day_histogram(conn, "focus", focus.day, focus.streak_durations)
+        if days:
+            self._publish("focus_days", {focus.day for focus in days})
+
+    @timed("db.get_focus_days")
+    def get_focus_days(self, start_date: date, end_date: date) -> List[FocusDay]:
+        """Сохранённые показатели фокуса за период, по дням."""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT * FROM focus_days WHERE day >= ? AND day <= ? ORDER BY day
+            """, (start_date.isoformat(), end_date.isoformat()))
+
+            return [
+                FocusDay(day=date.fromisoformat(row["day"]),
+                         **{column: row[column] for column in self._FOCUS_COLUMNS})
+                for row in cursor.fetchall()
+            ]
+
+    @timed("db.get_days_without_focus")
+    def get_days_without_focus(self, through: date) -> List[date]:
+        """
+        Дни с сессиями или активностями по through включительно без окончательных показателей.
+
+        Окончательна строка focus_days, посчитанная после окончания дня;
+        посчитанные в тот же день (пока день шёл) возвращаются снова.
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT t.day FROM cumulative_totals t
+                LEFT JOIN focus_days f ON f.day = t.day
+                WHERE t.day <= ? AND (f.computed_on IS NULL OR f.computed_on <= t.day)
+                ORDER BY t.day
+            """, (through.isoformat(),))
+
+            return [date.fromisoformat(row["day"]) for row in cursor.fetchall()]
@@ -0,0 +1,261 @@
+"""Журнал состояния сессии: дешёвые контрольные точки между записями в БД.
+
+Каждое событие (старт, пауза, продолжение, стоп, пульс, начало и конец
+активности) дописывается одной JSON-строкой в конец файла. Строка сразу
+уходит в ОС, поэтому падение процесса ничего не теряет; fsync выполняется
+пачками (не чаще раза в fsync_interval секунд) и сразу - для событий,
+меняющих состояние сессии. При запуске журнал проигрывается: длительности
+восстанавливаются по последнему пульсу, висящие активности закрываются,
+после чего состояние переносится в таблицы sessions/activities
+и журнал обнуляется. Та же компакция выполняется периодически во время работы.
+"""
+
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from models.session import Session
+from models.activity import Activity
+from utils.clock import SYSTEM_CLOCK, Clock
+from utils.metrics import timed
+
+
+# События, после которых журнал сразу сбрасывается на диск
+DURABLE_EVENTS = {"start", "pause", "resume", "stop", "snapshot"}
+
+
+class JournalState:
+    """Состояние, восстановленное проигрыванием журнала."""
+
+    def __init__(self):
+        self.sessions: Dict[str, dict] = {}
+        self.activities: Dict[str, dict] = {}
+        self.last_seen: Dict[str, str] = {}  # session_id -> время последнего события
+
+    def apply(self, record: dict) -> None:
+        """Применить одно событие журнала."""
+        event = record.get("e")
+        at = record.get("at")
+
+        if event in DURABLE_EVENTS:
+            session = record["session"]
+            self.sessions[session["id"]] = session
+            self.last_seen[session["id"]] = at
+        elif event == "heartbeat":
+            session = self.sessions.get(record["id"])
+            if session is not None:
+                session["total_duration"] = record["total"]
+                session["active_duration"] = record["active"]
+                self.last_seen[record["id"]] = at
+        elif event in ("activity_start", "activity_end"):
+            activity = record["activity"]
+            self.activities[activity["id"]] = activity
+            session_id = activity["session_id"]
+            if session_id in self.sessions:
+                self.last_seen[session_id] = max(self.last_seen.get(session_id) or at, at)
+
+    def close_dangling(self) -> int:
+        """Закрыть незавершённые активности по последнему пульсу их сессии."""
+        closed = 0
+        for activity in self.activities.values():
+            if activity["end_time"] is not None:
+                continue
+            last_seen = self.last_seen.get(activity["session_id"]) or activity["start_time"]
+            end_time = max(last_seen, activity["start_time"])
+            activity["end_time"] = end_time
+            activity["duration"] = max(0, int((
+                datetime.fromisoformat(end_time) - datetime.fromisoformat(activity["start_time"])
+            ).total_seconds()))
+            closed += 1
+        return closed
+
+
+class SessionJournal:
+    """Журнал событий сессии с пакетным fsync."""
+
+    def __init__(self, path: Path, fsync_interval: float = 5.0, clock: Optional[Clock] = None):
+        self._logger = logging.getLogger(__name__)
+        self._path = Path(path)
+        self._fsync_interval = fsync_interval
+        self._clock = time.monotonic  # интервал fsync - по настоящему времени
+        # Метки событий - по тем же часам, что и начало сессий и активностей:
+        # по ним закрываются висящие активности при восстановлении
+        self._now = (clock or SYSTEM_CLOCK).now
+
+        self._state = JournalState()
+        self._file = None
+        self._last_fsync: float = 0.0
+        self._pending: bool = False  # есть записи без fsync
+
+    @property
+    def path(self) -> Path:
+        """Путь к файлу журнала."""
+        return self._path
+
+    # === Запись событий ===
+
+    def session_event(self, event: str, session: Session) -> None:
+        """Записать смену состояния сессии (start/pause/resume/stop/snapshot)."""
+        self._append({"e": event, "session": session.to_dict()})
+
+    def heartbeat(self, session: Session) -> None:
+        """Записать пульс с текущими длительностями."""
+        self._append({
+            "e": "heartbeat",
+            "id": session.id,
+            "total": session.total_duration,
+            "active": session.active_duration,
+        })
+
+    def activity_started(self, activity: Activity) -> None:
+        """Записать начало активности."""
+        self._append({"e": "activity_start", "activity": activity.to_dict()})
+
+    def activity_finished(self, activity: Activity) -> None:
+        """Записать окончание активности."""
+        self._append({"e": "activity_end", "activity": activity.to_dict()})
+
+    @timed("journal.append")
+    def _append(self, record: dict) -> None:
+        """Дописать событие и при необходимости сбросить на диск."""
+        record["at"] = self._now().isoformat()
+        self._state.apply(record)
+
+        try:
+            if self._file is None:
+                self._path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self._path, "a", encoding="utf-8")
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._file.flush()
+            self._pending = True
+
+            now = self._clock()
+            if record["e"] in DURABLE_EVENTS or now - self._last_fsync >= self._fsync_interval:
+                os.fsync(self._file.fileno())
+                self._last_fsync = now
+                self._pending = False
+        except OSError as e:
+            self._logger.error(f"Ошибка записи журнала: {e}")
+
+    def sync(self) -> None:
+        """Сбросить на диск всё, что ещё не прошло fsync."""
+        if self._file is not None and self._pending:
+            try:
+                os.fsync(self._file.fileno())
+            except OSError as e:
+                self._logger.error(f"Ошибка записи журнала: {e}")
+            self._last_fsync = self._clock()
+            self._pending = False
+
+    def close(self) -> None:
+        """Закрыть файл журнала."""
+        self.sync()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    # === Чтение и компакция ===
+
+    def replay(self) -> JournalState:
+        """Проиграть файл журнала (обрезанная последняя строка пропускается)."""
+        state = JournalState()
+        if not self._path.exists():
+            return state
+
+        with open(self._path, "r", encoding="utf-8", errors="replace") as f:
+            for number, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    state.apply(json.loads(line))
+                except (ValueError, KeyError, TypeError) as e:
+                    self._logger.warning(f"Пропущена повреждённая запись журнала (строка {number}): {e}")
+        return state
+
+    @timed("journal.recover")
+    def recover(self, db) -> int:
+        """
+        Восстановление после запуска: перенести журнал в БД.
+
+        Длительности сессий берутся из последнего пульса, висящие
+        активности закрываются временем последнего события их сессии,
+        остальные активности без end_time закрываются средствами БД.
+
+        Args:
+            db: DatabaseManager
+
+        Returns:
+            Количество закрытых активностей
+        """
+        state = self.replay()
+        closed = state.close_dangling()
+
+        if state.sessions or state.activities:
+            db.apply_checkpoint(
+                [Session.from_dict(s) for s in state.sessions.values()],
+                [Activity.from_dict(a) for a in state.activities.values()]
+            )
+            self._logger.info(
+                f"Журнал восстановлен: сессий {len(state.sessions)}, "
+                f"закрыто активностей {closed}"
+            )
+
+        closed += db.close_dangling_activities()
+        self._rewrite([])
+        self._state = JournalState()
+        return closed
+
+    @timed("journal.compact")
+    def compact(self, db) -> None:
+        """
+        Перенести накопленное состояние в БД и сократить журнал.
+
+        В журнале остаются только снимки незавершённых сессий и активностей.
+        """
+        state = self._state
+        sessions = [Session.from_dict(s) for s in state.sessions.values()]
+        activities = [Activity.from_dict(a) for a in state.activities.values()]
+        db.apply_checkpoint(sessions, activities)
+
+        open_sessions = [s for s in sessions if s.end_time is None]
+        open_activities = [a for a in activities if a.end_time is None]
+
+        self._state = JournalState()
+        records = []
+        for session in open_sessions:
+            records.append({"e": "snapshot", "session": session.to_dict()})
+        for activity in open_activities:
+            records.append({"e": "activity_start", "activity": activity.to_dict()})
+
+        now = self._now().isoformat()
+        for record in records:
+            record["at"] = now
+            self._state.apply(record)
+
+        self._rewrite(records)
+
+    def _rewrite(self, records: List[dict]) -> None:
+        """Атомарно заменить файл журнала заданными записями."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+        tmp_path = self._path.with_name(self._path.name + ".tmp")
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for record in records:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self._path)
+        except OSError as e:
+            self._logger.error(f"Ошибка компакции журнала: {e}")
+
+        self._last_fsync = self._clock()
+        self._pending = False
@@ -1,25 +1,37 @@
 """Главное окно приложения."""
 
 import logging
+from typing import Optional
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout,
     QTabWidget, QSystemTrayIcon, QMenu, QMessageBox,
     QApplication
 )
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QIcon, QAction, QCloseEvent, QPixmap, QPainter, QColor, QFont
+from PyQt6.QtCore import Qt, QEvent
+from PyQt6.QtGui import (
+    QIcon, QAction, QCloseEvent, QPixmap, QPainter, QColor, QFont,
+    QShortcut, QKeySequence
+)
 
 from database.db_manager import DatabaseManager
+from database.journal import SessionJournal
 from utils.config import Config
 from core.tracker import TimeTracker
 from core.activity_monitor import ActivityMonitor
+from core.activity_sources import ActivitySource
 from core.break_manager import BreakManager
+from core.clock_service import ClockService
+from core.change_watcher import ChangeWatcher
+from core.focus_analyzer import FocusHistory
+from utils import metrics, tracing
+from utils.metrics import timed
 
 from .styles import MAIN_STYLESHEET
 from .widgets.timer_widget import TimerWidget
 from .widgets.stats_widget import StatsWidget
 from .widgets.activity_widget import ActivityWidget
 from .widgets.settings_widget import SettingsWidget
+from .widgets.diagnostics_widget import DiagnosticsWidget
 
 
 def create_tray_icon() -> QIcon:
@@ -49,22 +61,42 @@ def create_tray_icon() -> QIcon:
 class MainWindow(QMainWindow):
     """Главное окно приложения."""
 
-    def __init__(self, db_manager: DatabaseManager, config: Config):
+    def __init__(self, db_manager: DatabaseManager, config: Config,
+                 show_diagnostics: bool = False,
+                 activity_source: Optional[ActivitySource] = None):
         super().__init__()
         self._logger = logging.getLogger(__name__)
 
         self._db = db_manager
         self._config = config
 
-        # Инициализация компонентов ядра
-        self._tracker = TimeTracker(db_manager)
-        self._activity_monitor = ActivityMonitor(db_manager, config)
-        self._break_manager = BreakManager(config)
+        # Инициализация компонентов ядра (все таймеры - через один сервис,
+        # промежуточное состояние - в журнал рядом с БД)
+        self._clock_service = ClockService(self)
+        self._journal = SessionJournal(db_manager.db_path.with_suffix(".journal"))
+        self._tracker = TimeTracker(db_manager, self._clock_service, self._journal)
+        self._activity_monitor = ActivityMonitor(
+            db_manager, config, self._clock_service, self._journal,
+            source=activity_source
+        )
+        self._break_manager = BreakManager(config, self._clock_service)
+        # Серии фокуса по истории - в фоне, по дням, которых ещё нет в БД
+        self._focus_history = FocusHistory(db_manager, parent=self)
+        # Уведомления о записях в БД (своих и других процессов)
+        self._change_watcher = ChangeWatcher(db_manager, self._clock_service, self)
+
+        self._diagnostics_widget = None
 
         self._setup_ui()
         self._setup_tray()
         self._connect_signals()
 
+        if show_diagnostics:
+            self._toggle_diagnostics()
+
+        self._change_watcher.start()
+        self._focus_history.update()
+
         # Автозапуск только если включено в настройках
         if config.settings.auto_start_tracking:
             self._tracker.start()
@@ -103,6 +135,23 @@ class MainWindow(QMainWindow):
 
         main_layout.addWidget(self._tab_widget, 1)
 
+        # Скрытая вкладка диагностики
+        diagnostics_shortcut = QShortcut(QKeySequence("Ctrl+Shift+D"), self)
+        diagnostics_shortcut.activated.connect(self._toggle_diagnostics)
+
+    def _toggle_diagnostics(self) -> None:
+        """Показать или скрыть вкладку диагностики."""
+        if self._diagnostics_widget is None:
+            metrics.enable()
+            self._diagnostics_widget = DiagnosticsWidget(self._clock_service)
+            index = self._tab_widget.addTab(self._diagnostics_widget, "Диагностика")
+            self._tab_widget.setCurrentIndex(index)
+        else:
+            index = self._tab_widget.indexOf(self._diagnostics_widget)
+            self._tab_widget.removeTab(index)
+            self._diagnostics_widget.deleteLater()
+            self._diagnostics_widget = None
+
     def _setup_tray(self) -> None:
         """Настройка иконки в системном трее."""
         self._tray_icon = QSystemTrayIcon(self)
@@ -131,14 +180,55 @@ class MainWindow(QMainWindow):
 
         tray_menu.addSeparator()
 
+        if tracing.is_enabled():
+            tray_menu.addMenu(self._create_profiling_menu(tray_menu))
+            tray_menu.addSeparator()
+
         quit_action = QAction("Выход", self)
         quit_action.triggered.connect(self._quit_app)
         tray_menu.addAction(quit_action)
 
+        # Подсказка считается только когда её собираются показать
+        tray_menu.aboutToShow.connect(self._update_tray_tooltip)
+        self._tray_icon.installEventFilter(self)
+
         self._tray_icon.setContextMenu(tray_menu)
         self._tray_icon.activated.connect(self._on_tray_activated)
         self._tray_icon.show()
 
+    def _create_profiling_menu(self, parent: QMenu) -> QMenu:
+        """Меню профилирования (только в режиме трассировки)."""
+        self._profiling = tracing.ProfilingHooks()
+
+        menu = QMenu("Профилирование", parent)
+
+        trace_action = QAction("Сохранить трассировку", self)
+        trace_action.triggered.connect(self._profiling.dump_trace)
+        menu.addAction(trace_action)
+
+        self._profile_action = QAction("Начать cProfile", self)
+        self._profile_action.triggered.connect(self._toggle_profiling)
+        menu.addAction(self._profile_action)
+
+        memory_action = QAction("Снимок памяти (tracemalloc)", self)
+        memory_action.triggered.connect(self._profiling.memory_snapshot)
+        menu.addAction(memory_action)
+
+        return menu
+
+    def _toggle_profiling(self) -> None:
+        """Запустить или остановить cProfile."""
+        if self._profiling.is_profiling:
+            path = self._profiling.stop_profile()
+            self._profile_action.setText("Начать cProfile")
+            self._tray_icon.showMessage(
+                "Профилирование", f"Профиль сохранён:\n{path}",
+                QSystemTrayIcon.MessageIcon.Information, 3000
+            )
+        else:
+            self._profiling.start_profile()
+            self._profile_action.setText("Остановить cProfile")
+
     def _show_window(self) -> None:
         """Показать окно."""
         self.show()
@@ -151,15 +241,35 @@ class MainWindow(QMainWindow):
         self._tracker.session_started.connect(self._on_session_started)
         self._tracker.session_stopped.connect(self._on_session_stopped)
         self._tracker.session_paused.connect(self._on_session_paused)
+        self._tracker.session_resumed.connect(self._on_session_resumed)
         self._tracker.state_changed.connect(self._update_tray_tooltip)
 
         self._break_manager.break_reminder.connect(self._show_break_reminder)
+        self._settings_widget.settings_saved.connect(self._break_manager.reschedule)
 
         # Сигналы мониторинга простоя
         self._activity_monitor.idle_detected.connect(self._on_idle_detected)
         self._activity_monitor.user_returned.connect(self._on_user_returned)
 
-        self._tab_widget.currentChanged.connect(self._on_tab_changed)
+        # Вкладки узнают о записях в БД через шину изменений (статистика
+        # перечитывает при показе только изменившиеся дни); вкладка
+        # продуктивности во время сессии ведёт итоги дня в памяти
+        self._tracker.time_updated.connect(self._activity_widget.tick)
+        self._activity_monitor.activity_changed.connect(self._on_activity_changed)
+        self._change_watcher.changed.connect(self._stats_widget.on_data_changed)
+        self._change_watcher.changed.connect(self._activity_widget.on_data_changed)
+
+    def eventFilter(self, obj, event) -> bool:
+        """Наведение на иконку трея - обновить подсказку перед показом."""
+        if obj is self._tray_icon and event.type() == QEvent.Type.ToolTip:
+            self._update_tray_tooltip()
+        return super().eventFilter(obj, event)
+
+    def _on_activity_changed(self, *args) -> None:
+        """Новая активность - живые итоги и показатели фокуса на вкладке продуктивности."""
+        activity = self._activity_monitor.current_activity
+        if activity is not None:
+            self._activity_widget.activity_started(activity)
 
     def _update_tray_tooltip(self) -> None:
         """Обновить tooltip иконки в трее."""
@@ -174,28 +284,36 @@ class MainWindow(QMainWindow):
         time_str = format_time(self._tracker.elapsed_seconds)
         self._tray_icon.setToolTip(f"Work Chronometer - {status}\n{time_str}")
 
+    @timed("signal.session_started")
     def _on_session_started(self, session) -> None:
         """Обработка начала сессии."""
         self._activity_monitor.start_monitoring(session.id)
         self._break_manager.start()
         self._update_title()
-        self._update_tray_tooltip()
 
+    @timed("signal.session_paused")
     def _on_session_paused(self) -> None:
         """Сессия на паузе."""
         self._break_manager.pause()
         self._update_title()
-        self._update_tray_tooltip()
 
+    @timed("signal.session_resumed")
+    def _on_session_resumed(self) -> None:
+        """Сессия возобновлена."""
+        self._break_manager.resume()
+        self._update_title()
+
+    @timed("signal.session_stopped")
     def _on_session_stopped(self, session) -> None:
         """Обработка окончания сессии."""
         self._activity_monitor.stop_monitoring()
         self._break_manager.stop()
+        self._focus_history.update()
         self._stats_widget.refresh()
         self._activity_widget.refresh()
         self._update_title()
-        self._update_tray_tooltip()
 
+    @timed("signal.idle_detected")
     def _on_idle_detected(self, idle_seconds: int) -> None:
         """Обнаружен простой - автопауза."""
         if self._tracker.is_running:
@@ -210,6 +328,7 @@ class MainWindow(QMainWindow):
                     3000
                 )
 
+    @timed("signal.user_returned")
     def _on_user_returned(self) -> None:
         """Пользователь вернулся после простоя."""
         if self._tracker.is_paused:
@@ -222,13 +341,7 @@ class MainWindow(QMainWindow):
                     3000
                 )
 
-    def _on_tab_changed(self, index: int) -> None:
-        """Обработка смены вкладки."""
-        if index == 0:
-            self._stats_widget.refresh()
-        elif index == 1:
-            self._activity_widget.refresh()
-
+    @timed("signal.break_reminder")
     def _show_break_reminder(self, break_type: str, duration: int) -> None:
         """Показать напоминание о перерыве."""
         if not self._config.settings.notifications_enabled:
@@ -279,9 +392,29 @@ class MainWindow(QMainWindow):
             elif reply == QMessageBox.StandardButton.Cancel:
                 return
 
+        self._tracker.flush()
+        self._journal.close()
+        self._activity_monitor.shutdown()
+
         self._tray_icon.hide()
         QApplication.quit()
 
+    def showEvent(self, event) -> None:
+        """Окно показано - таймеры в обычном режиме."""
+        super().showEvent(event)
+        self._clock_service.set_ui_visible(not self.isMinimized())
+
+    def hideEvent(self, event) -> None:
+        """Окно скрыто (трей) - таймеры в фоновом режиме."""
+        super().hideEvent(event)
+        self._clock_service.set_ui_visible(False)
+
+    def changeEvent(self, event) -> None:
+        """Сворачивание окна тоже считается скрытием."""
+        super().changeEvent(event)
+        if event.type() == QEvent.Type.WindowStateChange:
+            self._clock_service.set_ui_visible(self.isVisible() and not self.isMinimized())
+
     def closeEvent(self, event: QCloseEvent) -> None:
         """Обработка закрытия окна."""
         if self._config.settings.minimize_to_tray:
@@ -4,5 +4,8 @@ from .timer_widget import TimerWidget
 from .stats_widget import StatsWidget
 from .activity_widget import ActivityWidget
 from .settings_widget import SettingsWidget
+from .diagnostics_widget import DiagnosticsWidget
+from .timeline_widget import TimelineWidget
 
-__all__ = ["TimerWidget", "StatsWidget", "ActivityWidget", "SettingsWidget"]
+__all__ = ["TimerWidget", "StatsWidget", "ActivityWidget", "SettingsWidget", "DiagnosticsWidget",
+           "TimelineWidget"]
@@ -1,19 +1,29 @@
 """Виджет активности приложений с отображением продуктивности."""
 
-from datetime import date
+import logging
+import threading
+from datetime import date, datetime, time, timedelta
+from typing import Optional
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel,
-    QTableWidget, QTableWidgetItem, QHeaderView,
-    QProgressBar, QFrame, QSizePolicy, QComboBox,
-    QPushButton, QMenu
+    QTableWidget, QTableWidgetItem, QTableView, QHeaderView,
+    QFrame, QSizePolicy, QComboBox,
+    QPushButton, QMenu, QLineEdit
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QObject, QThreadPool, QTimer, pyqtSignal
 from PyQt6.QtGui import QAction
 
+from core.day_totals import DayTotals
+from core.focus_analyzer import FocusAnalyzer
+from database.changes import DataChange
 from database.db_manager import DatabaseManager
 from utils.config import Config
 from utils.helpers import format_duration
-from models.activity import ActivityType
+from utils.metrics import timed
+from models.activity import Activity, ActivityType
+from models.focus_day import FocusDay
+from .apps_model import NAME_ROLE, AppsFilterProxy, AppsTableModel, ShareDelegate
+from .timeline_widget import TimelineWidget
 
 
 class ProductivityCard(QFrame):
@@ -54,15 +64,111 @@ class ProductivityCard(QFrame):
             self._percent_label.setText("0%")
 
 
+class TitleSearch(QObject):
+    """
+    Поиск по заголовкам окон в пуле потоков.
+
+    Новый запрос отменяет выполняющийся (SQLite прерывается через
+    progress handler), а ответы устаревших запросов отбрасываются,
+    поэтому быстрый набор не копит очередь запросов к БД.
+    """
+
+    results_ready = pyqtSignal(str, object)  # запрос, список результатов
+    _finished = pyqtSignal(int, str, object)  # номер запроса, запрос, результаты
+
+    def __init__(self, db_manager: DatabaseManager, parent=None):
+        super().__init__(parent)
+        self._logger = logging.getLogger(__name__)
+        self._db = db_manager
+        self._generation: int = 0
+        self._cancel: Optional[threading.Event] = None
+        self._finished.connect(self._on_finished)
+
+    def submit(self, query: str, start_date: Optional[date], end_date: Optional[date]) -> None:
+        """Запустить поиск, отменив предыдущий."""
+        self.cancel()
+        self._generation += 1
+        generation = self._generation
+        cancel = self._cancel = threading.Event()
+
+        QThreadPool.globalInstance().start(
+            lambda: self._run(generation, cancel, query, start_date, end_date)
+        )
+
+    def cancel(self) -> None:
+        """Отменить выполняющийся поиск."""
+        if self._cancel is not None:
+            self._cancel.set()
+            self._cancel = None
+
+    def _run(self, generation: int, cancel: threading.Event, query: str,
+             start_date: Optional[date], end_date: Optional[date]) -> None:
+        """Выполнить запрос (в потоке пула)."""
+        try:
+            results = self._db.search_titles(query, start_date, end_date, cancel=cancel)
+        except Exception as e:
+            self._logger.warning(f"Ошибка поиска по заголовкам: {e}")
+            return
+
+        if results is None or cancel.is_set():
+            return
+        try:
+            self._finished.emit(generation, query, results)
+        except RuntimeError:
+            pass  # виджет уже удалён
+
+    def _on_finished(self, generation: int, query: str, results: list) -> None:
+        """Ответ пришёл в GUI-поток - отдаём, если он не устарел."""
+        if generation == self._generation:
+            self.results_ready.emit(query, results)
+
+
 class ActivityWidget(QWidget):
-    """Виджет отображения активности приложений."""
+    """
+    Виджет отображения активности приложений.
+
+    Пока виджет скрыт (неактивная вкладка или окно в трее), refresh()
+    только помечает данные устаревшими; загрузка выполняется один раз
+    при показе.
+    """
+
+    SEARCH_DEBOUNCE_MS = 300
+    FILTER_TYPES = [None, "productive", "distracting", "neutral"]  # по пунктам фильтра
+    SEARCH_RANGES = [("Сегодня", 0), ("7 дней", 6), ("30 дней", 29), ("Всё время", None)]
 
     def __init__(self, db_manager: DatabaseManager, config: Config = None, parent=None):
         super().__init__(parent)
         self._db = db_manager
         self._config = config
+        self._dirty: bool = True  # первая загрузка - при первом показе
+
+        # Серии фокуса за сегодня: анализатор дополняется с каждой новой
+        # активностью, без повторного чтения дня из БД
+        self._focus = FocusAnalyzer()
+        self._focus_day: Optional[date] = None
+        self._focus_open: Optional[Activity] = None
+
+        # Время по приложениям за сегодня: загружается из БД при _reload,
+        # дальше ведётся в памяти по activity_started и tick
+        self._totals = DayTotals()
+        self._live_stale: bool = False  # итоги менялись, пока вкладка скрыта
+        self._loaded_version: Optional[tuple] = None  # (день, версия активностей дня) при загрузке
+
+        # Таблица приложений: строки в модели, фильтр по типу, поиск по
+        # имени и сортировка - в прокси, без запросов к БД
+        self._apps_model = AppsTableModel(self)
+        self._apps_proxy = AppsFilterProxy(self)
+        self._apps_proxy.setSourceModel(self._apps_model)
+
+        # Поиск по заголовкам: запрос уходит после паузы в наборе
+        self._search = TitleSearch(db_manager, self)
+        self._search.results_ready.connect(self._show_search_results)
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(self.SEARCH_DEBOUNCE_MS)
+        self._search_timer.timeout.connect(self._run_search)
+
         self._setup_ui()
-        self.refresh()
 
     def _setup_ui(self) -> None:
         """Настройка интерфейса."""
@@ -79,6 +185,14 @@ class ActivityWidget(QWidget):
 
         header_layout.addStretch()
 
+        # Поиск по имени приложения (в памяти, без запроса к БД)
+        self._app_filter_edit = QLineEdit()
+        self._app_filter_edit.setPlaceholderText("Приложение...")
+        self._app_filter_edit.setClearButtonEnabled(True)
+        self._app_filter_edit.setMaximumWidth(180)
+        self._app_filter_edit.textChanged.connect(self._apps_proxy.set_name_filter)
+        header_layout.addWidget(self._app_filter_edit)
+
         # Фильтр по типу
         self._filter_combo = QComboBox()
         self._filter_combo.addItems(["Все", "Продуктивные", "Отвлекающие", "Нейтральные"])
@@ -103,14 +217,30 @@ class ActivityWidget(QWidget):
 
         layout.addLayout(cards_layout)
 
+        # Серии фокуса за сегодня
+        self._focus_label = QLabel()
+        self._focus_label.setStyleSheet("color: #6B7280; font-size: 12px;")
+        layout.addWidget(self._focus_label)
+
+        # Лента дня
+        timeline_label = QLabel("Лента дня")
+        timeline_label.setObjectName("sectionTitle")
+        layout.addWidget(timeline_label)
+
+        self._timeline = TimelineWidget(self._db)
+        layout.addWidget(self._timeline)
+
         # Таблица приложений
         table_label = QLabel("Приложения")
         table_label.setObjectName("sectionTitle")
         layout.addWidget(table_label)
 
-        self._apps_table = QTableWidget()
-        self._apps_table.setColumnCount(4)
-        self._apps_table.setHorizontalHeaderLabels(["Приложение", "Тип", "Время", "Доля"])
+        self._apps_table = QTableView()
+        self._apps_table.setModel(self._apps_proxy)
+        self._apps_table.setItemDelegateForColumn(AppsTableModel.SHARE, ShareDelegate(self._apps_table))
+        self._apps_table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
+        self._apps_table.setSortingEnabled(True)
+        self._apps_table.sortByColumn(AppsTableModel.TIME, Qt.SortOrder.DescendingOrder)
         self._apps_table.setAlternatingRowColors(False)
         self._apps_table.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self._apps_table.customContextMenuRequested.connect(self._show_context_menu)
@@ -124,7 +254,7 @@ class ActivityWidget(QWidget):
         header.resizeSection(2, 90)
         header.resizeSection(3, 130)
 
-        self._apps_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self._apps_table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
         self._apps_table.verticalHeader().setVisible(False)
 
         layout.addWidget(self._apps_table, 1)
@@ -134,135 +264,256 @@ class ActivityWidget(QWidget):
         hint_label.setStyleSheet("color: #6B7280; font-size: 11px; font-style: italic;")
         layout.addWidget(hint_label)
 
-    def refresh(self) -> None:
-        """Обновить данные."""
-        # Получаем статистику продуктивности
-        productivity = self._db.get_productivity_stats(date.today())
+        # Поиск по заголовкам окон
+        search_layout = QHBoxLayout()
+
+        self._search_edit = QLineEdit()
+        self._search_edit.setPlaceholderText("Поиск по заголовкам окон, например ABC-123")
+        self._search_edit.setClearButtonEnabled(True)
+        self._search_edit.textChanged.connect(self._on_search_text_changed)
+        search_layout.addWidget(self._search_edit, 1)
+
+        self._search_range = QComboBox()
+        self._search_range.addItems([name for name, _ in self.SEARCH_RANGES])
+        self._search_range.setCurrentIndex(len(self.SEARCH_RANGES) - 1)
+        self._search_range.currentIndexChanged.connect(self._on_search_text_changed)
+        search_layout.addWidget(self._search_range)
+
+        layout.addLayout(search_layout)
+
+        self._search_summary = QLabel()
+        self._search_summary.setStyleSheet("color: #6B7280; font-size: 11px;")
+        self._search_summary.hide()
+        layout.addWidget(self._search_summary)
+
+        self._search_table = QTableWidget()
+        self._search_table.setColumnCount(4)
+        self._search_table.setHorizontalHeaderLabels(["Заголовок", "Приложение", "Время", "Раз"])
+        self._search_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self._search_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self._search_table.verticalHeader().setVisible(False)
+        self._search_table.setMaximumHeight(200)
+
+        search_header = self._search_table.horizontalHeader()
+        search_header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        for column, width in ((1, 130), (2, 90), (3, 50)):
+            search_header.setSectionResizeMode(column, QHeaderView.ResizeMode.Fixed)
+            search_header.resizeSection(column, width)
+
+        self._search_table.hide()
+        layout.addWidget(self._search_table)
+
+    def mark_dirty(self) -> None:
+        """Пометить данные устаревшими (перезагрузятся при показе)."""
+        self._dirty = True
+
+    def on_data_changed(self, change: DataChange) -> None:
+        """
+        Данные в БД изменились.
 
-        productive_time = productivity["productive"]["duration"]
-        distracting_time = productivity["distracting"]["duration"]
-        neutral_time = productivity["neutral"]["duration"]
-        total_time = productive_time + distracting_time + neutral_time
+        Пока идёт сессия, свои записи активностей уже учтены в итогах в
+        памяти; перечитывать нужно только записи других процессов и
+        изменения за сегодня вне сессии.
+        """
+        today = date.today()
+        if not change.touches(("activities",), today, today):
+            return
+        if change.external or self._totals.open_activity is None:
+            self.refresh()
 
-        self._productive_card.set_values(productive_time, total_time)
-        self._distracting_card.set_values(distracting_time, total_time)
-        self._neutral_card.set_values(neutral_time, total_time)
+    def refresh(self) -> None:
+        """Обновить данные (если виджет скрыт - отложить до показа)."""
+        if not self.isVisible():
+            self._dirty = True
+            return
+        self._reload()
+
+    def showEvent(self, event) -> None:
+        """Виджет показан - догоняем отложенное обновление."""
+        super().showEvent(event)
+        if self._dirty and self._loaded_version == self._data_version():
+            # Помечено устаревшим, но активности дня с загрузки не менялись
+            self._dirty = False
+        if self._dirty:
+            self._reload()
+        elif self._live_stale:
+            # Пока вкладка была скрыта, менялись только итоги в памяти
+            self._live_stale = False
+            self._show_live()
+            self._timeline.refresh()
+
+    def _data_version(self) -> tuple:
+        """Сегодняшний день и версия его активностей в шине изменений."""
+        today = date.today()
+        return today, self._db.changes.version("activities", today)
+
+    @timed("gui.activity.refresh")
+    def _reload(self) -> None:
+        """Загрузить данные из БД (дальше итоги дня ведутся в памяти)."""
+        self._dirty = False
+        self._live_stale = False
+        # Версия - до чтения: запись во время загрузки вызовет ещё одну
+        self._loaded_version = self._data_version()
+
+        # Один запрос: итоги по приложениям и сами активности дня (для фокуса)
+        today = date.today()
+        dashboard = self._db.get_day_dashboard(today)
+        activities = dashboard["activities"]
+        # Идущая активность могла начаться вчера - сегодня она считается с полуночи
+        open_activity = next((a for a in activities if a.end_time is None), None)
+
+        self._totals.seed(today, dashboard["apps"], open_activity)
+        self._seed_focus(today, activities)
+
+        # Обновляем карточки, таблицу и ленту
+        self._show_live()
+        self._timeline.refresh()
+
+    # === Итоги дня в памяти ===
+
+    def activity_started(self, activity: Activity) -> None:
+        """Началась новая активность - предыдущая закончилась в момент её начала."""
+        if not self._totals.activity_started(activity):
+            self._dirty = True  # наступил новый день - загрузить заново
+            if self.isVisible():
+                self._reload()
+            return
 
-        # Обновляем таблицу
-        self._load_apps_table()
+        previous = self._focus_open
+        if previous is not None and previous is not activity:
+            self._focus.add(previous.application_name, previous.activity_type,
+                            max(previous.start_time, datetime.combine(self._focus_day, time.min)),
+                            activity.start_time)
+        self._focus_open = activity
 
-    def _load_apps_table(self) -> None:
-        """Загрузить таблицу приложений."""
-        self._apps_table.setRowCount(0)
+        if self.isVisible():
+            self._show_live()
+        else:
+            self._live_stale = True
 
-        apps = self._db.get_app_with_type(date.today())
+    def tick(self, *args) -> None:
+        """Секунда сессии: время идущей активности в карточках и таблице."""
+        if not self.isVisible() or self._dirty or self._totals.open_activity is None:
+            return
+        self._show_live()
+
+    @timed("gui.activity.live")
+    def _show_live(self) -> None:
+        """Показать итоги из памяти (строки таблицы обновляются на месте)."""
+        now = datetime.now()
+        by_type = self._totals.by_type(now)
+        total_time = by_type["productive"] + by_type["distracting"] + by_type["neutral"]
+
+        self._productive_card.set_values(by_type["productive"], total_time)
+        self._distracting_card.set_values(by_type["distracting"], total_time)
+        self._neutral_card.set_values(by_type["neutral"], total_time)
+
+        self._apps_model.set_apps(self._totals.apps(now))
+        self._show_focus(now)
+
+    # === Серии фокуса ===
+
+    def _seed_focus(self, today: date, activities: list) -> None:
+        """Пересчитать сегодняшние серии фокуса по активностям дня."""
+        day_start = datetime.combine(today, time.min)
+        self._focus = FocusAnalyzer()
+        self._focus_day = today
+        self._focus_open = None
+        for activity in activities:
+            if activity.end_time is None:
+                self._focus_open = activity
+            else:
+                self._focus.add(activity.application_name, activity.activity_type,
+                                max(activity.start_time, day_start), activity.end_time)
+
+    def focus_summary(self, now: Optional[datetime] = None) -> FocusDay:
+        """Показатели фокуса за сегодня с учётом идущей активности."""
+        day = self._focus_day or date.today()
+        analyzer = self._focus
+        if self._focus_open is not None:
+            analyzer = self._focus.copy()
+            analyzer.add(self._focus_open.application_name, self._focus_open.activity_type,
+                         max(self._focus_open.start_time, datetime.combine(day, time.min)),
+                         now or datetime.now())
+        return analyzer.summary(day)
+
+    def _show_focus(self, now: Optional[datetime] = None) -> None:
+        """Показать показатели фокуса."""
+        focus = self.focus_summary(now)
+        if not focus.tracked_seconds:
+            self._focus_label.setText("Фокус: пока нет данных")
+            return
+        self._focus_label.setText(
+            f"Фокус: {format_duration(focus.focus_seconds)} "
+            f"(глубокая работа {format_duration(focus.deep_work_seconds)})  ·  "
+            f"серий {focus.streaks}, самая длинная {format_duration(focus.longest_streak)}  ·  "
+            f"переключений {focus.switches_per_hour:.0f}/ч  ·  прерываний {focus.interruptions}"
+        )
+
+    # === Поиск по заголовкам ===
+
+    def _on_search_text_changed(self, *args) -> None:
+        """Текст или период поиска изменился - ждём паузы в наборе."""
+        if not self._search_edit.text().strip():
+            self._search_timer.stop()
+            self._search.cancel()
+            self._search_table.hide()
+            self._search_summary.hide()
+            return
+        self._search_timer.start()
 
-        if not apps:
+    def _run_search(self) -> None:
+        """Отправить запрос поиска."""
+        query = self._search_edit.text().strip()
+        if not query:
             return
 
-        total_time = sum(app["duration"] for app in apps)
-
-        # Применяем фильтр
-        filter_index = self._filter_combo.currentIndex()
-        if filter_index == 1:
-            apps = [a for a in apps if a["type"] == "productive"]
-        elif filter_index == 2:
-            apps = [a for a in apps if a["type"] == "distracting"]
-        elif filter_index == 3:
-            apps = [a for a in apps if a["type"] == "neutral"]
-
-        for app in apps:
-            row = self._apps_table.rowCount()
-            self._apps_table.insertRow(row)
-
-            # Имя приложения
-            name_item = QTableWidgetItem(f"  {app['name']}")
-            name_item.setFlags(name_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-            name_item.setData(Qt.ItemDataRole.UserRole, app['name'])  # Сохраняем имя
-            self._apps_table.setItem(row, 0, name_item)
-
-            # Тип активности
-            type_text, type_color = self._get_type_display(app["type"])
-            type_item = QTableWidgetItem(type_text)
-            type_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            type_item.setForeground(type_color)
-            type_item.setFlags(type_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-            self._apps_table.setItem(row, 1, type_item)
-
-            # Время
-            time_item = QTableWidgetItem(format_duration(app["duration"]))
+        days = self.SEARCH_RANGES[self._search_range.currentIndex()][1]
+        end_date = date.today()
+        start_date = end_date - timedelta(days=days) if days is not None else None
+        self._search.submit(query, start_date, end_date)
+
+    def _show_search_results(self, query: str, results: list) -> None:
+        """Показать найденные заголовки."""
+        if query != self._search_edit.text().strip():
+            return  # пока шёл запрос, текст уже сменился
+
+        self._search_table.setRowCount(len(results))
+        for row, match in enumerate(results):
+            title_item = QTableWidgetItem(match["title"])
+            title_item.setToolTip(match["title"])
+            self._search_table.setItem(row, 0, title_item)
+            self._search_table.setItem(row, 1, QTableWidgetItem(match["name"]))
+
+            time_item = QTableWidgetItem(format_duration(match["duration"]))
             time_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            time_item.setFlags(time_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-            self._apps_table.setItem(row, 2, time_item)
-
-            # Прогресс бар
-            progress = QProgressBar()
-            progress.setMaximum(100)
-            percentage = int((app["duration"] / total_time) * 100) if total_time > 0 else 0
-            progress.setValue(percentage)
-            progress.setFormat(f"{percentage}%")
-
-            # Цвет прогресс-бара в зависимости от типа
-            bar_style = self._get_progress_style(app["type"])
-            progress.setStyleSheet(bar_style)
-
-            self._apps_table.setCellWidget(row, 3, progress)
-
-    def _get_type_display(self, activity_type: str) -> tuple:
-        """Получить отображение типа активности."""
-        from PyQt6.QtGui import QColor
-
-        types = {
-            "productive": ("Продуктивное", QColor("#166534")),
-            "distracting": ("Отвлекающее", QColor("#991B1B")),
-            "neutral": ("Нейтральное", QColor("#4B5563")),
-            "unknown": ("Неизвестно", QColor("#6B7280"))
-        }
-        return types.get(activity_type, types["unknown"])
-
-    def _get_progress_style(self, activity_type: str) -> str:
-        """Получить стиль прогресс-бара."""
-        colors = {
-            "productive": "#22C55E",
-            "distracting": "#EF4444",
-            "neutral": "#6B7280",
-            "unknown": "#9CA3AF"
-        }
-        color = colors.get(activity_type, colors["unknown"])
-
-        return f"""
-            QProgressBar {{
-                border: none;
-                border-radius: 4px;
-                background-color: #E5E7EB;
-                height: 16px;
-                text-align: center;
-                font-size: 11px;
-                font-weight: bold;
-                color: #374151;
-            }}
-            QProgressBar::chunk {{
-                background-color: {color};
-                border-radius: 4px;
-            }}
-        """
+            self._search_table.setItem(row, 2, time_item)
+
+            count_item = QTableWidgetItem(str(match["count"]))
+            count_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+            self._search_table.setItem(row, 3, count_item)
+
+        total = sum(match["duration"] for match in results)
+        if results:
+            self._search_summary.setText(
+                f"Найдено заголовков: {len(results)}, всего {format_duration(total)}"
+            )
+        else:
+            self._search_summary.setText("Ничего не найдено")
+        self._search_summary.show()
+        self._search_table.setVisible(bool(results))
 
     def _apply_filter(self) -> None:
-        """Применить фильтр."""
-        self._load_apps_table()
+        """Применить фильтр по типу."""
+        self._apps_proxy.set_type(self.FILTER_TYPES[self._filter_combo.currentIndex()])
 
     def _show_context_menu(self, position) -> None:
         """Показать контекстное меню."""
-        item = self._apps_table.itemAt(position)
-        if not item:
-            return
-
-        row = item.row()
-        name_item = self._apps_table.item(row, 0)
-        if not name_item:
+        index = self._apps_table.indexAt(position)
+        if not index.isValid():
             return
 
-        app_name = name_item.data(Qt.ItemDataRole.UserRole)
+        app_name = index.data(NAME_ROLE)
 
         menu = QMenu(self)
 
@@ -0,0 +1,203 @@
+"""Модель таблицы приложений за день.
+
+Строки (приложение, тип, время) живут в памяти модели; фильтр по типу,
+поиск по имени и сортировка по столбцам выполняет AppsFilterProxy без
+обращения к БД. Обновление итогов (set_apps) меняет значения в
+существующих строках и добавляет новые, не перестраивая таблицу.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, QRectF, QSortFilterProxyModel, Qt
+from PyQt6.QtGui import QColor, QPainter
+from PyQt6.QtWidgets import QStyle, QStyledItemDelegate
+
+from utils.helpers import format_duration
+
+
+# Отображение типа активности: подпись, цвет текста, цвет полосы доли
+TYPE_DISPLAY = {
+    "productive": ("Продуктивное", "#166534", "#22C55E"),
+    "distracting": ("Отвлекающее", "#991B1B", "#EF4444"),
+    "neutral": ("Нейтральное", "#4B5563", "#6B7280"),
+    "unknown": ("Неизвестно", "#6B7280", "#9CA3AF"),
+}
+
+NAME_ROLE = Qt.ItemDataRole.UserRole
+TYPE_ROLE = Qt.ItemDataRole.UserRole + 1
+SORT_ROLE = Qt.ItemDataRole.UserRole + 2
+SHARE_ROLE = Qt.ItemDataRole.UserRole + 3  # доля в процентах (0-100)
+
+
+def type_display(activity_type: str) -> Tuple[str, str, str]:
+    """Подпись и цвета типа активности."""
+    return TYPE_DISPLAY.get(activity_type, TYPE_DISPLAY["unknown"])
+
+
+class AppsTableModel(QAbstractTableModel):
+    """Приложения за день: имя, тип, время и доля от общего времени."""
+
+    HEADERS = ["Приложение", "Тип", "Время", "Доля"]
+    NAME, TYPE, TIME, SHARE = range(4)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows: List[list] = []  # [имя, тип, время]
+        self._index: Dict[Tuple[str, str], int] = {}
+        self._total: int = 0
+
+    def set_apps(self, apps: Iterable[Dict[str, Any]]) -> None:
+        """
+        Показать строки вида get_app_with_type (name, type, duration).
+
+        Строки с уже известной парой (приложение, тип) обновляются на
+        месте, новые добавляются в конец; если какая-то пара пропала,
+        модель сбрасывается целиком.
+        """
+        durations: Dict[Tuple[str, str], int] = {}
+        for app in apps:
+            key = (app["name"], app["type"])
+            durations[key] = durations.get(key, 0) + (app["duration"] or 0)
+
+        if any(key not in durations for key in self._index):
+            self.beginResetModel()
+            self._rows = [[name, activity_type, duration]
+                          for (name, activity_type), duration in durations.items()]
+            self._index = {(row[0], row[1]): i for i, row in enumerate(self._rows)}
+            self._total = sum(durations.values())
+            self.endResetModel()
+            return
+
+        total = sum(durations.values())
+        changed = total != self._total
+        self._total = total
+        new_keys = []
+        for key, duration in durations.items():
+            row = self._index.get(key)
+            if row is None:
+                new_keys.append(key)
+            elif self._rows[row][2] != duration:
+                self._rows[row][2] = duration
+                changed = True
+
+        if changed and self._rows:
+            # Общее время изменилось - доли меняются во всех строках
+            self.dataChanged.emit(self.index(0, self.TIME), self.index(len(self._rows) - 1, self.SHARE))
+        if new_keys:
+            first = len(self._rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(new_keys) - 1)
+            for key in new_keys:
+                self._index[key] = len(self._rows)
+                self._rows.append([key[0], key[1], durations[key]])
+            self.endInsertRows()
+
+    @property
+    def total(self) -> int:
+        """Общее время всех приложений."""
+        return self._total
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section: int, orientation: Qt.Orientation,
+                   role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        name, activity_type, duration = self._rows[index.row()]
+        column = index.column()
+
+        if role == NAME_ROLE:
+            return name
+        if role == TYPE_ROLE:
+            return activity_type
+        if role == SHARE_ROLE:
+            return int(duration / self._total * 100) if self._total > 0 else 0
+        if role == SORT_ROLE:
+            if column == self.NAME:
+                return name.lower()
+            if column == self.TYPE:
+                return type_display(activity_type)[0]
+            return duration  # время и доля сортируются одинаково
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == self.NAME:
+                return f"  {name}"
+            if column == self.TYPE:
+                return type_display(activity_type)[0]
+            if column == self.TIME:
+                return format_duration(duration)
+            return f"{self.data(index, SHARE_ROLE)}%"
+        if role == Qt.ItemDataRole.ForegroundRole and column == self.TYPE:
+            return QColor(type_display(activity_type)[1])
+        if role == Qt.ItemDataRole.TextAlignmentRole and column != self.NAME:
+            return Qt.AlignmentFlag.AlignCenter
+        return None
+
+
+class AppsFilterProxy(QSortFilterProxyModel):
+    """Фильтр по типу и подстроке имени, сортировка по значениям столбцов."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._type: Optional[str] = None
+        self._name: str = ""
+        self.setSortRole(SORT_ROLE)
+        self.setDynamicSortFilter(True)
+
+    def set_type(self, activity_type: Optional[str]) -> None:
+        """Показывать только приложения типа activity_type (None - все)."""
+        if activity_type != self._type:
+            self._type = activity_type
+            self.invalidateFilter()
+
+    def set_name_filter(self, text: str) -> None:
+        """Показывать только приложения, в имени которых есть text (без учёта регистра)."""
+        text = text.strip().lower()
+        if text != self._name:
+            self._name = text
+            self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row: int, source_parent: QModelIndex) -> bool:
+        index = self.sourceModel().index(source_row, 0, source_parent)
+        if self._type is not None and index.data(TYPE_ROLE) != self._type:
+            return False
+        return not self._name or self._name in index.data(NAME_ROLE).lower()
+
+
+class ShareDelegate(QStyledItemDelegate):
+    """Доля приложения полосой в цвет его типа."""
+
+    BACKGROUND = QColor("#E5E7EB")
+    TEXT = QColor("#374151")
+
+    def paint(self, painter: QPainter, option, index: QModelIndex) -> None:
+        if option.state & QStyle.StateFlag.State_Selected:
+            painter.fillRect(option.rect, option.palette.highlight())
+
+        share = index.data(SHARE_ROLE) or 0
+        rect = QRectF(option.rect.adjusted(4, 4, -4, -4))
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(self.BACKGROUND)
+        painter.drawRoundedRect(rect, 4, 4)
+        if share > 0:
+            painter.setBrush(QColor(type_display(index.data(TYPE_ROLE))[2]))
+            painter.drawRoundedRect(QRectF(rect.left(), rect.top(), rect.width() * share / 100,
+                                           rect.height()), 4, 4)
+
+        font = painter.font()
+        font.setBold(True)
+        font.setPixelSize(11)
+        painter.setFont(font)
+        painter.setPen(self.TEXT)
+        painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, f"{share}%")
+        painter.restore()
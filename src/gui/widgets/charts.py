@@ -0,0 +1,306 @@
+"""Графики статистики: столбцы по дням, тепловая карта года и распределение длительностей.
+
+Графики рисуются QPainter в QPixmap один раз, а на экран картинка
+только копируется. Перерисовка нужна, когда меняются сами дневные
+итоги или размер виджета: повторный set_* с теми же значениями
+(обычный refresh без новых данных) кэш не сбрасывает.
+"""
+
+from datetime import date, timedelta
+from typing import Dict, Optional
+
+from PyQt6.QtWidgets import QWidget, QSizePolicy, QToolTip
+from PyQt6.QtCore import Qt, QPoint, QRectF
+from PyQt6.QtGui import QColor, QPainter, QPixmap
+
+from utils.helpers import format_duration
+from utils.log_histogram import LogHistogram
+from utils.metrics import timed
+
+
+WEEKDAYS = ["Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Вс"]
+MONTHS = ["янв", "фев", "мар", "апр", "май", "июн", "июл", "авг", "сен", "окт", "ноя", "дек"]
+
+
+class CachedChart(QWidget):
+    """
+    Основа графика с картинкой в кэше.
+
+    Наследник задаёт данные через _set_data() (кортеж - чтобы сравнивать)
+    и рисует их в _draw().
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._data: tuple = ()
+        self._pixmap: Optional[QPixmap] = None
+        self.renders: int = 0
+
+        self.setMouseTracking(True)
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
+
+    def _set_data(self, data: tuple) -> None:
+        """Новые данные; картинка сбрасывается, только если они отличаются."""
+        if data == self._data:
+            return
+        self._data = data
+        self._pixmap = None
+        self.update()
+
+    def render_pixmap(self) -> QPixmap:
+        """Нарисовать график в новую картинку по текущему размеру."""
+        ratio = self.devicePixelRatioF()
+        pixmap = QPixmap(int(self.width() * ratio), int(self.height() * ratio))
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(Qt.GlobalColor.transparent)
+
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        self._draw(painter, self.width(), self.height())
+        painter.end()
+
+        self.renders += 1
+        return pixmap
+
+    def _draw(self, painter: QPainter, width: int, height: int) -> None:
+        raise NotImplementedError
+
+    def _tooltip_at(self, x: float, y: float) -> Optional[str]:
+        """Подсказка для точки графика."""
+        return None
+
+    def paintEvent(self, event) -> None:
+        if self._pixmap is None or self._pixmap.deviceIndependentSize().toSize() != self.size():
+            self._pixmap = self.render_pixmap()
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, self._pixmap)
+        painter.end()
+
+    def mouseMoveEvent(self, event) -> None:
+        position = event.position()
+        text = self._tooltip_at(position.x(), position.y())
+        if text:
+            QToolTip.showText(self.mapToGlobal(QPoint(int(position.x()), int(position.y()))), text, self)
+        else:
+            QToolTip.hideText()
+
+
+class DailyBarChart(CachedChart):
+    """Столбцы суммарного времени по дням периода."""
+
+    BAR_COLOR = QColor("#3B82F6")
+    GRID_COLOR = QColor("#E5E7EB")
+    TEXT_COLOR = QColor("#6B7280")
+
+    LEFT = 30
+    BOTTOM = 16
+    TOP = 6
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setFixedHeight(130)
+
+    def set_days(self, totals: Dict[date, int], start: date, end: date) -> None:
+        """Показать дни от start до end включительно."""
+        days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+        self._set_data(tuple((day, totals.get(day, 0)) for day in days))
+
+    def _slot(self, width: int) -> float:
+        return (width - self.LEFT) / max(1, len(self._data))
+
+    @timed("gui.chart.bars")
+    def _draw(self, painter: QPainter, width: int, height: int) -> None:
+        if not self._data:
+            return
+        plot_height = height - self.TOP - self.BOTTOM
+        bottom = self.TOP + plot_height
+
+        # Шкала в целых часах, не больше четырёх линий сетки
+        hours = max(1, -(-max(total for _, total in self._data) // 3600))
+        step = max(1, -(-hours // 4))
+        hours = -(-hours // step) * step
+
+        for hour in range(0, hours + 1, step):
+            y = bottom - plot_height * hour / hours
+            painter.setPen(self.GRID_COLOR)
+            painter.drawLine(self.LEFT, int(y), width, int(y))
+            painter.setPen(self.TEXT_COLOR)
+            painter.drawText(QRectF(0, y - 8, self.LEFT - 4, 16),
+                             Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter, f"{hour}ч")
+
+        slot = self._slot(width)
+        bar_width = max(1.0, slot * 0.7)
+        label_every = 1 if slot >= 22 else 7 if slot < 8 else 2
+        painter.setPen(Qt.PenStyle.NoPen)
+        for i, (day, total) in enumerate(self._data):
+            x = self.LEFT + slot * i + (slot - bar_width) / 2
+            bar_height = plot_height * total / (hours * 3600)
+            if bar_height > 0:
+                painter.setBrush(self.BAR_COLOR)
+                painter.drawRoundedRect(QRectF(x, bottom - bar_height, bar_width, bar_height), 2, 2)
+
+        painter.setPen(self.TEXT_COLOR)
+        for i, (day, _) in enumerate(self._data):
+            if i % label_every:
+                continue
+            label = WEEKDAYS[day.weekday()] if len(self._data) <= 7 else str(day.day)
+            painter.drawText(QRectF(self.LEFT + slot * i, bottom, slot, self.BOTTOM),
+                             Qt.AlignmentFlag.AlignCenter | Qt.TextFlag.TextDontClip, label)
+
+    def _tooltip_at(self, x: float, y: float) -> Optional[str]:
+        index = int((x - self.LEFT) // self._slot(self.width())) if x >= self.LEFT else -1
+        if not 0 <= index < len(self._data):
+            return None
+        day, total = self._data[index]
+        return f"{day:%d.%m.%Y}: {format_duration(total)}"
+
+
+class YearHeatmap(CachedChart):
+    """
+    Тепловая карта года: столбец - неделя, строка - день недели.
+
+    Насыщенность клетки - по отработанным часам (пороги LEVEL_HOURS).
+    """
+
+    LEVEL_COLORS = [QColor(c) for c in ("#EBEDF0", "#BBF7D0", "#4ADE80", "#16A34A", "#166534")]
+    LEVEL_HOURS = [0, 2, 4, 6]  # больше 0, от 2, от 4, от 6 часов
+    TEXT_COLOR = QColor("#6B7280")
+
+    WEEKS = 53
+    LEFT = 24
+    TOP = 14
+    GAP = 2
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setFixedHeight(self.TOP + 7 * 13 + 2)
+
+    def set_totals(self, totals: Dict[date, int], end: date) -> None:
+        """Показать год, заканчивающийся днём end."""
+        start = end - timedelta(days=end.weekday(), weeks=self.WEEKS - 1)
+        days = (end - start).days + 1
+        self._set_data((start, tuple(totals.get(start + timedelta(days=i), 0) for i in range(days))))
+
+    @classmethod
+    def level(cls, seconds: int) -> int:
+        """Уровень насыщенности для времени за день."""
+        if seconds <= 0:
+            return 0
+        return sum(1 for hours in cls.LEVEL_HOURS if seconds >= hours * 3600)
+
+    def _cell(self, width: int, height: int) -> float:
+        """Шаг клетки (клетка плюс зазор)."""
+        return max(4.0, min((width - self.LEFT) / self.WEEKS, (height - self.TOP) / 7))
+
+    @timed("gui.chart.heatmap")
+    def _draw(self, painter: QPainter, width: int, height: int) -> None:
+        if not self._data:
+            return
+        start, totals = self._data
+        step = self._cell(width, height)
+        size = step - self.GAP
+
+        painter.setPen(self.TEXT_COLOR)
+        for row in (0, 2, 4):
+            painter.drawText(QRectF(0, self.TOP + step * row, self.LEFT - 4, step),
+                             Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter, WEEKDAYS[row])
+
+        painter.setPen(Qt.PenStyle.NoPen)
+        brushes = self.LEVEL_COLORS
+        month = None
+        for i, seconds in enumerate(totals):
+            column, row = divmod(i, 7)
+            day = start + timedelta(days=i)
+            x = self.LEFT + column * step
+            if row == 0 and day.month != month:
+                if month is not None or day.day <= 7:
+                    painter.setPen(self.TEXT_COLOR)
+                    painter.drawText(QRectF(x, 0, step * 4, self.TOP),
+                                     Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
+                                     MONTHS[day.month - 1])
+                    painter.setPen(Qt.PenStyle.NoPen)
+                month = day.month
+            painter.setBrush(brushes[self.level(seconds)])
+            painter.drawRoundedRect(QRectF(x, self.TOP + row * step, size, size), 2, 2)
+
+    def _tooltip_at(self, x: float, y: float) -> Optional[str]:
+        if not self._data or x < self.LEFT or y < self.TOP:
+            return None
+        start, totals = self._data
+        step = self._cell(self.width(), self.height())
+        column, row = int((x - self.LEFT) // step), int((y - self.TOP) // step)
+        index = column * 7 + row
+        if row >= 7 or index >= len(totals):
+            return None
+        day = start + timedelta(days=index)
+        return f"{day:%d.%m.%Y}: {format_duration(totals[index])}"
+
+
+class HistogramChart(CachedChart):
+    """Распределение длительностей по интервалам EDGES с метками медианы и p90."""
+
+    EDGES = [0, 60, 300, 900, 1800, 3600, 7200, 14400]
+    LABELS = ["<1м", "1–5м", "5–15м", "15–30м", "30–60м", "1–2ч", "2–4ч", "4ч+"]
+
+    BAR_COLOR = QColor("#8B5CF6")
+    MARK_COLOR = QColor("#F59E0B")
+    TEXT_COLOR = QColor("#6B7280")
+
+    BOTTOM = 16
+    TOP = 6
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setFixedHeight(110)
+
+    def set_histogram(self, histogram: LogHistogram) -> None:
+        """Показать гистограмму (достаточно счётчиков, сами длительности не нужны)."""
+        marks = (histogram.quantile(0.5), histogram.quantile(0.9)) if histogram.count else ()
+        self._set_data((tuple(histogram.histogram(self.EDGES)), marks))
+
+    def _slot(self, width: int) -> float:
+        return width / len(self.EDGES)
+
+    def _position(self, seconds: float, width: int) -> float:
+        """Координата x длительности: интервал и доля внутри него."""
+        index = max(i for i, edge in enumerate(self.EDGES) if edge <= seconds)
+        if index + 1 < len(self.EDGES):
+            lower, upper = self.EDGES[index], self.EDGES[index + 1]
+            fraction = (seconds - lower) / (upper - lower)
+        else:
+            fraction = 0.5
+        return self._slot(width) * (index + fraction)
+
+    @timed("gui.chart.histogram")
+    def _draw(self, painter: QPainter, width: int, height: int) -> None:
+        if not self._data:
+            return
+        counts, marks = self._data
+        plot_height = height - self.TOP - self.BOTTOM
+        bottom = self.TOP + plot_height
+        slot = self._slot(width)
+        highest = max(max(counts), 1)
+
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(self.BAR_COLOR)
+        for i, count in enumerate(counts):
+            bar_height = plot_height * count / highest
+            if bar_height > 0:
+                painter.drawRoundedRect(QRectF(slot * i + slot * 0.1, bottom - bar_height,
+                                               slot * 0.8, bar_height), 2, 2)
+
+        painter.setPen(self.MARK_COLOR)
+        for seconds in marks:
+            x = self._position(seconds, width)
+            painter.drawLine(int(x), self.TOP, int(x), bottom)
+
+        painter.setPen(self.TEXT_COLOR)
+        for i, label in enumerate(self.LABELS):
+            painter.drawText(QRectF(slot * i, bottom, slot, self.BOTTOM),
+                             Qt.AlignmentFlag.AlignCenter | Qt.TextFlag.TextDontClip, label)
+
+    def _tooltip_at(self, x: float, y: float) -> Optional[str]:
+        index = int(x // self._slot(self.width()))
+        if not self._data or not 0 <= index < len(self.EDGES):
+            return None
+        return f"{self.LABELS[index]}: {self._data[0][index]}"
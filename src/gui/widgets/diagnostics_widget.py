@@ -0,0 +1,119 @@
+"""Скрытая вкладка диагностики: метрики горячих путей."""
+
+from PyQt6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel,
+    QTableWidget, QTableWidgetItem, QHeaderView,
+    QPushButton, QFileDialog
+)
+from PyQt6.QtCore import Qt, QTimer
+
+from core.clock_service import ClockService
+from utils import metrics
+
+
+class DiagnosticsWidget(QWidget):
+    """Виджет отображения метрик производительности."""
+
+    COLUMNS = ["Операция", "Вызовы", "Ошибки", "p50, мс", "p95, мс", "p99, мс", "max, мс"]
+    KEYS = ["count", "errors", "p50_ms", "p95_ms", "p99_ms", "max_ms"]
+
+    def __init__(self, clock_service: ClockService = None, parent=None):
+        super().__init__(parent)
+        self._clock_service = clock_service
+        self._setup_ui()
+
+        # Автообновление только пока вкладка видна
+        self._timer = QTimer(self)
+        self._timer.setInterval(2000)
+        self._timer.timeout.connect(self.refresh)
+
+    def _setup_ui(self) -> None:
+        """Настройка интерфейса."""
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(12, 12, 12, 12)
+        layout.setSpacing(12)
+
+        header_layout = QHBoxLayout()
+
+        title = QLabel("Диагностика")
+        title.setObjectName("sectionTitle")
+        header_layout.addWidget(title)
+
+        header_layout.addStretch()
+
+        reset_btn = QPushButton("Сбросить")
+        reset_btn.clicked.connect(self._reset)
+        header_layout.addWidget(reset_btn)
+
+        export_btn = QPushButton("Экспорт JSON")
+        export_btn.clicked.connect(self._export)
+        header_layout.addWidget(export_btn)
+
+        layout.addLayout(header_layout)
+
+        self._table = QTableWidget()
+        self._table.setColumnCount(len(self.COLUMNS))
+        self._table.setHorizontalHeaderLabels(self.COLUMNS)
+        self._table.setAlternatingRowColors(False)
+        self._table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self._table.verticalHeader().setVisible(False)
+
+        header = self._table.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        for i in range(1, len(self.COLUMNS)):
+            header.setSectionResizeMode(i, QHeaderView.ResizeMode.Fixed)
+            header.resizeSection(i, 75)
+
+        layout.addWidget(self._table, 1)
+
+        self._status_label = QLabel()
+        self._status_label.setStyleSheet("color: #6B7280; font-size: 11px;")
+        layout.addWidget(self._status_label)
+
+    def refresh(self) -> None:
+        """Обновить таблицу метрик."""
+        snapshot = metrics.registry.snapshot()
+
+        self._table.setRowCount(len(snapshot))
+        for row, (name, stats) in enumerate(snapshot.items()):
+            name_item = QTableWidgetItem(name)
+            name_item.setFlags(name_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
+            self._table.setItem(row, 0, name_item)
+
+            for col, key in enumerate(self.KEYS, start=1):
+                item = QTableWidgetItem(str(stats[key]))
+                item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+                item.setFlags(item.flags() & ~Qt.ItemFlag.ItemIsEditable)
+                self._table.setItem(row, col, item)
+
+        if metrics.is_enabled():
+            status = f"Операций: {len(snapshot)}"
+        else:
+            status = "Сбор метрик выключен"
+
+        if self._clock_service is not None:
+            status += f" · пробуждений в секунду: {self._clock_service.wakeups_per_second():.2f}"
+
+        self._status_label.setText(status)
+
+    def _reset(self) -> None:
+        """Сбросить накопленные метрики."""
+        metrics.registry.reset()
+        self.refresh()
+
+    def _export(self) -> None:
+        """Сохранить метрики в JSON."""
+        path, _ = QFileDialog.getSaveFileName(self, "Экспорт метрик", "metrics.json", "JSON (*.json)")
+        if path:
+            metrics.registry.dump(path)
+
+    def showEvent(self, event) -> None:
+        """Вкладка показана - запускаем автообновление."""
+        super().showEvent(event)
+        self.refresh()
+        self._timer.start()
+
+    def hideEvent(self, event) -> None:
+        """Вкладка скрыта - останавливаем автообновление."""
+        super().hideEvent(event)
+        self._timer.stop()
@@ -5,7 +5,7 @@ from PyQt6.QtWidgets import (
     QSpinBox, QCheckBox, QGroupBox, QFormLayout,
     QPushButton, QMessageBox, QScrollArea, QFrame
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, pyqtSignal
 
 from utils.config import Config
 
@@ -13,6 +13,8 @@ from utils.config import Config
 class SettingsWidget(QWidget):
     """Виджет настроек приложения."""
 
+    settings_saved = pyqtSignal()
+
     def __init__(self, config: Config, parent=None):
         super().__init__(parent)
         self._config = config
@@ -127,6 +129,30 @@ class SettingsWidget(QWidget):
 
         content_layout.addWidget(idle_group)
 
+        # === Группа определения приложений ===
+        apps_group = QGroupBox("Определение приложений")
+        apps_layout = QVBoxLayout(apps_group)
+        apps_layout.setSpacing(10)
+        apps_layout.setContentsMargins(15, 20, 15, 15)
+
+        self._detailed_app_names = QCheckBox("Различать скрипты и Electron-приложения")
+        self._detailed_app_names.setToolTip(
+            "Для python, node, java и electron к имени процесса\n"
+            "добавляется имя скрипта или приложения: «python (manage.py)».\n"
+            "Применяется со следующей сессии"
+        )
+        apps_layout.addWidget(self._detailed_app_names)
+
+        self._input_intensity = QCheckBox("Учитывать интенсивность клавиатуры и мыши")
+        self._input_intensity.setToolTip(
+            "Поминутно считается число нажатий и движений мыши в каждом\n"
+            "приложении (какие клавиши нажаты - не записывается).\n"
+            "Нужны X11 и python-xlib. Применяется со следующей сессии"
+        )
+        apps_layout.addWidget(self._input_intensity)
+
+        content_layout.addWidget(apps_group)
+
         # === Группа запуска ===
         startup_group = QGroupBox("При запуске")
         startup_layout = QVBoxLayout(startup_group)
@@ -186,6 +212,9 @@ class SettingsWidget(QWidget):
         self._idle_enabled.setChecked(s.idle_detection_enabled)
         self._idle_timeout.setValue(s.idle_timeout)
 
+        self._detailed_app_names.setChecked(s.detailed_app_names)
+        self._input_intensity.setChecked(s.input_intensity_enabled)
+
         self._auto_start.setChecked(s.auto_start_tracking)
         self._minimize_to_tray.setChecked(s.minimize_to_tray)
 
@@ -200,9 +229,12 @@ class SettingsWidget(QWidget):
             sound_enabled=self._sound_enabled.isChecked(),
             idle_detection_enabled=self._idle_enabled.isChecked(),
             idle_timeout=self._idle_timeout.value(),
+            detailed_app_names=self._detailed_app_names.isChecked(),
+            input_intensity_enabled=self._input_intensity.isChecked(),
             auto_start_tracking=self._auto_start.isChecked(),
             minimize_to_tray=self._minimize_to_tray.isChecked()
         )
+        self.settings_saved.emit()
 
         QMessageBox.information(self, "Готово", "Настройки сохранены!")
 
@@ -226,5 +258,7 @@ class SettingsWidget(QWidget):
             self._sound_enabled.setChecked(d.sound_enabled)
             self._idle_enabled.setChecked(d.idle_detection_enabled)
             self._idle_timeout.setValue(d.idle_timeout)
+            self._detailed_app_names.setChecked(d.detailed_app_names)
+            self._input_intensity.setChecked(d.input_intensity_enabled)
             self._auto_start.setChecked(d.auto_start_tracking)
             self._minimize_to_tray.setChecked(d.minimize_to_tray)
@@ -1,15 +1,20 @@
 """Виджет статистики."""
 
 from datetime import date, timedelta
+from typing import Dict, Optional, Set
+
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel,
     QFrame, QTableWidget, QTableWidgetItem,
-    QHeaderView, QComboBox, QSizePolicy
+    QHeaderView, QComboBox, QSizePolicy, QDateEdit
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QDate
 
+from database.changes import DataChange
 from database.db_manager import DatabaseManager
 from utils.helpers import format_duration, get_week_bounds
+from utils.metrics import timed
+from .charts import DailyBarChart, HistogramChart, YearHeatmap
 
 
 class StatCard(QFrame):
@@ -42,13 +47,41 @@ class StatCard(QFrame):
 
 
 class StatsWidget(QWidget):
-    """Виджет отображения статистики."""
+    """
+    Виджет отображения статистики.
+
+    Пока виджет скрыт (неактивная вкладка или окно в трее), refresh()
+    только помечает данные устаревшими; загрузка выполняется один раз
+    при показе.
+    """
+
+    PERIODS = ["Сегодня", "Эта неделя", "Этот месяц", "Последние 30 дней",
+               "Этот год", "Всё время", "Период..."]
+    CUSTOM_PERIOD = len(PERIODS) - 1
+
+    # Распределения длительностей: подпись -> метрика duration_histogram
+    DISTRIBUTIONS = {"Сессии": "session", "Активности": "activity", "Серии фокуса": "focus"}
+
+    # Таблицы, изменения которых видны на вкладке
+    DATA_TABLES = ("sessions", "activities", "focus_days", "duration_histogram")
+
+    MAX_BAR_DAYS = 62  # дольше - столбцы слишком узкие, график скрывается
+    MAX_TABLE_ROWS = 500
 
     def __init__(self, db_manager: DatabaseManager, parent=None):
         super().__init__(parent)
         self._db = db_manager
+        self._dirty: bool = True  # первая загрузка - при первом показе
+
+        # Загруженное: итоги по дням за год, день и период загрузки и дни,
+        # изменившиеся с тех пор (None - перечитать всё)
+        self._year_totals: Dict[date, int] = {}
+        self._loaded_today: Optional[date] = None
+        self._loaded_period: Optional[tuple] = None
+        self._changed_days: Optional[Set[date]] = None
+        self._loaded_versions: Optional[tuple] = None  # версии DATA_TABLES при загрузке
+
         self._setup_ui()
-        self.refresh()
 
     def _setup_ui(self) -> None:
         """Настройка интерфейса."""
@@ -65,10 +98,21 @@ class StatsWidget(QWidget):
 
         header_layout.addStretch()
 
+        # Свой период: даты показываются только для пункта «Период...»
+        today = QDate.currentDate()
+        self._start_edit = QDateEdit(today.addDays(-6))
+        self._end_edit = QDateEdit(today)
+        for edit in (self._start_edit, self._end_edit):
+            edit.setCalendarPopup(True)
+            edit.setDisplayFormat("dd.MM.yyyy")
+            edit.dateChanged.connect(self._on_period_changed)
+            edit.hide()
+            header_layout.addWidget(edit)
+
         self._period_combo = QComboBox()
-        self._period_combo.addItems(["Сегодня", "Эта неделя", "Этот месяц"])
+        self._period_combo.addItems(self.PERIODS)
         self._period_combo.setMinimumWidth(130)
-        self._period_combo.currentIndexChanged.connect(self.refresh)
+        self._period_combo.currentIndexChanged.connect(self._on_period_changed)
         header_layout.addWidget(self._period_combo)
 
         layout.addLayout(header_layout)
@@ -86,15 +130,45 @@ class StatsWidget(QWidget):
         self._breaks_card = StatCard("Перерывов", "0", "#F59E0B")
         cards_layout.addWidget(self._breaks_card)
 
-        self._avg_card = StatCard("Среднее", "0мин", "#8B5CF6")
-        cards_layout.addWidget(self._avg_card)
+        self._median_card = StatCard("Медиана сессии", "0мин", "#8B5CF6")
+        cards_layout.addWidget(self._median_card)
 
         layout.addLayout(cards_layout)
 
+        # Время по типам активности за период
+        self._productivity_label = QLabel()
+        self._productivity_label.setStyleSheet("color: #6B7280; font-size: 12px;")
+        layout.addWidget(self._productivity_label)
+
+        # Графики: столбцы по дням периода и год целиком
+        self._bar_chart = DailyBarChart()
+        self._bar_chart.hide()
+        layout.addWidget(self._bar_chart)
+
+        self._heatmap = YearHeatmap()
+        layout.addWidget(self._heatmap)
+
+        # Распределение длительностей за период
+        distribution_header = QHBoxLayout()
+        distribution_title = QLabel("Длительности")
+        distribution_title.setObjectName("sectionTitle")
+        distribution_header.addWidget(distribution_title)
+        self._quantiles_label = QLabel()
+        self._quantiles_label.setStyleSheet("color: #6B7280; font-size: 12px;")
+        distribution_header.addWidget(self._quantiles_label, 1)
+        self._distribution_combo = QComboBox()
+        self._distribution_combo.addItems(list(self.DISTRIBUTIONS))
+        self._distribution_combo.currentIndexChanged.connect(self._on_distribution_changed)
+        distribution_header.addWidget(self._distribution_combo)
+        layout.addLayout(distribution_header)
+
+        self._histogram_chart = HistogramChart()
+        layout.addWidget(self._histogram_chart)
+
         # Таблица
-        table_label = QLabel("История сессий")
-        table_label.setObjectName("sectionTitle")
-        layout.addWidget(table_label)
+        self._table_label = QLabel("История сессий")
+        self._table_label.setObjectName("sectionTitle")
+        layout.addWidget(self._table_label)
 
         self._sessions_table = QTableWidget()
         self._sessions_table.setColumnCount(5)
@@ -116,65 +190,175 @@ class StatsWidget(QWidget):
 
         layout.addWidget(self._sessions_table, 1)
 
-    def refresh(self) -> None:
-        """Обновить данные."""
-        period_index = self._period_combo.currentIndex()
-
-        if period_index == 0:
-            self._load_daily_stats(date.today())
-        elif period_index == 1:
-            start, end = get_week_bounds()
-            self._load_period_stats(start, end)
+    def _on_period_changed(self, *args) -> None:
+        """Смена периода."""
+        custom = self._period_combo.currentIndex() == self.CUSTOM_PERIOD
+        self._start_edit.setVisible(custom)
+        self._end_edit.setVisible(custom)
+        # Итоги за год остаются, перечитывается только период
+        if self.isVisible():
+            self._reload()
         else:
-            today = date.today()
-            start = today.replace(day=1)
-            self._load_period_stats(start, today)
+            self._dirty = True
 
-    def _load_daily_stats(self, target_date: date) -> None:
-        """Загрузить статистику за день."""
-        stats = self._db.get_daily_stats(target_date)
+    def _on_distribution_changed(self, *args) -> None:
+        """Смена показываемого распределения."""
+        if self.isVisible():
+            self._load_distribution(*self._period_bounds(date.today()))
+        else:
+            self._dirty = True
+
+    def mark_dirty(self) -> None:
+        """Пометить все данные устаревшими (перезагрузятся при показе)."""
+        self._dirty = True
+        self._changed_days = None
+
+    def on_data_changed(self, change: DataChange) -> None:
+        """
+        Данные в БД изменились: запомнить затронутые дни.
+
+        При показе перечитываются только они (и период, если они в него
+        попадают); изменения других таблиц не требуют ничего.
+        """
+        if not change.touches(self.DATA_TABLES):
+            return
+        if change.days and self._changed_days is not None:
+            self._changed_days |= change.days
+        else:
+            self._changed_days = None
+        self._dirty = True
+
+    def refresh(self) -> None:
+        """Перечитать все данные (если виджет скрыт - отложить до показа)."""
+        self._changed_days = None
+        if not self.isVisible():
+            self._dirty = True
+            return
+        self._reload()
+
+    def showEvent(self, event) -> None:
+        """Виджет показан - догоняем отложенное обновление."""
+        super().showEvent(event)
+        if self._dirty and self._is_current():
+            # Помечено устаревшим, но с загрузки в БД ничего не менялось
+            self._dirty = False
+        if self._dirty:
+            self._reload()
+
+    def _data_versions(self) -> tuple:
+        """Версии таблиц вкладки в шине изменений."""
+        return tuple(self._db.changes.version(table) for table in self.DATA_TABLES)
+
+    def _is_current(self) -> bool:
+        """Загруженное актуально: тот же день и период, версии данных не менялись."""
+        today = date.today()
+        return (self._loaded_today == today
+                and self._loaded_period == self._period_bounds(today)
+                and self._loaded_versions == self._data_versions())
+
+    @timed("gui.stats.refresh")
+    def _reload(self) -> None:
+        """Загрузить из БД изменившееся с прошлой загрузки."""
+        self._dirty = False
+        # Версии - до чтения: запись во время загрузки вызовет ещё одну
+        self._loaded_versions = self._data_versions()
+
+        today = date.today()
+        year_start = today - timedelta(weeks=YearHeatmap.WEEKS)
+        full = self._changed_days is None or self._loaded_today != today
+        changed = self._changed_days or set()
+
+        # Итоги по дням за год: целиком при первой загрузке, дальше - только изменённые дни
+        if full:
+            self._year_totals = self._db.get_daily_totals(year_start, today)
+        else:
+            patch = sorted(day for day in changed if year_start <= day <= today)
+            if patch:
+                for day in patch:
+                    self._year_totals.pop(day, None)
+                self._year_totals.update(self._db.get_daily_totals(patch[0], patch[-1]))
+        self._heatmap.set_totals(self._year_totals, today)
+
+        start, end = self._period_bounds(today)
+        if full or (start, end) != self._loaded_period or any(start <= day <= end for day in changed):
+            self._load_range_stats(start, end)
+            self._load_distribution(start, end)
+            self._load_sessions_table(start, end)
+
+        if self._period_combo.currentIndex() == 0 or (end - start).days >= self.MAX_BAR_DAYS:
+            self._bar_chart.hide()
+        else:
+            totals = self._year_totals
+            if start < year_start:
+                totals = self._db.get_daily_totals(start, end)
+            self._bar_chart.set_days(totals, start, end)
+            self._bar_chart.show()
+
+        self._changed_days = set()
+        self._loaded_today = today
+        self._loaded_period = (start, end)
+
+    def _period_bounds(self, today: date) -> tuple:
+        """Первый и последний день выбранного периода."""
+        index = self._period_combo.currentIndex()
+        if index == 1:
+            return get_week_bounds(today)
+        if index == 2:
+            return today.replace(day=1), today
+        if index == 3:
+            return today - timedelta(days=29), today
+        if index == 4:
+            return today.replace(month=1, day=1), today
+        if index == 5:
+            return date.min, today
+        if index == self.CUSTOM_PERIOD:
+            start = self._start_edit.date().toPyDate()
+            end = self._end_edit.date().toPyDate()
+            return min(start, end), max(start, end)
+        return today, today
+
+    def _load_range_stats(self, start_date: date, end_date: date) -> None:
+        """Карточки за период (по нарастающим итогам, без пересчёта сессий)."""
+        stats = self._db.get_range_stats(start_date, end_date)
 
         self._total_card.set_value(format_duration(stats["total_time"]))
         self._sessions_card.set_value(str(stats["sessions_count"]))
         self._breaks_card.set_value(str(stats["breaks_count"]))
 
-        avg = (stats["total_time"] // stats["sessions_count"]
-               if stats["sessions_count"] > 0 else 0)
-        self._avg_card.set_value(format_duration(avg))
-
-        self._load_sessions_table([target_date])
-
-    def _load_period_stats(self, start_date: date, end_date: date) -> None:
-        """Загрузить статистику за период."""
-        weekly_stats = self._db.get_weekly_stats(start_date, end_date)
-
-        total_time = sum(day.get("total_time", 0) for day in weekly_stats)
-        sessions_count = sum(day.get("sessions_count", 0) for day in weekly_stats)
-
-        self._total_card.set_value(format_duration(total_time))
-        self._sessions_card.set_value(str(sessions_count))
-
-        avg = total_time // sessions_count if sessions_count > 0 else 0
-        self._avg_card.set_value(format_duration(avg))
-
-        dates = []
-        current = start_date
-        while current <= end_date:
-            dates.append(current)
-            current += timedelta(days=1)
-
-        self._load_sessions_table(dates)
+        productivity = stats["productivity"]
+        self._productivity_label.setText(
+            f"Продуктивное: {format_duration(productivity['productive'])}  ·  "
+            f"Отвлекающее: {format_duration(productivity['distracting'])}  ·  "
+            f"Нейтральное: {format_duration(productivity['neutral'])}"
+        )
+
+    def _load_distribution(self, start_date: date, end_date: date) -> None:
+        """Медиана сессии, перцентили и гистограмма выбранной метрики за период."""
+        sessions = self._db.get_duration_histogram("session", start_date, end_date)
+        self._median_card.set_value(format_duration(int(sessions.quantile(0.5))))
+
+        metric = self.DISTRIBUTIONS[self._distribution_combo.currentText()]
+        histogram = (sessions if metric == "session"
+                     else self._db.get_duration_histogram(metric, start_date, end_date))
+        self._histogram_chart.set_histogram(histogram)
+        if histogram.count:
+            self._quantiles_label.setText(
+                f"медиана {format_duration(int(histogram.quantile(0.5)))}  ·  "
+                f"p90 {format_duration(int(histogram.quantile(0.9)))}  ·  "
+                f"среднее {format_duration(int(histogram.mean()))}  ·  {histogram.count} шт."
+            )
+        else:
+            self._quantiles_label.setText("нет данных")
 
-    def _load_sessions_table(self, dates: list) -> None:
-        """Загрузить таблицу сессий."""
+    def _load_sessions_table(self, start_date: date, end_date: date) -> None:
+        """Загрузить таблицу сессий (не больше MAX_TABLE_ROWS последних)."""
         self._sessions_table.setRowCount(0)
 
-        all_sessions = []
-        for d in dates:
-            sessions = self._db.get_sessions_by_date(d)
-            all_sessions.extend(sessions)
-
-        all_sessions.sort(key=lambda s: s.start_time, reverse=True)
+        all_sessions = self._db.get_sessions_in_range(start_date, end_date, self.MAX_TABLE_ROWS)
+        if len(all_sessions) == self.MAX_TABLE_ROWS:
+            self._table_label.setText(f"История сессий (последние {self.MAX_TABLE_ROWS})")
+        else:
+            self._table_label.setText("История сессий")
 
         for session in all_sessions:
             row = self._sessions_table.rowCount()
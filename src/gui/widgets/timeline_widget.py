@@ -0,0 +1,464 @@
+"""Лента активностей: день или несколько недель одной полосой.
+
+Отрезки не превращаются в виджеты - лента рисуется сама и только
+в видимой части. Время делится на плитки по TILE_WIDTH пикселей;
+готовая плитка хранится как QPixmap и при прокрутке просто копируется.
+Отрезки короче пикселя сливаются: пиксель закрашивается типом,
+занявшим в нём больше всего времени, так что число прямоугольников
+в плитке не превышает её ширины при любом числе активностей.
+
+Данные грузятся по дням (дерево интервалов на день из БД) по мере
+того, как дни попадают в видимую область.
+"""
+
+import logging
+import math
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from PyQt6.QtWidgets import QWidget, QToolTip, QSizePolicy
+from PyQt6.QtCore import Qt, QObject, QPoint, QRect, QThreadPool, pyqtSignal
+from PyQt6.QtGui import QColor, QPainter, QPixmap
+
+from database.db_manager import DatabaseManager
+from models.activity import Activity, ActivityType
+from utils.helpers import format_duration
+from utils.interval_tree import IntervalTree
+from utils.metrics import timed
+
+
+TYPE_COLORS = {
+    ActivityType.PRODUCTIVE: QColor("#22C55E"),
+    ActivityType.DISTRACTING: QColor("#EF4444"),
+    ActivityType.NEUTRAL: QColor("#6B7280"),
+    ActivityType.UNKNOWN: QColor("#9CA3AF"),
+}
+
+# Начало координат ленты: время - секунды от этой даты (без часовых поясов,
+# как и в БД), пиксель x - секунды x * seconds_per_pixel
+_EPOCH = datetime(2000, 1, 1)
+
+Segment = Tuple[float, float, ActivityType]
+Run = Tuple[int, int, ActivityType]
+
+
+def to_seconds(moment: datetime) -> float:
+    """Координата ленты для момента времени."""
+    return (moment - _EPOCH).total_seconds()
+
+
+def from_seconds(seconds: float) -> datetime:
+    """Момент времени для координаты ленты."""
+    return _EPOCH + timedelta(seconds=seconds)
+
+
+def level_of_detail(segments: Iterable[Segment], origin: float,
+                    seconds_per_pixel: float) -> List[Run]:
+    """
+    Свести отрезки к прямоугольникам на пиксельной сетке.
+
+    Args:
+        segments: Отрезки (начало, конец, тип) в секундах, по возрастанию начала
+        origin: Координата пикселя 0
+        seconds_per_pixel: Масштаб
+
+    Returns:
+        Столбцы [x0, x1) с типом; соседние одного типа объединены. Отрезки
+        уже пикселя копятся в своём пикселе, и он получает тип, набравший
+        больше всего времени.
+    """
+    runs: List[Run] = []
+    bucket_x: Optional[int] = None
+    bucket: Dict[ActivityType, float] = {}
+
+    def emit(x0: int, x1: int, activity_type: ActivityType) -> None:
+        if runs:
+            last_x0, last_x1, last_type = runs[-1]
+            x0 = max(x0, last_x1)
+            if x1 <= x0:
+                return
+            if last_type == activity_type and last_x1 == x0:
+                runs[-1] = (last_x0, x1, activity_type)
+                return
+        runs.append((x0, x1, activity_type))
+
+    def flush() -> None:
+        if bucket_x is not None and bucket:
+            emit(bucket_x, bucket_x + 1, max(bucket, key=bucket.get))
+
+    for start, end, activity_type in segments:
+        if end <= start:
+            continue
+        x0 = (start - origin) / seconds_per_pixel
+        x1 = (end - origin) / seconds_per_pixel
+
+        if x1 - x0 >= 1:
+            flush()
+            bucket_x, bucket = None, {}
+            emit(int(round(x0)), int(round(x1)), activity_type)
+        else:
+            column = math.floor(x0)
+            if column != bucket_x:
+                flush()
+                bucket_x, bucket = column, {}
+            bucket[activity_type] = bucket.get(activity_type, 0.0) + (end - start)
+
+    flush()
+    return runs
+
+
+class TileCache:
+    """Плитки ленты (QPixmap) с вытеснением давно не использованных."""
+
+    def __init__(self, capacity: int):
+        self._capacity = capacity
+        # ключ (уровень масштаба, номер) -> (плитка, начало, конец в секундах)
+        self._tiles: "OrderedDict[Tuple[int, int], Tuple[QPixmap, float, float]]" = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def __len__(self) -> int:
+        return len(self._tiles)
+
+    def get(self, key: Tuple[int, int]) -> Optional[QPixmap]:
+        """Плитка по ключу или None."""
+        entry = self._tiles.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._tiles.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key: Tuple[int, int], pixmap: QPixmap, start: float, end: float) -> None:
+        """Сохранить плитку, покрывающую [start, end) секунд."""
+        self._tiles[key] = (pixmap, start, end)
+        self._tiles.move_to_end(key)
+        while len(self._tiles) > self._capacity:
+            self._tiles.popitem(last=False)
+
+    def invalidate(self, start: Optional[float] = None, end: Optional[float] = None) -> None:
+        """Удалить плитки, задевающие [start, end) секунд (без аргументов - все)."""
+        if start is None:
+            self._tiles.clear()
+            return
+        stale = [key for key, (_, tile_start, tile_end) in self._tiles.items()
+                 if tile_start < end and tile_end > start]
+        for key in stale:
+            del self._tiles[key]
+
+
+class DayLoader(QObject):
+    """
+    Загрузка дней ленты в пуле потоков.
+
+    Ответ приходит сигналом в GUI-поток; ответы, запрошенные до
+    invalidate(), отбрасываются.
+    """
+
+    day_loaded = pyqtSignal(object, object)  # date, IntervalTree
+    _finished = pyqtSignal(int, object, object)  # поколение, date, IntervalTree
+
+    def __init__(self, db_manager: DatabaseManager, threaded: bool = True, parent=None):
+        super().__init__(parent)
+        self._logger = logging.getLogger(__name__)
+        self._db = db_manager
+        self._threaded = threaded
+        self._generation: int = 0
+        self._pending: Set[date] = set()
+        self._finished.connect(self._on_finished)
+
+    def request(self, day: date) -> None:
+        """Загрузить день, если он ещё не запрошен."""
+        if day in self._pending:
+            return
+        self._pending.add(day)
+        generation = self._generation
+        if self._threaded:
+            QThreadPool.globalInstance().start(lambda: self._run(generation, day))
+        else:
+            self._run(generation, day)
+
+    def invalidate(self, day: Optional[date] = None) -> None:
+        """Забыть выполняющиеся загрузки (все или только если среди них day)."""
+        if day is None or day in self._pending:
+            # Поколение общее: ожидаемые дни запросятся заново при отрисовке
+            self._pending.clear()
+            self._generation += 1
+
+    def _run(self, generation: int, day: date) -> None:
+        """Прочитать день (в потоке пула)."""
+        start = datetime.combine(day, datetime.min.time())
+        try:
+            tree = self._db.get_activity_index(start, start + timedelta(days=1))
+        except Exception as e:
+            self._logger.warning(f"Ошибка загрузки ленты за {day}: {e}")
+            tree = IntervalTree()
+        try:
+            self._finished.emit(generation, day, tree)
+        except RuntimeError:
+            pass  # виджет уже удалён
+
+    def _on_finished(self, generation: int, day: date, tree: IntervalTree) -> None:
+        if generation != self._generation:
+            return
+        self._pending.discard(day)
+        self.day_loaded.emit(day, tree)
+
+
+class TimelineWidget(QWidget):
+    """
+    Лента активностей, раскрашенная по ActivityType.
+
+    Колесо мыши меняет масштаб вокруг курсора (от секунды на пиксель
+    до нескольких недель на экран), перетаскивание - сдвигает ленту,
+    двойной щелчок возвращает к целому дню. Подсказка показывает
+    активность под курсором.
+    """
+
+    TILE_WIDTH = 256
+    MAX_TILES = 96
+    MAX_DAYS = 62
+
+    # Масштаб: 2 ** (level / 2) секунд на пиксель, от 1 с до ~1.2 ч
+    MAX_LEVEL = 24
+
+    BAR_TOP = 6
+    BAR_HEIGHT = 28
+    AXIS_HEIGHT = 18
+
+    # Шаги подписей оси, секунды
+    _TICK_STEPS = [60, 300, 900, 1800, 3600, 3 * 3600, 6 * 3600, 86400, 7 * 86400]
+    _MIN_TICK_SPACING = 70  # пикселей
+
+    def __init__(self, db_manager: DatabaseManager, parent=None, threaded: bool = True):
+        super().__init__(parent)
+        self._db = db_manager
+        self._loader = DayLoader(db_manager, threaded, self)
+        self._loader.day_loaded.connect(self._on_day_loaded)
+
+        self._days: "OrderedDict[date, IntervalTree]" = OrderedDict()
+        self._tiles = TileCache(self.MAX_TILES)
+        self.tiles_rendered: int = 0
+
+        self._level: int = 0
+        self._offset: int = 0  # номер пикселя у левого края
+        self._fit_day: Optional[date] = date.today()
+        self._drag_x: Optional[int] = None
+
+        self.setMouseTracking(True)
+        self.setMinimumHeight(self.BAR_TOP + self.BAR_HEIGHT + self.AXIS_HEIGHT)
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
+
+    # === Масштаб и положение ===
+
+    @staticmethod
+    def seconds_per_pixel(level: int) -> float:
+        """Секунд в пикселе на уровне масштаба."""
+        return 2 ** (level / 2)
+
+    @property
+    def level(self) -> int:
+        """Текущий уровень масштаба."""
+        return self._level
+
+    def visible_range(self) -> Tuple[datetime, datetime]:
+        """Видимый отрезок времени."""
+        spp = self.seconds_per_pixel(self._level)
+        return (from_seconds(self._offset * spp),
+                from_seconds((self._offset + max(1, self.width())) * spp))
+
+    def show_day(self, day: date) -> None:
+        """Показать день целиком."""
+        self._fit_day = day
+        self._apply_fit()
+        self.update()
+
+    def _apply_fit(self) -> None:
+        """Подобрать масштаб, при котором день помещается в ширину."""
+        width = max(1, self.width())
+        level = 0
+        while level < self.MAX_LEVEL and self.seconds_per_pixel(level) * width < 86400:
+            level += 1
+        self._level = level
+        day_start = to_seconds(datetime.combine(self._fit_day, datetime.min.time()))
+        self._offset = int(day_start / self.seconds_per_pixel(level))
+
+    def zoom(self, steps: int, anchor_x: Optional[int] = None) -> None:
+        """Изменить масштаб на steps уровней (меньше - крупнее), держа точку anchor_x."""
+        level = min(self.MAX_LEVEL, max(0, self._level + steps))
+        if level == self._level:
+            return
+        anchor_x = self.width() // 2 if anchor_x is None else anchor_x
+        anchor = (self._offset + anchor_x) * self.seconds_per_pixel(self._level)
+        self._level = level
+        self._offset = int(round(anchor / self.seconds_per_pixel(level))) - anchor_x
+        self._fit_day = None
+        self.update()
+
+    def scroll_by(self, pixels: int) -> None:
+        """Сдвинуть ленту на pixels пикселей (положительное - к более позднему)."""
+        self._offset += pixels
+        self._fit_day = None
+        self.update()
+
+    # === Данные ===
+
+    def refresh(self, day: Optional[date] = None) -> None:
+        """Перечитать день (по умолчанию сегодняшний) - в нём могли появиться активности."""
+        day = day or date.today()
+        self._days.pop(day, None)
+        self._loader.invalidate(day)
+        start = to_seconds(datetime.combine(day, datetime.min.time()))
+        self._tiles.invalidate(start, start + 86400)
+        self.update()
+
+    def activity_at(self, moment: datetime) -> Optional[Activity]:
+        """Активность в момент moment среди загруженных дней."""
+        tree = self._days.get(moment.date())
+        if tree is None:
+            return None
+        found = tree.at(moment)
+        return found[-1] if found else None
+
+    def _on_day_loaded(self, day: date, tree: IntervalTree) -> None:
+        """День загружен - сохранить и перерисовать его плитки."""
+        self._days[day] = tree
+        self._days.move_to_end(day)
+        while len(self._days) > self.MAX_DAYS:
+            self._days.popitem(last=False)
+        start = to_seconds(datetime.combine(day, datetime.min.time()))
+        self._tiles.invalidate(start, start + 86400)
+        self.update()
+
+    def _days_between(self, start: float, end: float) -> List[date]:
+        """Дни, задевающие отрезок [start, end) секунд."""
+        first = from_seconds(start).date()
+        last = from_seconds(end - 1e-6).date()
+        return [first + timedelta(days=i) for i in range((last - first).days + 1)]
+
+    def _segments(self, start: float, end: float) -> List[Segment]:
+        """Отрезки загруженных дней внутри [start, end), обрезанные по дням."""
+        now = to_seconds(datetime.now())
+        segments: List[Segment] = []
+        for day in self._days_between(start, end):
+            tree = self._days[day]
+            day_start = to_seconds(datetime.combine(day, datetime.min.time()))
+            low, high = max(start, day_start), min(end, day_start + 86400)
+            for activity in tree.overlapping(from_seconds(low), from_seconds(high)):
+                seg_end = to_seconds(activity.end_time) if activity.end_time else now
+                segments.append((
+                    max(to_seconds(activity.start_time), low),
+                    min(seg_end, high),
+                    activity.activity_type
+                ))
+        return segments
+
+    # === Отрисовка ===
+
+    def _tile(self, index: int) -> Optional[QPixmap]:
+        """Плитка index текущего масштаба (None, пока её дни не загружены)."""
+        key = (self._level, index)
+        pixmap = self._tiles.get(key)
+        if pixmap is not None:
+            return pixmap
+
+        spp = self.seconds_per_pixel(self._level)
+        start = index * self.TILE_WIDTH * spp
+        end = start + self.TILE_WIDTH * spp
+
+        days = self._days_between(start, end)
+        for day in days:
+            if day not in self._days:
+                self._loader.request(day)
+        if any(day not in self._days for day in days):
+            return None  # плитка дорисуется, когда дни загрузятся
+
+        pixmap = QPixmap(self.TILE_WIDTH, self.BAR_HEIGHT)
+        pixmap.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(pixmap)
+        for x0, x1, activity_type in level_of_detail(self._segments(start, end), start, spp):
+            painter.fillRect(x0, 0, x1 - x0, self.BAR_HEIGHT, TYPE_COLORS[activity_type])
+        painter.end()
+
+        self.tiles_rendered += 1
+        self._tiles.put(key, pixmap, start, end)
+        return pixmap
+
+    @timed("gui.timeline.paint")
+    def paintEvent(self, event) -> None:
+        painter = QPainter(self)
+        width = self.width()
+
+        painter.fillRect(QRect(0, self.BAR_TOP, width, self.BAR_HEIGHT), QColor("#F3F4F6"))
+
+        first = self._offset // self.TILE_WIDTH
+        last = (self._offset + width - 1) // self.TILE_WIDTH
+        for index in range(first, last + 1):
+            x = index * self.TILE_WIDTH - self._offset
+            pixmap = self._tile(index)
+            if pixmap is None:
+                painter.fillRect(QRect(x, self.BAR_TOP, self.TILE_WIDTH, self.BAR_HEIGHT),
+                                 QColor("#E5E7EB"))  # день ещё грузится
+            else:
+                painter.drawPixmap(x, self.BAR_TOP, pixmap)
+
+        self._paint_axis(painter, width)
+        painter.end()
+
+    def _paint_axis(self, painter: QPainter, width: int) -> None:
+        """Деления и подписи времени под лентой."""
+        spp = self.seconds_per_pixel(self._level)
+        step = next((s for s in self._TICK_STEPS if s / spp >= self._MIN_TICK_SPACING),
+                    self._TICK_STEPS[-1])
+        label_format = "%d.%m" if step >= 86400 else "%H:%M"
+
+        top = self.BAR_TOP + self.BAR_HEIGHT
+        painter.setPen(QColor("#6B7280"))
+        start = self._offset * spp
+        tick = math.ceil(start / step) * step
+        while tick < start + width * spp:
+            x = int(round(tick / spp)) - self._offset
+            painter.drawLine(x, top, x, top + 4)
+            painter.drawText(x + 3, top + self.AXIS_HEIGHT - 4, from_seconds(tick).strftime(label_format))
+            tick += step
+
+    # === События ===
+
+    def resizeEvent(self, event) -> None:
+        super().resizeEvent(event)
+        if self._fit_day is not None:
+            self._apply_fit()
+
+    def wheelEvent(self, event) -> None:
+        steps = -1 if event.angleDelta().y() > 0 else 1
+        self.zoom(steps, int(event.position().x()))
+        event.accept()
+
+    def mousePressEvent(self, event) -> None:
+        if event.button() == Qt.MouseButton.LeftButton:
+            self._drag_x = int(event.position().x())
+
+    def mouseReleaseEvent(self, event) -> None:
+        self._drag_x = None
+
+    def mouseDoubleClickEvent(self, event) -> None:
+        start, end = self.visible_range()
+        self.show_day((start + (end - start) / 2).date())
+
+    def mouseMoveEvent(self, event) -> None:
+        x = int(event.position().x())
+        if self._drag_x is not None:
+            self.scroll_by(self._drag_x - x)
+            self._drag_x = x
+            return
+
+        moment = from_seconds((self._offset + x) * self.seconds_per_pixel(self._level))
+        activity = self.activity_at(moment)
+        if activity is None:
+            QToolTip.hideText()
+            return
+        text = f"{activity.application_name}\n{activity.window_title}\n" \
+               f"{activity.start_time:%H:%M}, {format_duration(activity.duration)}"
+        QToolTip.showText(self.mapToGlobal(QPoint(x, self.BAR_TOP + self.BAR_HEIGHT)), text, self)
@@ -8,14 +8,23 @@ from PyQt6.QtCore import Qt
 
 from core.tracker import TimeTracker
 from utils.helpers import format_time
+from utils.metrics import timed
 
 
 class TimerWidget(QWidget):
-    """Виджет отображения и управления таймером."""
+    """
+    Виджет отображения и управления таймером.
+
+    Пока виджет не виден (окно свёрнуто в трей), метки не обновляются
+    и сводка за день не запрашивается из БД - виджет только помечает себя
+    устаревшим и догоняет состояние одним обновлением при показе.
+    """
 
     def __init__(self, tracker: TimeTracker, parent=None):
         super().__init__(parent)
         self._tracker = tracker
+        self._today_bucket: int = -1
+        self._dirty: bool = False
         self._setup_ui()
         self._connect_signals()
         self._update_buttons_state()
@@ -134,7 +143,15 @@ class TimerWidget(QWidget):
             self._start_btn.setText("Старт")
 
     def _update_today_label(self) -> None:
-        """Обновить метку общего времени за сегодня."""
+        """Обновить метку общего времени за сегодня (скрытый виджет - при показе)."""
+        if not self.isVisible():
+            self._dirty = True
+            return
+        self._load_today_total()
+
+    @timed("gui.timer.update_today")
+    def _load_today_total(self) -> None:
+        """Запросить общее время за сегодня и вывести его."""
         total = self._tracker.get_today_total()
         hours, remainder = divmod(total, 3600)
         minutes = remainder // 60
@@ -154,10 +171,15 @@ class TimerWidget(QWidget):
 
     def _on_time_updated(self, seconds: int) -> None:
         """Обновление времени."""
+        if not self.isVisible():
+            self._dirty = True
+            return
+
         self._timer_label.setText(format_time(seconds))
 
-        # Обновляем общее время каждые 30 секунд
-        if seconds % 30 == 0:
+        # Обновляем общее время каждые 30 секунд (тики могут приходить неравномерно)
+        if seconds // 30 != self._today_bucket:
+            self._today_bucket = seconds // 30
             self._update_today_label()
 
     def _on_session_started(self, session) -> None:
@@ -185,3 +207,11 @@ class TimerWidget(QWidget):
         self._timer_label.setText("00:00:00")
         self._update_buttons_state()
         self._update_today_label()
+
+    def showEvent(self, event) -> None:
+        """Виджет показан - догоняем пропущенные обновления."""
+        super().showEvent(event)
+        if self._dirty:
+            self._dirty = False
+            self._today_bucket = self._tracker.elapsed_seconds // 30
+            self._update_display()
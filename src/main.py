@@ -1,6 +1,7 @@
 """Главный модуль приложения."""
 
 import sys
+import argparse
 import logging
 from pathlib import Path
 
@@ -8,30 +9,62 @@ from PyQt6.QtWidgets import QApplication
 from PyQt6.QtCore import Qt
 
 from gui.main_window import MainWindow
+from core.activity_sources import PlatformSource, RecordingSource
 from database.db_manager import DatabaseManager
 from utils.config import Config
+from utils import metrics, tracing
+from utils.log_pipeline import LoggingPipeline, setup_logging as setup_log_pipeline
 
 
-def setup_logging() -> None:
-    """Настройка системы логирования."""
+def setup_logging(level: int = logging.INFO) -> LoggingPipeline:
+    """Настройка системы логирования (запись на диск в фоновом потоке)."""
     log_dir = Path(__file__).parent.parent / "data" / "logs"
-    log_dir.mkdir(parents = True, exist_ok = True)
-
-    logging.basicConfig(
-        level = logging.INFO,
-        format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        handlers = [
-            logging.FileHandler(log_dir / "app.log", encoding = "utf-8"),
-            logging.StreamHandler()
-        ]
+    return setup_log_pipeline(log_dir, level = level)
+
+
+def parse_args(argv: list) -> argparse.Namespace:
+    """Разобрать аргументы командной строки (аргументы Qt пропускаются)."""
+    parser = argparse.ArgumentParser(prog = "work-chronometer")
+    parser.add_argument(
+        "--diagnostics", action = "store_true",
+        help = "показать вкладку диагностики (Ctrl+Shift+D)"
+    )
+    parser.add_argument(
+        "--metrics-dump", type = Path, metavar = "PATH",
+        help = "сохранить метрики производительности в JSON при выходе"
+    )
+    parser.add_argument(
+        "--trace", nargs = "?", type = Path, metavar = "PATH",
+        const = tracing.default_output_dir() / "trace-exit.json",
+        help = "записывать трассу (Chrome Trace) и сохранить её при выходе"
     )
+    parser.add_argument(
+        "--record-activity", type = Path, metavar = "PATH",
+        help = "записывать опросы активности в файл трассы (для bench_pipeline.py)"
+    )
+    parser.add_argument(
+        "--log-level", default = "INFO",
+        choices = ["DEBUG", "INFO", "WARNING", "ERROR"],
+        help = "уровень логирования"
+    )
+    args, _ = parser.parse_known_args(argv[1:])
+    return args
 
 
 def main() -> int:
     """Главная функция запуска приложения."""
-    setup_logging()
+    args = parse_args(sys.argv)
+    log_pipeline = setup_logging(getattr(logging, args.log_level))
     logger = logging.getLogger(__name__)
 
+    if args.diagnostics or args.metrics_dump:
+        metrics.enable()
+
+    if args.trace:
+        tracing.enable()
+    elif tracing.configure_from_env():
+        args.trace = tracing.default_output_dir() / "trace-exit.json"
+
     logger.info("Запуск приложения Work Chronometer")
 
     # Инициализация конфигурации
@@ -47,13 +80,34 @@ def main() -> int:
     app.setApplicationVersion("1.0.0")
     app.setOrganizationName("WorkChronometer")
 
+    activity_source = None
+    if args.record_activity:
+        activity_source = RecordingSource(PlatformSource(), args.record_activity)
+        logger.info(f"Опросы активности записываются в {args.record_activity}")
+
     # Создание и отображение главного окна
-    window = MainWindow(db_manager, config)
+    window = MainWindow(
+        db_manager, config,
+        show_diagnostics = args.diagnostics,
+        activity_source = activity_source
+    )
     window.show()
 
     logger.info("Приложение успешно запущено")
 
-    return app.exec()
+    exit_code = app.exec()
+
+    if args.metrics_dump:
+        metrics.registry.dump(args.metrics_dump)
+        logger.info(f"Метрики сохранены в {args.metrics_dump}")
+
+    if args.trace:
+        tracing.tracer.dump(args.trace)
+        logger.info(f"Трасса сохранена в {args.trace}")
+
+    log_pipeline.stop()
+
+    return exit_code
 
 
 if __name__ == "__main__":
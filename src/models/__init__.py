@@ -2,5 +2,7 @@
 
 from .session import Session, SessionStatus
 from .activity import Activity, ActivityType
+from .input_minute import InputMinute
+from .focus_day import FocusDay
 
-__all__ = ["Session", "SessionStatus", "Activity", "ActivityType"]
+__all__ = ["Session", "SessionStatus", "Activity", "ActivityType", "InputMinute", "FocusDay"]
@@ -33,9 +33,9 @@ class Activity:
         """Проверка, активна ли запись."""
         return self.end_time is None
 
-    def stop(self) -> None:
-        """Остановить запись активности."""
-        self.end_time = datetime.now()
+    def stop(self, at: Optional[datetime] = None) -> None:
+        """Остановить запись активности (в момент at, по умолчанию - сейчас)."""
+        self.end_time = at or datetime.now()
         if self.start_time:
             self.duration = int((self.end_time - self.start_time).total_seconds())
 
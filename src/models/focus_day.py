@@ -0,0 +1,41 @@
+"""Модель показателей фокуса за день."""
+
+from dataclasses import dataclass, field
+from datetime import date
+from typing import List
+
+
+@dataclass
+class FocusDay:
+    """Серии непрерывной продуктивной работы и переключения за один день."""
+
+    day: date
+    focus_seconds: int = 0  # время в засчитанных сериях фокуса
+    deep_work_seconds: int = 0  # время в длинных сериях (глубокая работа)
+    longest_streak: int = 0  # самая длинная серия, секунды
+    streaks: int = 0  # число засчитанных серий
+    interruptions: int = 0  # серии, прерванные отвлекающим приложением
+    switches: int = 0  # смены приложения
+    tracked_seconds: int = 0  # всё время активностей
+    # Длительности серий (для гистограммы; из БД не читаются)
+    streak_durations: List[int] = field(default_factory=list)
+
+    @property
+    def switches_per_hour(self) -> float:
+        """Переключений на час отслеженного времени."""
+        if self.tracked_seconds <= 0:
+            return 0.0
+        return self.switches * 3600 / self.tracked_seconds
+
+    def to_dict(self) -> dict:
+        """Преобразовать в словарь."""
+        return {
+            "day": self.day.isoformat(),
+            "focus_seconds": self.focus_seconds,
+            "deep_work_seconds": self.deep_work_seconds,
+            "longest_streak": self.longest_streak,
+            "streaks": self.streaks,
+            "interruptions": self.interruptions,
+            "switches": self.switches,
+            "tracked_seconds": self.tracked_seconds
+        }
@@ -0,0 +1,32 @@
+"""Модель поминутной интенсивности ввода."""
+
+from dataclasses import dataclass
+from datetime import datetime
+
+
+@dataclass
+class InputMinute:
+    """Счётчики клавиатуры и мыши за одну минуту в одном приложении."""
+
+    minute: datetime
+    application_name: str = ""
+    keys: int = 0  # нажатия клавиш
+    clicks: int = 0  # нажатия кнопок мыши
+    scrolls: int = 0  # шаги колеса
+    motion: int = 0  # события перемещения мыши
+
+    @property
+    def events(self) -> int:
+        """Всего событий ввода."""
+        return self.keys + self.clicks + self.scrolls + self.motion
+
+    def to_dict(self) -> dict:
+        """Преобразовать в словарь."""
+        return {
+            "minute": self.minute.isoformat(),
+            "application_name": self.application_name,
+            "keys": self.keys,
+            "clicks": self.clicks,
+            "scrolls": self.scrolls,
+            "motion": self.motion
+        }
@@ -49,10 +49,10 @@ class Session:
         if self.status == SessionStatus.PAUSED:
             self.status = SessionStatus.ACTIVE
 
-    def complete(self) -> None:
-        """Завершить сессию."""
+    def complete(self, at: Optional[datetime] = None) -> None:
+        """Завершить сессию (в момент at, по умолчанию - сейчас)."""
         self.status = SessionStatus.COMPLETED
-        self.end_time = datetime.now()
+        self.end_time = at or datetime.now()
 
     def to_dict(self) -> dict:
         """Преобразовать в словарь для сохранения."""
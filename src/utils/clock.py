@@ -0,0 +1,112 @@
+"""Источник времени для ядра приложения.
+
+Трекер, менеджер перерывов, монитор активности и сервис пробуждений
+берут время не напрямую из time/datetime, а из переданного Clock.
+В приложении это SystemClock; в тестах и бенчмарках - VirtualClock,
+который перематывает время мгновенно и сам вызывает пробуждения
+ClockService вместо QTimer, так что недели работы проигрываются за секунды.
+"""
+
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+
+class Clock:
+    """Часы: монотонное время для интервалов и настенное - для записей."""
+
+    def monotonic(self) -> float:
+        """Монотонное время в секундах."""
+        raise NotImplementedError
+
+    def now(self) -> datetime:
+        """Текущие дата и время."""
+        raise NotImplementedError
+
+    def time(self) -> float:
+        """Unix-время в секундах."""
+        return self.now().timestamp()
+
+    def attach(self, service) -> bool:
+        """
+        Взять на себя пробуждения сервиса.
+
+        Returns:
+            True, если сервис не должен заводить QTimer
+        """
+        return False
+
+
+class SystemClock(Clock):
+    """Настоящие часы системы."""
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def now(self) -> datetime:
+        return datetime.now()
+
+    def time(self) -> float:
+        return time.time()
+
+
+SYSTEM_CLOCK = SystemClock()
+
+
+class VirtualClock(Clock):
+    """
+    Управляемые часы.
+
+    Время стоит на месте, пока его не перемотают advance()/advance_to().
+    При перемотке присоединённые сервисы пробуждений срабатывают ровно
+    в назначенные сроки, по порядку, как если бы время шло на самом деле.
+    """
+
+    # Столько пробуждений подряд без движения времени считается зацикливанием
+    MAX_WAKEUPS_AT_INSTANT = 10_000
+
+    def __init__(self, start: Optional[datetime] = None):
+        self._start = start or datetime(2024, 1, 1)
+        self._elapsed: float = 0.0
+        self._services: List = []
+
+    def monotonic(self) -> float:
+        return self._elapsed
+
+    def now(self) -> datetime:
+        return self._start + timedelta(seconds=self._elapsed)
+
+    def attach(self, service) -> bool:
+        self._services.append(service)
+        return True
+
+    def advance(self, seconds: float) -> None:
+        """Перемотать время на seconds секунд, выполняя пробуждения по пути."""
+        target = self._elapsed + seconds
+        repeats = 0
+
+        while True:
+            pending = [(due, service) for service in self._services
+                       for due in (service.next_due(),) if due is not None]
+            if not pending:
+                break
+            due, service = min(pending, key=lambda item: item[0])
+            if due > target:
+                break
+
+            if due > self._elapsed:
+                self._elapsed = due
+                repeats = 0
+            else:
+                repeats += 1
+                if repeats > self.MAX_WAKEUPS_AT_INSTANT:
+                    raise RuntimeError(f"Пробуждения зациклились на {self.now().isoformat()}")
+            service.wake()
+
+        self._elapsed = max(self._elapsed, target)
+
+    def advance_to(self, moment: datetime) -> None:
+        """Перемотать время до moment (назад время не идёт)."""
+        seconds = (moment - self.now()).total_seconds()
+        if seconds > 0:
+            self.advance(seconds)
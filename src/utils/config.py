@@ -29,6 +29,12 @@ class AppSettings:
     idle_detection_enabled: bool = True
     idle_timeout: int = 300  # секунды бездействия для автопаузы
 
+    # Различать скрипты интерпретаторов и Electron-приложения по командной строке
+    detailed_app_names: bool = False
+
+    # Поминутные счётчики клавиатуры и мыши по приложениям (только количество)
+    input_intensity_enabled: bool = False
+
     # Категории приложений для продуктивности
     productive_apps: List[str] = None
     distracting_apps: List[str] = None
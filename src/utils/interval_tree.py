@@ -0,0 +1,117 @@
+"""Дерево интервалов для загруженного диапазона времени.
+
+Строится один раз по отрезкам [start, end) - активностям или сессиям
+за день, неделю, видимую часть ленты - и дальше отвечает на вопросы
+«что было в момент t», «что пересекает отрезок» и «где пусто» за
+O(log n + k) без обращений к БД.
+
+Дерево статическое: отрезки сортируются по началу, корень поддерева -
+середина своего диапазона массива, а для каждого поддерева хранится
+максимальный конец. Поддерево, чей максимальный конец не дотягивает
+до запроса, отбрасывается целиком. Ключи - любые сравнимые значения
+(datetime, секунды).
+"""
+
+from typing import Any, Generic, Iterable, List, Optional, Tuple, TypeVar
+
+
+T = TypeVar("T")
+
+
+class IntervalTree(Generic[T]):
+    """Статическое дерево интервалов с полуоткрытыми отрезками [start, end)."""
+
+    def __init__(self, intervals: Iterable[Tuple[Any, Any, T]] = ()):
+        items = sorted(intervals, key=lambda item: item[0])
+        self._starts: List[Any] = [item[0] for item in items]
+        self._ends: List[Any] = [item[1] for item in items]
+        self._values: List[T] = [item[2] for item in items]
+        self._max_end: List[Any] = list(self._ends)
+        if items:
+            self._build(0, len(items))
+
+    def _build(self, lo: int, hi: int) -> Any:
+        """Заполнить максимальные концы поддерева [lo, hi) и вернуть его максимум."""
+        mid = (lo + hi) // 2
+        best = self._ends[mid]
+        if lo < mid:
+            best = max(best, self._build(lo, mid))
+        if mid + 1 < hi:
+            best = max(best, self._build(mid + 1, hi))
+        self._max_end[mid] = best
+        return best
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __iter__(self):
+        """Отрезки (start, end, value) по возрастанию начала."""
+        return iter(zip(self._starts, self._ends, self._values))
+
+    def _search(self, lo: Any, hi: Any, closed: bool) -> List[int]:
+        """
+        Индексы отрезков с end > lo и start < hi (start <= hi при closed).
+
+        Обход без рекурсии; результат упорядочен по началу.
+        """
+        found: List[int] = []
+        starts, ends, max_end = self._starts, self._ends, self._max_end
+        stack = [(0, len(starts))] if starts else []
+        while stack:
+            left, right = stack.pop()
+            mid = (left + right) // 2
+            if max_end[mid] <= lo:
+                continue  # всё поддерево кончается до запроса
+            if left < mid:
+                stack.append((left, mid))
+            start = starts[mid]
+            if start < hi or (closed and start == hi):
+                # Правее начала только больше - правое поддерево смотрим лишь здесь
+                if ends[mid] > lo:
+                    found.append(mid)
+                if mid + 1 < right:
+                    stack.append((mid + 1, right))
+        found.sort()
+        return found
+
+    def at(self, point: Any) -> List[T]:
+        """Отрезки, содержащие момент point (start <= point < end)."""
+        return [self._values[i] for i in self._search(point, point, True)]
+
+    def overlapping(self, start: Any, end: Any) -> List[T]:
+        """Отрезки, пересекающие [start, end), по возрастанию начала."""
+        if not start < end:
+            return []
+        return [self._values[i] for i in self._search(start, end, False)]
+
+    def covered(self, start: Any, end: Any) -> List[Tuple[Any, Any]]:
+        """Объединение отрезков внутри [start, end), обрезанное по его границам."""
+        merged: List[Tuple[Any, Any]] = []
+        if not start < end:
+            return merged
+        for i in self._search(start, end, False):
+            piece_start = max(self._starts[i], start)
+            piece_end = min(self._ends[i], end)
+            if merged and piece_start <= merged[-1][1]:
+                if piece_end > merged[-1][1]:
+                    merged[-1] = (merged[-1][0], piece_end)
+            else:
+                merged.append((piece_start, piece_end))
+        return merged
+
+    def gaps(self, start: Any, end: Any, min_length: Optional[Any] = None) -> List[Tuple[Any, Any]]:
+        """
+        Промежутки внутри [start, end), не покрытые ни одним отрезком.
+
+        Args:
+            start: Начало диапазона
+            end: Конец диапазона
+            min_length: Отбросить промежутки короче (в единицах разности ключей)
+        """
+        result: List[Tuple[Any, Any]] = []
+        cursor = start
+        for piece_start, piece_end in self.covered(start, end) + [(end, end)]:
+            if piece_start > cursor and (min_length is None or piece_start - cursor >= min_length):
+                result.append((cursor, piece_start))
+            cursor = max(cursor, piece_end)
+        return result
@@ -0,0 +1,121 @@
+"""Гистограмма длительностей с логарифмическими корзинами.
+
+Границы корзин общие для всех гистограмм: целые секунды, каждая
+следующая граница примерно на 9% больше предыдущей (первые корзины -
+по одной секунде). Поэтому гистограммы за разные дни или разных
+пользователей складываются поштучно, а квантиль любой суммы
+оценивается с относительной ошибкой не больше ~4.5% - без хранения
+самих длительностей.
+"""
+
+import bisect
+import math
+from typing import Dict, Iterable, List, Optional, Sequence
+
+
+GROWTH = 2 ** (1 / 8)
+MAX_SECONDS = 31 * 86400  # всё длиннее попадает в последнюю корзину
+
+
+def _bucket_bounds() -> List[int]:
+    bounds = [0, 1]
+    while bounds[-1] < MAX_SECONDS:
+        bounds.append(max(bounds[-1] + 1, round(bounds[-1] * GROWTH)))
+    return bounds
+
+
+BOUNDS: List[int] = _bucket_bounds()
+
+
+def bucket_of(seconds: float) -> int:
+    """Номер корзины для длительности."""
+    return max(0, bisect.bisect_right(BOUNDS, seconds) - 1)
+
+
+def bucket_value(bucket: int) -> float:
+    """Представитель корзины: точное значение для корзины из одной секунды,
+    иначе среднее геометрическое границ."""
+    lower = BOUNDS[bucket]
+    upper = BOUNDS[bucket + 1] if bucket + 1 < len(BOUNDS) else lower * GROWTH
+    if upper - lower <= 1:
+        return float(lower)
+    return math.sqrt(lower * upper)
+
+
+class LogHistogram:
+    """Счётчики по корзинам (разреженно: номер корзины -> количество)."""
+
+    def __init__(self, counts: Optional[Dict[int, int]] = None):
+        self._counts: Dict[int, int] = {b: c for b, c in (counts or {}).items() if c > 0}
+
+    @classmethod
+    def of(cls, values: Iterable[float]) -> "LogHistogram":
+        """Гистограмма набора длительностей."""
+        histogram = cls()
+        for value in values:
+            histogram.add(value)
+        return histogram
+
+    def add(self, seconds: float, count: int = 1) -> None:
+        """Учесть длительность count раз."""
+        bucket = bucket_of(seconds)
+        self._counts[bucket] = self._counts.get(bucket, 0) + count
+
+    def merge(self, other: "LogHistogram") -> "LogHistogram":
+        """Прибавить другую гистограмму (на месте) и вернуть себя."""
+        for bucket, count in other._counts.items():
+            self._counts[bucket] = self._counts.get(bucket, 0) + count
+        return self
+
+    def __add__(self, other: "LogHistogram") -> "LogHistogram":
+        return LogHistogram(dict(self._counts)).merge(other)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, LogHistogram) and self._counts == other._counts
+
+    @property
+    def counts(self) -> Dict[int, int]:
+        """Ненулевые счётчики по корзинам."""
+        return dict(self._counts)
+
+    @property
+    def count(self) -> int:
+        """Число учтённых длительностей."""
+        return sum(self._counts.values())
+
+    def quantile(self, q: float) -> float:
+        """Оценка квантиля q (0..1); 0 для пустой гистограммы."""
+        total = self.count
+        if total == 0:
+            return 0.0
+        rank = q * (total - 1)
+        seen = 0
+        for bucket in sorted(self._counts):
+            seen += self._counts[bucket]
+            if seen > rank:
+                return bucket_value(bucket)
+        return bucket_value(max(self._counts))
+
+    def mean(self) -> float:
+        """Оценка среднего по представителям корзин."""
+        total = self.count
+        if total == 0:
+            return 0.0
+        return sum(bucket_value(b) * c for b, c in self._counts.items()) / total
+
+    def histogram(self, edges: Sequence[float]) -> List[int]:
+        """
+        Количества в крупных интервалах для отображения.
+
+        Args:
+            edges: Возрастающие границы; интервалы [edges[i], edges[i+1]),
+                   последний - от edges[-1] и выше
+
+        Returns:
+            len(edges) количеств (корзина относится к интервалу своей нижней границы)
+        """
+        result = [0] * len(edges)
+        for bucket, count in self._counts.items():
+            index = bisect.bisect_right(edges, BOUNDS[bucket]) - 1
+            result[max(0, index)] += count
+        return result
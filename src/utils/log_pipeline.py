@@ -0,0 +1,180 @@
+"""Неблокирующее логирование.
+
+Поток GUI только кладёт записи в очередь (QueueHandler), а запись на диск
+и в консоль выполняет фоновый QueueListener. Файл ротируется по размеру
+и возрасту, старые сегменты сжимаются gzip. Повторяющиеся сообщения
+горячих путей (например, ошибка опроса окна каждые 2 секунды)
+подавляются с периодической сводкой.
+"""
+
+import gzip
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+
+class CompressingRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """Ротация по размеру и по возрасту файла со сжатием старых сегментов."""
+
+    def __init__(self, filename, max_bytes: int = 5 * 1024 * 1024,
+                 max_age: float = 24 * 3600, backup_count: int = 7,
+                 encoding: Optional[str] = "utf-8"):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count,
+                         encoding=encoding, delay=True)
+        self._max_age = max_age
+        self._opened_at = self._file_created_at()
+        self.namer = self._gzip_namer
+        self.rotator = self._gzip_rotator
+
+    def _file_created_at(self) -> float:
+        """
+        Время начала текущего сегмента.
+
+        Для файла от прошлого запуска берётся время последней записи:
+        если он давно не менялся, ротация произойдёт на первой же записи.
+        """
+        try:
+            return os.stat(self.baseFilename).st_mtime
+        except OSError:
+            return time.time()
+
+    @staticmethod
+    def _gzip_namer(name: str) -> str:
+        """Имя сжатого сегмента: app.log.1 -> app.log.1.gz."""
+        return name + ".gz"
+
+    @staticmethod
+    def _gzip_rotator(source: str, dest: str) -> None:
+        """Сжать закрытый сегмент и удалить исходник."""
+        with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(source)
+
+    def shouldRollover(self, record: logging.LogRecord) -> int:
+        """Пора ли начинать новый сегмент."""
+        if self._max_age and time.time() - self._opened_at >= self._max_age:
+            if os.path.exists(self.baseFilename) and os.path.getsize(self.baseFilename) > 0:
+                return 1
+        return super().shouldRollover(record)
+
+    def doRollover(self) -> None:
+        """Ротация с обновлением времени начала сегмента."""
+        super().doRollover()
+        self._opened_at = time.time()
+
+
+class DuplicateFilter(logging.Filter):
+    """
+    Подавление повторяющихся сообщений.
+
+    Одинаковое сообщение (логгер, уровень, текст) пропускается не чаще
+    раза в interval секунд; при следующем пропуске к нему добавляется
+    количество подавленных повторов. Сообщения выше max_level не трогаются.
+    """
+
+    def __init__(self, interval: float = 60.0, max_level: int = logging.DEBUG,
+                 max_keys: int = 1024):
+        super().__init__()
+        self._interval = interval
+        self._max_level = max_level
+        self._max_keys = max_keys
+        self._lock = threading.Lock()
+        # ключ -> (время последнего пропуска, подавлено с тех пор)
+        self._seen: Dict[Tuple[str, int, str], Tuple[float, int]] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Пропустить или подавить запись."""
+        if record.levelno > self._max_level:
+            return True
+
+        key = (record.name, record.levelno, str(record.msg))
+        now = time.monotonic()
+
+        with self._lock:
+            last, suppressed = self._seen.get(key, (0.0, 0))
+            if last and now - last < self._interval:
+                self._seen[key] = (last, suppressed + 1)
+                return False
+
+            if len(self._seen) >= self._max_keys and key not in self._seen:
+                self._seen.clear()
+            self._seen[key] = (now, 0)
+
+        if suppressed:
+            record.msg = f"{record.msg} (повторено ещё {suppressed} раз)"
+        return True
+
+
+class LoggingPipeline:
+    """Очередь + фоновый писатель."""
+
+    def __init__(self, listener: logging.handlers.QueueListener):
+        self._listener = listener
+
+    def stop(self) -> None:
+        """Дописать очередь и остановить фоновый поток."""
+        if self._listener is None:
+            return
+
+        self._listener.stop()
+        for handler in self._listener.handlers:
+            handler.close()
+        self._listener = None
+
+
+def setup_logging(log_dir: Path, level: int = logging.INFO,
+                  max_bytes: int = 5 * 1024 * 1024, max_age: float = 24 * 3600,
+                  backup_count: int = 7, duplicate_interval: float = 60.0) -> LoggingPipeline:
+    """
+    Настроить неблокирующий конвейер логирования для корневого логгера.
+
+    Args:
+        log_dir: Каталог для app.log и сжатых сегментов
+        level: Уровень логирования
+        max_bytes: Размер сегмента, после которого происходит ротация
+        max_age: Возраст сегмента в секундах, после которого происходит ротация
+        backup_count: Сколько сжатых сегментов хранить
+        duplicate_interval: Окно подавления повторов (секунды)
+
+    Returns:
+        Конвейер; stop() нужно вызвать при выходе
+    """
+    log_dir = Path(log_dir)
+    log_dir.mkdir(parents=True, exist_ok=True)
+
+    formatter = logging.Formatter(LOG_FORMAT)
+
+    file_handler = CompressingRotatingFileHandler(
+        log_dir / "app.log", max_bytes=max_bytes,
+        max_age=max_age, backup_count=backup_count
+    )
+    file_handler.setFormatter(formatter)
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(formatter)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(DuplicateFilter(duplicate_interval))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    listener = logging.handlers.QueueListener(
+        log_queue, file_handler, stream_handler, respect_handler_level=True
+    )
+    listener.start()
+
+    return LoggingPipeline(listener)
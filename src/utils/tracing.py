@@ -0,0 +1,250 @@
+"""Трассировка временной шкалы для разбора зависаний.
+
+Спаны пишутся в кольцевой буфер и выгружаются в формате Chrome Trace
+Event (открывается в Perfetto или chrome://tracing). Включается
+переменной окружения WORK_CHRONOMETER_TRACE=1 или флагом --trace.
+Здесь же - хуки для снимков cProfile и tracemalloc.
+"""
+
+import cProfile
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+
+ENV_VAR = "WORK_CHRONOMETER_TRACE"
+ENV_BUFFER_VAR = "WORK_CHRONOMETER_TRACE_BUFFER"
+DEFAULT_CAPACITY = 100_000
+
+
+def default_output_dir() -> Path:
+    """Каталог для трасс и профилей."""
+    return Path(__file__).parent.parent.parent / "data" / "profiles"
+
+
+class _State:
+    """Глобальное состояние трассировки."""
+
+    enabled: bool = False
+
+
+_state = _State()
+
+
+class Tracer:
+    """Кольцевой буфер завершённых спанов."""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self._events: deque = deque(maxlen=capacity)
+        self._origin = time.perf_counter()
+        self._thread_names: dict = {}
+
+    @property
+    def capacity(self) -> int:
+        """Размер буфера."""
+        return self._events.maxlen
+
+    def resize(self, capacity: int) -> None:
+        """Изменить размер буфера (сохраняя последние события)."""
+        self._events = deque(self._events, maxlen=capacity)
+
+    def add_complete(self, name: str, category: str, started: float,
+                     duration: float, args: Optional[dict] = None) -> None:
+        """Добавить завершённый спан (время - perf_counter, секунды)."""
+        thread = threading.current_thread()
+        if thread.ident not in self._thread_names:
+            self._thread_names[thread.ident] = thread.name
+        self._events.append((name, category, started, duration, thread.ident, args))
+
+    def clear(self) -> None:
+        """Очистить буфер."""
+        self._events.clear()
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def to_chrome_trace(self) -> dict:
+        """Представление в формате Chrome Trace Event."""
+        pid = os.getpid()
+        events = [
+            {
+                "name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                "args": {"name": name}
+            }
+            # Снимок: рабочие потоки могут дописывать имена во время выгрузки
+            for tid, name in list(self._thread_names.items())
+        ]
+
+        for name, category, started, duration, tid, args in list(self._events):
+            event = {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": round((started - self._origin) * 1_000_000, 1),
+                "dur": round(duration * 1_000_000, 1),
+                "pid": pid,
+                "tid": tid,
+            }
+            if args:
+                event["args"] = args
+            events.append(event)
+
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def dump(self, path: Path) -> Path:
+        """Сохранить трассу в JSON."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_chrome_trace()), encoding="utf-8")
+        return path
+
+
+tracer = Tracer()
+
+
+def enable(flag: bool = True, capacity: Optional[int] = None) -> None:
+    """Включить или выключить трассировку."""
+    if capacity:
+        tracer.resize(capacity)
+    _state.enabled = flag
+
+
+def is_enabled() -> bool:
+    """Включена ли трассировка."""
+    return _state.enabled
+
+
+def configure_from_env() -> bool:
+    """Включить трассировку, если задана переменная окружения."""
+    value = os.environ.get(ENV_VAR, "")
+    if value and value != "0":
+        capacity = int(os.environ.get(ENV_BUFFER_VAR, "0") or 0)
+        enable(True, capacity or None)
+    return _state.enabled
+
+
+class _Span:
+    """Активный спан (контекстный менеджер)."""
+
+    __slots__ = ("_name", "_category", "_args", "_started")
+
+    def __init__(self, name: str, category: str, args: Optional[dict]):
+        self._name = name
+        self._category = category
+        self._args = args
+        self._started = 0.0
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        tracer.add_complete(
+            self._name, self._category, self._started,
+            time.perf_counter() - self._started, self._args
+        )
+        return False
+
+
+class _NullSpan:
+    """Пустой спан, когда трассировка выключена."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL = _NullSpan()
+
+
+def span(name: str, category: str = "app", **args):
+    """
+    Контекстный менеджер спана.
+
+    Args:
+        name: Имя спана
+        category: Категория (db, monitor, probe, gui, signal)
+        **args: Дополнительные поля для просмотрщика
+
+    Returns:
+        Контекстный менеджер (пустой, если трассировка выключена)
+    """
+    if not _state.enabled:
+        return _NULL
+    return _Span(name, category, args or None)
+
+
+class ProfilingHooks:
+    """Снимки cProfile и tracemalloc по запросу (из меню трея)."""
+
+    def __init__(self, output_dir: Optional[Path] = None):
+        self._logger = logging.getLogger(__name__)
+        self._output_dir = output_dir or default_output_dir()
+        self._profiler: Optional[cProfile.Profile] = None
+
+    @property
+    def is_profiling(self) -> bool:
+        """Идёт ли сейчас профилирование."""
+        return self._profiler is not None
+
+    def _path(self, prefix: str, suffix: str) -> Path:
+        """Путь к новому файлу с отметкой времени."""
+        self._output_dir.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        return self._output_dir / f"{prefix}-{stamp}{suffix}"
+
+    def dump_trace(self) -> Path:
+        """Выгрузить текущий буфер трассировки."""
+        path = tracer.dump(self._path("trace", ".json"))
+        self._logger.info(f"Трасса сохранена: {path}")
+        return path
+
+    def start_profile(self) -> None:
+        """Начать профилирование cProfile (поток GUI)."""
+        if self._profiler is None:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+            self._logger.info("Профилирование запущено")
+
+    def stop_profile(self) -> Optional[Path]:
+        """Остановить профилирование и сохранить .prof."""
+        if self._profiler is None:
+            return None
+
+        self._profiler.disable()
+        path = self._path("profile", ".prof")
+        self._profiler.dump_stats(str(path))
+        self._profiler = None
+        self._logger.info(f"Профиль сохранён: {path}")
+        return path
+
+    def memory_snapshot(self, top: int = 30) -> Path:
+        """
+        Снимок tracemalloc.
+
+        Первый вызов включает tracemalloc, поэтому полезная картина
+        появляется со второго снимка. Рядом с .snapshot пишется текстовый топ.
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(10)
+
+        snapshot = tracemalloc.take_snapshot()
+        path = self._path("memory", ".snapshot")
+        snapshot.dump(str(path))
+
+        lines = [str(stat) for stat in snapshot.statistics("lineno")[:top]]
+        path.with_suffix(".txt").write_text("\n".join(lines), encoding="utf-8")
+
+        self._logger.info(f"Снимок памяти сохранён: {path}")
+        return path
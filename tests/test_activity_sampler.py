@@ -0,0 +1,137 @@
+"""Тесты фонового опроса активности."""
+
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+
+import sys
+
+sys.path.insert(0, 'src')
+
+from PyQt6.QtCore import QCoreApplication, QEventLoop, QTimer
+
+from core.activity_sampler import ActivitySampler
+from core.activity_sources import PlatformSource, Sample
+from core.activity_monitor import ActivityMonitor
+from database.db_manager import DatabaseManager
+from utils import metrics
+
+
+class TestActivitySampler(unittest.TestCase):
+    """Тесты сборщика: таймауты, очередь, рабочий поток."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def setUp(self):
+        """Подготовка к тестам."""
+        self.sampler = ActivitySampler(queue_size=4)
+
+    def tearDown(self):
+        """Остановка рабочего потока."""
+        self.sampler.shutdown()
+        metrics.enable(False)
+        metrics.registry.reset()
+
+    def test_probe_timeout(self):
+        """Зависшая проба прерывается по таймауту и учитывается в метриках."""
+        metrics.enable()
+        source = PlatformSource()
+        source.PROBE_TIMEOUT = 0.2
+
+        with self.assertRaises(subprocess.TimeoutExpired):
+            source._run_probe([sys.executable, "-c", "import time; time.sleep(5)"])
+
+        self.assertEqual(source.timeouts, 1)
+        snapshot = metrics.registry.snapshot()
+        timeout_metrics = [name for name in snapshot if name.endswith(".timeout")]
+        self.assertEqual(len(timeout_metrics), 1)
+        self.assertEqual(snapshot[timeout_metrics[0]]["errors"], 1)
+
+    def test_queue_is_bounded(self):
+        """При переполнении очереди теряются самые старые результаты."""
+        self.sampler.sample = lambda idle_timeout: Sample(idle_seconds=idle_timeout)
+
+        for i in range(7):
+            self.sampler._on_sample_requested(i)
+
+        samples = self.sampler.take_samples()
+        self.assertEqual([s.idle_seconds for s in samples], [3, 4, 5, 6])
+        self.assertEqual(self.sampler.dropped, 3)
+
+    def test_sample_runs_in_worker_thread(self):
+        """Опрос выполняется в рабочем потоке, результат приходит сигналом."""
+        import threading
+        main_thread = threading.get_ident()
+        threads = []
+
+        def fake_sample(idle_timeout):
+            threads.append(threading.get_ident())
+            return Sample(app_name="code", window_probed=True)
+
+        self.sampler.sample = fake_sample
+        self.sampler.start()
+
+        loop = QEventLoop()
+        self.sampler.samples_ready.connect(loop.quit)
+        QTimer.singleShot(2000, loop.quit)
+
+        self.assertTrue(self.sampler.request(300))
+        loop.exec()
+
+        samples = self.sampler.take_samples()
+        self.assertEqual([s.app_name for s in samples], ["code"])
+        self.assertNotEqual(threads[0], main_thread)
+
+    def test_request_skipped_while_busy(self):
+        """Пока опрос не завершён, новые запросы пропускаются."""
+        self.sampler._busy = True
+
+        self.assertFalse(self.sampler.request(300))
+        self.assertEqual(self.sampler.skipped, 1)
+
+
+class TestActivityMonitorSamples(unittest.TestCase):
+    """Обработка результатов опроса монитором."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def setUp(self):
+        """Подготовка к тестам."""
+        self.db = DatabaseManager(Path(tempfile.mkdtemp()) / "test.db")
+        self.db.initialize()
+        self.monitor = ActivityMonitor(self.db, threaded=False)
+        self.monitor.start_monitoring("session")
+
+    def tearDown(self):
+        """Остановка мониторинга."""
+        self.monitor.stop_monitoring()
+
+    def test_window_change_starts_activity(self):
+        """Смена окна создаёт новую активность."""
+        changes = []
+        self.monitor.activity_changed.connect(lambda app, title: changes.append(app))
+
+        self.monitor._apply_sample(Sample(app_name="code", window_title="main.py", window_probed=True))
+        self.monitor._apply_sample(Sample(app_name="code", window_title="main.py", window_probed=True))
+        self.monitor._apply_sample(Sample(app_name="firefox", window_probed=True))
+
+        self.assertEqual(changes, ["code", "firefox"])
+        self.assertEqual(len(self.db.get_activities_by_session("session")), 2)
+
+    def test_idle_sample_emits_idle_detected(self):
+        """Порог простоя превышен - сигнал idle_detected."""
+        idle = []
+        self.monitor.idle_detected.connect(idle.append)
+
+        self.monitor._apply_sample(Sample(idle_seconds=600))
+
+        self.assertEqual(idle, [600])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+"""Тесты источников активности: запись и проигрывание трасс."""
+
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+import sys
+
+sys.path.insert(0, 'src')
+
+from PyQt6.QtCore import QCoreApplication
+
+from core.activity_sources import (
+    ActivitySource, RecordingSource, ReplaySource, Sample, read_trace, write_trace
+)
+from core.trace_replay import TraceReplayer
+from database.db_manager import DatabaseManager
+
+
+def _samples():
+    return [
+        Sample(0, "code", "tracker.py - VS Code", True, 1000.0),
+        Sample(0, "code", "tracker.py - VS Code", True, 1002.0),
+        Sample(1, "firefox", "GitHub - Mozilla Firefox", True, 1004.0),
+        Sample(400, "", "", False, 1006.0),
+        Sample(0, "code", "db_manager.py - VS Code", True, 1008.0),
+    ]
+
+
+class _FixedSource(ActivitySource):
+    """Источник, отдающий опросы из списка."""
+
+    def __init__(self, samples):
+        self._samples = list(samples)
+        self.closed = False
+
+    def sample(self, idle_timeout: int) -> Sample:
+        return self._samples.pop(0)
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class TestTraceFormat(unittest.TestCase):
+    """Тесты двоичного формата трассы."""
+
+    def setUp(self):
+        """Подготовка к тестам."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.path = self.temp_dir / "focus.trace"
+
+    def test_round_trip(self):
+        """Записанная трасса читается без потерь."""
+        self.assertEqual(write_trace(self.path, _samples()), 5)
+        self.assertEqual(list(read_trace(self.path)), _samples())
+
+    def test_strings_written_once(self):
+        """Повторяющиеся строки не увеличивают размер трассы."""
+        write_trace(self.path, _samples()[:1])
+        single = self.path.stat().st_size
+        write_trace(self.path, _samples()[:1] * 100)
+        repeated = self.path.stat().st_size
+
+        # Каждый следующий опрос - только запись фиксированного размера
+        self.assertLess(repeated - single, 99 * 24)
+
+    def test_truncated_tail(self):
+        """Оборванный хвост (падение при записи) отбрасывается."""
+        write_trace(self.path, _samples())
+        data = self.path.read_bytes()
+        self.path.write_bytes(data[:-5])
+
+        self.assertEqual(list(read_trace(self.path)), _samples()[:4])
+
+    def test_bad_magic(self):
+        """Чужой файл не принимается за трассу."""
+        self.path.write_bytes(b"not a trace")
+        with self.assertRaises(ValueError):
+            list(read_trace(self.path))
+
+    def test_recording_source(self):
+        """RecordingSource отдаёт опросы вложенного источника и пишет их."""
+        inner = _FixedSource(_samples())
+        source = RecordingSource(inner, self.path)
+
+        returned = [source.sample(300) for _ in range(5)]
+        self.assertEqual(source.stats()["recorded"], 5)
+        source.close()
+
+        self.assertTrue(inner.closed)
+        self.assertEqual(returned, _samples())
+        self.assertEqual(list(read_trace(self.path)), _samples())
+
+    def test_replay_source(self):
+        """ReplaySource отдаёт опросы по порядку и сообщает об окончании."""
+        source = ReplaySource(_samples())
+        self.assertFalse(source.exhausted)
+
+        for expected in _samples():
+            self.assertEqual(source.sample(300), expected)
+
+        self.assertTrue(source.exhausted)
+        self.assertEqual(source.sample(300).app_name, "")
+        self.assertEqual(source.stats()["replayed"], 5)
+
+
+class TestTraceReplayer(unittest.TestCase):
+    """Тесты прогона трассы через монитор активности."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def setUp(self):
+        """Подготовка к тестам."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.db_path = self.temp_dir / "replay.db"
+        self.db = DatabaseManager(self.db_path)
+        self.db.initialize()
+
+    def test_replay_records_activities(self):
+        """Переключения и простой из трассы доходят до БД."""
+        result = TraceReplayer(self.db).run(_samples())
+
+        self.assertEqual(result["events"], 5)
+        self.assertEqual(result["activity_switches"], 3)
+        self.assertEqual(result["idle_events"], 1)
+        self.assertEqual(result["latency"]["count"], 5)
+
+        conn = sqlite3.connect(self.db_path)
+        try:
+            rows = conn.execute(
+                "SELECT application_name, duration FROM activities"
+            ).fetchall()
+        finally:
+            conn.close()
+
+        # Длительности - по времени опросов трассы, а не по времени прогона
+        self.assertEqual(sorted(rows), [("code", 0), ("code", 4), ("firefox", 4)])
+
+
+if __name__ == '__main__':
+    unittest.main()
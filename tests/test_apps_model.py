@@ -0,0 +1,137 @@
+"""Тесты модели таблицы приложений."""
+
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import sys
+
+sys.path.insert(0, 'src')
+
+from PyQt6.QtCore import QPersistentModelIndex, Qt
+from PyQt6.QtWidgets import QApplication
+
+from database.db_manager import DatabaseManager
+from gui.widgets.activity_widget import ActivityWidget
+from gui.widgets.apps_model import NAME_ROLE, SHARE_ROLE, AppsFilterProxy, AppsTableModel
+from models.activity import Activity, ActivityType
+from models.session import Session
+
+APP = QApplication.instance() or QApplication([])
+
+
+APPS = [
+    {"name": "code", "type": "productive", "duration": 600},
+    {"name": "Chrome", "type": "distracting", "duration": 300},
+    {"name": "terminal", "type": "productive", "duration": 100},
+]
+
+
+class TestAppsModel(unittest.TestCase):
+    """Тесты модели и прокси."""
+
+    def setUp(self):
+        """Подготовка к тестам."""
+        self.model = AppsTableModel()
+        self.model.set_apps(APPS)
+        self.proxy = AppsFilterProxy()
+        self.proxy.setSourceModel(self.model)
+        self.proxy.sort(AppsTableModel.TIME, Qt.SortOrder.DescendingOrder)
+
+    def names(self):
+        return [self.proxy.index(row, 0).data(NAME_ROLE) for row in range(self.proxy.rowCount())]
+
+    def test_filter_search_and_sort(self):
+        """Фильтр по типу, поиск по подстроке имени и сортировка."""
+        self.assertEqual(self.names(), ["code", "Chrome", "terminal"])
+
+        self.proxy.set_type("productive")
+        self.assertEqual(self.names(), ["code", "terminal"])
+
+        self.proxy.set_type(None)
+        self.proxy.set_name_filter("C")
+        self.assertEqual(self.names(), ["code", "Chrome"])
+
+        self.proxy.set_name_filter("")
+        self.proxy.sort(AppsTableModel.NAME, Qt.SortOrder.AscendingOrder)
+        self.assertEqual(self.names(), ["Chrome", "code", "terminal"])
+
+    def test_update_in_place(self):
+        """Новые значения не пересоздают строки; доля считается от общего времени."""
+        code = QPersistentModelIndex(self.model.index(0, AppsTableModel.SHARE))
+        self.assertEqual(code.data(SHARE_ROLE), 60)
+
+        self.model.set_apps(APPS[:2] + [{"name": "terminal", "type": "productive", "duration": 1100},
+                                        {"name": "vim", "type": "productive", "duration": 0}])
+        self.assertTrue(code.isValid())
+        self.assertEqual(code.data(SHARE_ROLE), 30)
+        self.assertEqual(self.model.rowCount(), 4)
+        self.assertEqual(self.names()[0], "terminal")  # пересортировано по времени
+
+        self.model.set_apps(APPS[:1])  # пропавшие строки - сброс модели
+        self.assertEqual(self.names(), ["code"])
+
+
+class TestActivityWidgetFilter(unittest.TestCase):
+    """Фильтр вкладки продуктивности работает без запросов к БД."""
+
+    def test_filter_does_not_query(self):
+        db = DatabaseManager(Path(tempfile.mkdtemp()) / "test.db")
+        db.initialize()
+        start = datetime.now().replace(hour=0, minute=1, second=0, microsecond=0)
+        session = Session(start_time=start)
+        db.save_session(session)
+        for offset, (name, activity_type) in enumerate([("code", ActivityType.PRODUCTIVE),
+                                                        ("chrome", ActivityType.DISTRACTING)]):
+            activity = Activity(session_id=session.id, application_name=name,
+                                start_time=start + timedelta(seconds=offset * 30),
+                                activity_type=activity_type)
+            activity.end_time = activity.start_time + timedelta(seconds=30)
+            activity.duration = 30
+            db.save_activity(activity)
+
+        widget = ActivityWidget(db)
+        widget.show()
+        APP.processEvents()
+        self.assertEqual(widget._apps_proxy.rowCount(), 2)
+
+        calls = []
+        db.get_day_dashboard = lambda *args: calls.append(args) or {"apps": [], "activities": []}
+        widget._filter_combo.setCurrentIndex(2)
+        self.assertEqual(widget._apps_proxy.rowCount(), 1)
+        self.assertEqual(widget._apps_proxy.index(0, 0).data(NAME_ROLE), "chrome")
+        widget._app_filter_edit.setText("zzz")
+        self.assertEqual(widget._apps_proxy.rowCount(), 0)
+        self.assertEqual(calls, [])
+        widget.deleteLater()
+
+
+class TestActivityWidgetDay(unittest.TestCase):
+    """Активность, идущая через полночь, на вкладке продуктивности."""
+
+    def test_open_activity_from_yesterday_counts_from_midnight(self):
+        db = DatabaseManager(Path(tempfile.mkdtemp()) / "test.db")
+        db.initialize()
+        midnight = datetime.combine(datetime.now().date(), datetime.min.time())
+        session = Session(start_time=midnight - timedelta(hours=1))
+        db.save_session(session)
+        db.save_activity(Activity(session_id=session.id, application_name="code",
+                                  start_time=midnight - timedelta(hours=1),
+                                  activity_type=ActivityType.PRODUCTIVE))
+
+        widget = ActivityWidget(db)
+        widget.show()
+        APP.processEvents()
+        now = midnight + timedelta(minutes=30)
+        self.assertEqual(widget._totals.by_type(now)["productive"], 1800)
+        self.assertEqual(widget.focus_summary(now).tracked_seconds, 1800)
+        widget.deleteLater()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+"""Тесты менеджера перерывов."""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+import sys
+
+sys.path.insert(0, 'src')
+
+from PyQt6.QtCore import QCoreApplication
+
+from core.break_manager import BreakManager
+from utils.config import Config
+
+
+class FakeClock:
+    """Управляемые монотонные часы."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestBreakManager(unittest.TestCase):
+    """Тесты планирования напоминаний по дедлайнам."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def setUp(self):
+        """Подготовка к тестам."""
+        self.config = Config(Path(tempfile.mkdtemp()) / "config.json")
+        self.config.settings.short_break_interval = 25
+        self.config.settings.long_break_interval = 100
+
+        self.clock = FakeClock()
+        self.manager = BreakManager(self.config)
+        self.manager._clock = self.clock
+
+        self.reminders = []
+        self.manager.break_reminder.connect(lambda kind, _: self.reminders.append(kind))
+
+    def _advance(self, minutes: float) -> None:
+        self.clock.now += minutes * 60
+        self.manager._on_deadline()
+
+    def test_deadline_scheduled_for_first_boundary(self):
+        """Таймер ставится ровно на первую границу."""
+        self.manager.start()
+
+        self.assertTrue(self.manager._deadline.one_shot)
+        self.assertEqual(self.manager._deadline.interval_ms, 25 * 60 * 1000)
+
+    def test_reminders_in_order(self):
+        """Короткие напоминания, на 100-й минуте - длинное."""
+        self.manager.start()
+        for _ in range(4):
+            self._advance(25)
+
+        self.assertEqual(self.reminders, ["short", "short", "short", "long"])
+
+    def test_stalled_loop_does_not_skip_reminder(self):
+        """Поздний таймер доставляет одно напоминание, длинное в приоритете."""
+        self.manager.start()
+        self._advance(101.5)
+
+        self.assertEqual(self.reminders, ["long"])
+        self.assertEqual(self.manager._deadline.interval_ms, int(23.5 * 60 * 1000))
+
+    def test_pause_shifts_deadline(self):
+        """Время на паузе не считается рабочим."""
+        self.manager.start()
+        self.clock.now += 10 * 60
+        self.manager.pause()
+        self.clock.now += 60 * 60
+        self.manager.resume()
+
+        self.assertEqual(self.manager.work_seconds, 600)
+        self.assertEqual(self.manager._deadline.interval_ms, 15 * 60 * 1000)
+
+        self._advance(14)
+        self.assertEqual(self.reminders, [])
+        self._advance(1)
+        self.assertEqual(self.reminders, ["short"])
+
+    def test_config_change_reschedules(self):
+        """Смена интервала пересчитывает дедлайн."""
+        self.manager.start()
+        self.clock.now += 5 * 60
+
+        self.config.settings.short_break_interval = 10
+        self.manager.reschedule()
+
+        self.assertEqual(self.manager._deadline.interval_ms, 5 * 60 * 1000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,233 @@
+"""Тесты уведомлений об изменении данных."""
+
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import sqlite3
+import tempfile
+import unittest
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import sys
+
+sys.path.insert(0, 'src')
+
+from database.changes import ChangeBus, DataChange
+from database.db_manager import DatabaseManager
+from models.activity import Activity, ActivityType
+from models.session import Session
+
+from PyQt6.QtWidgets import QApplication
+
+from gui.widgets.activity_widget import ActivityWidget
+from gui.widgets.stats_widget import StatsWidget
+
+APP = QApplication.instance() or QApplication([])
+
+
+class TestChangeBus(unittest.TestCase):
+    """Тесты шины изменений."""
+
+    def test_versions_by_table_and_day(self):
+        """Версии растут по таблице и по дню; без дней - для всех дней."""
+        bus = ChangeBus()
+        day, other = date(2024, 3, 1), date(2024, 3, 2)
+
+        bus.publish(DataChange("activities", frozenset([day])))
+        self.assertEqual(bus.version("activities"), 1)
+        self.assertEqual(bus.version("activities", day), 1)
+        self.assertEqual(bus.version("activities", other), 0)
+        self.assertEqual(bus.version("sessions"), 0)
+
+        bus.publish(DataChange("activities"))
+        self.assertEqual(bus.version("activities", other), 1)
+
+        bus.publish(DataChange(None))
+        self.assertEqual(bus.version("sessions", other), 1)
+
+    def test_touches(self):
+        """Проверка затронутых таблиц и дней."""
+        change = DataChange("activities", frozenset([date(2024, 3, 1)]))
+        self.assertTrue(change.touches(("activities",)))
+        self.assertFalse(change.touches(("sessions",)))
+        self.assertTrue(change.touches(("activities",), date(2024, 3, 1), date(2024, 3, 1)))
+        self.assertFalse(change.touches(("activities",), date(2024, 3, 2)))
+        self.assertTrue(DataChange(None).touches(("sessions",), date(2024, 3, 2)))
+
+    def test_failing_subscriber_does_not_break_others(self):
+        """Ошибка одного подписчика не мешает остальным."""
+        bus = ChangeBus()
+        received = []
+
+        def failing(change):
+            raise RuntimeError("boom")
+
+        bus.subscribe(failing)
+        bus.subscribe(received.append)
+        bus.publish(DataChange("sessions"))
+        bus.unsubscribe(received.append)
+        bus.publish(DataChange("sessions"))
+        self.assertEqual(len(received), 1)
+
+
+class TestDatabaseChanges(unittest.TestCase):
+    """Тесты уведомлений DatabaseManager."""
+
+    def setUp(self):
+        """Подготовка к тестам."""
+        self.db_path = Path(tempfile.mkdtemp()) / "test.db"
+        self.db = DatabaseManager(self.db_path)
+        self.db.initialize()
+        self.received = []
+        self.db.changes.subscribe(self.received.append)
+
+    def test_writes_publish_tables_days_and_apps(self):
+        """Запись сессии и активности публикует таблицу, дни и приложения."""
+        session = Session(start_time=datetime(2024, 3, 1, 9))
+        self.db.save_session(session)
+        activity = Activity(session_id=session.id, application_name="code",
+                            start_time=datetime(2024, 3, 1, 23, 50),
+                            activity_type=ActivityType.PRODUCTIVE)
+        activity.end_time = datetime(2024, 3, 2, 0, 10)
+        self.db.save_activity(activity)
+
+        self.assertEqual([c.table for c in self.received], ["sessions", "activities"])
+        self.assertEqual(self.received[0].days, {date(2024, 3, 1)})
+        self.assertEqual(self.received[1].days, {date(2024, 3, 1), date(2024, 3, 2)})
+        self.assertEqual(self.received[1].apps, {"code"})
+        self.assertEqual(self.db.changes.version("activities", date(2024, 3, 2)), 1)
+
+    def test_external_write_detected_own_ignored(self):
+        """Запись другого соединения видна по data_version, своя - нет."""
+        self.assertFalse(self.db.check_external_changes())  # точка отсчёта
+        self.db.save_session(Session(start_time=datetime(2024, 3, 1, 9)))
+        self.assertFalse(self.db.check_external_changes())
+
+        with sqlite3.connect(self.db_path) as other:
+            other.execute("DELETE FROM sessions")
+        self.assertTrue(self.db.check_external_changes())
+        self.assertTrue(self.received[-1].external)
+        self.assertFalse(self.db.check_external_changes())
+
+
+class TestStatsWidgetChanges(unittest.TestCase):
+    """Тесты частичной перезагрузки статистики."""
+
+    def setUp(self):
+        """Подготовка к тестам."""
+        self.db = DatabaseManager(Path(tempfile.mkdtemp()) / "test.db")
+        self.db.initialize()
+        self.widget = StatsWidget(self.db)
+        self.widget.show()
+        APP.processEvents()
+        self.db.changes.subscribe(self.widget.on_data_changed)
+
+        self.period_loads = 0
+        load = self.widget._load_range_stats
+
+        def counting(*args):
+            self.period_loads += 1
+            load(*args)
+
+        self.widget._load_range_stats = counting
+
+    def tearDown(self):
+        """Очистка после тестов."""
+        self.widget.deleteLater()
+
+    def _save_session(self, day: date, seconds: int) -> None:
+        session = Session(start_time=datetime.combine(day, datetime.min.time()) + timedelta(hours=9))
+        session.end_time = session.start_time + timedelta(seconds=seconds)
+        session.total_duration = seconds
+        self.db.save_session(session)
+
+    def test_change_outside_period_patches_year_only(self):
+        """Изменение вне периода обновляет итоги за год, период не перечитывается."""
+        yesterday = date.today() - timedelta(days=1)
+        self._save_session(yesterday, 600)  # период по умолчанию - сегодня
+        self.widget._reload()
+
+        self.assertEqual(self.period_loads, 0)
+        self.assertEqual(self.widget._year_totals.get(yesterday), 600)
+
+    def test_change_inside_period_reloads_it(self):
+        """Изменение за день периода перечитывает период; без изменений - ничего."""
+        self._save_session(date.today(), 600)
+        self.widget._reload()
+        self.assertEqual(self.period_loads, 1)
+
+        self.widget._reload()
+        self.assertEqual(self.period_loads, 1)
+
+        self.db.changes.publish(DataChange("app_settings"))  # другая таблица
+        self.widget._reload()
+        self.assertEqual(self.period_loads, 1)
+
+    def test_show_skips_reload_when_versions_unchanged(self):
+        """Скрытый refresh() без изменений в БД не перечитывает данные при показе."""
+        self.widget._reload()
+        self.widget.hide()
+        self.widget.refresh()
+        self.widget.show()
+        self.assertEqual(self.period_loads, 0)
+
+        self.widget.hide()
+        self.widget.refresh()
+        self._save_session(date.today(), 600)
+        self.widget.show()
+        self.assertEqual(self.period_loads, 1)
+
+
+class TestActivityWidgetChanges(unittest.TestCase):
+    """Тесты обновления вкладки продуктивности по уведомлениям."""
+
+    def test_visible_tab_reloads_own_writes_outside_session(self):
+        """Своя запись за сегодня вне сессии сразу видна на открытой вкладке."""
+        db = DatabaseManager(Path(tempfile.mkdtemp()) / "test.db")
+        db.initialize()
+        widget = ActivityWidget(db)
+        widget.show()
+        APP.processEvents()
+        db.changes.subscribe(widget.on_data_changed)
+        self.assertEqual(widget._apps_model.rowCount(), 0)
+
+        start = datetime.combine(date.today(), datetime.min.time()) + timedelta(minutes=1)
+        session = Session(start_time=start)
+        db.save_session(session)
+        activity = Activity(session_id=session.id, application_name="code", start_time=start,
+                            activity_type=ActivityType.PRODUCTIVE)
+        activity.stop(start + timedelta(minutes=1))
+        db.save_activity(activity)
+
+        self.assertEqual(widget._apps_model.rowCount(), 1)
+        widget.deleteLater()
+
+    def test_hidden_refresh_skipped_without_changes(self):
+        """Отложенное обновление при показе пропускается, если версия дня не менялась."""
+        db = DatabaseManager(Path(tempfile.mkdtemp()) / "test.db")
+        db.initialize()
+        widget = ActivityWidget(db)
+        widget.show()
+        APP.processEvents()
+
+        calls = []
+        load = db.get_day_dashboard
+        db.get_day_dashboard = lambda *args: calls.append(args) or load(*args)
+
+        widget.hide()
+        widget.refresh()
+        widget.show()
+        self.assertEqual(calls, [])
+
+        widget.hide()
+        widget.refresh()
+        db.changes.publish(DataChange("activities", frozenset([date.today()])))
+        widget.show()
+        self.assertEqual(len(calls), 1)
+        widget.deleteLater()
+
+
+if __name__ == '__main__':
+    unittest.main()
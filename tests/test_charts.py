@@ -0,0 +1,104 @@
+"""Тесты графиков статистики."""
+
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import time
+import unittest
+from datetime import date, timedelta
+
+import sys
+
+sys.path.insert(0, 'src')
+
+from PyQt6.QtWidgets import QApplication
+
+from gui.widgets.charts import DailyBarChart, HistogramChart, YearHeatmap
+from utils.log_histogram import LogHistogram
+
+
+# Виджетам нужен QApplication; создаём его при импорте, пока другие
+# модули тестов не создали QCoreApplication в своих setUpClass
+APP = QApplication.instance() or QApplication([])
+
+
+class TestCharts(unittest.TestCase):
+    """Тесты кэширования и отрисовки графиков."""
+
+    def setUp(self):
+        """Подготовка к тестам."""
+        self.today = date(2024, 12, 31)
+        self.totals = {self.today - timedelta(days=i): (i % 10) * 3600 for i in range(365)}
+
+    def test_cache_survives_same_data(self):
+        """Повторная установка тех же итогов не перерисовывает график."""
+        chart = DailyBarChart()
+        chart.resize(600, chart.height())
+        chart.set_days(self.totals, self.today - timedelta(days=6), self.today)
+        chart.grab()
+        chart.set_days(dict(self.totals), self.today - timedelta(days=6), self.today)
+        chart.grab()
+        self.assertEqual(chart.renders, 1)
+
+        changed = dict(self.totals)
+        changed[self.today] += 60
+        chart.set_days(changed, self.today - timedelta(days=6), self.today)
+        chart.grab()
+        self.assertEqual(chart.renders, 2)
+
+        # Итоги за пределами показанной недели на картинку не влияют
+        changed[self.today - timedelta(days=100)] += 60
+        chart.set_days(changed, self.today - timedelta(days=6), self.today)
+        chart.grab()
+        self.assertEqual(chart.renders, 2)
+
+    def test_heatmap_levels_and_tooltip(self):
+        """Уровни клеток по часам и подсказка по дню под курсором."""
+        self.assertEqual([YearHeatmap.level(h * 3600) for h in (0, 1, 2, 5, 9)], [0, 1, 2, 3, 4])
+
+        heatmap = YearHeatmap()
+        heatmap.resize(800, heatmap.height())
+        heatmap.set_totals(self.totals, self.today)
+        step = heatmap._cell(heatmap.width(), heatmap.height())
+        start, totals = heatmap._data
+
+        self.assertEqual(start.weekday(), 0)
+        self.assertEqual(start + timedelta(days=len(totals) - 1), self.today)
+        # Последний столбец, строка дня недели сегодняшнего дня
+        x = YearHeatmap.LEFT + (len(totals) - 1) // 7 * step + 1
+        y = YearHeatmap.TOP + self.today.weekday() * step + 1
+        self.assertEqual(heatmap._tooltip_at(x, y), "31.12.2024: 0мин")
+
+    def test_histogram_bins_and_marks(self):
+        """Гистограмма раскладывается по интервалам, медиана и p90 отмечены."""
+        chart = HistogramChart()
+        chart.resize(640, chart.height())
+        chart.set_histogram(LogHistogram.of([30, 120, 120, 600, 2400, 20000]))
+        counts, (median, p90) = chart._data
+
+        self.assertEqual(list(counts), [1, 2, 1, 0, 1, 0, 0, 1])
+        self.assertAlmostEqual(median, 120, delta=12)
+        self.assertAlmostEqual(p90, 2400, delta=240)
+        self.assertEqual(chart._tooltip_at(chart._slot(640) * 1.5, 50), "1–5м: 2")
+
+        chart.grab()
+        chart.set_histogram(LogHistogram.of([30, 120, 120, 600, 2400, 20000]))
+        chart.grab()
+        self.assertEqual(chart.renders, 1)
+
+    def test_year_renders_fast(self):
+        """Год целиком рисуется за миллисекунды."""
+        heatmap = YearHeatmap()
+        heatmap.resize(800, heatmap.height())
+        heatmap.set_totals(self.totals, self.today)
+        heatmap.render_pixmap()
+
+        started = time.perf_counter()
+        for _ in range(10):
+            heatmap.render_pixmap()
+        self.assertLess((time.perf_counter() - started) / 10, 0.05)
+
+
+if __name__ == '__main__':
+    unittest.main()
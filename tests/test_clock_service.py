@@ -0,0 +1,120 @@
+"""Тесты сервиса пробуждений."""
+
+import unittest
+from datetime import datetime
+
+import sys
+
+sys.path.insert(0, 'src')
+
+from PyQt6.QtCore import QCoreApplication
+
+from core.clock_service import ClockService
+from utils.clock import VirtualClock
+
+
+class FakeClock:
+    """Управляемые монотонные часы."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestClockService(unittest.TestCase):
+    """Тесты выравнивания и режимов сервиса."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def setUp(self):
+        """Подготовка к тестам."""
+        self.clock = FakeClock()
+        self.service = ClockService()
+        self.service._clock = self.clock
+        self.calls = []
+
+    def _subscribe(self, name, interval_ms, **kwargs):
+        return self.service.subscribe(lambda: self.calls.append(name), interval_ms, name=name, **kwargs)
+
+    def _run(self, seconds: float, step: float = 0.5) -> None:
+        """Прогнать часы, пробуждаясь в назначенные сроки."""
+        end = self.clock.now + seconds
+        while True:
+            pending = [s.due for s in self.service._subscriptions if s.active and s.due is not None]
+            if not pending or min(pending) > end:
+                break
+            self.clock.now = max(self.clock.now, min(pending))
+            self.service._on_wakeup()
+        self.clock.now = end
+
+    def test_aligned_wakeups_are_coalesced(self):
+        """Подписки 1 с и 2 с просыпаются вместе: 10 пробуждений за 10 с."""
+        self._subscribe("tracker", 1000).start()
+        self._subscribe("monitor", 2000).start()
+
+        self._run(10)
+
+        self.assertEqual(self.calls.count("tracker"), 10)
+        self.assertEqual(self.calls.count("monitor"), 5)
+        self.assertEqual(self.service.wakeups, 10)
+
+    def test_background_and_idle_intervals(self):
+        """Скрытое окно и простой снижают частоту пробуждений."""
+        self._subscribe("tracker", 1000, background_interval_ms=60_000).start()
+        self._subscribe("monitor", 2000, idle_interval_ms=10_000).start()
+        self._subscribe("label", 1000, background_interval_ms=0).start()
+
+        self.service.set_ui_visible(False)
+        self.service.set_user_idle(True)
+        self._run(120)
+
+        self.assertEqual(self.calls.count("label"), 0)
+        self.assertEqual(self.calls.count("tracker"), 2)
+        self.assertEqual(self.calls.count("monitor"), 12)
+        self.assertLessEqual(self.service.wakeups, 12)
+
+    def test_hidden_and_idle_keeps_background_sleep(self):
+        """Подписка, спящая при скрытом окне, не просыпается из-за простоя."""
+        subscription = self._subscribe("poll", 5000, background_interval_ms=0, idle_interval_ms=30_000)
+        subscription.start()
+
+        self.service.set_ui_visible(False)
+        self.service.set_user_idle(True)
+        self.assertIsNone(self.service.effective_interval_ms(subscription))
+        self._run(120)
+        self.assertEqual(self.calls.count("poll"), 0)
+
+        self.service.set_ui_visible(True)
+        self.assertEqual(self.service.effective_interval_ms(subscription), 30_000)
+
+    def test_single_shot(self):
+        """Однократная подписка срабатывает один раз."""
+        deadline = self.service.single_shot(lambda: self.calls.append("once"))
+        deadline.start(1500)
+
+        self.assertEqual(deadline.remaining_ms(), 1500)
+        self._run(5)
+
+        self.assertEqual(self.calls, ["once"])
+        self.assertFalse(deadline.is_running)
+
+    def test_virtual_clock_drives_wakeups(self):
+        """Виртуальные часы вызывают подписки в их сроки без QTimer."""
+        clock = VirtualClock(datetime(2024, 1, 1))
+        service = ClockService(clock=clock)
+        service.subscribe(lambda: self.calls.append(clock.monotonic()), 1000).start()
+        service.single_shot(lambda: self.calls.append("once")).start(2500)
+
+        clock.advance(3)
+
+        self.assertEqual(self.calls, [1.0, 2.0, "once", 3.0])
+        self.assertFalse(service._timer.isActive())
+        self.assertEqual(clock.now(), datetime(2024, 1, 1, 0, 0, 3))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,11 @@
 """Тесты для базы данных."""
 
 import unittest
+import sqlite3
 import tempfile
+import threading
 from pathlib import Path
-from datetime import date
+from datetime import date, datetime, timedelta
 
 import sys
 
@@ -11,6 +13,8 @@ sys.path.insert(0, 'src')
 
 from database.db_manager import DatabaseManager
 from models.session import Session
+from models.activity import Activity, ActivityType
+from utils.log_histogram import LogHistogram
 
 
 class TestDatabaseManager(unittest.TestCase):
@@ -61,6 +65,378 @@ class TestDatabaseManager(unittest.TestCase):
         self.assertEqual(stats["sessions_count"], 2)
         self.assertEqual(stats["total_time"], 3600)
 
+    def test_close_dangling_activities(self):
+        """Висящая активность закрывается началом следующей."""
+        session = Session()
+        self.db.save_session(session)
+
+        start = datetime(2024, 3, 1, 10, 0, 0)
+        dangling = Activity(session_id=session.id, application_name="code", start_time=start)
+        following = Activity(session_id=session.id, application_name="firefox",
+                             start_time=start + timedelta(seconds=90))
+        self.db.save_activity(dangling)
+        self.db.save_activity(following)
+
+        closed = self.db.close_dangling_activities()
+
+        self.assertEqual(closed, 2)
+        activities = {a.id: a for a in self.db.get_activities_by_session(session.id)}
+        self.assertEqual(activities[dangling.id].duration, 90)
+        self.assertEqual(activities[following.id].duration, 0)
+
+    def _save_titles(self, *titles, day=date(2024, 3, 1), duration=60):
+        session = Session()
+        self.db.save_session(session)
+        activities = []
+        for i, title in enumerate(titles):
+            activity = Activity(
+                session_id=session.id, application_name="firefox", window_title=title,
+                start_time=datetime.combine(day, datetime.min.time()) + timedelta(hours=9, minutes=i),
+                duration=duration
+            )
+            self.db.save_activity(activity)
+            activities.append(activity)
+        return activities
+
+    def test_search_titles(self):
+        """Поиск по заголовкам суммирует время по каждому совпавшему заголовку."""
+        self._save_titles(
+            "ABC-123: Ошибка в отчёте - Jira",
+            "ABC-123: Ошибка в отчёте - Jira",
+            "ABC-124: Новый экспорт - Jira",
+            "CORE-123 - Jira",
+        )
+
+        results = self.db.search_titles("abc-123")
+        self.assertEqual([(r["title"], r["duration"], r["count"]) for r in results],
+                         [("ABC-123: Ошибка в отчёте - Jira", 120, 2)])
+
+        # Последнее слово ищется префиксом, регистр кириллицы не важен
+        self.assertEqual(len(self.db.search_titles("ОШИБ")), 1)
+        self.assertEqual(len(self.db.search_titles("jira")), 3)
+        self.assertEqual(self.db.search_titles('"'), [])
+
+    def test_search_titles_range_and_updates(self):
+        """Период ограничивает поиск, смена заголовка переиндексируется."""
+        old, = self._save_titles("ABC-1 старое", day=date(2024, 1, 10))
+        self._save_titles("ABC-1 новое", day=date(2024, 3, 1))
+
+        self.assertEqual(len(self.db.search_titles("abc-1", date(2024, 3, 1), date(2024, 3, 1))), 1)
+        self.assertEqual(len(self.db.search_titles("abc-1", end_date=date(2024, 1, 31))), 1)
+
+        old.window_title = "переименовано"
+        self.db.save_activity(old)
+        self.assertEqual(self.db.search_titles("старое"), [])
+        self.assertEqual(len(self.db.search_titles("переименовано")), 1)
+
+    def test_search_titles_cancelled(self):
+        """Отменённый поиск возвращает None."""
+        self._save_titles("ABC-1")
+        cancel = threading.Event()
+        cancel.set()
+        self.assertIsNone(self.db.search_titles("abc", cancel=cancel))
+
+    def test_search_index_built_for_existing_history(self):
+        """База без индекса заголовков индексируется при инициализации."""
+        self._save_titles("ABC-7 до индекса")
+        conn = sqlite3.connect(self.db_path)
+        conn.executescript("""
+            DROP TRIGGER activity_titles_insert;
+            DROP TRIGGER activity_titles_delete;
+            DROP TRIGGER activity_titles_update;
+            DROP TABLE activity_titles;
+        """)
+        conn.close()
+
+        self.db.initialize()
+        self.assertEqual(len(self.db.search_titles("abc-7")), 1)
+
+    def _save_intervals(self, *spans):
+        """Активности одной сессии по парам (начало, конец) в минутах от 9:00."""
+        session = Session(start_time=datetime(2024, 3, 1, 9, 0))
+        self.db.save_session(session)
+        base = datetime(2024, 3, 1, 9, 0)
+        activities = []
+        for i, (start, end) in enumerate(spans):
+            activity = Activity(
+                session_id=session.id, application_name=f"app{i}",
+                start_time=base + timedelta(minutes=start),
+                end_time=base + timedelta(minutes=end) if end is not None else None
+            )
+            self.db.save_activity(activity)
+            activities.append(activity)
+        return session, activities
+
+    def test_point_and_overlap_queries(self):
+        """Точечный запрос и запрос пересечений по полуоткрытым интервалам."""
+        _, (first, second, third) = self._save_intervals((0, 30), (30, 45), (60, 90))
+        at = lambda h, m, s=0: datetime(2024, 3, 1, h, m, s)
+
+        self.assertEqual([a.id for a in self.db.get_activities_at(at(9, 29, 59))], [first.id])
+        self.assertEqual([a.id for a in self.db.get_activities_at(at(9, 30))], [second.id])
+        self.assertEqual(self.db.get_activities_at(at(9, 50)), [])
+
+        overlapping = self.db.get_overlapping_activities(at(9, 40), at(10, 0, 1))
+        self.assertEqual([a.id for a in overlapping], [second.id, third.id])
+        self.assertEqual(self.db.get_overlapping_activities(at(9, 45), at(10, 0)), [])
+
+    def test_interval_index_follows_updates(self):
+        """Открытая активность индексируется до конца, закрытие и удаление обновляют индекс."""
+        session, (activity,) = self._save_intervals((0, None))
+        later = datetime(2024, 3, 1, 12, 0)
+        self.assertEqual(len(self.db.get_activities_at(later)), 1)
+
+        activity.stop(datetime(2024, 3, 1, 9, 10))
+        self.db.save_activity(activity)
+        self.assertEqual(self.db.get_activities_at(later), [])
+        self.assertEqual(len(self.db.get_activities_at(datetime(2024, 3, 1, 9, 5))), 1)
+
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("DELETE FROM activities")
+        conn.commit()
+        conn.close()
+        self.assertEqual(self.db.get_activities_at(datetime(2024, 3, 1, 9, 5)), [])
+
+        # Повторное сохранение сессии не плодит записей в индексе
+        session.complete(datetime(2024, 3, 1, 10, 0))
+        self.db.save_session(session)
+        sessions = self.db.get_overlapping_sessions(datetime(2024, 3, 1), datetime(2024, 3, 2))
+        self.assertEqual([s.id for s in sessions], [session.id])
+        self.assertEqual(self.db.get_overlapping_sessions(
+            datetime(2024, 3, 1, 10, 0), datetime(2024, 3, 2)), [])
+
+    def test_activity_gaps(self):
+        """Промежутки без активностей внутри диапазона."""
+        self._save_intervals((0, 30), (20, 40), (41, 50), (70, 80))
+        at = lambda m: datetime(2024, 3, 1, 9, 0) + timedelta(minutes=m)
+
+        self.assertEqual(self.db.get_activity_gaps(at(-10), at(90)), [
+            (at(-10), at(0)), (at(40), at(41)), (at(50), at(70)), (at(80), at(90))
+        ])
+        self.assertEqual(self.db.get_activity_gaps(at(0), at(80), min_seconds=120),
+                         [(at(50), at(70))])
+
+    def test_interval_index_built_for_existing_history(self):
+        """База без индекса интервалов индексируется при инициализации."""
+        self._save_intervals((0, 30))
+        conn = sqlite3.connect(self.db_path)
+        conn.executescript("""
+            DROP TRIGGER activity_intervals_insert;
+            DROP TRIGGER activity_intervals_update;
+            DROP TRIGGER activity_intervals_delete;
+            DROP TABLE activity_intervals;
+        """)
+        conn.close()
+
+        self.db.initialize()
+        self.assertEqual(len(self.db.get_activities_at(datetime(2024, 3, 1, 9, 15))), 1)
+
+    def test_get_daily_totals(self):
+        """Итоги по дням периода; дни без сессий отсутствуют."""
+        for day, hours in ((date(2024, 2, 29), 1), (date(2024, 3, 1), 2), (date(2024, 3, 1), 3),
+                           (date(2024, 3, 3), 4), (date(2024, 3, 4), 5)):
+            self.db.save_session(Session(
+                start_time=datetime.combine(day, datetime.min.time()) + timedelta(hours=9),
+                total_duration=hours * 3600
+            ))
+
+        self.assertEqual(self.db.get_daily_totals(date(2024, 3, 1), date(2024, 3, 3)), {
+            date(2024, 3, 1): 5 * 3600, date(2024, 3, 3): 4 * 3600
+        })
+
+    def _brute_range_stats(self, start: date, end: date) -> dict:
+        conn = sqlite3.connect(self.db_path)
+        try:
+            params = (start.isoformat(), end.isoformat())
+            total, sessions, breaks = conn.execute("""
+                SELECT COALESCE(SUM(total_duration), 0), COUNT(*), COALESCE(SUM(breaks_count), 0)
+                FROM sessions WHERE date(start_time) BETWEEN ? AND ?
+            """, params).fetchone()
+            by_type = dict(conn.execute("""
+                SELECT activity_type, SUM(duration) FROM activities
+                WHERE date(start_time) BETWEEN ? AND ? GROUP BY activity_type
+            """, params).fetchall())
+        finally:
+            conn.close()
+        return {"total_time": total, "sessions_count": sessions, "breaks_count": breaks,
+                "productivity": {t: by_type.get(t, 0) for t in ("productive", "neutral",
+                                                               "distracting", "unknown")}}
+
+    def _assert_ranges(self):
+        days = [date(2024, 2, 27) + timedelta(days=i) for i in range(8)]
+        for start in days:
+            for end in days[days.index(start):]:
+                stats = self.db.get_range_stats(start, end)
+                expected = self._brute_range_stats(start, end)
+                self.assertEqual({k: stats[k] for k in expected}, expected, (start, end))
+
+    def test_range_stats_follow_writes(self):
+        """Итоги за любой период совпадают с полным пересчётом после любых изменений."""
+        sessions = []
+        for offset, hours in ((0, 2), (1, 3), (1, 1), (4, 5)):
+            session = Session(start_time=datetime(2024, 2, 28, 9) + timedelta(days=offset),
+                              total_duration=hours * 3600, breaks_count=hours % 2)
+            self.db.save_session(session)
+            sessions.append(session)
+            for activity_type in (ActivityType.PRODUCTIVE, ActivityType.DISTRACTING):
+                self.db.save_activity(Activity(
+                    session_id=session.id, application_name="app",
+                    start_time=session.start_time, duration=hours * 600, activity_type=activity_type
+                ))
+        self._assert_ranges()
+
+        # Изменение сегодняшней сессии, перенос на другой день и правка задним числом
+        sessions[-1].total_duration += 1800
+        self.db.save_session(sessions[-1])
+        sessions[0].start_time = datetime(2024, 3, 2, 10)
+        self.db.save_session(sessions[0])
+        self.db.save_session(Session(start_time=datetime(2024, 2, 27, 8), total_duration=600))
+        self._assert_ranges()
+
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("DELETE FROM sessions WHERE id = ?", (sessions[1].id,))
+        conn.execute("UPDATE activities SET activity_type = 'neutral' WHERE session_id = ?",
+                     (sessions[2].id,))
+        conn.commit()
+        conn.close()
+        self._assert_ranges()
+
+        self.assertEqual(self.db.get_range_stats(date(2000, 1, 1), date(2000, 1, 2))["total_time"], 0)
+
+    def test_cumulative_totals_built_for_existing_history(self):
+        """База без нарастающих итогов пересчитывается при инициализации."""
+        for offset in range(3):
+            session = Session(start_time=datetime(2024, 2, 28, 9) + timedelta(days=offset),
+                              total_duration=3600 * (offset + 1), breaks_count=1)
+            self.db.save_session(session)
+            self.db.save_activity(Activity(session_id=session.id, application_name="app",
+                                           start_time=session.start_time, duration=60,
+                                           activity_type=ActivityType.NEUTRAL))
+        conn = sqlite3.connect(self.db_path)
+        conn.executescript("""
+            DROP TRIGGER cumulative_sessions_insert;
+            DROP TRIGGER cumulative_sessions_update;
+            DROP TRIGGER cumulative_sessions_delete;
+            DROP TRIGGER cumulative_activities_insert;
+            DROP TRIGGER cumulative_activities_update;
+            DROP TRIGGER cumulative_activities_delete;
+            DROP TABLE cumulative_totals;
+        """)
+        conn.close()
+
+        self.db.initialize()
+        self._assert_ranges()
+
+    def test_get_sessions_in_range(self):
+        """Сессии периода от последней, с ограничением числа."""
+        for offset in range(5):
+            self.db.save_session(Session(start_time=datetime(2024, 3, 1, 9) + timedelta(days=offset)))
+
+        sessions = self.db.get_sessions_in_range(date(2024, 3, 2), date(2024, 3, 4))
+        self.assertEqual([s.start_time.day for s in sessions], [4, 3, 2])
+        self.assertEqual(len(self.db.get_sessions_in_range(date(2024, 3, 1), date(2024, 3, 5), 2)), 2)
+
+
+    def test_duration_histogram_follows_writes(self):
+        """Гистограммы совпадают с гистограммой завершённых строк после любых изменений."""
+        day = date(2024, 3, 1)
+        sessions = []
+        for minutes in (5, 25, 25, 90, 240):
+            session = Session(start_time=datetime(2024, 3, 1, 9), total_duration=minutes * 60)
+            session.end_time = session.start_time + timedelta(minutes=minutes)
+            self.db.save_session(session)
+            sessions.append(session)
+        running = Session(start_time=datetime(2024, 3, 1, 18), total_duration=100)
+        self.db.save_session(running)
+        activity = Activity(session_id=running.id, application_name="app",
+                            start_time=datetime(2024, 3, 1, 18))
+        self.db.save_activity(activity)
+        activity.stop(activity.start_time + timedelta(seconds=70))
+        self.db.save_activity(activity)
+
+        sessions[0].total_duration = 600
+        self.db.save_session(sessions[0])
+        sessions[1].start_time += timedelta(days=1)
+        sessions[1].end_time += timedelta(days=1)
+        self.db.save_session(sessions[1])
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("DELETE FROM sessions WHERE id = ?", (sessions[3].id,))
+        conn.commit()
+        conn.close()
+
+        self.assertEqual(self.db.get_duration_histogram("session", day, day),
+                         LogHistogram.of([600, 25 * 60, 240 * 60]))
+        self.assertEqual(self.db.get_duration_histogram("session", day, day + timedelta(days=1)).count, 4)
+        self.assertEqual(self.db.get_duration_histogram("activity", day, day), LogHistogram.of([70]))
+        self.assertAlmostEqual(self.db.get_duration_histogram("session", day, day).quantile(0.5), 25 * 60, delta=25 * 6)
+
+        self.db.set_day_durations("focus", day, [300, 1500])
+        self.db.set_day_durations("focus", day, [2700])
+        self.assertEqual(self.db.get_duration_histogram("focus", day, day), LogHistogram.of([2700]))
+        with self.assertRaises(ValueError):
+            self.db.set_day_durations("session", day, [1])
+
+    def test_duration_histogram_built_for_existing_history(self):
+        """База без гистограмм пересчитывается при инициализации."""
+        durations = [60, 61, 3000, 3600, 7200]
+        for offset, seconds in enumerate(durations):
+            session = Session(start_time=datetime(2024, 3, 1, 9) + timedelta(days=offset % 2),
+                              total_duration=seconds)
+            session.end_time = session.start_time + timedelta(seconds=seconds)
+            self.db.save_session(session)
+        conn = sqlite3.connect(self.db_path)
+        conn.executescript("""
+            DROP TRIGGER duration_sessions_insert;
+            DROP TRIGGER duration_sessions_update;
+            DROP TRIGGER duration_sessions_delete;
+            DROP TABLE duration_histogram;
+        """)
+        conn.close()
+
+        self.db.initialize()
+        self.assertEqual(self.db.get_duration_histogram("session", date(2024, 3, 1), date(2024, 3, 2)),
+                         LogHistogram.of(durations))
+
+    def test_iter_activities_matches_list(self):
+        """Итератор активностей выдаёт то же, что и список пересечений."""
+        self._save_intervals((0, 30), (20, 90), (120, None), (200, 260))
+        start = datetime(2024, 3, 1, 9) + timedelta(minutes=25)
+        end = start + timedelta(minutes=200)
+        self.assertEqual([a.id for a in self.db.iter_activities(start, end)],
+                         [a.id for a in self.db.get_overlapping_activities(start, end)])
+        self.assertEqual(list(self.db.iter_activities(end, start)), [])
+
+    def test_day_dashboard(self):
+        """Итоги по типам, топы и приложения дня одним запросом."""
+        session = Session(start_time=datetime(2024, 3, 1, 9))
+        self.db.save_session(session)
+        spans = [
+            ("code", ActivityType.PRODUCTIVE, datetime(2024, 3, 1, 9), 600),
+            ("code", ActivityType.PRODUCTIVE, datetime(2024, 3, 1, 10), 300),
+            ("terminal", ActivityType.PRODUCTIVE, datetime(2024, 3, 1, 11), 200),
+            ("chrome", ActivityType.DISTRACTING, datetime(2024, 3, 1, 12), 100),
+            ("chrome", ActivityType.DISTRACTING, datetime(2024, 2, 29, 23, 50), 1200),  # вчерашняя
+        ]
+        for name, activity_type, start, seconds in spans:
+            activity = Activity(session_id=session.id, application_name=name, start_time=start,
+                                end_time=start + timedelta(seconds=seconds), activity_type=activity_type)
+            activity.duration = seconds
+            self.db.save_activity(activity)
+
+        dashboard = self.db.get_day_dashboard(date(2024, 3, 1), top=1)
+        self.assertEqual(dashboard["productive"], {"duration": 1100, "apps": 2})
+        self.assertEqual(dashboard["distracting"], {"duration": 100, "apps": 1})
+        self.assertEqual(dashboard["neutral"], {"duration": 0, "apps": 0})
+        self.assertEqual(dashboard["top_productive"], [{"name": "code", "duration": 900}])
+        self.assertEqual([app["name"] for app in dashboard["apps"]], ["code", "terminal", "chrome"])
+
+        stats = self.db.get_productivity_stats(date(2024, 3, 1))
+        self.assertNotIn("apps", stats)
+        self.assertEqual(len(stats["top_productive"]), 2)
+        self.assertEqual(self.db.get_app_with_type(date(2024, 3, 1)), dashboard["apps"])
+        # Активности дня для вкладки - вместе с начатой накануне
+        self.assertEqual(len(dashboard["activities"]), 5)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,101 @@
+"""Тесты итогов дня в памяти."""
+
+import tempfile
+import unittest
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import sys
+
+sys.path.insert(0, 'src')
+
+from core.day_totals import DayTotals
+from database.db_manager import DatabaseManager
+from models.activity import Activity, ActivityType
+from models.session import Session
+
+
+P, D = ActivityType.PRODUCTIVE, ActivityType.DISTRACTING
+
+
+class TestDayTotals(unittest.TestCase):
+    """Тесты накопления времени по приложениям."""
+
+    def setUp(self):
+        """Подготовка к тестам."""
+        self.db = DatabaseManager(Path(tempfile.mkdtemp()) / "test.db")
+        self.db.initialize()
+        self.day = date(2024, 3, 1)
+        self.session = Session(start_time=datetime(2024, 3, 1, 9))
+        self.db.save_session(self.session)
+
+    def _start(self, app, activity_type, at):
+        activity = Activity(session_id=self.session.id, application_name=app,
+                            activity_type=activity_type, start_time=at)
+        self.db.save_activity(activity)
+        return activity
+
+    def test_matches_database_after_activities_finish(self):
+        """Итоги в памяти совпадают с итогами из БД по завершённым активностям."""
+        totals = DayTotals()
+        totals.seed(self.day, self.db.get_app_with_type(self.day))
+
+        moment = datetime(2024, 3, 1, 9, 0, 0, 500_000)
+        previous = None
+        for app, activity_type, seconds in (("code", P, 600.4), ("youtube", D, 90), ("code", P, 1200),
+                                            ("shell", P, 30.7)):
+            activity = self._start(app, activity_type, moment)
+            if previous is not None:
+                previous.stop(moment)
+                self.db.save_activity(previous)
+            self.assertTrue(totals.activity_started(activity))
+            previous = activity
+            moment += timedelta(seconds=seconds)
+
+        # Идущая активность учитывается по времени от начала
+        live = {a["name"]: a["duration"] for a in totals.apps(moment)}
+        self.assertEqual(live["shell"], 30)
+        self.assertEqual(totals.by_type(moment)["productive"], live["code"] + 30)
+
+        previous.stop(moment)
+        self.db.save_activity(previous)
+        self.assertEqual(totals.apps(moment), self.db.get_app_with_type(self.day))
+
+    def test_seed_with_open_activity(self):
+        """Засеянная идущая активность не учитывается дважды."""
+        finished = self._start("code", P, datetime(2024, 3, 1, 9))
+        finished.stop(datetime(2024, 3, 1, 10))
+        self.db.save_activity(finished)
+        running = self._start("code", P, datetime(2024, 3, 1, 10))
+        running.duration = 300  # записано контрольной точкой журнала
+        self.db.save_activity(running)
+
+        totals = DayTotals()
+        totals.seed(self.day, self.db.get_app_with_type(self.day), running)
+        self.assertEqual(totals.by_type(datetime(2024, 3, 1, 10, 30))["productive"], 5400)
+
+    def test_open_activity_from_yesterday_counts_from_midnight(self):
+        """Активность, идущая с вечера, учитывается сегодня только с полуночи."""
+        running = self._start("code", P, datetime(2024, 2, 29, 23, 30))
+        running.duration = 600  # записано вчера, в итоги дня не входит
+
+        totals = DayTotals()
+        totals.seed(self.day, self.db.get_app_with_type(self.day), running)
+        self.assertEqual(totals.by_type(datetime(2024, 3, 1, 0, 30))["productive"], 1800)
+
+        self.assertTrue(totals.activity_started(self._start("youtube", D, datetime(2024, 3, 1, 1))))
+        self.assertEqual(totals.apps(datetime(2024, 3, 1, 1))[0], {"name": "code", "type": "productive",
+                                                                   "duration": 3600})
+
+    def test_other_day_needs_reseed(self):
+        """Активность другого дня не прибавляется к итогам."""
+        totals = DayTotals()
+        totals.seed(self.day, [])
+        self.assertFalse(totals.activity_started(
+            Activity(application_name="code", start_time=datetime(2024, 3, 2, 0, 0, 1))
+        ))
+        self.assertIsNone(totals.open_activity)
+
+
+if __name__ == '__main__':
+    unittest.main()
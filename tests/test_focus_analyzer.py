@@ -0,0 +1,144 @@
+"""Тесты анализа серий фокуса."""
+
+import tempfile
+import unittest
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import sys
+
+sys.path.insert(0, 'src')
+
+from core.focus_analyzer import FocusAnalyzer, FocusHistory, analyze_day
+from database.db_manager import DatabaseManager
+from models.activity import Activity, ActivityType
+from models.session import Session
+from utils.log_histogram import LogHistogram
+
+
+P, D, N = ActivityType.PRODUCTIVE, ActivityType.DISTRACTING, ActivityType.NEUTRAL
+DAY = date(2024, 3, 1)
+
+
+def activities(*spans):
+    """Активности подряд с 9:00: (приложение, тип, минуты)."""
+    result = []
+    moment = datetime(2024, 3, 1, 9, 0)
+    for app, activity_type, minutes in spans:
+        end = moment + timedelta(minutes=minutes)
+        result.append(Activity(application_name=app, activity_type=activity_type,
+                               start_time=moment, end_time=end,
+                               duration=int(minutes * 60)))
+        moment = end
+    return result
+
+
+class TestFocusAnalyzer(unittest.TestCase):
+    """Тесты выделения серий."""
+
+    def test_short_neutral_blip_tolerated(self):
+        """Короткая нейтральная вставка не прерывает серию, длинная - прерывает."""
+        focus = analyze_day(activities(("code", P, 20), ("mail", N, 1), ("code", P, 20),
+                                       ("mail", N, 10), ("code", P, 10)), DAY)
+        self.assertEqual(focus.streak_durations, [41 * 60, 10 * 60])
+        self.assertEqual(focus.deep_work_seconds, 41 * 60)
+        self.assertEqual(focus.longest_streak, 41 * 60)
+        self.assertEqual(focus.switches, 4)
+        self.assertEqual(focus.interruptions, 0)
+
+    def test_distraction_interrupts(self):
+        """Отвлекающее приложение закрывает серию; короткие серии не учитываются."""
+        focus = analyze_day(activities(("code", P, 30), ("youtube", D, 1), ("code", P, 3),
+                                       ("youtube", D, 5)), DAY)
+        self.assertEqual(focus.streak_durations, [30 * 60])
+        self.assertEqual(focus.interruptions, 2)
+        self.assertEqual(focus.tracked_seconds, 39 * 60)
+        self.assertAlmostEqual(focus.switches_per_hour, 3 * 60 / 39)
+
+    def test_pause_ends_streak(self):
+        """Долгая пауза между активностями закрывает серию и не считается переключением."""
+        first, second = activities(("code", P, 20), ("code", P, 20))
+        second.start_time += timedelta(hours=1)
+        second.end_time += timedelta(hours=1)
+
+        focus = analyze_day([first, second], DAY)
+        self.assertEqual(focus.streak_durations, [20 * 60, 20 * 60])
+        self.assertEqual(focus.switches, 0)
+
+    def test_streaming_matches_batch(self):
+        """Предварительный итог копии не меняет состояние анализатора."""
+        spans = activities(("code", P, 10), ("chat", N, 1), ("code", P, 10), ("news", D, 2))
+        analyzer = FocusAnalyzer()
+        for activity in spans[:3]:
+            analyzer.add_activity(activity)
+            preview = analyzer.copy()
+            preview.add_activity(spans[3])
+        self.assertEqual(analyzer.summary(DAY).streak_durations, [21 * 60])
+        self.assertEqual(preview.summary(DAY), analyze_day(spans, DAY))
+
+
+class TestFocusHistory(unittest.TestCase):
+    """Тесты пересчёта истории."""
+
+    def setUp(self):
+        """Подготовка к тестам."""
+        self.db = DatabaseManager(Path(tempfile.mkdtemp()) / "test.db")
+        self.db.initialize()
+        for offset in range(3):
+            session = Session(start_time=datetime(2024, 3, 1, 9) + timedelta(days=offset))
+            self.db.save_session(session)
+            for activity in activities(("code", P, 30 + offset * 10), ("youtube", D, 5)):
+                activity.session_id = session.id
+                activity.start_time += timedelta(days=offset)
+                activity.end_time += timedelta(days=offset)
+                self.db.save_activity(activity)
+
+    def test_missing_days_saved(self):
+        """Дни без показателей считаются и сохраняются вместе с гистограммой серий."""
+        self.assertEqual(len(self.db.get_days_without_focus(date(2024, 3, 3))), 3)
+        updated = []
+        history = FocusHistory(self.db, threaded=False)
+        history.days_updated.connect(updated.append)
+        history.update(date(2024, 3, 3))
+
+        self.assertEqual(updated, [[date(2024, 3, 1), date(2024, 3, 2), date(2024, 3, 3)]])
+        # Последний день посчитан, пока он шёл, - он остаётся незаконченным
+        self.assertEqual(self.db.get_days_without_focus(date(2024, 3, 3)), [date(2024, 3, 3)])
+        days = self.db.get_focus_days(date(2024, 3, 1), date(2024, 3, 3))
+        self.assertEqual([d.longest_streak for d in days], [1800, 2400, 3000])
+        self.assertEqual([d.interruptions for d in days], [1, 1, 1])
+        self.assertEqual(self.db.get_duration_histogram("focus", date(2024, 3, 1), date(2024, 3, 3)),
+                         LogHistogram.of([1800, 2400, 3000]))
+
+        # Повторный запуск пересчитывает только последний день
+        updated.clear()
+        history.update(date(2024, 3, 3))
+        self.assertEqual(updated, [[date(2024, 3, 3)]])
+
+    def test_day_computed_while_in_progress_is_recomputed(self):
+        """День, посчитанный до своего окончания, пересчитывается на следующий день."""
+        day = date(2024, 3, 10)
+        session = Session(start_time=datetime(2024, 3, 10, 9))
+        self.db.save_session(session)
+        history = FocusHistory(self.db, threaded=False)
+
+        first = Activity(session_id=session.id, application_name="code", activity_type=P,
+                         start_time=datetime(2024, 3, 10, 9))
+        first.stop(datetime(2024, 3, 10, 9, 1))
+        self.db.save_activity(first)
+        history.update(day)
+        self.assertEqual(self.db.get_focus_days(day, day)[0].focus_seconds, 0)  # минута - не серия
+
+        # Работа продолжилась после расчёта (выход без остановки, падение, полночь)
+        second = Activity(session_id=session.id, application_name="code", activity_type=P,
+                          start_time=datetime(2024, 3, 10, 9, 1))
+        second.stop(datetime(2024, 3, 10, 10, 1))
+        self.db.save_activity(second)
+        history.update(day + timedelta(days=1))
+
+        self.assertEqual(self.db.get_focus_days(day, day)[0].focus_seconds, 3660)
+        self.assertNotIn(day, self.db.get_days_without_focus(day + timedelta(days=1)))
+
+
+if __name__ == '__main__':
+    unittest.main()
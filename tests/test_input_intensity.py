@@ -0,0 +1,204 @@
+"""Тесты поминутной интенсивности ввода."""
+
+import shutil
+import subprocess
+import tempfile
+import time
+import unittest
+from datetime import datetime, date
+from pathlib import Path
+
+import sys
+
+sys.path.insert(0, 'src')
+
+from PyQt6.QtCore import QCoreApplication
+
+from core.activity_monitor import ActivityMonitor
+from core.activity_sources import ReplaySource, Sample
+from core.input_intensity import (
+    CLICKS, KEYS, MOTION, SCROLLS, InputCollector, IntensityRing, XRecordCollector,
+    count_device_events
+)
+from database.db_manager import DatabaseManager
+from models.input_minute import InputMinute
+from utils.clock import VirtualClock
+from utils.config import Config
+
+
+class FakeCollector(InputCollector):
+    """Сборщик, которым управляет тест."""
+
+    def __init__(self, ring: IntensityRing):
+        super().__init__(ring)
+        self.running = False
+
+    def start(self) -> None:
+        self.running = True
+
+    def stop(self) -> None:
+        self.running = False
+
+
+class TestIntensityRing(unittest.TestCase):
+    """Тесты кольцевого буфера."""
+
+    def setUp(self):
+        """Подготовка к тестам."""
+        self.clock = VirtualClock(datetime(2024, 3, 1, 10, 0))
+        self.ring = IntensityRing(capacity=4, clock=self.clock)
+        self.ring.set_app("code")
+
+    def test_counts_per_minute_and_app(self):
+        """События складываются по минутам и приложениям."""
+        self.ring.record(KEYS, 30)
+        self.ring.record(MOTION, 200)
+        self.ring.set_app("firefox")
+        self.ring.record(CLICKS, 2)
+        self.clock.advance(60)
+        self.ring.record(SCROLLS, 5)
+
+        self.assertEqual(self.ring.drain(), [
+            InputMinute(datetime(2024, 3, 1, 10, 0), "code", keys=30, motion=200),
+            InputMinute(datetime(2024, 3, 1, 10, 0), "firefox", clicks=2),
+            InputMinute(datetime(2024, 3, 1, 10, 1), "firefox", scrolls=5),
+        ])
+        self.assertEqual(self.ring.drain(), [])
+
+    def test_partial_minute_continues_after_drain(self):
+        """После выгрузки неполной минуты счёт продолжается с нуля."""
+        self.ring.record(KEYS, 10)
+        first = self.ring.drain()
+        self.clock.advance(30)
+        self.ring.record(KEYS, 5)
+
+        self.assertEqual([m.keys for m in first + self.ring.drain()], [10, 5])
+
+    def test_unflushed_minutes_are_overwritten(self):
+        """Буфер не растёт: минута старше capacity вытесняется."""
+        for _ in range(6):
+            self.ring.record(KEYS)
+            self.clock.advance(60)
+
+        minutes = self.ring.drain()
+        self.assertEqual(len(minutes), 4)
+        self.assertEqual(minutes[0].minute, datetime(2024, 3, 1, 10, 2))
+        self.assertEqual(self.ring.overwritten, 2)
+
+    def test_count_device_events(self):
+        """Пачка событий X11 сводится к счётчикам по типу и кнопке."""
+        def event(event_type, detail):
+            return bytes([event_type, detail]) + bytes(30)
+
+        data = (event(2, 38) + event(3, 38)            # нажатие и отпускание клавиши
+                + event(4, 1) + event(4, 5)            # щелчок и шаг колеса
+                + event(6, 0) + event(6 | 0x80, 0))    # движение, одно - SendEvent
+
+        self.assertEqual(count_device_events(data), [1, 1, 1, 2])
+
+    def test_no_app_no_counts(self):
+        """Пока приложение не определено, события не учитываются."""
+        self.ring.set_app("")
+        self.ring.record(KEYS, 10)
+        self.assertEqual(self.ring.drain(), [])
+
+
+class TestInputIntensityStorage(unittest.TestCase):
+    """Тесты таблицы input_intensity и выгрузки из монитора."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def setUp(self):
+        """Подготовка к тестам."""
+        temp_dir = Path(tempfile.mkdtemp())
+        self.db = DatabaseManager(temp_dir / "test.db")
+        self.db.initialize()
+        self.config = Config(temp_dir / "config.json")
+
+    def test_partial_minutes_are_added(self):
+        """Повторная запись той же минуты складывает счётчики."""
+        minute = datetime(2024, 3, 1, 10, 0)
+        self.db.save_input_minutes([InputMinute(minute, "code", keys=10, clicks=1)])
+        self.db.save_input_minutes([
+            InputMinute(minute, "code", keys=20),
+            InputMinute(datetime(2024, 3, 1, 10, 1), "code", keys=6, clicks=3),
+            InputMinute(datetime(2024, 3, 2, 0, 0), "code", keys=100),
+        ])
+
+        stats = self.db.get_input_intensity(date(2024, 3, 1))
+        self.assertEqual(len(stats), 1)
+        self.assertEqual(stats[0]["active_minutes"], 2)
+        self.assertEqual(stats[0]["keys"], 36)
+        self.assertEqual(stats[0]["per_minute"], 20.0)
+
+    def test_monitor_flushes_on_stop(self):
+        """Монитор приписывает ввод текущему приложению и пишет итоги при остановке."""
+        self.config.settings.input_intensity_enabled = True
+        clock = VirtualClock(datetime(2024, 3, 1, 10, 0))
+        collectors = []
+
+        def factory(ring):
+            collectors.append(FakeCollector(ring))
+            return collectors[-1]
+
+        monitor = ActivityMonitor(
+            self.db, self.config, threaded=False, clock=clock,
+            source=ReplaySource([Sample(0, "code", "main.py", True)]),
+            input_collector_factory=factory
+        )
+        monitor.start_monitoring("session")
+        monitor._check_activity()
+        self.assertTrue(collectors[0].running)
+
+        monitor.intensity.record(KEYS, 42)
+        monitor.stop_monitoring()
+        monitor.shutdown()
+
+        self.assertFalse(collectors[0].running)
+        stats = self.db.get_input_intensity(date(2024, 3, 1))
+        self.assertEqual([(s["name"], s["keys"]) for s in stats], [("code", 42)])
+
+    def test_disabled_by_default(self):
+        """Без настройки сборщик не создаётся."""
+        created = []
+        monitor = ActivityMonitor(
+            self.db, self.config, threaded=False,
+            source=ReplaySource([]), input_collector_factory=created.append
+        )
+        monitor.start_monitoring("session")
+        monitor.stop_monitoring()
+        monitor.shutdown()
+        self.assertEqual(created, [])
+
+
+@unittest.skipUnless(XRecordCollector.available() and shutil.which("xdotool"),
+                     "нужны X-сервер (например, Xvfb), python-xlib и xdotool")
+class TestXRecordCollector(unittest.TestCase):
+    """Синтетический ввод через XTEST (xdotool) под X-сервером."""
+
+    def test_synthetic_input_is_counted(self):
+        """Нажатия, щелчки и движения мыши попадают в счётчики."""
+        ring = IntensityRing()
+        ring.set_app("xvfb")
+        collector = XRecordCollector(ring)
+        collector.start()
+        try:
+            time.sleep(0.2)
+            subprocess.run(["xdotool", "key", "a", "b", "c"], check=True)
+            subprocess.run(["xdotool", "click", "1", "click", "4"], check=True)
+            subprocess.run(["xdotool", "mousemove", "10", "10", "mousemove", "50", "50"], check=True)
+            time.sleep(0.5)
+        finally:
+            collector.stop()
+
+        minutes = ring.drain()
+        self.assertEqual(sum(m.keys for m in minutes), 3)
+        self.assertEqual(sum(m.clicks for m in minutes), 1)
+        self.assertEqual(sum(m.scrolls for m in minutes), 1)
+        self.assertGreaterEqual(sum(m.motion for m in minutes), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+"""Тесты дерева интервалов."""
+
+import random
+import unittest
+from datetime import datetime, timedelta
+
+import sys
+
+sys.path.insert(0, 'src')
+
+from utils.interval_tree import IntervalTree
+
+
+class TestIntervalTree(unittest.TestCase):
+    """Тесты запросов к дереву интервалов."""
+
+    def setUp(self):
+        """Подготовка к тестам."""
+        rng = random.Random(7)
+        self.intervals = []
+        for i in range(500):
+            start = rng.randint(0, 10_000)
+            self.intervals.append((start, start + rng.choice([0, 1, 5, 60, 600, 3000]), i))
+        self.tree = IntervalTree(self.intervals)
+
+    def _brute(self, predicate):
+        return [value for start, end, value in sorted(self.intervals, key=lambda item: item[0])
+                if predicate(start, end)]
+
+    def test_matches_brute_force(self):
+        """Результаты совпадают с полным перебором, порядок - по началу."""
+        rng = random.Random(11)
+        for _ in range(300):
+            lo = rng.randint(-100, 11_000)
+            hi = lo + rng.randint(1, 800)
+            self.assertEqual(self.tree.overlapping(lo, hi),
+                             self._brute(lambda s, e: s < hi and e > lo))
+            self.assertEqual(self.tree.at(lo),
+                             self._brute(lambda s, e: s <= lo < e))
+
+    def test_half_open_bounds(self):
+        """Конец отрезка в него не входит, пустые отрезки не находятся."""
+        tree = IntervalTree([(10, 20, "a"), (20, 30, "b"), (25, 25, "empty")])
+        self.assertEqual(tree.at(20), ["b"])
+        self.assertEqual(tree.at(25), ["b"])
+        self.assertEqual(tree.overlapping(0, 10), [])
+        self.assertEqual(tree.overlapping(19, 21), ["a", "b"])
+        self.assertEqual(tree.overlapping(15, 15), [])
+
+    def test_gaps_and_coverage(self):
+        """Промежутки - дополнение объединения отрезков внутри диапазона."""
+        day = datetime(2024, 3, 1)
+        at = lambda minutes: day + timedelta(minutes=minutes)
+        tree = IntervalTree([
+            (at(0), at(30), 1), (at(10), at(20), 2), (at(30), at(45), 3), (at(50), at(60), 4)
+        ])
+
+        self.assertEqual(tree.covered(at(5), at(55)), [(at(5), at(45)), (at(50), at(55))])
+        self.assertEqual(tree.gaps(at(-5), at(70)),
+                         [(at(-5), at(0)), (at(45), at(50)), (at(60), at(70))])
+        self.assertEqual(tree.gaps(at(-5), at(70), timedelta(minutes=10)), [(at(60), at(70))])
+        self.assertEqual(IntervalTree().gaps(at(0), at(1)), [(at(0), at(1))])
+
+
+if __name__ == '__main__':
+    unittest.main()
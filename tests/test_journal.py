@@ -0,0 +1,110 @@
+"""Тесты журнала сессии."""
+
+import json
+import tempfile
+import unittest
+from datetime import date
+from pathlib import Path
+
+import sys
+
+sys.path.insert(0, 'src')
+
+from database.db_manager import DatabaseManager
+from database.journal import SessionJournal
+from models.session import Session, SessionStatus
+from models.activity import Activity
+
+
+class TestSessionJournal(unittest.TestCase):
+    """Тесты записи, восстановления и компакции журнала."""
+
+    def setUp(self):
+        """Подготовка к тестам."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.db = DatabaseManager(self.temp_dir / "test.db")
+        self.db.initialize()
+        self.path = self.temp_dir / "test.journal"
+
+    def _crashed_session(self) -> Session:
+        """Сессия, после которой процесс «упал» без сохранения в БД."""
+        journal = SessionJournal(self.path)
+        session = Session()
+        journal.session_event("start", session)
+        self.db.save_session(session)
+
+        activity = Activity(session_id=session.id, application_name="code")
+        journal.activity_started(activity)
+        self.db.save_activity(activity)
+
+        session.total_duration = session.active_duration = 42
+        journal.heartbeat(session)
+        journal.sync()
+        return session
+
+    def test_recover_restores_durations(self):
+        """После падения длительность берётся из последнего пульса."""
+        session = self._crashed_session()
+
+        SessionJournal(self.path).recover(self.db)
+
+        restored = self.db.get_session(session.id)
+        self.assertEqual(restored.total_duration, 42)
+        self.assertEqual(restored.status, SessionStatus.ACTIVE)
+
+    def test_recover_closes_dangling_activities(self):
+        """Висящие активности закрываются."""
+        session = self._crashed_session()
+
+        closed = SessionJournal(self.path).recover(self.db)
+
+        self.assertEqual(closed, 1)
+        activities = self.db.get_activities_by_session(session.id)
+        self.assertTrue(all(a.end_time is not None for a in activities))
+
+    def test_recover_truncates_journal(self):
+        """После восстановления журнал пуст."""
+        self._crashed_session()
+
+        SessionJournal(self.path).recover(self.db)
+
+        self.assertEqual(self.path.read_text(encoding="utf-8"), "")
+
+    def test_torn_last_line_is_skipped(self):
+        """Недописанная последняя строка не ломает проигрывание."""
+        session = self._crashed_session()
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write('{"e": "heartbeat", "id": "')
+
+        state = SessionJournal(self.path).replay()
+
+        self.assertEqual(state.sessions[session.id]["total_duration"], 42)
+
+    def test_compact_keeps_only_open_entries(self):
+        """Компакция пишет состояние в БД и оставляет снимки открытых записей."""
+        journal = SessionJournal(self.path)
+
+        finished = Session()
+        journal.session_event("start", finished)
+        finished.complete()
+        journal.session_event("stop", finished)
+
+        running = Session()
+        journal.session_event("start", running)
+        running.total_duration = 120
+        journal.heartbeat(running)
+
+        journal.compact(self.db)
+
+        self.assertEqual(self.db.get_daily_stats(date.today())["sessions_count"], 2)
+        self.assertEqual(self.db.get_session(running.id).total_duration, 120)
+
+        records = [json.loads(line) for line in self.path.read_text(encoding="utf-8").splitlines()]
+        self.assertEqual([r["e"] for r in records], ["snapshot"])
+        self.assertEqual(records[0]["session"]["id"], running.id)
+
+        journal.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+"""Тесты гистограммы длительностей."""
+
+import random
+import unittest
+
+import sys
+
+sys.path.insert(0, 'src')
+
+from utils.log_histogram import BOUNDS, GROWTH, LogHistogram, bucket_of, bucket_value
+
+
+class TestLogHistogram(unittest.TestCase):
+    """Тесты корзин, слияния и квантилей."""
+
+    def test_bounds(self):
+        """Границы растут, короткие длительности различаются до секунды."""
+        self.assertEqual(BOUNDS[:4], [0, 1, 2, 3])
+        self.assertTrue(all(a < b for a, b in zip(BOUNDS, BOUNDS[1:])))
+        self.assertTrue(all(b <= a * GROWTH + 1 for a, b in zip(BOUNDS[1:], BOUNDS[2:])))
+        for seconds in (0, 1, 7, 59, 60, 3599, 86400):
+            bucket = bucket_of(seconds)
+            self.assertLessEqual(BOUNDS[bucket], seconds)
+            self.assertTrue(bucket + 1 == len(BOUNDS) or seconds < BOUNDS[bucket + 1])
+        self.assertEqual(bucket_of(-5), 0)
+        self.assertEqual(bucket_of(10**9), len(BOUNDS) - 1)
+
+    def test_quantiles_close_to_exact(self):
+        """Квантили отличаются от точных не больше чем на ширину корзины."""
+        rng = random.Random(3)
+        values = sorted(int(rng.lognormvariate(7, 1.2)) for _ in range(5000))
+        histogram = LogHistogram.of(values)
+
+        self.assertEqual(histogram.count, len(values))
+        for q in (0.1, 0.5, 0.9, 0.99):
+            exact = values[int(q * (len(values) - 1))]
+            self.assertLessEqual(abs(histogram.quantile(q) - exact), max(1.0, exact * (GROWTH - 1)), q)
+        self.assertAlmostEqual(histogram.mean(), sum(values) / len(values),
+                               delta=sum(values) / len(values) * 0.05)
+        self.assertEqual(LogHistogram().quantile(0.5), 0.0)
+        self.assertEqual(bucket_value(bucket_of(7)), 7)
+
+    def test_merge_equals_union(self):
+        """Сумма гистограмм равна гистограмме объединения."""
+        first, second = [5, 100, 4000, 4000], [1, 200, 7200]
+        merged = LogHistogram.of(first) + LogHistogram.of(second)
+        self.assertEqual(merged, LogHistogram.of(first + second))
+        self.assertEqual(merged.histogram([0, 60, 3600]), [2, 2, 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
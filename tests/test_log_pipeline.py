@@ -0,0 +1,81 @@
+"""Тесты конвейера логирования."""
+
+import gzip
+import logging
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+import sys
+
+sys.path.insert(0, 'src')
+
+from utils.log_pipeline import CompressingRotatingFileHandler, DuplicateFilter
+
+
+def _record(msg: str, level: int = logging.DEBUG) -> logging.LogRecord:
+    return logging.LogRecord("test", level, __file__, 1, msg, None, None)
+
+
+class TestDuplicateFilter(unittest.TestCase):
+    """Тесты подавления повторов."""
+
+    def test_suppresses_repeats(self):
+        """Повтор в пределах окна подавляется, затем выводится со счётчиком."""
+        log_filter = DuplicateFilter(interval=0.05)
+
+        self.assertTrue(log_filter.filter(_record("Ошибка получения активного окна")))
+        self.assertFalse(log_filter.filter(_record("Ошибка получения активного окна")))
+        self.assertFalse(log_filter.filter(_record("Ошибка получения активного окна")))
+
+        time.sleep(0.06)
+        record = _record("Ошибка получения активного окна")
+        self.assertTrue(log_filter.filter(record))
+        self.assertIn("повторено ещё 2 раз", record.getMessage())
+
+    def test_higher_levels_pass(self):
+        """Предупреждения и ошибки не подавляются."""
+        log_filter = DuplicateFilter(interval=60)
+
+        for _ in range(3):
+            self.assertTrue(log_filter.filter(_record("Ошибка базы данных", logging.ERROR)))
+
+
+class TestCompressingRotatingFileHandler(unittest.TestCase):
+    """Тесты ротации."""
+
+    def setUp(self):
+        """Подготовка к тестам."""
+        self.log_path = Path(tempfile.mkdtemp()) / "app.log"
+
+    def test_size_rotation_compresses(self):
+        """При превышении размера старый сегмент сжимается."""
+        handler = CompressingRotatingFileHandler(self.log_path, max_bytes=200, max_age=0, backup_count=2)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        for i in range(20):
+            handler.emit(_record(f"строка {i:03d} " + "x" * 20, logging.INFO))
+        handler.close()
+
+        segment = self.log_path.with_name("app.log.1.gz")
+        self.assertTrue(segment.exists())
+        self.assertFalse(self.log_path.with_name("app.log.3.gz").exists())
+        with gzip.open(segment, "rt", encoding="utf-8") as f:
+            self.assertIn("строка", f.read())
+
+    def test_age_rotation(self):
+        """Сегмент старше max_age ротируется."""
+        handler = CompressingRotatingFileHandler(self.log_path, max_bytes=0, max_age=3600)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        handler.emit(_record("первая", logging.INFO))
+
+        handler._opened_at -= 7200
+        handler.emit(_record("вторая", logging.INFO))
+        handler.close()
+
+        self.assertTrue(self.log_path.with_name("app.log.1.gz").exists())
+        self.assertEqual(self.log_path.read_text(encoding="utf-8").strip(), "вторая")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+"""Тесты инструментации."""
+
+import unittest
+
+import sys
+
+sys.path.insert(0, 'src')
+
+from utils import metrics
+from utils.metrics import LatencyHistogram, MetricsRegistry
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    """Тесты гистограммы задержек."""
+
+    def test_percentiles(self):
+        """Перцентили в пределах точности корзин."""
+        histogram = LatencyHistogram()
+        for ms in range(1, 101):
+            histogram.record(ms / 1000)
+
+        self.assertEqual(histogram.count, 100)
+        self.assertAlmostEqual(histogram.percentile(50), 0.050, delta=0.050 * 0.1)
+        self.assertAlmostEqual(histogram.percentile(99), 0.099, delta=0.099 * 0.1)
+        self.assertLessEqual(histogram.percentile(100), histogram.max)
+
+    def test_errors_counted(self):
+        """Ошибки учитываются отдельно."""
+        histogram = LatencyHistogram()
+        histogram.record(0.01, error=True)
+        histogram.record(0.01)
+
+        self.assertEqual(histogram.to_dict()["errors"], 1)
+
+
+class TestTimed(unittest.TestCase):
+    """Тесты декоратора и контекстного менеджера."""
+
+    def setUp(self):
+        """Подготовка к тестам."""
+        metrics.registry.reset()
+
+    def tearDown(self):
+        """Выключение сбора после теста."""
+        metrics.enable(False)
+        metrics.registry.reset()
+
+    def test_disabled_records_nothing(self):
+        """Выключенный сбор ничего не пишет."""
+        @metrics.timed("test.op")
+        def op():
+            return 42
+
+        self.assertEqual(op(), 42)
+        with metrics.measure("test.block"):
+            pass
+        self.assertEqual(metrics.registry.snapshot(), {})
+
+    def test_enabled_records_calls_and_errors(self):
+        """Включённый сбор считает вызовы и ошибки."""
+        metrics.enable()
+
+        @metrics.timed("test.op")
+        def op(fail):
+            if fail:
+                raise ValueError
+            return 1
+
+        op(False)
+        with self.assertRaises(ValueError):
+            op(True)
+        with metrics.measure("test.block"):
+            pass
+
+        snapshot = metrics.registry.snapshot()
+        self.assertEqual(snapshot["test.op"]["count"], 2)
+        self.assertEqual(snapshot["test.op"]["errors"], 1)
+        self.assertEqual(snapshot["test.block"]["count"], 1)
+
+    def test_dump(self):
+        """Сводка сохраняется в JSON."""
+        import json
+        import tempfile
+        from pathlib import Path
+
+        registry = MetricsRegistry()
+        registry.record("op", 0.002)
+        path = Path(tempfile.mkdtemp()) / "metrics.json"
+        registry.dump(path)
+
+        self.assertEqual(json.loads(path.read_text(encoding="utf-8"))["op"]["count"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+"""Тесты кэша сведений о процессах."""
+
+import os
+import subprocess
+import unittest
+from unittest import mock
+
+import sys
+
+sys.path.insert(0, 'src')
+
+from core.process_cache import ProcessCache, ProcessInfo
+
+
+class TestProcessInfo(unittest.TestCase):
+    """Тесты имени приложения по командной строке."""
+
+    def test_plain_process_keeps_name(self):
+        """Обычный процесс - имя без изменений."""
+        info = ProcessInfo(1, 0.0, "firefox", cmdline=["/usr/bin/firefox", "--new-tab"])
+        self.assertEqual(info.display_name, "firefox")
+
+    def test_python_script(self):
+        """Скрипт python опознаётся по первому аргументу."""
+        info = ProcessInfo(1, 0.0, "python3", cmdline=["python3", "-u", "/srv/app/manage.py", "runserver"])
+        self.assertEqual(info.display_name, "python3 (manage.py)")
+
+    def test_python_module(self):
+        """Запуск модуля через -m."""
+        info = ProcessInfo(1, 0.0, "python", cmdline=["python", "-m", "jupyterlab"])
+        self.assertEqual(info.display_name, "python (jupyterlab)")
+
+    def test_electron_app(self):
+        """Electron-приложение - по каталогу приложения."""
+        info = ProcessInfo(1, 0.0, "electron", cmdline=["electron", "/opt/Obsidian/resources/app.asar"])
+        self.assertEqual(info.display_name, "electron (Obsidian)")
+
+    def test_inline_code_keeps_name(self):
+        """python -c - скрипта нет."""
+        info = ProcessInfo(1, 0.0, "python", cmdline=["python", "-c", "print(1)"])
+        self.assertEqual(info.display_name, "python")
+
+
+class TestProcessCache(unittest.TestCase):
+    """Тесты кэширования и распознавания повторного PID."""
+
+    def test_hit_for_same_process(self):
+        """Повторный запрос того же процесса берётся из кэша."""
+        cache = ProcessCache()
+
+        first = cache.lookup(os.getpid())
+        second = cache.lookup(os.getpid())
+
+        self.assertIs(first, second)
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_capture_details(self):
+        """С capture_details читаются exe и cmdline."""
+        cache = ProcessCache(capture_details=True)
+
+        info = cache.lookup(os.getpid())
+
+        self.assertTrue(info.exe)
+        self.assertTrue(info.cmdline)
+
+    def test_lru_eviction(self):
+        """Сверх ёмкости вытесняется самый давний процесс."""
+        cache = ProcessCache(capacity=1)
+        child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(5)"])
+        try:
+            cache.lookup(os.getpid())
+            cache.lookup(child.pid)
+            self.assertEqual(len(cache), 1)
+
+            cache.lookup(os.getpid())
+            self.assertEqual(cache.stats()["misses"], 3)
+        finally:
+            child.kill()
+            child.wait()
+
+    def test_reused_pid_misses_cache(self):
+        """Тот же PID с другим временем создания - новый процесс; старая запись ждёт вытеснения."""
+        class FakeProcess:
+            def __init__(self, pid):
+                self.pid = pid
+
+            def create_time(self):
+                return current["create_time"]
+
+            def name(self):
+                return current["name"]
+
+        current = {"create_time": 100.0, "name": "firefox"}
+        cache = ProcessCache(capacity=2)
+        with mock.patch.object(ProcessCache, "_start_time", return_value=None), \
+                mock.patch("psutil.Process", FakeProcess):
+            self.assertEqual(cache.app_name(4242), "firefox")
+
+            current.update(create_time=200.0, name="telegram")
+            self.assertEqual(cache.app_name(4242), "telegram")
+
+            self.assertEqual(cache.stats(), {"size": 2, "hits": 0, "misses": 2})
+            # Старая запись - первая на вытеснение
+            self.assertEqual(list(cache._entries), [(4242, 100.0), (4242, 200.0)])
+
+            current.update(create_time=300.0, name="code")
+            self.assertEqual(cache.app_name(4242), "code")
+            self.assertEqual(list(cache._entries), [(4242, 200.0), (4242, 300.0)])
+
+    def test_missing_process(self):
+        """Несуществующий процесс - None."""
+        cache = ProcessCache()
+        self.assertIsNone(cache.lookup(2 ** 22 + 12345))
+
+
+if __name__ == "__main__":
+    unittest.main()
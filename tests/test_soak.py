@@ -0,0 +1,221 @@
+"""Длительный прогон трекера, перерывов и монитора на виртуальных часах."""
+
+import gc
+import sqlite3
+import tempfile
+import tracemalloc
+import unittest
+from datetime import datetime, timedelta, date
+from pathlib import Path
+
+import sys
+
+sys.path.insert(0, 'src')
+
+from PyQt6.QtCore import QCoreApplication
+
+from core.activity_monitor import ActivityMonitor
+from core.activity_sources import ActivitySource, Sample
+from core.break_manager import BreakManager
+from core.clock_service import ClockService
+from core.tracker import TimeTracker
+from database.db_manager import DatabaseManager
+from database.journal import SessionJournal
+from utils.clock import VirtualClock
+from utils.config import Config
+
+
+APPS = ["code", "firefox", "gnome-terminal", "telegram"]
+SWITCH_EVERY = 600  # секунды
+
+
+class ScriptedSource(ActivitySource):
+    """Пользователь, переключающий приложение каждые SWITCH_EVERY секунд."""
+
+    def __init__(self, clock: VirtualClock):
+        self._clock = clock
+
+    def sample(self, idle_timeout: int) -> Sample:
+        app = APPS[int(self._clock.monotonic() // SWITCH_EVERY) % len(APPS)]
+        return Sample(0, app, f"{app} - window", True, self._clock.now().timestamp())
+
+
+class TestSoak(unittest.TestCase):
+    """Недели работы по будням: длительности, перерывы, полночь, память."""
+
+    WEEKS = 2
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def setUp(self):
+        """Подготовка к тестам."""
+        temp_dir = Path(tempfile.mkdtemp())
+        self.journal_path = temp_dir / "soak.journal"
+        self.db_path = temp_dir / "soak.db"
+        self.db = DatabaseManager(self.db_path)
+        self.db.initialize()
+
+        self.config = Config(temp_dir / "config.json")
+        self.config.settings.short_break_interval = 25
+        self.config.settings.long_break_interval = 100
+
+        # Понедельник, полночь: монотонное время 0 совпадает с началом суток
+        self.clock = VirtualClock(datetime(2024, 1, 1))
+        self.reminders = []
+        self._start_app()
+
+    def _start_app(self) -> None:
+        """Компоненты и связи как в MainWindow (журнал восстанавливается трекером)."""
+        self.service = ClockService(clock=self.clock)
+        self.service.set_ui_visible(False)  # приложение свёрнуто в трей
+        self.journal = SessionJournal(self.journal_path, clock=self.clock)
+
+        self.tracker = TimeTracker(self.db, self.service, self.journal, clock=self.clock)
+        self.breaks = BreakManager(self.config, self.service, clock=self.clock)
+        self.monitor = ActivityMonitor(
+            self.db, self.config, self.service, self.journal,
+            threaded=False, source=ScriptedSource(self.clock), clock=self.clock
+        )
+
+        # Связи как в MainWindow
+        self.tracker.session_started.connect(lambda s: self.monitor.start_monitoring(s.id))
+        self.tracker.session_started.connect(lambda s: self.breaks.start())
+        self.tracker.session_paused.connect(self.breaks.pause)
+        self.tracker.session_resumed.connect(self.breaks.resume)
+        self.tracker.session_stopped.connect(lambda s: self.monitor.stop_monitoring())
+        self.tracker.session_stopped.connect(lambda s: self.breaks.stop())
+
+        self.breaks.break_reminder.connect(lambda kind, _: self.reminders.append(kind))
+
+    def tearDown(self):
+        """Остановка монитора."""
+        self.monitor.shutdown()
+        self.journal.close()
+
+    def _crash(self) -> None:
+        """Процесс упал: таймеры больше не срабатывают, ничего не дописывается."""
+        for subscription in list(self.service._subscriptions):
+            subscription.stop()
+        self.monitor.shutdown()
+
+    def _at(self, day: date, hour: int) -> datetime:
+        return datetime.combine(day, datetime.min.time()) + timedelta(hours=hour)
+
+    def _work_day(self, day: date) -> None:
+        """9:00-13:00, обед, 14:00-18:00."""
+        self.clock.advance_to(self._at(day, 9))
+        self.tracker.start()
+        self.clock.advance_to(self._at(day, 13))
+        self.tracker.pause()
+        self.clock.advance_to(self._at(day, 14))
+        self.tracker.start()
+        self.clock.advance_to(self._at(day, 18))
+        self.tracker.stop()
+
+    def _week(self, monday: date) -> None:
+        for offset in range(5):
+            self._work_day(monday + timedelta(days=offset))
+
+    def _query(self, sql: str) -> list:
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute(sql).fetchall()
+        finally:
+            conn.close()
+
+    def test_weeks_of_tracking(self):
+        """Итоги по дням, напоминания и переход через полночь без роста памяти."""
+        monday = date(2024, 1, 1)
+
+        # Первая неделя прогревает кэши, рост памяти меряем на остальных
+        self._week(monday)
+        gc.collect()
+        tracemalloc.start()
+        try:
+            before = tracemalloc.take_snapshot()
+            for week in range(1, self.WEEKS):
+                self._week(monday + timedelta(weeks=week))
+            gc.collect()
+            after = tracemalloc.take_snapshot()
+        finally:
+            tracemalloc.stop()
+
+        growth = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+        self.assertLess(growth, 256 * 1024)
+
+        # Вечерняя сессия последней пятницы переходит через полночь
+        friday = monday + timedelta(weeks=self.WEEKS - 1, days=4)
+        self.clock.advance_to(self._at(friday, 22))
+        self.tracker.start()
+        self.clock.advance_to(self._at(friday, 23) + timedelta(minutes=30))
+        self.assertEqual(self.tracker.get_today_total(), 8 * 3600 + 90 * 60)
+
+        self.clock.advance_to(self._at(friday, 24) + timedelta(minutes=30))
+        self.assertEqual(self.tracker.get_today_total(), 0)  # сессия относится к пятнице
+        self.clock.advance_to(self._at(friday, 25))
+        self.tracker.stop()
+
+        workdays = 5 * self.WEEKS
+        days = self._query(
+            "SELECT date(start_time), SUM(total_duration), COUNT(*) FROM sessions GROUP BY 1"
+        )
+        self.assertEqual(len(days), workdays)
+        for day, total, count in days:
+            expected = 8 * 3600 + (3 * 3600 if day == friday.isoformat() else 0)
+            self.assertEqual(total, expected, day)
+
+        # Активности пишутся и на обеде (монитор на паузе не останавливается);
+        # первая начинается с первого опроса через 2 секунды после старта
+        activities = dict(self._query(
+            "SELECT date(start_time), SUM(duration) FROM activities GROUP BY 1"
+        ))
+        self.assertEqual(activities[monday.isoformat()], 9 * 3600 - 2)
+        saturday = friday + timedelta(days=1)
+        self.assertEqual(activities[friday.isoformat()], 9 * 3600 - 2 + 2 * 3600 - 2)
+        self.assertEqual(activities[saturday.isoformat()], 3600)
+        self.assertEqual(self._query("SELECT COUNT(*) FROM activities WHERE end_time IS NULL"), [(0,)])
+
+        # Рабочее время копится между сессиями: граница каждые 25 минут, длинная - каждые 100
+        worked_minutes = workdays * 8 * 60 + 3 * 60
+        self.assertEqual(len(self.reminders), worked_minutes // 25)
+        self.assertEqual(self.reminders.count("long"), worked_minutes // 100)
+
+    def test_crash_recovery_on_virtual_time(self):
+        """После падения висящая активность закрывается временем последнего события."""
+        monday = date(2024, 1, 1)
+        self.clock.advance_to(self._at(monday, 9))
+        self.tracker.start()
+        # Между компакциями журнала: после последней в нём есть пульсы
+        crash = self._at(monday, 11) + timedelta(seconds=SWITCH_EVERY * 2 // 3 + 3)
+        self.clock.advance_to(crash)
+        self._crash()
+
+        # Перезапуск через час: журнал переносится в БД, сессия продолжается
+        self.clock.advance_to(self._at(monday, 12))
+        self._start_app()
+        self.assertTrue(self.tracker.is_running)
+        self.clock.advance_to(self._at(monday, 13))
+        self.tracker.stop()
+
+        self.assertEqual(self._query("SELECT COUNT(*) FROM activities WHERE end_time IS NULL"), [(0,)])
+        # Активность, шедшая при падении, закрыта по виртуальному времени
+        (end_time, duration), = self._query(
+            f"SELECT end_time, duration FROM activities WHERE start_time < '{crash.isoformat()}' "
+            f"ORDER BY start_time DESC LIMIT 1"
+        )
+        recovered_end = datetime.fromisoformat(end_time)
+        self.assertLessEqual(recovered_end, crash)
+        self.assertGreaterEqual(recovered_end, crash - timedelta(seconds=TimeTracker.HEARTBEAT_INTERVAL))
+        self.assertLessEqual(duration, SWITCH_EVERY)
+
+        # До падения - по последнему пульсу, после перезапуска - ещё час
+        before_crash = int((crash - self._at(monday, 9)).total_seconds())
+        (total,), = self._query("SELECT total_duration FROM sessions")
+        self.assertGreaterEqual(total, before_crash - TimeTracker.HEARTBEAT_INTERVAL + 3600)
+        self.assertLessEqual(total, before_crash + 3600)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+"""Тесты ленты активностей."""
+
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import tempfile
+import unittest
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import sys
+
+sys.path.insert(0, 'src')
+
+from PyQt6.QtWidgets import QApplication
+
+from database.db_manager import DatabaseManager
+from gui.widgets.timeline_widget import TYPE_COLORS, TimelineWidget, level_of_detail
+from models.activity import Activity, ActivityType
+from models.session import Session
+
+
+# Виджетам нужен QApplication; создаём его при импорте, пока другие
+# модули тестов не создали QCoreApplication в своих setUpClass
+APP = QApplication.instance() or QApplication([])
+
+P, D, N = ActivityType.PRODUCTIVE, ActivityType.DISTRACTING, ActivityType.NEUTRAL
+
+
+class TestLevelOfDetail(unittest.TestCase):
+    """Тесты сведения отрезков к пикселям."""
+
+    def test_wide_segments_kept(self):
+        """Широкие отрезки остаются, соседние одного типа сливаются."""
+        runs = level_of_detail([(0, 100, P), (100, 250, P), (250, 300, D)], 0, 10)
+        self.assertEqual(runs, [(0, 25, P), (25, 30, D)])
+
+    def test_subpixel_segments_merged(self):
+        """Мелкие отрезки в пикселе дают один столбец доминирующего типа."""
+        segments = []
+        for second in range(0, 600, 2):  # 300 отрезков по секунде, 10 секунд в пикселе
+            segments.append((second, second + 1, D if second % 10 == 0 else P))
+
+        runs = level_of_detail(segments, 0, 10)
+        self.assertEqual(runs, [(0, 60, P)])
+
+    def test_output_bounded_by_width(self):
+        """Число прямоугольников не больше числа пикселей."""
+        segments = [(i * 0.5, i * 0.5 + 0.4, (P, D, N)[i % 3]) for i in range(100_000)]
+        runs = level_of_detail(segments, 0, 100)
+        self.assertLessEqual(len(runs), 500)
+        self.assertTrue(all(x0 < x1 for x0, x1, _ in runs))
+
+
+class TestTimelineWidget(unittest.TestCase):
+    """Тесты отрисовки и загрузки данных ленты."""
+
+    def setUp(self):
+        """Подготовка к тестам."""
+        self.db = DatabaseManager(Path(tempfile.mkdtemp()) / "test.db")
+        self.db.initialize()
+        self.day = date(2024, 3, 1)
+
+        session = Session(start_time=datetime(2024, 3, 1, 9, 0))
+        self.db.save_session(session)
+        for hour, activity_type in ((9, P), (12, D)):
+            start = datetime(2024, 3, 1, hour, 0)
+            self.db.save_activity(Activity(
+                session_id=session.id, application_name=activity_type.value,
+                start_time=start, end_time=start + timedelta(hours=2),
+                duration=7200, activity_type=activity_type
+            ))
+
+        self.widget = TimelineWidget(self.db, threaded=False)
+        self.widget.resize(800, self.widget.minimumHeight())
+        self.widget.show_day(self.day)
+
+    def tearDown(self):
+        """Удаление виджета."""
+        self.widget.deleteLater()
+
+    def _color_at(self, moment: datetime):
+        image = self.widget.grab().toImage()
+        start, end = self.widget.visible_range()
+        x = int((moment - start) / (end - start) * self.widget.width())
+        return image.pixelColor(x, TimelineWidget.BAR_TOP + TimelineWidget.BAR_HEIGHT // 2)
+
+    def test_day_fits_and_colors(self):
+        """День помещается в ширину, отрезки окрашены по типу."""
+        start, end = self.widget.visible_range()
+        self.assertLessEqual(start, datetime(2024, 3, 1))
+        self.assertGreaterEqual(end, datetime(2024, 3, 2))
+
+        self.widget.grab()  # первая отрисовка загружает день
+        self.assertEqual(self._color_at(datetime(2024, 3, 1, 10, 0)), TYPE_COLORS[P])
+        self.assertEqual(self._color_at(datetime(2024, 3, 1, 13, 0)), TYPE_COLORS[D])
+        self.assertNotIn(self._color_at(datetime(2024, 3, 1, 16, 0)), TYPE_COLORS.values())
+
+        self.assertEqual(self.widget.activity_at(datetime(2024, 3, 1, 12, 30)).activity_type, D)
+
+    def test_tiles_reused_when_scrolling_back(self):
+        """Прокрутка туда и обратно не перерисовывает плитки заново."""
+        self.widget.grab()
+        self.widget.grab()
+        rendered = self.widget.tiles_rendered
+
+        self.widget.scroll_by(1000)
+        self.widget.grab()
+        self.widget.grab()
+        self.widget.scroll_by(-1000)
+        after_scroll = self.widget.tiles_rendered
+        self.widget.grab()
+
+        self.assertEqual(self.widget.tiles_rendered, after_scroll)
+        self.assertGreater(after_scroll, rendered)
+
+    def test_refresh_picks_up_new_activity(self):
+        """refresh() перечитывает день и перерисовывает его плитки."""
+        self.widget.grab()
+        self.widget.grab()
+        moment = datetime(2024, 3, 1, 16, 0)
+        self.db.save_activity(Activity(
+            session_id="s", application_name="shell",
+            start_time=moment - timedelta(hours=1), end_time=moment + timedelta(hours=1),
+            activity_type=N
+        ))
+        self.assertNotEqual(self._color_at(moment), TYPE_COLORS[N])
+
+        self.widget.refresh(self.day)
+        self.widget.grab()
+        self.assertEqual(self._color_at(moment), TYPE_COLORS[N])
+
+    def test_zoom_keeps_anchor(self):
+        """Масштаб меняется вокруг точки под курсором."""
+        def moment_at(x):
+            start, end = self.widget.visible_range()
+            return start + (end - start) * (x / self.widget.width())
+
+        anchor = moment_at(300)
+        self.widget.zoom(-4, 300)
+        self.assertLess(abs((moment_at(300) - anchor).total_seconds()), 300)
+
+        self.widget.zoom(100)
+        start, end = self.widget.visible_range()
+        self.assertGreater(end - start, timedelta(days=14))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+"""Тесты трассировки."""
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import sys
+
+sys.path.insert(0, 'src')
+
+from utils import metrics, tracing
+
+
+class TestTracing(unittest.TestCase):
+    """Тесты кольцевого буфера и экспорта Chrome Trace."""
+
+    def setUp(self):
+        """Подготовка к тестам."""
+        tracing.tracer.clear()
+
+    def tearDown(self):
+        """Выключение трассировки после теста."""
+        tracing.enable(False)
+        tracing.tracer.clear()
+
+    def test_disabled_records_nothing(self):
+        """Выключенная трассировка не пишет спаны."""
+        with tracing.span("noop"):
+            pass
+        self.assertEqual(len(tracing.tracer), 0)
+
+    def test_ring_buffer_keeps_latest(self):
+        """Буфер хранит только последние события."""
+        tracer = tracing.Tracer(capacity=3)
+        for i in range(5):
+            tracer.add_complete(f"op{i}", "test", 0.0, 0.001)
+
+        names = [e["name"] for e in tracer.to_chrome_trace()["traceEvents"] if e["ph"] == "X"]
+        self.assertEqual(names, ["op2", "op3", "op4"])
+
+    def test_timed_emits_spans(self):
+        """Декоратор метрик пишет спаны при включённой трассировке."""
+        tracing.enable()
+
+        @metrics.timed("db.test")
+        def op():
+            with tracing.span("inner", "probe", pid=1):
+                pass
+
+        op()
+        path = tracing.tracer.dump(Path(tempfile.mkdtemp()) / "trace.json")
+        events = json.loads(path.read_text(encoding="utf-8"))["traceEvents"]
+        spans = {e["name"]: e for e in events if e["ph"] == "X"}
+
+        self.assertEqual(spans["db.test"]["cat"], "db")
+        self.assertEqual(spans["inner"]["args"], {"pid": 1})
+        self.assertGreaterEqual(spans["db.test"]["dur"], spans["inner"]["dur"])
+        self.assertEqual(metrics.registry.snapshot().get("db.test"), None)
+
+
+if __name__ == "__main__":
+    unittest.main()
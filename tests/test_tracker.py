@@ -1,14 +1,20 @@
 """Тесты для трекера времени."""
 
+import tempfile
 import unittest
 from unittest.mock import Mock, MagicMock
 from datetime import datetime
+from pathlib import Path
 
 import sys
 
 sys.path.insert(0, 'src')
 
+from PyQt6.QtCore import QCoreApplication
+
 from models.session import Session, SessionStatus
+from database.db_manager import DatabaseManager
+from core.tracker import TimeTracker
 
 
 class TestSession(unittest.TestCase):
@@ -68,6 +74,42 @@ class TestSession(unittest.TestCase):
         self.assertEqual(restored.total_duration, original.total_duration)
 
 
+class TestTimeTracker(unittest.TestCase):
+    """Тесты трекера с настоящей БД и управляемыми часами."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def setUp(self):
+        """Подготовка к тестам."""
+        self.db = DatabaseManager(Path(tempfile.mkdtemp()) / "test.db")
+        self.db.initialize()
+
+        self.now = 1000.0
+        self.tracker = TimeTracker(self.db)
+        self.tracker._clock = lambda: self.now
+
+    def test_today_total_counts_current_session_once(self):
+        """Сохранённая часть текущей сессии не учитывается дважды."""
+        self.tracker.start()
+        self.now += 90
+        self.tracker._on_tick()  # сохраняет 90 секунд в БД
+
+        self.now += 30
+        self.assertEqual(self.tracker.get_today_total(), 120)
+
+    def test_today_total_includes_finished_sessions(self):
+        """Завершённые сессии берутся из БД."""
+        self.tracker.start()
+        self.now += 300
+        self.tracker.stop()
+
+        self.tracker.start()
+        self.now += 60
+        self.assertEqual(self.tracker.get_today_total(), 360)
+
+
 if __name__ == "__main__":
     unittest.main()
     
\ No newline at end of file